@@ -0,0 +1,28 @@
+import os
+
+import psycopg2
+import pytest
+
+# 데이터베이스가 필요한 테스트의 연결 정보 (없으면 해당 테스트는 건너뜀)
+#   POSTGRES_TEST_DSN="host=localhost dbname=main_db user=admin password=admin123" python -m pytest codes
+TEST_DSN = os.environ.get("POSTGRES_TEST_DSN", "host=localhost port=5432 dbname=main_db user=admin password=admin123")
+
+
+@pytest.fixture
+def pg_conn():
+    """테스트용 연결입니다. 테스트가 끝나면 롤백하므로 테이블/함수 생성도 남지 않습니다."""
+    try:
+        conn = psycopg2.connect(TEST_DSN, connect_timeout=3)
+    except psycopg2.OperationalError as e:
+        pytest.skip(f"PostgreSQL에 연결할 수 없습니다: {e}")
+    try:
+        yield conn
+    finally:
+        conn.rollback()
+        conn.close()
+
+
+@pytest.fixture
+def pg_params(pg_conn):
+    """TEST_DSN을 psycopg2.connect() 키워드 인자로 나눈 dict입니다. (서버가 없으면 건너뜀)"""
+    return psycopg2.extensions.parse_dsn(TEST_DSN)
@@ -0,0 +1,367 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, List, Optional, Sequence, Tuple
+
+import psycopg2
+import psycopg2.extensions
+from psycopg2.pool import PoolError
+
+from postgres_metrics import statement_shape
+from postgres_pool import PoolTimeoutError
+
+# ----------------------------------------------------------------------
+# asyncio 기반 PostgreSQL 실행 엔진 (Async Engine)
+# ----------------------------------------------------------------------
+# psycopg2의 비동기 연결(async_=True)은 쿼리를 보낸 뒤 바로 반환하고,
+# conn.poll()이 알려주는 소켓 상태(읽기/쓰기 대기)를 이벤트 루프의
+# add_reader/add_writer로 기다립니다. 따라서 새 드라이버 없이도 스레드를 쓰지 않고
+# 여러 쿼리를 서로 다른 연결에서 동시에 실행할 수 있습니다.
+#
+# 비동기 연결의 제약:
+# - 항상 autocommit으로 동작하므로 트랜잭션은 transaction() 블록(BEGIN/COMMIT)으로 묶습니다.
+# - executemany, COPY, 이름 있는(서버 측) 커서는 사용할 수 없습니다.
+# - 한 연결에서는 한 번에 하나의 쿼리만 실행할 수 있습니다. (동시 실행은 풀의 여러 연결로)
+
+
+async def wait_ready(conn) -> None:
+    """conn.poll()이 POLL_OK를 반환할 때까지 이벤트 루프에서 소켓 준비 상태를 기다립니다."""
+    loop = asyncio.get_running_loop()
+    while True:
+        state = conn.poll()
+        if state == psycopg2.extensions.POLL_OK:
+            return
+
+        fd = conn.fileno()
+        ready = loop.create_future()
+
+        def _wake() -> None:
+            if not ready.done():
+                ready.set_result(None)
+
+        if state == psycopg2.extensions.POLL_READ:
+            loop.add_reader(fd, _wake)
+            try:
+                await ready
+            finally:
+                loop.remove_reader(fd)
+        elif state == psycopg2.extensions.POLL_WRITE:
+            loop.add_writer(fd, _wake)
+            try:
+                await ready
+            finally:
+                loop.remove_writer(fd)
+        else:
+            raise psycopg2.OperationalError(f"알 수 없는 poll 상태입니다: {state}")
+
+
+class AsyncConnection:
+    """psycopg2 비동기 연결을 감싸 await 가능한 실행 메서드를 제공합니다."""
+
+    def __init__(self, raw, metrics: Optional[Any] = None):
+        self.raw = raw
+        self.metrics = metrics
+        self.created_at = time.monotonic()
+        self.idle_since = self.created_at  # 풀에 마지막으로 반환된 시각
+
+    @classmethod
+    async def connect(cls, metrics: Optional[Any] = None, **conn_kwargs: Any) -> "AsyncConnection":
+        raw = psycopg2.connect(async_=True, **conn_kwargs)
+        try:
+            await wait_ready(raw)
+        except BaseException:
+            raw.close()
+            raise
+        return cls(raw, metrics)
+
+    def _record(self, cur, query: Any, start: float, error: bool) -> None:
+        """metrics가 있으면 실행 시간/행 수를 기록합니다. (비동기 연결은 EXPLAIN 자동 수집을 하지 않습니다)"""
+        seconds = time.perf_counter() - start
+        shape = statement_shape(query, cur)
+        rows = None if error or cur.rowcount < 0 else cur.rowcount
+        self.metrics.observe(shape, seconds, rows, error)
+        if not error and self.metrics.is_slow(seconds):
+            sent = cur.query.decode(psycopg2.extensions.encodings[self.raw.encoding], "replace") if cur.query else shape
+            self.metrics.record_slow(shape, sent, seconds, rows)
+
+    @property
+    def closed(self) -> bool:
+        return self.raw.closed != 0
+
+    @property
+    def busy(self) -> bool:
+        """쿼리 실행 도중 취소되어 결과를 다 받지 못한 상태인지 여부"""
+        return not self.closed and self.raw.isexecuting()
+
+    async def execute(self, query: Any, params: Optional[Sequence[Any]] = None):
+        """쿼리를 실행하고 결과를 읽을 수 있는 커서를 반환합니다. (커서는 호출자가 닫습니다)"""
+        cur = self.raw.cursor()
+        start = time.perf_counter()
+        try:
+            cur.execute(query, params)
+            await wait_ready(self.raw)
+        except BaseException:
+            if self.metrics is not None:
+                self._record(cur, query, start, True)
+            cur.close()
+            raise
+        if self.metrics is not None:
+            self._record(cur, query, start, False)
+        return cur
+
+    async def ping(self) -> None:
+        """'SELECT 1'로 연결 상태를 확인합니다. 풀 내부 확인이므로 쿼리 지표에는 기록하지 않습니다."""
+        cur = self.raw.cursor()
+        try:
+            cur.execute("SELECT 1")
+            await wait_ready(self.raw)
+        finally:
+            cur.close()
+
+    async def run(self, query: Any, params: Optional[Sequence[Any]] = None) -> int:
+        """결과 행이 없는 문장을 실행하고 영향받은 행 수를 반환합니다."""
+        cur = await self.execute(query, params)
+        try:
+            return cur.rowcount
+        finally:
+            cur.close()
+
+    async def fetchall(self, query: Any, params: Optional[Sequence[Any]] = None) -> List[Tuple]:
+        cur = await self.execute(query, params)
+        try:
+            return cur.fetchall()
+        finally:
+            cur.close()
+
+    async def fetchone(self, query: Any, params: Optional[Sequence[Any]] = None) -> Optional[Tuple]:
+        cur = await self.execute(query, params)
+        try:
+            return cur.fetchone()
+        finally:
+            cur.close()
+
+    async def insert_values(self, insert_prefix: str, rows: Sequence[Sequence[Any]],
+                            template: Optional[str] = None, page_size: int = 1000) -> int:
+        """
+        여러 행을 "INSERT ... VALUES (...), (...)" 문장으로 page_size 행씩 삽입합니다.
+        (비동기 연결은 executemany/execute_values를 쓸 수 없으므로 mogrify로 VALUES를 만듭니다)
+        insert_prefix 예: "INSERT INTO books (title, price) VALUES "
+        """
+        if not rows:
+            return 0
+        template = template or "(" + ", ".join(["%s"] * len(rows[0])) + ")"
+        codec = psycopg2.extensions.encodings[self.raw.encoding]
+        cur = self.raw.cursor()
+        try:
+            total = 0
+            for start in range(0, len(rows), page_size):
+                page = rows[start:start + page_size]
+                values = b", ".join(cur.mogrify(template, row) for row in page)
+                query = insert_prefix.encode(codec) + values
+                started = time.perf_counter()
+                try:
+                    cur.execute(query)
+                    await wait_ready(self.raw)
+                except BaseException:
+                    if self.metrics is not None:
+                        self._record(cur, query, started, True)
+                    raise
+                if self.metrics is not None:
+                    self._record(cur, query, started, False)
+                total += cur.rowcount
+            return total
+        finally:
+            cur.close()
+
+    @asynccontextmanager
+    async def transaction(self) -> AsyncIterator["AsyncConnection"]:
+        """BEGIN ~ COMMIT 으로 블록을 하나의 트랜잭션으로 묶습니다. 예외 시 ROLLBACK 합니다."""
+        await self.run("BEGIN")
+        try:
+            yield self
+        except BaseException:
+            if not self.closed and not self.busy:
+                await self.run("ROLLBACK")
+            raise
+        else:
+            await self.run("COMMIT")
+
+    def close(self) -> None:
+        if not self.closed:
+            self.raw.close()
+
+
+class AsyncConnectionPool:
+    """
+    asyncio용 연결 풀입니다. (동기 ConnectionPool과 같은 설정 의미)
+    - minconn / maxconn, timeout(대여 대기 최대 초), max_lifetime(연결 최대 재사용 초)
+    - health_check: 대여 시 'SELECT 1'로 연결 상태 확인
+    - health_check_idle: 이 시간(초) 이상 유휴 상태였던 연결만 확인 (동기 풀과 같이 짧게 쉰 연결은 바로 대여)
+    - metrics: QueryMetrics 객체를 주면 쿼리 실행 시간과 연결 대여 시간을 기록
+    하나의 이벤트 루프 안에서만 사용해야 합니다.
+    """
+
+    def __init__(self, minconn: int = 1, maxconn: int = 10, timeout: float = 30.0,
+                 max_lifetime: Optional[float] = 1800.0, health_check: bool = True,
+                 health_check_idle: float = 30.0, metrics: Optional[Any] = None, **conn_kwargs: Any):
+        if minconn < 0 or maxconn < 1 or minconn > maxconn:
+            raise ValueError("minconn/maxconn 값이 올바르지 않습니다.")
+        self.minconn = minconn
+        self.maxconn = maxconn
+        self.timeout = timeout
+        self.max_lifetime = max_lifetime
+        self.health_check = health_check
+        self.health_check_idle = health_check_idle
+        self.metrics = metrics
+        self._conn_kwargs = conn_kwargs
+        self._idle: List[AsyncConnection] = []
+        self._size = 0
+        self._closed = False
+        self._cond = asyncio.Condition()
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+
+    async def open(self) -> "AsyncConnectionPool":
+        """minconn개의 연결을 미리 생성합니다."""
+        self.loop = asyncio.get_running_loop()
+        while self._size < self.minconn:
+            self._size += 1
+            self._idle.append(await self._connect())
+        return self
+
+    async def _connect(self) -> AsyncConnection:
+        try:
+            return await AsyncConnection.connect(metrics=self.metrics, **self._conn_kwargs)
+        except BaseException:
+            async with self._cond:
+                self._size -= 1
+                self._cond.notify()
+            raise
+
+    async def _discard(self, conn: AsyncConnection) -> None:
+        conn.close()
+        async with self._cond:
+            self._size -= 1
+            self._cond.notify()
+
+    def _is_expired(self, conn: AsyncConnection) -> bool:
+        return self.max_lifetime is not None and time.monotonic() - conn.created_at > self.max_lifetime
+
+    async def _is_healthy(self, conn: AsyncConnection) -> bool:
+        if conn.closed or conn.raw.info.transaction_status == psycopg2.extensions.TRANSACTION_STATUS_UNKNOWN:
+            return False
+        if not self.health_check or time.monotonic() - conn.idle_since < self.health_check_idle:
+            return True
+        try:
+            await conn.ping()
+            return True
+        except psycopg2.Error:
+            return False
+
+    async def getconn(self, timeout: Optional[float] = None) -> AsyncConnection:
+        if self.metrics is None:
+            return await self._getconn(timeout)
+        start = time.perf_counter()
+        try:
+            conn = await self._getconn(timeout)
+        except PoolTimeoutError:
+            self.metrics.observe_acquire(time.perf_counter() - start, timed_out=True)
+            raise
+        self.metrics.observe_acquire(time.perf_counter() - start)
+        return conn
+
+    async def _getconn(self, timeout: Optional[float]) -> AsyncConnection:
+        timeout = self.timeout if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+        while True:
+            async with self._cond:
+                if self._closed:
+                    raise PoolError("연결 풀이 이미 닫혔습니다.")
+                while not self._idle and self._size >= self.maxconn:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise PoolTimeoutError(f"{timeout}초 안에 사용 가능한 연결을 얻지 못했습니다.")
+                    try:
+                        await asyncio.wait_for(self._cond.wait(), remaining)
+                    except asyncio.TimeoutError:
+                        continue
+                    if self._closed:
+                        raise PoolError("연결 풀이 이미 닫혔습니다.")
+                if self._idle:
+                    conn = self._idle.pop()
+                else:
+                    conn = None
+                    self._size += 1  # 새 연결을 위한 자리 예약
+
+            if conn is None:
+                return await self._connect()
+            if self._is_expired(conn) or not await self._is_healthy(conn):
+                await self._discard(conn)
+                continue
+            return conn
+
+    async def putconn(self, conn: AsyncConnection, close: bool = False) -> None:
+        """연결을 반환합니다. 실행 도중이거나 트랜잭션이 열린 채로 돌아온 연결은 정리하거나 폐기합니다."""
+        if close or conn.closed or conn.busy or self._closed or self._is_expired(conn):
+            await self._discard(conn)
+            return
+        try:
+            if conn.raw.info.transaction_status != psycopg2.extensions.TRANSACTION_STATUS_IDLE:
+                await conn.run("ROLLBACK")
+        except psycopg2.Error:
+            await self._discard(conn)
+            return
+        conn.idle_since = time.monotonic()
+        async with self._cond:
+            self._idle.append(conn)
+            self._cond.notify()
+
+    @asynccontextmanager
+    async def connection(self, timeout: Optional[float] = None) -> AsyncIterator[AsyncConnection]:
+        """async with 문으로 연결을 빌려 씁니다. 태스크가 취소되어도 연결은 안전하게 정리됩니다."""
+        conn = await self.getconn(timeout)
+        try:
+            yield conn
+        finally:
+            await self.putconn(conn)
+
+    async def close(self) -> None:
+        async with self._cond:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._cond.notify_all()
+        for conn in idle:
+            await self._discard(conn)
+
+    def close_nowait(self) -> None:
+        """
+        이벤트 루프 없이 풀을 닫습니다. 유휴 연결은 바로 닫고, 대여 중인 연결은 반환될 때 닫힙니다.
+        (이미 끝난 이벤트 루프의 풀은 close()를 await할 수 없으므로 이 메서드로 정리합니다)
+        """
+        self._closed = True
+        idle, self._idle = self._idle, []
+        for conn in idle:
+            conn.close()
+        self._size -= len(idle)
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    async def __aenter__(self) -> "AsyncConnectionPool":
+        return await self.open()
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.close()
+
+
+async def gather_fetchall(pool: AsyncConnectionPool,
+                          queries: Sequence[Tuple[Any, Optional[Sequence[Any]]]]) -> List[List[Tuple]]:
+    """
+    여러 (쿼리, 파라미터)를 풀의 서로 다른 연결에서 동시에 실행하고, 입력 순서대로 결과를 반환합니다.
+    동시 실행 수는 풀의 maxconn으로 제한됩니다.
+    """
+    async def _one(query: Any, params: Optional[Sequence[Any]]) -> List[Tuple]:
+        async with pool.connection() as conn:
+            return await conn.fetchall(query, params)
+
+    return list(await asyncio.gather(*(_one(q, p) for q, p in queries)))
@@ -0,0 +1,452 @@
+import argparse
+import json
+import math
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import psycopg2
+
+from postgres_bulk import bulk_insert
+from postgres_modify import delete_nth, update_nth
+from postgres_stream import stream_query
+from postgres_uuid7 import install_uuid7_function, uuid7
+
+# ----------------------------------------------------------------------
+# books CRUD 벤치마크 (Benchmark Harness)
+# ----------------------------------------------------------------------
+# 로컬 PostgreSQL에 bench 스키마를 만들고 books 테이블을 지정한 크기(1만~1000만 행)로 채운 뒤,
+# 삽입(executemany / execute_values 배치 / COPY), 전체 조회, 조건 조회, 순번 기반 수정/삭제,
+# 기본 키 종류(UUID v4 / v7)별 삽입의 처리량과 지연 시간(p50/p99)을 측정해 JSON 파일로 저장합니다.
+#
+# 연결은 search_path=bench,public 으로 설정되므로 예제 스크립트와 같은 SQL("books")이
+# bench.books 에서 실행되고, 기존 public.books 데이터에는 영향을 주지 않습니다.
+#
+# 사용 예:
+#   python codes/postgres_benchmark.py --sizes 10000 100000 --output bench_results.json
+#   python codes/postgres_benchmark.py --sizes 10000 --compare bench_results.json
+#   python codes/postgres_benchmark.py --sizes 1000000 --cases uuid
+
+BENCH_SCHEMA = "bench"
+PRICE_RANGE = 100_000          # 가격은 0 ~ 99,999 균등 분포
+EXPENSIVE_THRESHOLD = 99_000   # 조건 조회가 약 1%의 행을 고르도록 하는 기준 가격
+SEED_BATCH_SIZE = 500_000
+
+BENCH_DDL = [
+    'CREATE EXTENSION IF NOT EXISTS "uuid-ossp"',
+    f"CREATE SCHEMA IF NOT EXISTS {BENCH_SCHEMA}",
+    f"DROP TABLE IF EXISTS {BENCH_SCHEMA}.books",
+    f"""
+    CREATE TABLE {BENCH_SCHEMA}.books (
+        serial_no SERIAL UNIQUE NOT NULL,
+        id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+        title VARCHAR(100) NOT NULL,
+        price INT NOT NULL
+    )
+    """,
+]
+
+BENCH_INDEXES = [
+    f"CREATE INDEX IF NOT EXISTS books_title_id_idx ON {BENCH_SCHEMA}.books (title, id)",
+    f"CREATE INDEX IF NOT EXISTS books_price_covering_idx ON {BENCH_SCHEMA}.books (price, id) INCLUDE (title)",
+]
+
+
+# ----------------------------------------------------------------------
+# 측정 헬퍼
+# ----------------------------------------------------------------------
+
+def percentile(sorted_values: Sequence[float], pct: float) -> float:
+    """정렬된 값에서 nearest-rank 방식의 백분위수를 구합니다."""
+    if not sorted_values:
+        return float("nan")
+    rank = max(1, math.ceil(pct / 100.0 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def summarize(case: str, size: int, latencies: List[float], rows_per_op: float) -> Dict[str, Any]:
+    """작업별 지연 시간(초) 목록을 결과 레코드로 요약합니다."""
+    ordered = sorted(latencies)
+    total = sum(ordered)
+    ops = len(ordered)
+    return {
+        "case": case,
+        "size": size,
+        "ops": ops,
+        "rows_per_op": rows_per_op,
+        "total_seconds": round(total, 6),
+        "ops_per_sec": round(ops / total, 3) if total else None,
+        "rows_per_sec": round(ops * rows_per_op / total, 3) if total else None,
+        "mean_ms": round(total / ops * 1000, 3) if ops else None,
+        "p50_ms": round(percentile(ordered, 50) * 1000, 3),
+        "p99_ms": round(percentile(ordered, 99) * 1000, 3),
+        "max_ms": round(ordered[-1] * 1000, 3) if ordered else None,
+    }
+
+
+def measure(fn: Callable[[int], Any], repeat: int, warmup: int = 1) -> List[float]:
+    """fn(i)를 warmup회 실행한 뒤 repeat회 실행하며 각 실행 시간을 잽니다."""
+    for i in range(warmup):
+        fn(-1 - i)
+    latencies = []
+    for i in range(repeat):
+        start = time.perf_counter()
+        fn(i)
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def make_rows(rng: random.Random, count: int, size_hint: int) -> List[tuple]:
+    """(title, price) 합성 데이터를 만듭니다. 제목은 약 size_hint/4 종류가 중복되어 나타납니다."""
+    distinct = max(1, size_hint // 4)
+    return [(f"도서-{rng.randrange(distinct)}", rng.randrange(PRICE_RANGE)) for _ in range(count)]
+
+
+# ----------------------------------------------------------------------
+# 준비 (스키마 / 데이터 적재)
+# ----------------------------------------------------------------------
+
+def connect(args: argparse.Namespace):
+    conn = psycopg2.connect(
+        host=args.host, port=args.port, dbname=args.dbname, user=args.user, password=args.password,
+        options=f"-c search_path={BENCH_SCHEMA},public",
+    )
+    conn.autocommit = False
+    return conn
+
+
+def prepare_table(conn, with_indexes: bool, ddl: Optional[Sequence[str]] = None) -> None:
+    with conn.cursor() as cur:
+        for statement in ddl or BENCH_DDL:
+            cur.execute(statement)
+        if with_indexes:
+            for statement in BENCH_INDEXES:
+                cur.execute(statement)
+    conn.commit()
+
+
+def vacuum(conn) -> None:
+    """VACUUM ANALYZE는 트랜잭션 밖에서만 실행할 수 있으므로 잠시 autocommit으로 전환합니다."""
+    conn.autocommit = True
+    try:
+        with conn.cursor() as cur:
+            cur.execute("VACUUM ANALYZE books")
+    finally:
+        conn.autocommit = False
+
+
+def seed(conn, size: int, rng: random.Random) -> float:
+    """books를 size행으로 COPY 적재하고 걸린 시간(초)을 반환합니다. (행은 생성기로 만들어 메모리를 아낍니다)"""
+    distinct = max(1, size // 4)
+
+    def rows():
+        for _ in range(size):
+            yield (f"도서-{rng.randrange(distinct)}", rng.randrange(PRICE_RANGE))
+
+    start = time.perf_counter()
+    bulk_insert(conn, rows(), batch_size=SEED_BATCH_SIZE, small_batch_size=1)
+    elapsed = time.perf_counter() - start
+    vacuum(conn)
+    return elapsed
+
+
+# ----------------------------------------------------------------------
+# 벤치마크 케이스
+# ----------------------------------------------------------------------
+
+def bench_inserts(conn, size: int, args: argparse.Namespace, rng: random.Random) -> List[Dict[str, Any]]:
+    """
+    같은 행 수를 세 가지 방식으로 삽입합니다. 실제 사용과 같이 커밋까지 측정하고,
+    측정이 끝나면 추가된 행을 지워 다음 케이스의 테이블 크기를 유지합니다.
+    """
+    n = args.insert_rows
+    results = []
+
+    def run(method: str) -> Callable[[int], None]:
+        def _insert(_: int) -> None:
+            rows = make_rows(rng, n, size)
+            if method == "executemany":
+                with conn.cursor() as cur:
+                    cur.executemany("INSERT INTO books (title, price) VALUES (%s, %s)", rows)
+                conn.commit()
+            elif method == "execute_values":
+                # small_batch_size를 행 수보다 크게 주면 execute_values 경로만 사용합니다.
+                bulk_insert(conn, rows, batch_size=n, small_batch_size=n + 1)
+            else:
+                bulk_insert(conn, rows, batch_size=n, small_batch_size=1)
+        return _insert
+
+    with conn.cursor() as cur:
+        cur.execute("SELECT COALESCE(MAX(serial_no), 0) FROM books")
+        last_serial = cur.fetchone()[0]
+    conn.commit()
+
+    for method in ("executemany", "execute_values", "copy"):
+        if method == "executemany" and n * args.insert_repeat > args.executemany_limit:
+            print(f"  - insert_{method}: 행 수가 많아 건너뜁니다. (--executemany-limit)", file=sys.stderr)
+            continue
+        latencies = measure(run(method), args.insert_repeat)
+        results.append(summarize(f"insert_{method}", size, latencies, n))
+
+    with conn.cursor() as cur:
+        cur.execute("DELETE FROM books WHERE serial_no > %s", (last_serial,))
+    conn.commit()
+    vacuum(conn)
+    return results
+
+
+def bench_reads(conn, size: int, args: argparse.Namespace, rng: random.Random) -> List[Dict[str, Any]]:
+    results = []
+    distinct = max(1, size // 4)
+
+    def full_scan(_: int) -> None:
+        with conn.cursor() as cur:
+            cur.execute("SELECT id, title, price FROM books ORDER BY price DESC")
+            cur.fetchall()
+        conn.rollback()
+
+    def full_scan_stream(_: int) -> None:
+        for _row in stream_query(conn, "SELECT id, title, price FROM books ORDER BY price DESC"):
+            pass
+        conn.rollback()
+
+    def expensive(_: int) -> None:
+        with conn.cursor() as cur:
+            cur.execute("SELECT id, title, price FROM books WHERE price >= %s ORDER BY price DESC",
+                        (EXPENSIVE_THRESHOLD,))
+            cur.fetchall()
+        conn.rollback()
+
+    def by_title(_: int) -> None:
+        with conn.cursor() as cur:
+            cur.execute("SELECT id, title, price FROM books WHERE title = %s", (f"도서-{rng.randrange(distinct)}",))
+            cur.fetchall()
+        conn.rollback()
+
+    scan_repeat = max(1, args.repeat // 10) if size >= 1_000_000 else args.repeat
+    results.append(summarize("full_scan_fetchall", size, measure(full_scan, scan_repeat), size))
+    results.append(summarize("full_scan_stream", size, measure(full_scan_stream, scan_repeat), size))
+    results.append(summarize("filter_price", size, measure(expensive, args.repeat),
+                             size * (PRICE_RANGE - EXPENSIVE_THRESHOLD) / PRICE_RANGE))
+    results.append(summarize("filter_title", size, measure(by_title, args.repeat), 4))
+    return results
+
+
+def bench_positional(conn, size: int, args: argparse.Namespace) -> List[Dict[str, Any]]:
+    """순번 기반 수정/삭제: 기존 두 문장 방식(SELECT OFFSET 후 수정)과 한 문장 CTE 방식을 비교합니다."""
+    results = []
+
+    def legacy_update(_: int) -> None:
+        with conn.cursor() as cur:
+            cur.execute("SELECT id FROM books ORDER BY title ASC LIMIT 1 OFFSET 1")
+            row = cur.fetchone()
+            if row:
+                cur.execute("UPDATE books SET price = %s WHERE id = %s", (27000, row[0]))
+        conn.rollback()
+
+    def cte_update(_: int) -> None:
+        with conn.cursor() as cur:
+            update_nth(cur, "books", ("title", "id"), 1, {"price": 27000}, returning=("id",))
+        conn.rollback()
+
+    def legacy_delete(_: int) -> None:
+        with conn.cursor() as cur:
+            cur.execute("SELECT id FROM books ORDER BY title ASC LIMIT 1 OFFSET 2")
+            row = cur.fetchone()
+            if row:
+                cur.execute("DELETE FROM books WHERE id = %s", (row[0],))
+        conn.rollback()
+
+    def cte_delete(_: int) -> None:
+        with conn.cursor() as cur:
+            delete_nth(cur, "books", ("title", "id"), 2, returning=("id",))
+        conn.rollback()
+
+    for name, fn in (("update_second_two_step", legacy_update), ("update_second_cte", cte_update),
+                     ("delete_third_two_step", legacy_delete), ("delete_third_cte", cte_delete)):
+        results.append(summarize(name, size, measure(fn, args.repeat), 1))
+    return results
+
+
+# (이름, 서버 기본값, 클라이언트에서 키 생성 여부)
+UUID_VARIANTS = (
+    ("uuid_v4", "uuid_generate_v4()", False),
+    ("uuid_v7_server", "uuid_generate_v7()", False),
+    ("uuid_v7_client", None, True),
+)
+
+
+def bench_uuid_keys(conn, size: int, args: argparse.Namespace, rng: random.Random) -> List[Dict[str, Any]]:
+    """
+    기본 키 종류별로 빈 테이블에 size행을 insert_rows행씩 COPY로 적재하며
+    배치 지연 시간과 처리량, 적재 후 기본 키 인덱스 크기(pk_index_bytes)를 비교합니다.
+    """
+    with conn.cursor() as cur:
+        install_uuid7_function(cur)
+    conn.commit()
+
+    results = []
+    for name, default, client_side in UUID_VARIANTS:
+        table = f"books_{name}"
+        with conn.cursor() as cur:
+            cur.execute(f"DROP TABLE IF EXISTS {table}")
+            cur.execute(f"CREATE TABLE {table} (id UUID PRIMARY KEY DEFAULT {default or 'uuid_generate_v4()'}, "
+                        "title VARCHAR(100) NOT NULL, price INT NOT NULL)")
+        conn.commit()
+
+        columns = ("id", "title", "price") if client_side else ("title", "price")
+        latencies = []
+        for start_row in range(0, size, args.insert_rows):
+            rows = make_rows(rng, min(args.insert_rows, size - start_row), size)
+            start = time.perf_counter()
+            if client_side:
+                rows = [(uuid7(), title, price) for title, price in rows]
+            bulk_insert(conn, rows, table=table, columns=columns, batch_size=len(rows), small_batch_size=1)
+            latencies.append(time.perf_counter() - start)
+
+        with conn.cursor() as cur:
+            cur.execute("SELECT pg_relation_size(%s::regclass)", (f"{BENCH_SCHEMA}.{table}_pkey",))
+            index_bytes = cur.fetchone()[0]
+            cur.execute(f"DROP TABLE {table}")
+        conn.commit()
+
+        result = summarize(f"insert_{name}", size, latencies, size / len(latencies))
+        result["pk_index_bytes"] = index_bytes
+        results.append(result)
+    return results
+
+
+# ----------------------------------------------------------------------
+# 결과 저장 / 비교
+# ----------------------------------------------------------------------
+
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=os.path.dirname(os.path.abspath(__file__)),
+            stderr=subprocess.DEVNULL, text=True,
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results: List[Dict[str, Any]], baseline_path: str, threshold_pct: float) -> List[str]:
+    """기준 결과 파일과 비교해 p50이 threshold_pct% 이상 느려진 케이스를 반환합니다."""
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = {(r["case"], r["size"]): r for r in json.load(f)["results"]}
+    regressions = []
+    for r in results:
+        base = baseline.get((r["case"], r["size"]))
+        if not base or not base.get("p50_ms"):
+            continue
+        change = (r["p50_ms"] - base["p50_ms"]) / base["p50_ms"] * 100
+        if change >= threshold_pct:
+            regressions.append(f"{r['case']} (size={r['size']}): p50 {base['p50_ms']}ms -> {r['p50_ms']}ms (+{change:.1f}%)")
+    return regressions
+
+
+def run_benchmark(args: argparse.Namespace) -> Dict[str, Any]:
+    rng = random.Random(args.seed)
+    conn = connect(args)
+    results: List[Dict[str, Any]] = []
+    try:
+        with conn.cursor() as cur:
+            cur.execute("SHOW server_version")
+            server_version = cur.fetchone()[0]
+        conn.commit()
+
+        for size in args.sizes:
+            print(f"[size={size:,}] 테이블 준비 및 데이터 적재 중...", file=sys.stderr)
+            prepare_table(conn, with_indexes=not args.without_indexes)
+            seed_seconds = seed(conn, size, rng)
+            results.append(summarize("seed_copy", size, [seed_seconds], size))
+
+            for group in args.cases:
+                print(f"[size={size:,}] {group} 측정 중...", file=sys.stderr)
+                if group == "insert":
+                    results.extend(bench_inserts(conn, size, args, rng))
+                elif group == "read":
+                    results.extend(bench_reads(conn, size, args, rng))
+                elif group == "positional":
+                    results.extend(bench_positional(conn, size, args))
+                elif group == "uuid":
+                    results.extend(bench_uuid_keys(conn, size, args, rng))
+
+        if not args.keep_table:
+            with conn.cursor() as cur:
+                cur.execute(f"DROP TABLE IF EXISTS {BENCH_SCHEMA}.books")
+            conn.commit()
+    finally:
+        conn.close()
+
+    return {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "git_revision": git_revision(),
+            "server_version": server_version,
+            "python": platform.python_version(),
+            "psycopg2": psycopg2.__version__,
+            "args": {k: v for k, v in vars(args).items() if k != "password"},
+        },
+        "results": results,
+    }
+
+
+def parse_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="books CRUD 경로 벤치마크 (로컬 PostgreSQL)")
+    parser.add_argument("--host", default=os.environ.get("PGHOST", "localhost"))
+    parser.add_argument("--port", default=os.environ.get("PGPORT", "5432"))
+    parser.add_argument("--dbname", default=os.environ.get("PGDATABASE", "main_db"))
+    parser.add_argument("--user", default=os.environ.get("PGUSER", "admin"))
+    parser.add_argument("--password", default=os.environ.get("PGPASSWORD", "admin123"))
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000],
+                        help="books 테이블 행 수 목록 (예: 10000 100000 1000000 10000000)")
+    parser.add_argument("--cases", nargs="+", choices=["insert", "read", "positional", "uuid"],
+                        default=["insert", "read", "positional", "uuid"])
+    parser.add_argument("--repeat", type=int, default=30, help="조회/수정 케이스 반복 횟수")
+    parser.add_argument("--insert-rows", type=int, default=10_000, help="삽입 케이스 한 번에 넣을 행 수")
+    parser.add_argument("--insert-repeat", type=int, default=5, help="삽입 케이스 반복 횟수")
+    parser.add_argument("--executemany-limit", type=int, default=200_000,
+                        help="executemany 케이스의 총 삽입 행 수 상한 (너무 느린 경우 건너뜀)")
+    parser.add_argument("--without-indexes", action="store_true", help="보조 인덱스 없이 측정")
+    parser.add_argument("--seed", type=int, default=42, help="합성 데이터 난수 시드")
+    parser.add_argument("--keep-table", action="store_true", help="측정 후 bench.books를 삭제하지 않음")
+    parser.add_argument("--output", default="bench_results.json", help="결과 JSON 파일 경로")
+    parser.add_argument("--compare", help="비교할 이전 결과 JSON 파일 경로")
+    parser.add_argument("--regression-threshold", type=float, default=20.0,
+                        help="p50이 이 비율(%%) 이상 느려지면 회귀로 보고")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    args = parse_args(argv)
+    report = run_benchmark(args)
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+
+    print(f"{'case':<26} {'size':>10} {'ops/s':>10} {'rows/s':>12} {'p50 ms':>9} {'p99 ms':>9} {'pk index':>10}")
+    for r in report["results"]:
+        index_size = f"{r['pk_index_bytes'] / 1024 / 1024:.1f}MB" if "pk_index_bytes" in r else ""
+        print(f"{r['case']:<26} {r['size']:>10,} {r['ops_per_sec'] or 0:>10,.1f} "
+              f"{r['rows_per_sec'] or 0:>12,.0f} {r['p50_ms']:>9.3f} {r['p99_ms']:>9.3f} {index_size:>10}")
+    print(f"=> 결과가 {args.output}에 저장되었습니다.")
+
+    if args.compare:
+        regressions = compare(report["results"], args.compare, args.regression_threshold)
+        if regressions:
+            print("=> 성능 회귀가 감지되었습니다:", file=sys.stderr)
+            for line in regressions:
+                print(f"  - {line}", file=sys.stderr)
+            return 1
+        print("=> 기준 결과 대비 성능 회귀가 없습니다.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,227 @@
+import csv
+import json
+import os
+from itertools import chain, islice
+from typing import Any, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+from psycopg2 import sql
+from psycopg2.extras import execute_values
+
+# ----------------------------------------------------------------------
+# COPY 기반 대량 적재 (Bulk Loader)
+# ----------------------------------------------------------------------
+# executemany는 psycopg2에서 행마다 서버 왕복이 발생합니다.
+# 이 모듈은 임의의 iterable 또는 CSV/JSONL 파일의 행을 COPY ... FROM STDIN으로
+# 스트리밍하여 적재하며, 배치 단위로 커밋하므로 메모리 사용량이 일정합니다.
+# 행 수가 적은 배치는 COPY 대신 execute_values 한 번으로 처리합니다.
+
+DEFAULT_BATCH_SIZE = 100_000      # 커밋 단위 행 수
+DEFAULT_SMALL_BATCH_SIZE = 1_000  # 이보다 적은 배치는 execute_values 사용
+DEFAULT_PAGE_SIZE = 1_000         # execute_values 한 번에 보낼 행 수
+
+
+def _copy_escape(value: Any) -> str:
+    """COPY text 형식에 맞게 값을 이스케이프합니다. None은 NULL(\\N)로 변환합니다."""
+    if value is None:
+        return "\\N"
+    text = str(value)
+    return (text.replace("\\", "\\\\")
+                .replace("\t", "\\t")
+                .replace("\n", "\\n")
+                .replace("\r", "\\r"))
+
+
+class RowStream:
+    """
+    행 iterator를 COPY text 형식의 파일 객체처럼 읽을 수 있게 감싸는 클래스입니다.
+    copy_expert()가 read(size)를 호출할 때마다 필요한 만큼만 행을 변환합니다.
+    count는 지금까지 읽힌 행 수입니다. (다른 모듈에서 COPY ... FROM STDIN에 그대로 넘겨 사용)
+    """
+
+    def __init__(self, rows: Iterable[Sequence[Any]]):
+        self._rows = iter(rows)
+        self._buf = ""
+        self.count = 0
+
+    def read(self, size: int = -1) -> str:
+        parts = [self._buf]
+        length = len(self._buf)
+        while size < 0 or length < size:
+            row = next(self._rows, None)
+            if row is None:
+                break
+            line = "\t".join(_copy_escape(v) for v in row) + "\n"
+            parts.append(line)
+            length += len(line)
+            self.count += 1
+        data = "".join(parts)
+        if size < 0:
+            size = len(data)
+        self._buf = data[size:]
+        return data[:size]
+
+
+def _stage_name(table: str) -> str:
+    return f"_bulk_stage_{table}"
+
+
+def _ensure_stage(cur, table: str, columns: Sequence[str]) -> sql.Identifier:
+    """
+    RETURNING 값을 돌려받기 위한 임시 스테이징 테이블을 준비합니다.
+    세션(연결)마다 한 번 생성되고, 이후에는 비우기만 합니다.
+    이전 호출과 columns가 다르면(풀에서 재사용한 연결) 새로 만듭니다.
+    """
+    stage = _stage_name(table)
+    cur.execute(
+        "SELECT array_agg(attname::text ORDER BY attnum) FROM pg_attribute "
+        "WHERE attrelid = to_regclass(%s) AND attnum > 0 AND NOT attisdropped",
+        (f"pg_temp.{stage}",),
+    )
+    existing = cur.fetchone()[0]
+    if existing == [*columns, "_ord"]:
+        cur.execute(sql.SQL("TRUNCATE {} RESTART IDENTITY").format(sql.Identifier(stage)))
+        return sql.Identifier(stage)
+
+    if existing is not None:
+        cur.execute(sql.SQL("DROP TABLE pg_temp.{}").format(sql.Identifier(stage)))
+    cur.execute(sql.SQL("CREATE TEMP TABLE {} AS SELECT {} FROM {} WITH NO DATA").format(
+        sql.Identifier(stage),
+        sql.SQL(", ").join(map(sql.Identifier, columns)),
+        sql.Identifier(table),
+    ))
+    # 입력 순서를 보존하기 위한 순번 컬럼
+    cur.execute(sql.SQL("ALTER TABLE {} ADD COLUMN _ord BIGSERIAL").format(sql.Identifier(stage)))
+    return sql.Identifier(stage)
+
+
+def _insert_values(cur, rows: List[Sequence[Any]], table: str, columns: Sequence[str],
+                   returning: Optional[Sequence[str]], page_size: int) -> Tuple[int, List[Tuple]]:
+    """작은 배치를 execute_values로 삽입합니다."""
+    query = sql.SQL("INSERT INTO {} ({}) VALUES %s").format(
+        sql.Identifier(table),
+        sql.SQL(", ").join(map(sql.Identifier, columns)),
+    )
+    if returning:
+        query += sql.SQL(" RETURNING {}").format(sql.SQL(", ").join(map(sql.Identifier, returning)))
+        result = execute_values(cur, query, rows, page_size=page_size, fetch=True)
+        return len(rows), result
+    execute_values(cur, query, rows, page_size=page_size)
+    return len(rows), []
+
+
+def _insert_copy(cur, rows: Iterable[Sequence[Any]], table: str, columns: Sequence[str],
+                 returning: Optional[Sequence[str]]) -> Tuple[int, List[Tuple]]:
+    """배치를 COPY FROM STDIN으로 스트리밍합니다. RETURNING이 필요하면 스테이징 테이블을 거칩니다."""
+    column_list = sql.SQL(", ").join(map(sql.Identifier, columns))
+    stream = RowStream(rows)
+
+    if not returning:
+        copy_query = sql.SQL("COPY {} ({}) FROM STDIN").format(sql.Identifier(table), column_list)
+        cur.copy_expert(copy_query, stream)
+        return stream.count, []
+
+    stage = _ensure_stage(cur, table, columns)
+    cur.copy_expert(sql.SQL("COPY {} ({}) FROM STDIN").format(stage, column_list), stream)
+    cur.execute(sql.SQL("INSERT INTO {} ({}) SELECT {} FROM {} ORDER BY _ord RETURNING {}").format(
+        sql.Identifier(table), column_list, column_list, stage,
+        sql.SQL(", ").join(map(sql.Identifier, returning)),
+    ))
+    return stream.count, cur.fetchall()
+
+
+def bulk_insert(
+    conn,
+    rows: Iterable[Sequence[Any]],
+    table: str = "books",
+    columns: Sequence[str] = ("title", "price"),
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    small_batch_size: int = DEFAULT_SMALL_BATCH_SIZE,
+    page_size: int = DEFAULT_PAGE_SIZE,
+    returning: Optional[Sequence[str]] = None,
+) -> Union[int, List[Tuple]]:
+    """
+    rows를 batch_size 단위로 나누어 적재하고 배치마다 커밋합니다.
+
+    - 배치의 행 수가 small_batch_size 미만이면 execute_values로, 그 이상이면 COPY로 적재합니다.
+    - returning에 컬럼명(예: ("id", "serial_no"))을 주면 생성된 값의 리스트를 입력 순서대로 반환하고,
+      주지 않으면 적재한 전체 행 수를 반환합니다.
+    - 배치 도중 오류가 발생하면 해당 배치만 롤백되고 예외가 전달됩니다. (이전 배치는 이미 커밋됨)
+    """
+    if batch_size < 1:
+        raise ValueError("batch_size는 1 이상이어야 합니다.")
+
+    it = iter(rows)
+    head_size = min(small_batch_size, batch_size)
+    total = 0
+    returned: List[Tuple] = []
+
+    while True:
+        head = list(islice(it, head_size))
+        if not head:
+            break
+
+        try:
+            with conn.cursor() as cur:
+                if len(head) < small_batch_size:
+                    count, result = _insert_values(cur, head, table, columns, returning, page_size)
+                else:
+                    batch = chain(head, islice(it, batch_size - len(head)))
+                    count, result = _insert_copy(cur, batch, table, columns, returning)
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+
+        total += count
+        returned.extend(result)
+
+    return returned if returning else total
+
+
+# ----------------------------------------------------------------------
+# 파일 입력 (CSV / JSONL) 스트리밍
+# ----------------------------------------------------------------------
+
+def iter_csv_rows(path: str, columns: Sequence[str] = ("title", "price"), header: bool = True,
+                  delimiter: str = ",", encoding: str = "utf-8") -> Iterator[Tuple]:
+    """
+    CSV 파일을 한 줄씩 읽어 columns 순서의 튜플을 생성합니다.
+    header=True이면 첫 줄의 컬럼명으로 값을 찾고, 아니면 앞에서부터 순서대로 사용합니다.
+    """
+    with open(path, newline="", encoding=encoding) as f:
+        if header:
+            for record in csv.DictReader(f, delimiter=delimiter):
+                yield tuple(record[c] for c in columns)
+        else:
+            for record in csv.reader(f, delimiter=delimiter):
+                if record:
+                    yield tuple(record[:len(columns)])
+
+
+def iter_jsonl_rows(path: str, columns: Sequence[str] = ("title", "price"),
+                    encoding: str = "utf-8") -> Iterator[Tuple]:
+    """JSONL(한 줄에 JSON 객체 하나) 파일을 한 줄씩 읽어 columns 순서의 튜플을 생성합니다."""
+    with open(path, encoding=encoding) as f:
+        for line in f:
+            if line.strip():
+                record = json.loads(line)
+                yield tuple(record.get(c) for c in columns)
+
+
+def iter_file_rows(path: str, columns: Sequence[str] = ("title", "price")) -> Iterator[Tuple]:
+    """확장자에 따라 CSV(.csv) 또는 JSONL(.jsonl, .ndjson) 파일의 행을 스트리밍합니다."""
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".csv":
+        return iter_csv_rows(path, columns)
+    if ext in (".jsonl", ".ndjson"):
+        return iter_jsonl_rows(path, columns)
+    raise ValueError(f"지원하지 않는 파일 형식입니다: {path}")
+
+
+def bulk_insert_file(conn, path: str, columns: Sequence[str] = ("title", "price"),
+                     **kwargs: Any) -> Union[int, List[Tuple]]:
+    """
+    CSV(.csv) 또는 JSONL(.jsonl, .ndjson) 파일을 스트리밍하여 bulk_insert()로 적재합니다.
+    나머지 인자는 bulk_insert()에 그대로 전달됩니다.
+    """
+    return bulk_insert(conn, iter_file_rows(path, columns), columns=columns, **kwargs)
@@ -0,0 +1,191 @@
+import select
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import psycopg2
+import psycopg2.extensions
+
+# ----------------------------------------------------------------------
+# 조회 결과 캐시 (Read-through Query Cache)
+# ----------------------------------------------------------------------
+# 같은 SQL + 파라미터 조회가 반복되면 DB에 다시 묻지 않고 프로세스 메모리에서 돌려줍니다.
+# - 키: 공백을 정규화한 SQL 문자열 + 파라미터 튜플
+# - 크기 제한(LRU)과 유효 시간(TTL)으로 오래된 항목을 제거합니다.
+# - 각 항목은 읽은 테이블 이름으로 태그되며, 쓰기 후 invalidate("books")를 호출하면
+#   그 테이블을 읽은 항목만 제거됩니다.
+# - 여러 프로세스가 있을 때는 PostgreSQL LISTEN/NOTIFY로 무효화를 전파할 수 있습니다.
+
+DEFAULT_CACHE_SIZE = 1024         # 최대 항목 수
+DEFAULT_CACHE_TTL = 60.0          # 항목 유효 시간(초)
+DEFAULT_NOTIFY_CHANNEL = "query_cache_invalidation"
+
+
+def normalize_query(query: Any) -> str:
+    """연속 공백/줄바꿈을 하나로 줄이고 끝의 세미콜론을 제거해 캐시 키로 사용합니다."""
+    return " ".join(str(query).split()).rstrip(";").rstrip()
+
+
+class QueryCache:
+    """스레드 안전 LRU + TTL 조회 결과 캐시입니다."""
+
+    def __init__(self, maxsize: int = DEFAULT_CACHE_SIZE, ttl: Optional[float] = DEFAULT_CACHE_TTL):
+        if maxsize < 1:
+            raise ValueError("maxsize는 1 이상이어야 합니다.")
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        # key -> (만료 시각, 테이블 목록, 결과)
+        self._entries: "OrderedDict[Tuple, Tuple[float, Tuple[str, ...], List[Tuple]]]" = OrderedDict()
+        # 테이블별 무효화 세대 번호 (조회 중 무효화된 결과가 저장되지 않도록 사용)
+        self._generations: Dict[str, int] = {}
+        self._epoch = 0  # 전체 무효화 횟수
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(query: Any, params: Optional[Sequence[Any]] = None) -> Tuple:
+        return (normalize_query(query), tuple(params) if params is not None else ())
+
+    def get(self, key: Tuple) -> Optional[List[Tuple]]:
+        """캐시된 결과의 복사본을 반환합니다. 없거나 만료되었으면 None입니다."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, _, result = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return list(result)
+
+    def _snapshot(self, tables: Sequence[str]) -> Tuple[int, Dict[str, int]]:
+        return self._epoch, {t: self._generations.get(t, 0) for t in tables}
+
+    def put(self, key: Tuple, result: List[Tuple], tables: Sequence[str],
+            snapshot: Optional[Tuple[int, Dict[str, int]]] = None) -> None:
+        """
+        결과를 저장합니다. snapshot(조회 시작 시점의 무효화 세대)이 주어지면
+        그 사이 관련 테이블이 무효화된 경우 오래된 결과이므로 저장하지 않습니다.
+        """
+        expires_at = time.monotonic() + self.ttl if self.ttl is not None else float("inf")
+        with self._lock:
+            if snapshot is not None and snapshot != self._snapshot(tables):
+                return
+            self._entries[key] = (expires_at, tuple(tables), list(result))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def get_or_load(self, query: Any, params: Optional[Sequence[Any]], loader: Callable[[], List[Tuple]],
+                    tables: Sequence[str]) -> List[Tuple]:
+        """
+        캐시에 있으면 바로 반환하고, 없으면 loader()로 DB에서 조회한 뒤 저장합니다.
+        loader에서 발생한 예외는 그대로 전달되며 결과는 저장되지 않습니다.
+        """
+        key = self.make_key(query, params)
+        cached = self.get(key)
+        if cached is not None:
+            with self._lock:
+                self.hits += 1
+            return cached
+
+        with self._lock:
+            self.misses += 1
+            snapshot = self._snapshot(tables)
+        result = loader()
+        self.put(key, result, tables, snapshot)
+        return list(result)
+
+    def invalidate(self, table: Optional[str] = None) -> int:
+        """table을 읽은 항목을 제거합니다. table이 None이면 전체를 비웁니다. 제거한 항목 수를 반환합니다."""
+        with self._lock:
+            if table is None:
+                removed = len(self._entries)
+                self._entries.clear()
+                self._epoch += 1
+                return removed
+            self._generations[table] = self._generations.get(table, 0) + 1
+            keys = [k for k, (_, tables, _) in self._entries.items() if table in tables]
+            for k in keys:
+                del self._entries[k]
+            return len(keys)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+# ----------------------------------------------------------------------
+# 프로세스 간 무효화 (LISTEN / NOTIFY)
+# ----------------------------------------------------------------------
+
+def publish_invalidation(conn, table: str, channel: str = DEFAULT_NOTIFY_CHANNEL) -> None:
+    """
+    다른 프로세스의 캐시에 table 무효화를 알립니다.
+    NOTIFY는 커밋 시점에 전달되므로, autocommit이 아니면 여기서 커밋합니다.
+    """
+    with conn.cursor() as cur:
+        cur.execute("SELECT pg_notify(%s, %s)", (channel, table))
+    if not conn.autocommit:
+        conn.commit()
+
+
+class CacheInvalidationListener:
+    """
+    별도 스레드에서 LISTEN channel을 수행하고, 알림의 payload(테이블 이름)로 cache를 무효화합니다.
+    풀과 무관하게 전용 연결 하나를 계속 점유하며, 연결이 끊기면 캐시 전체를 비우고 다시 연결합니다.
+    """
+
+    def __init__(self, cache: QueryCache, channel: str = DEFAULT_NOTIFY_CHANNEL,
+                 poll_interval: float = 1.0, **conn_kwargs: Any):
+        self.cache = cache
+        self.channel = channel
+        self.poll_interval = poll_interval
+        self._conn_kwargs = conn_kwargs
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _listen(self):
+        conn = psycopg2.connect(**self._conn_kwargs)
+        conn.set_isolation_level(psycopg2.extensions.ISOLATION_LEVEL_AUTOCOMMIT)
+        with conn.cursor() as cur:
+            cur.execute(f"LISTEN {psycopg2.extensions.quote_ident(self.channel, cur)}")
+        return conn
+
+    def _run(self) -> None:
+        conn = None
+        while not self._stop.is_set():
+            try:
+                if conn is None or conn.closed:
+                    conn = self._listen()
+                    # 연결이 끊긴 동안 놓친 알림이 있을 수 있으므로 전체를 비웁니다.
+                    self.cache.invalidate()
+                if select.select([conn], [], [], self.poll_interval) == ([], [], []):
+                    continue
+                conn.poll()
+                while conn.notifies:
+                    notify = conn.notifies.pop(0)
+                    self.cache.invalidate(notify.payload or None)
+            except psycopg2.Error as e:
+                print(f"캐시 무효화 리스너 오류: {e}", file=sys.stderr)
+                if conn is not None and not conn.closed:
+                    conn.close()
+                conn = None
+                self._stop.wait(self.poll_interval)
+        if conn is not None and not conn.closed:
+            conn.close()
+
+    def start(self) -> "CacheInvalidationListener":
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="cache-invalidation-listener", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
@@ -0,0 +1,559 @@
+import argparse
+import os
+import select
+import struct
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import psycopg2
+import psycopg2.extensions
+import psycopg2.extras
+from psycopg2 import sql
+
+# ----------------------------------------------------------------------
+# 변경 데이터 캡처 (Change Data Capture, 논리 복제)
+# ----------------------------------------------------------------------
+# 캐시/검색 인덱스가 변경을 알기 위해 get_all_books()로 전체를 주기적으로 다시 읽는 대신,
+# PostgreSQL 논리 복제 슬롯에서 커밋된 INSERT/UPDATE/DELETE/TRUNCATE만 순서대로 받아옵니다.
+#
+#   publication(books_cdc) ──> 복제 슬롯(books_cdc, 출력 플러그인 pgoutput) ──> ChangeStream
+#
+# - pgoutput은 PostgreSQL 10+에 내장되어 있어 wal2json 같은 확장 설치가 필요 없습니다.
+#   서버 설정 wal_level = logical, 접속 계정의 REPLICATION 권한(또는 superuser)이 필요합니다.
+# - 이벤트는 커밋 순서로, 트랜잭션 단위로 전달됩니다. (커밋되지 않은 변경은 오지 않음)
+# - 배치: batch_size개가 모이거나 batch_timeout초가 지나면 한 배치(ChangeBatch)를 돌려줍니다.
+# - 체크포인트: 소비자가 배치 처리를 마치면(다음 배치를 요청하면) 그 배치에서 끝난 마지막 트랜잭션의
+#   커밋 LSN을 서버에 확인(flush)합니다. 슬롯은 확인된 위치를 서버에 저장하므로, 프로세스가 죽었다가
+#   다시 연결하면 확인되지 않은 트랜잭션부터 다시 받습니다. (최소 한 번 전달 — 소비자는 멱등하게 처리)
+# - 배압: 소비자가 배치를 처리하는 동안에는 복제 연결을 읽지 않으므로 서버(walsender)가 전송을 멈추고
+#   WAL은 슬롯에 보존됩니다. 메모리에는 최대 batch_size개만 올라옵니다.
+#   배치 처리가 서버의 wal_sender_timeout(기본 60초)보다 오래 걸리면 연결이 끊기므로 배치를 작게 잡습니다.
+#
+# UPDATE/DELETE의 old 값은 기본(REPLICA IDENTITY DEFAULT)이면 기본 키(id)만 담깁니다.
+# 이전 행 전체가 필요하면 ALTER TABLE books REPLICA IDENTITY FULL 을 실행합니다.
+# 사용하지 않는 슬롯은 WAL을 계속 보존해 디스크를 채우므로, 소비자를 없앨 때는 drop_slot()으로 지웁니다.
+
+DEFAULT_BATCH_SIZE = 500
+DEFAULT_BATCH_TIMEOUT = 1.0
+DEFAULT_STATUS_INTERVAL = 10.0  # 서버에 진행 위치를 알리는 최대 간격(초)
+
+_PG_EPOCH = datetime(2000, 1, 1, tzinfo=timezone.utc)
+
+
+class ChangeEvent:
+    """
+    변경 이벤트 하나입니다.
+    op: 'insert' / 'update' / 'delete' / 'truncate'
+    table: 'schema.table'
+    new: 변경 후 행 {컬럼: 값} (delete/truncate는 None)
+    old: 변경 전 키 또는 행 (REPLICA IDENTITY 설정에 따름, 없으면 None)
+    xid, commit_time: 트랜잭션 ID와 커밋 시각, lsn: 트랜잭션 커밋 LSN
+    TOAST로 저장된 큰 값이 바뀌지 않았으면 new에 해당 컬럼이 빠집니다.
+    """
+
+    __slots__ = ("op", "table", "new", "old", "xid", "commit_time", "lsn")
+
+    def __init__(self, op: str, table: str, new: Optional[Dict[str, Any]], old: Optional[Dict[str, Any]],
+                 xid: int, commit_time: Optional[datetime], lsn: int):
+        self.op = op
+        self.table = table
+        self.new = new
+        self.old = old
+        self.xid = xid
+        self.commit_time = commit_time
+        self.lsn = lsn
+
+    @property
+    def key(self) -> Optional[Dict[str, Any]]:
+        """행을 식별하는 값 (delete/update는 old, insert는 new)"""
+        return self.old if self.old is not None else self.new
+
+    def __repr__(self) -> str:
+        return f"ChangeEvent({self.op} {self.table} new={self.new} old={self.old} lsn={format_lsn(self.lsn)})"
+
+
+class ChangeBatch(list):
+    """ChangeEvent 목록입니다. ack_lsn은 이 배치까지 처리했을 때 서버에 확인할 LSN입니다. (없으면 0)"""
+
+    def __init__(self, events: Sequence[ChangeEvent] = (), ack_lsn: int = 0):
+        super().__init__(events)
+        self.ack_lsn = ack_lsn
+
+
+def format_lsn(lsn: int) -> str:
+    return f"{lsn >> 32:X}/{lsn & 0xFFFFFFFF:X}"
+
+
+def parse_lsn(text: str) -> int:
+    high, low = text.split("/")
+    return (int(high, 16) << 32) + int(low, 16)
+
+
+# ----------------------------------------------------------------------
+# 슬롯 / publication 관리 (일반 연결에서 실행, 커밋은 호출자)
+# ----------------------------------------------------------------------
+
+def ensure_publication(cur, name: str, tables: Sequence[str] = ("books",)) -> bool:
+    """tables의 변경을 내보내는 publication을 만듭니다. 새로 만들었으면 True입니다."""
+    cur.execute("SELECT 1 FROM pg_publication WHERE pubname = %s", (name,))
+    if cur.fetchone():
+        return False
+    cur.execute(sql.SQL("CREATE PUBLICATION {} FOR TABLE {}").format(
+        sql.Identifier(name), sql.SQL(", ").join(map(sql.Identifier, tables))
+    ))
+    return True
+
+
+def ensure_slot(cur, slot: str) -> bool:
+    """pgoutput 논리 복제 슬롯을 만듭니다. 새로 만들었으면 True입니다. (슬롯 위치 이후의 변경부터 전달)"""
+    cur.execute("SELECT 1 FROM pg_replication_slots WHERE slot_name = %s", (slot,))
+    if cur.fetchone():
+        return False
+    cur.execute("SELECT pg_create_logical_replication_slot(%s, 'pgoutput')", (slot,))
+    return True
+
+
+def drop_slot(cur, slot: str) -> bool:
+    """슬롯을 삭제해 보존 중인 WAL을 풀어 줍니다. 슬롯이 없으면 False입니다."""
+    cur.execute("SELECT pg_drop_replication_slot(slot_name) FROM pg_replication_slots WHERE slot_name = %s",
+                (slot,))
+    return cur.rowcount > 0
+
+
+def drop_publication(cur, name: str) -> None:
+    cur.execute(sql.SQL("DROP PUBLICATION IF EXISTS {}").format(sql.Identifier(name)))
+
+
+def slot_lag(cur, slot: str) -> Optional[int]:
+    """슬롯이 아직 확인하지 않은 WAL 양(바이트)입니다. 소비자가 밀리고 있는지 모니터링할 때 사용합니다."""
+    cur.execute(
+        "SELECT pg_wal_lsn_diff(pg_current_wal_lsn(), confirmed_flush_lsn)::bigint "
+        "FROM pg_replication_slots WHERE slot_name = %s", (slot,)
+    )
+    row = cur.fetchone()
+    return row[0] if row else None
+
+
+# ----------------------------------------------------------------------
+# pgoutput 메시지 해석 (프로토콜 버전 1)
+# ----------------------------------------------------------------------
+
+class _Reader:
+    def __init__(self, data: bytes):
+        self.data = data
+        self.pos = 0
+
+    def unpack(self, fmt: str) -> Tuple:
+        values = struct.unpack_from(fmt, self.data, self.pos)
+        self.pos += struct.calcsize(fmt)
+        return values
+
+    def byte(self) -> str:
+        value = chr(self.data[self.pos])
+        self.pos += 1
+        return value
+
+    def string(self) -> str:
+        end = self.data.index(b"\0", self.pos)
+        value = self.data[self.pos:end].decode("utf-8")
+        self.pos = end + 1
+        return value
+
+
+class PgOutputDecoder:
+    """
+    pgoutput 바이너리 메시지를 ChangeEvent로 변환합니다.
+    컬럼 값은 텍스트로 오므로 psycopg2에 등록된 타입 변환기(int, numeric, date 등)로 파이썬 값으로 바꿉니다.
+    변환기가 없는 타입(uuid 등)은 문자열 그대로 둡니다.
+    """
+
+    def __init__(self, cursor=None):
+        self._cursor = cursor
+        self._relations: Dict[int, Tuple[str, List[Tuple[str, int, bool]]]] = {}
+        self.xid = 0
+        self.commit_time: Optional[datetime] = None
+        self.final_lsn = 0
+
+    def _value(self, text: str, type_oid: int) -> Any:
+        caster = psycopg2.extensions.string_types.get(type_oid)
+        return caster(text, self._cursor) if caster else text
+
+    def _tuple(self, reader: _Reader, relid: int, key_only: bool = False) -> Dict[str, Any]:
+        """TupleData를 {컬럼: 값}으로 읽습니다. key_only이면 키 컬럼만 남깁니다. (나머지는 NULL로 전송됨)"""
+        _, columns = self._relations[relid]
+        (count,) = reader.unpack("!h")
+        row: Dict[str, Any] = {}
+        for name, type_oid, is_key in columns[:count]:
+            kind = reader.byte()
+            if kind == "n":
+                if is_key or not key_only:
+                    row[name] = None
+            elif kind == "t":
+                (length,) = reader.unpack("!i")
+                text = reader.data[reader.pos:reader.pos + length].decode("utf-8")
+                reader.pos += length
+                row[name] = self._value(text, type_oid)
+            # 'u': 바뀌지 않은 TOAST 값 (전송되지 않음)
+        return row
+
+    def decode(self, payload: bytes) -> Tuple[str, Any]:
+        """
+        메시지 하나를 해석해 (종류, 값)을 반환합니다.
+        ('event', [ChangeEvent...]) / ('commit', 커밋 끝 LSN) / ('begin', xid) / ('other', None)
+        """
+        reader = _Reader(payload)
+        kind = reader.byte()
+        if kind == "B":
+            self.final_lsn, timestamp, self.xid = reader.unpack("!qqI")  # xid는 부호 없는 32비트
+            self.commit_time = _PG_EPOCH + timedelta(microseconds=timestamp)
+            return "begin", self.xid
+        if kind == "C":
+            _, _, end_lsn, _ = reader.unpack("!bqqq")
+            return "commit", end_lsn
+        if kind == "R":
+            (relid,) = reader.unpack("!I")
+            namespace, name = reader.string(), reader.string()
+            _, count = reader.unpack("!bh")
+            columns = []
+            for _ in range(count):
+                (flags,) = reader.unpack("!b")  # 1: REPLICA IDENTITY 키 컬럼
+                column = reader.string()
+                type_oid, _ = reader.unpack("!Ii")
+                columns.append((column, type_oid, bool(flags & 1)))
+            self._relations[relid] = (f"{namespace}.{name}", columns)
+            return "other", None
+        if kind in "IUD":
+            (relid,) = reader.unpack("!I")
+            table = self._relations[relid][0]
+            old = new = None
+            marker = reader.byte()
+            if kind in "UD" and marker in "KO":
+                old = self._tuple(reader, relid, key_only=marker == "K")
+                marker = reader.byte() if kind == "U" else None
+            if marker == "N":
+                new = self._tuple(reader, relid)
+            op = {"I": "insert", "U": "update", "D": "delete"}[kind]
+            return "event", [ChangeEvent(op, table, new, old, self.xid, self.commit_time, self.final_lsn)]
+        if kind == "T":
+            count, _ = reader.unpack("!ib")
+            relids = reader.unpack(f"!{count}I")
+            return "event", [ChangeEvent("truncate", self._relations[r][0], None, None,
+                                         self.xid, self.commit_time, self.final_lsn) for r in relids]
+        return "other", None  # Origin('O'), Type('Y'), Message('M') 등
+
+
+# ----------------------------------------------------------------------
+# 변경 스트림
+# ----------------------------------------------------------------------
+
+class ChangeStream:
+    """
+    논리 복제 슬롯의 변경을 배치로 읽는 스트림입니다.
+
+        with ChangeStream("books_cdc", "books_cdc", host=..., dbname=...) as stream:
+            for batch in stream.batches():     # 처리가 끝나 다음 배치를 요청하면 이전 배치가 확인(ack)됨
+                apply(batch)
+
+        async for event in stream:            # 이벤트 단위, asyncio (같은 확인 규칙)
+
+    auto_ack=False이면 소비자가 stream.ack(batch)를 직접 호출해야 위치가 저장됩니다.
+    create=True이면 publication과 슬롯이 없을 때 만듭니다.
+    """
+
+    def __init__(self, slot: str, publication: str, tables: Sequence[str] = ("books",),
+                 batch_size: int = DEFAULT_BATCH_SIZE, batch_timeout: float = DEFAULT_BATCH_TIMEOUT,
+                 auto_ack: bool = True, create: bool = True,
+                 status_interval: float = DEFAULT_STATUS_INTERVAL, **conn_kwargs: Any):
+        if batch_size < 1:
+            raise ValueError("batch_size는 1 이상이어야 합니다.")
+        self.slot = slot
+        self.publication = publication
+        self.tables = tuple(tables)
+        self.batch_size = batch_size
+        self.batch_timeout = batch_timeout
+        self.auto_ack = auto_ack
+        self.create = create
+        self.status_interval = status_interval
+        self._conn_kwargs = conn_kwargs
+        self._conn = None
+        self._cur = None
+        self._decoder: Optional[PgOutputDecoder] = None
+        self._ready: List[ChangeEvent] = []
+        self._ready_since: Optional[float] = None
+        self._commit_marks: List[Tuple[int, int]] = []  # (_ready 안의 위치, 커밋 끝 LSN)
+        self._in_transaction = False
+        self._unacked = 0          # 전달했지만 아직 확인하지 않은 배치 수
+        self._acked_lsn = 0
+        self._stopped = False
+
+    # -- 연결 ----------------------------------------------------------
+
+    def open(self) -> "ChangeStream":
+        if self._conn is not None:
+            return self
+        if self.create:
+            setup = psycopg2.connect(**self._conn_kwargs)
+            setup.autocommit = True  # 슬롯은 쓰기를 한 트랜잭션 안에서 만들 수 없음
+            try:
+                with setup.cursor() as cur:
+                    ensure_publication(cur, self.publication, self.tables)
+                    ensure_slot(cur, self.slot)
+            finally:
+                setup.close()
+        self._conn = psycopg2.connect(connection_factory=psycopg2.extras.LogicalReplicationConnection,
+                                      **self._conn_kwargs)
+        self._cur = self._conn.cursor()
+        self._cur.start_replication(
+            slot_name=self.slot, decode=False, status_interval=self.status_interval,
+            options={"proto_version": "1", "publication_names": self.publication},
+        )
+        self._decoder = PgOutputDecoder(self._cur)
+        self._stopped = False
+        return self
+
+    def close(self) -> None:
+        """연결을 닫습니다. 확인하지 않은 배치는 다음 연결에서 다시 전달됩니다."""
+        if self._conn is not None:
+            self._conn.close()
+        self._conn = self._cur = self._decoder = None
+        self._ready, self._commit_marks, self._ready_since = [], [], None
+        self._in_transaction = False
+        self._unacked = 0
+
+    def stop(self) -> None:
+        """batches()/이벤트 반복을 다음 확인 시점에 끝냅니다. (다른 스레드나 신호 처리기에서 호출 가능)"""
+        self._stopped = True
+
+    def __enter__(self) -> "ChangeStream":
+        return self.open()
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+    # -- 확인(체크포인트) ------------------------------------------------
+
+    @property
+    def acked_lsn(self) -> int:
+        return self._acked_lsn
+
+    def ack(self, batch: ChangeBatch) -> None:
+        """batch까지 처리했음을 서버에 알립니다. 슬롯은 이 위치 이전의 WAL을 더 이상 보존하지 않습니다."""
+        self._unacked = max(self._unacked - 1, 0)
+        if batch.ack_lsn > self._acked_lsn:
+            self._acked_lsn = batch.ack_lsn
+            self._cur.send_feedback(write_lsn=batch.ack_lsn, flush_lsn=batch.ack_lsn, force=True)
+
+    def _ack_idle(self) -> None:
+        """
+        보류 중인 이벤트가 없으면 서버가 보낸 마지막 위치까지 확인합니다.
+        publication에 없는 테이블의 변경만 있을 때도 슬롯이 WAL을 계속 붙잡지 않게 합니다.
+        (이벤트가 이미 이전 배치로 전달된 트랜잭션의 커밋도 여기서 확인됩니다)
+        """
+        if self._unacked or self._ready:
+            return
+        lsn = self._cur.wal_end if not self._in_transaction else 0
+        if self._commit_marks:
+            lsn = max(lsn, self._commit_marks[-1][1])
+            self._commit_marks = []
+        if lsn > self._acked_lsn:
+            self._acked_lsn = lsn
+            self._cur.send_feedback(write_lsn=lsn, flush_lsn=lsn, force=True)
+
+    # -- 읽기 ----------------------------------------------------------
+
+    def _drain(self) -> None:
+        """받아 둔 메시지를 batch_size개까지 해석합니다. (그 이상은 읽지 않아 서버 전송을 멈춤)"""
+        while len(self._ready) < self.batch_size:
+            message = self._cur.read_message()
+            if message is None:
+                return
+            kind, value = self._decoder.decode(message.payload)
+            if kind == "event":
+                if not self._ready:
+                    self._ready_since = time.monotonic()
+                self._ready.extend(value)
+            elif kind == "begin":
+                self._in_transaction = True
+            elif kind == "commit":
+                self._in_transaction = False
+                self._commit_marks.append((len(self._ready), value))
+
+    def _take(self, force: bool = False) -> Optional[ChangeBatch]:
+        """배치가 찼거나 batch_timeout이 지났으면(또는 force) 준비된 이벤트로 배치를 만듭니다."""
+        if not self._ready:
+            return None
+        full = len(self._ready) >= self.batch_size
+        expired = self._ready_since is not None and time.monotonic() - self._ready_since >= self.batch_timeout
+        if not (full or expired or force):
+            return None
+        size = min(len(self._ready), self.batch_size)
+        # 이 배치 안에서 끝난 마지막 트랜잭션의 커밋 LSN까지만 확인할 수 있습니다.
+        ack_lsn = 0
+        marks = []
+        for position, lsn in self._commit_marks:
+            if position <= size:
+                ack_lsn = lsn
+            else:
+                marks.append((position - size, lsn))
+        batch = ChangeBatch(self._ready[:size], ack_lsn)
+        self._ready = self._ready[size:]
+        self._commit_marks = marks
+        self._ready_since = time.monotonic() if self._ready else None
+        self._unacked += 1
+        return batch
+
+    def poll(self, timeout: Optional[float] = None) -> Optional[ChangeBatch]:
+        """최대 timeout초(기본 batch_timeout) 동안 배치를 기다립니다. 없으면 None입니다. (동기)"""
+        self.open()
+        deadline = time.monotonic() + (self.batch_timeout if timeout is None else timeout)
+        while True:
+            self._drain()
+            batch = self._take()
+            if batch is not None:
+                return batch
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                batch = self._take(force=True)
+                if batch is None:
+                    self._ack_idle()
+                return batch
+            if len(self._ready) < self.batch_size:
+                select.select([self._conn], [], [], remaining)
+
+    def batches(self, idle_timeout: Optional[float] = None) -> Iterator[ChangeBatch]:
+        """
+        배치를 계속 돌려줍니다. auto_ack이면 다음 배치를 요청할 때 이전 배치를 확인합니다.
+        idle_timeout초 동안 변경이 없으면 끝나며, None이면 stop() 전까지 계속 기다립니다.
+        """
+        idle_since = time.monotonic()
+        while not self._stopped:
+            batch = self.poll()
+            if batch is None:
+                if idle_timeout is not None and time.monotonic() - idle_since >= idle_timeout:
+                    return
+                continue
+            idle_since = time.monotonic()
+            yield batch
+            if self.auto_ack:
+                self.ack(batch)
+
+    def __iter__(self) -> Iterator[ChangeEvent]:
+        for batch in self.batches():
+            yield from batch
+
+    # -- asyncio ---------------------------------------------------------
+
+    async def apoll(self, timeout: Optional[float] = None) -> Optional[ChangeBatch]:
+        """poll()의 비동기 버전입니다. 이벤트 루프를 막지 않고 소켓이 읽기 가능해질 때까지 기다립니다."""
+        import asyncio
+
+        self.open()
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + (self.batch_timeout if timeout is None else timeout)
+        while True:
+            self._drain()
+            batch = self._take()
+            if batch is not None:
+                return batch
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                batch = self._take(force=True)
+                if batch is None:
+                    self._ack_idle()
+                return batch
+            if len(self._ready) >= self.batch_size:
+                continue
+            readable = loop.create_future()
+            fd = self._conn.fileno()
+            loop.add_reader(fd, lambda: readable.done() or readable.set_result(None))
+            try:
+                await asyncio.wait_for(readable, remaining)
+            except asyncio.TimeoutError:
+                pass
+            finally:
+                loop.remove_reader(fd)
+
+    async def abatches(self, idle_timeout: Optional[float] = None) -> AsyncIterator[ChangeBatch]:
+        """batches()의 비동기 버전입니다."""
+        import asyncio
+
+        loop = asyncio.get_running_loop()
+        idle_since = loop.time()
+        while not self._stopped:
+            batch = await self.apoll()
+            if batch is None:
+                if idle_timeout is not None and loop.time() - idle_since >= idle_timeout:
+                    return
+                continue
+            idle_since = loop.time()
+            yield batch
+            if self.auto_ack:
+                self.ack(batch)
+
+    async def __aiter__(self) -> AsyncIterator[ChangeEvent]:
+        async for batch in self.abatches():
+            for event in batch:
+                yield event
+
+
+# ----------------------------------------------------------------------
+# 명령줄 실행
+# ----------------------------------------------------------------------
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="books 변경 스트림(논리 복제 슬롯)을 만들고/지우고/출력합니다.")
+    parser.add_argument("command", choices=["create", "drop", "watch", "lag"])
+    parser.add_argument("--slot", default="books_cdc")
+    parser.add_argument("--publication", default="books_cdc")
+    parser.add_argument("--tables", nargs="+", default=["books"])
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument("--idle-timeout", type=float, help="watch: 이 시간(초) 동안 변경이 없으면 종료")
+    parser.add_argument("--host", default=os.environ.get("PGHOST", "localhost"))
+    parser.add_argument("--port", default=os.environ.get("PGPORT", "5432"))
+    parser.add_argument("--dbname", default=os.environ.get("PGDATABASE", "main_db"))
+    parser.add_argument("--user", default=os.environ.get("PGUSER", "admin"))
+    parser.add_argument("--password", default=os.environ.get("PGPASSWORD", "admin123"))
+    args = parser.parse_args(argv)
+    conn_kwargs = dict(host=args.host, port=args.port, dbname=args.dbname, user=args.user, password=args.password)
+
+    try:
+        if args.command == "watch":
+            with ChangeStream(args.slot, args.publication, args.tables, batch_size=args.batch_size,
+                              **conn_kwargs) as stream:
+                try:
+                    for batch in stream.batches(idle_timeout=args.idle_timeout):
+                        for event in batch:
+                            print(f"{event.commit_time:%H:%M:%S} {event.op:8} {event.table} "
+                                  f"new={event.new} old={event.old}")
+                        print(f"-- {len(batch)}건 처리, 확인 LSN {format_lsn(batch.ack_lsn)}", flush=True)
+                except KeyboardInterrupt:
+                    pass
+            return 0
+
+        conn = psycopg2.connect(**conn_kwargs)
+        conn.autocommit = True  # 슬롯 생성/삭제는 트랜잭션 블록 안에서 실행할 수 없음
+        try:
+            with conn.cursor() as cur:
+                if args.command == "create":
+                    ensure_publication(cur, args.publication, args.tables)
+                    created = ensure_slot(cur, args.slot)
+                    print(f"=> 슬롯 {args.slot} {'생성' if created else '이미 있음'}")
+                elif args.command == "drop":
+                    dropped = drop_slot(cur, args.slot)
+                    drop_publication(cur, args.publication)
+                    print(f"=> 슬롯 {args.slot} {'삭제' if dropped else '없음'}")
+                else:
+                    lag = slot_lag(cur, args.slot)
+                    print("슬롯이 없습니다." if lag is None else f"{args.slot}: 미확인 WAL {lag:,} bytes")
+        finally:
+            conn.close()
+    except psycopg2.Error as e:
+        print(f"CDC 작업 오류: {e}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
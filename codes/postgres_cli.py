@@ -0,0 +1,221 @@
+import argparse
+import io
+import json
+import os
+import socket
+import sys
+from contextlib import redirect_stderr, redirect_stdout
+from typing import Callable, List, Optional, Sequence
+
+# ----------------------------------------------------------------------
+# CRUD 스크립트 명령줄 / 상주 데몬 (CLI and Unix-socket Daemon)
+# ----------------------------------------------------------------------
+# cron이 스크립트를 하루 수천 번 실행하면 매번 인터프리터 시작 + psycopg2/공용 모듈 import + 연결 + DDL
+# 비용을 냅니다. 이 모듈은
+#   - 하위 명령(init-schema / insert / merge / query / update / delete / serve)을 가진 공용 파서와
+#   - 한 번 띄운 프로세스가 Unix 소켓으로 명령을 받아 실행하는 데몬(serve)과 클라이언트(forward)를
+# 제공합니다. 데몬은 연결 풀과 스키마 버전 확인 결과를 유지하므로 명령당 비용이 소켓 왕복 수준이 됩니다.
+#
+# 이 파일은 표준 라이브러리만 import하므로 클라이언트로 직접 실행하면 psycopg2도 불러오지 않습니다.
+#   python quests/10_DMLs_codes.py serve --socket /tmp/books.sock &      # 데몬 시작
+#   python codes/postgres_cli.py --socket /tmp/books.sock query expensive --min-price 20000
+#   python codes/postgres_cli.py --socket /tmp/books.sock stop              # 데몬 종료
+#
+# 프로토콜: 요청/응답 모두 한 줄짜리 JSON
+#   요청 {"argv": ["query", "all"]}, {"ping": true} 또는 {"stop": true}
+#   응답 {"status": 0, "stdout": "...", "stderr": "..."}
+
+SOCKET_ENV = "BOOKS_CLI_SOCKET"   # --socket 기본값을 줄 환경 변수
+CLIENT_TIMEOUT = 300.0            # 데몬 응답 대기 최대 시간(초)
+
+
+def build_parser(prog: str, description: str) -> argparse.ArgumentParser:
+    """CRUD 스크립트 공용 하위 명령 파서를 만듭니다. 하위 명령이 없으면 전체 데모를 실행합니다."""
+    parser = argparse.ArgumentParser(prog=prog, description=description)
+    parser.add_argument("--socket", default=os.environ.get(SOCKET_ENV),
+                        help=f"실행 중인 데몬의 Unix 소켓 경로 (기본: ${SOCKET_ENV}). 연결되면 명령을 데몬에서 실행")
+    commands = parser.add_subparsers(dest="command")
+
+    commands.add_parser("demo", help="전체 CRUD 데모 실행 (기존 main과 같음, 테이블을 비움)")
+
+    init = commands.add_parser("init-schema", help="확장/테이블/인덱스 생성 (버전이 같으면 건너뜀)")
+    init.add_argument("--force", action="store_true", help="스키마 버전과 관계없이 DDL을 다시 실행")
+
+    insert = commands.add_parser("insert", help="도서 삽입")
+    insert.add_argument("rows", nargs="*", metavar="TITLE PRICE", help="제목과 가격을 번갈아 나열")
+    insert.add_argument("--file", help="CSV/JSONL 파일에서 (title, price) 행을 COPY로 적재")
+
+    merge = commands.add_parser("merge", help="CSV/JSONL 가격표를 제목 기준으로 병합 (없으면 삽입, 가격이 다르면 갱신)")
+    merge.add_argument("file", help="(title, price) 행이 담긴 CSV/JSONL 파일")
+    merge.add_argument("--method", choices=["auto", "on_conflict", "merge"], default="auto",
+                       help="auto: 제목에 UNIQUE 인덱스가 있으면 ON CONFLICT, 없으면 MERGE(PG15+)")
+
+    query = commands.add_parser("query", help="도서 조회")
+    query.add_argument("kind", choices=["all", "expensive", "title", "search"])
+    query.add_argument("text", nargs="?", help="title: 정확한 제목, search: 제목 일부")
+    query.add_argument("--min-price", type=int, default=25000, help="expensive 기준 가격")
+    query.add_argument("--limit", type=int, default=20, help="search 결과 수")
+
+    update = commands.add_parser("update", help="도서 가격 갱신 (--id가 없으면 두 번째 도서)")
+    update.add_argument("--id", help="갱신할 도서 id")
+    update.add_argument("--price", type=int, default=27000)
+
+    commands.add_parser("delete", help="세 번째 도서 삭제")
+
+    serve = commands.add_parser("serve", help="Unix 소켓으로 명령을 받는 상주 데몬 실행")
+    serve.add_argument("--socket", dest="serve_socket", help="소켓 경로 (기본: --socket 값)")
+
+    commands.add_parser("stop", help="실행 중인 데몬 종료 (--socket 필요)")
+    return parser
+
+
+def parse_insert_rows(values: Sequence[str]) -> List[List]:
+    """["제목", "19000", ...] 을 [["제목", 19000], ...] 로 변환합니다."""
+    if len(values) % 2:
+        raise ValueError("insert 인자는 제목과 가격 쌍이어야 합니다.")
+    return [[values[i], int(values[i + 1])] for i in range(0, len(values), 2)]
+
+
+# ----------------------------------------------------------------------
+# 클라이언트
+# ----------------------------------------------------------------------
+
+def _request(socket_path: str, payload: dict, timeout: float = CLIENT_TIMEOUT) -> Optional[dict]:
+    """데몬에 요청 한 줄을 보내고 응답을 반환합니다. 데몬이 없으면(소켓 없음/연결 거부) None입니다."""
+    try:
+        client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    except (AttributeError, OSError):  # Unix 소켓을 지원하지 않는 플랫폼
+        return None
+    client.settimeout(timeout)
+    try:
+        try:
+            client.connect(socket_path)
+        except (FileNotFoundError, ConnectionRefusedError):
+            return None
+        client.sendall(json.dumps(payload, ensure_ascii=False).encode("utf-8") + b"\n")
+        with client.makefile("rb") as reader:
+            line = reader.readline()
+    finally:
+        client.close()
+    if not line:
+        raise ConnectionError("데몬이 응답 없이 연결을 닫았습니다.")
+    return json.loads(line)
+
+
+def forward(socket_path: Optional[str], argv: Sequence[str]) -> Optional[int]:
+    """
+    argv를 데몬에서 실행하고 출력을 그대로 옮겨 쓴 뒤 종료 코드를 반환합니다.
+    socket_path가 없거나 데몬이 실행 중이 아니면 None을 반환하므로 호출자가 직접 실행합니다.
+    """
+    if not socket_path:
+        return None
+    response = _request(socket_path, {"argv": list(argv)})
+    if response is None:
+        return None
+    sys.stdout.write(response.get("stdout", ""))
+    sys.stderr.write(response.get("stderr", ""))
+    return int(response.get("status", 1))
+
+
+def forward_command(prog: str, description: str, argv: Sequence[str]) -> Optional[int]:
+    """
+    스크립트 시작 시 무거운 모듈(psycopg2, 공용 모듈)을 불러오기 전에 호출하는 빠른 경로입니다.
+    argv를 공용 파서로 확인한 뒤 데몬에 전달하고 종료 코드를 반환합니다.
+    serve/stop 명령이거나 데몬이 실행 중이 아니면 None을 반환하므로 호출자가 모듈을 불러와 직접 실행합니다.
+    """
+    args = build_parser(prog, description).parse_args(argv)
+    if args.command in ("serve", "stop"):
+        return None
+    return forward(args.socket, argv)
+
+
+def stop(socket_path: str) -> bool:
+    """데몬을 종료합니다. 실행 중인 데몬이 없으면 False를 반환합니다."""
+    return _request(socket_path, {"stop": True}) is not None
+
+
+# ----------------------------------------------------------------------
+# 데몬
+# ----------------------------------------------------------------------
+
+def serve(socket_path: str, dispatch: Callable[[List[str]], int]) -> None:
+    """
+    socket_path에서 요청을 받아 dispatch(argv)로 실행하는 데몬을 시작합니다. (stop 요청까지 반환하지 않음)
+    명령은 한 번에 하나씩 순서대로 실행되며, 실행 중 출력은 요청별로 모아 응답으로 돌려줍니다.
+    소켓 파일은 소유자만 접근할 수 있도록 권한 0600으로 만듭니다.
+    """
+    import socketserver  # 데몬 모드에서만 필요
+
+    class Handler(socketserver.StreamRequestHandler):
+        def handle(self) -> None:
+            line = self.rfile.readline()
+            if not line:
+                return
+            try:
+                request = json.loads(line)
+            except ValueError:
+                self._reply(2, "", "잘못된 요청입니다.\n")
+                return
+            if request.get("ping"):
+                self._reply(0, "", "")
+                return
+            if request.get("stop"):
+                self._reply(0, "데몬을 종료합니다.\n", "")
+                self.server.running = False
+                return
+            out, err = io.StringIO(), io.StringIO()
+            with redirect_stdout(out), redirect_stderr(err):
+                try:
+                    status = dispatch([str(a) for a in request.get("argv", [])])
+                except SystemExit as e:  # argparse 오류/--help
+                    status = e.code if isinstance(e.code, int) else 2
+                except Exception as e:
+                    print(f"명령 실행 오류: {e}", file=sys.stderr)
+                    status = 1
+            self._reply(status or 0, out.getvalue(), err.getvalue())
+
+        def _reply(self, status: int, stdout: str, stderr: str) -> None:
+            response = {"status": status, "stdout": stdout, "stderr": stderr}
+            self.wfile.write(json.dumps(response, ensure_ascii=False).encode("utf-8") + b"\n")
+
+    if os.path.exists(socket_path):
+        if _request(socket_path, {"ping": True}, timeout=2.0) is not None:
+            raise RuntimeError(f"이미 데몬이 실행 중입니다: {socket_path}")
+        os.unlink(socket_path)  # 비정상 종료로 남은 소켓 파일
+
+    old_umask = os.umask(0o177)
+    try:
+        server = socketserver.UnixStreamServer(socket_path, Handler)
+    finally:
+        os.umask(old_umask)
+    server.running = True
+    print(f"=> 데몬이 {socket_path}에서 명령을 기다립니다. (종료: stop 명령)", file=sys.stderr)
+    try:
+        while server.running:
+            server.handle_request()
+    finally:
+        server.server_close()
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """가벼운 클라이언트: 명령을 데몬에 전달합니다. (psycopg2/공용 모듈을 import하지 않음)"""
+    parser = argparse.ArgumentParser(description="실행 중인 CRUD 데몬에 명령을 전달합니다.")
+    parser.add_argument("--socket", default=os.environ.get(SOCKET_ENV), required=os.environ.get(SOCKET_ENV) is None)
+    parser.add_argument("command", nargs=argparse.REMAINDER, help="데몬에서 실행할 명령 (예: query all)")
+    args = parser.parse_args(argv)
+    if args.command == ["stop"]:
+        if stop(args.socket):
+            return 0
+        print(f"실행 중인 데몬이 없습니다: {args.socket}", file=sys.stderr)
+        return 1
+    status = forward(args.socket, args.command)
+    if status is None:
+        print(f"실행 중인 데몬이 없습니다: {args.socket} (스크립트의 serve 명령으로 시작)", file=sys.stderr)
+        return 1
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,444 @@
+import array
+import io
+import math
+import re
+import struct
+import sys
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from psycopg2 import sql
+from psycopg2.extensions import encodings
+
+# ----------------------------------------------------------------------
+# 컬럼 단위 조회 (Columnar Fetch via Binary COPY)
+# ----------------------------------------------------------------------
+# fetchall()은 행마다 튜플과 파이썬 객체를 만들기 때문에 수백만 행의 price 집계에서는
+# 객체 생성 비용이 대부분을 차지합니다. 여기서는 쿼리 결과를
+#   COPY (SELECT ...) TO STDOUT WITH (FORMAT binary)
+# 로 받아, 고정 길이 컬럼(정수/실수/날짜 등)을 바이트 버퍼에서 바로 배열로 변환합니다.
+# - 모든 컬럼이 고정 길이이고 NOT NULL 테이블 컬럼이면 바이너리 COPY 결과 전체를 구조화 dtype 하나로
+#   해석합니다. (행 루프 없음)
+# - 그 밖의 경우(text 등 가변 길이 컬럼, NULL이 있을 수 있는 컬럼)는 텍스트 COPY로 받습니다. 텍스트 COPY는
+#   값 안의 탭/줄바꿈을 이스케이프하므로 전체를 한 번에 decode/split한 뒤 컬럼별로 잘라 내고,
+#   숫자 컬럼은 컬럼 단위로 변환합니다. (필드마다 struct로 길이를 읽는 루프가 없음)
+#   날짜/시각 컬럼은 서버에서 바이너리와 같은 2000-01-01 기준 정수(일/마이크로초)로 바꿔 보냅니다.
+# - 지원하지 않는 타입(numeric, uuid 등)은 서버에서 ::text로 바꿔 문자열 컬럼으로 받습니다.
+#   (uuid는 cursor.fetchall()과 같은 문자열이 되며, 값마다 uuid.UUID 객체를 만드는 비용이 들지 않습니다)
+
+_COPY_SIGNATURE = b"PGCOPY\n\xff\r\n\x00"
+_PG_EPOCH = date(2000, 1, 1)
+_PG_EPOCH_DAYS = 10957  # 1970-01-01 ~ 2000-01-01 일수
+
+# 타입 OID -> (빅엔디언 NumPy dtype, array 모듈 타입코드, 바이트 수)
+_FIXED_TYPES = {
+    16: (">?", "B", 1),      # boolean
+    21: (">i2", "h", 2),     # smallint
+    23: (">i4", "i", 4),     # integer
+    20: (">i8", "q", 8),     # bigint
+    700: (">f4", "f", 4),    # real
+    701: (">f8", "d", 8),    # double precision
+    1082: (">i4", "i", 4),   # date (2000-01-01 기준 일수)
+    1114: (">i8", "q", 8),   # timestamp (2000-01-01 기준 마이크로초)
+    1184: (">i8", "q", 8),   # timestamptz
+}
+_TEXT_TYPES = {18, 19, 25, 1042, 1043}  # char, name, text, bpchar, varchar
+
+# 텍스트 COPY 출력의 이스케이프 (PostgreSQL은 8진수/16진수 이스케이프를 출력하지 않음)
+_TEXT_ESCAPE = re.compile(r"\\(.)")
+_TEXT_UNESCAPES = {"b": "\b", "f": "\f", "n": "\n", "r": "\r", "t": "\t", "v": "\v"}
+
+
+_numpy_module: Any = False  # 아직 불러오지 않음
+
+
+def _numpy():
+    """
+    NumPy를 처음 필요할 때 불러옵니다. 설치되어 있지 않으면 None을 반환하며,
+    그때는 표준 라이브러리 array/list로 컬럼을 담습니다. (이 모듈을 import만 하는 스크립트는
+    NumPy import 비용을 부담하지 않습니다)
+    """
+    global _numpy_module
+    if _numpy_module is False:
+        try:
+            import numpy
+        except ImportError:
+            numpy = None
+        _numpy_module = numpy
+    return _numpy_module
+
+
+class Columns:
+    """
+    이름 -> 컬럼 배열의 가벼운 컨테이너입니다.
+    - columns[name]: NumPy 배열(numpy 설치 시) 또는 array.array/list
+    - nulls[name]: NULL이 하나라도 있는 컬럼의 NULL 위치 마스크 (해당 위치 값은 0 또는 None)
+    - 행 단위로 순회하면 튜플을 돌려주므로 기존 print_books_results() 등에도 그대로 넘길 수 있습니다.
+    """
+
+    def __init__(self, names: Sequence[str], columns: Dict[str, Any], nulls: Optional[Dict[str, Any]] = None):
+        self.names = list(names)
+        self.columns = columns
+        self.nulls = nulls or {}
+
+    def __getitem__(self, name: str):
+        return self.columns[name]
+
+    def __len__(self) -> int:
+        return len(self.columns[self.names[0]]) if self.names else 0
+
+    def __iter__(self) -> Iterator[Tuple]:
+        cols = [self._python_values(n) for n in self.names]
+        return iter(zip(*cols))
+
+    def _python_values(self, name: str) -> List[Any]:
+        values = self.columns[name]
+        values = values.tolist() if hasattr(values, "tolist") else list(values)
+        mask = self.nulls.get(name)
+        if mask is not None:
+            values = [None if m else v for v, m in zip(values, mask)]
+        return values
+
+    def dropna(self, *names: str) -> "Columns":
+        """names 컬럼(기본: 전체) 중 하나라도 NULL인 행을 제외한 Columns를 반환합니다."""
+        masks = [self.nulls[n] for n in (names or self.names) if n in self.nulls]
+        if not masks:
+            return self
+        keep = [not any(flags) for flags in zip(*masks)]
+        return self.filter(keep)
+
+    def filter(self, mask) -> "Columns":
+        """mask(불리언 배열/리스트)가 참인 행만 남긴 새 Columns를 반환합니다."""
+        numpy = _numpy()
+        if numpy is not None:
+            mask = numpy.asarray(mask, dtype=bool)
+            return Columns(self.names, {n: c[mask] for n, c in self.columns.items()},
+                           {n: m[mask] for n, m in self.nulls.items()})
+        keep = [i for i, m in enumerate(mask) if m]
+
+        def take(values):
+            picked = [values[i] for i in keep]
+            return array.array(values.typecode, picked) if isinstance(values, array.array) else picked
+
+        return Columns(self.names, {n: take(c) for n, c in self.columns.items()},
+                       {n: take(m) for n, m in self.nulls.items()})
+
+
+# ----------------------------------------------------------------------
+# 바이너리 COPY 해석
+# ----------------------------------------------------------------------
+
+def _fixed_array(raw: bytes, oid: int):
+    """빅엔디언 고정 길이 값들이 이어진 바이트를 컬럼 배열로 변환합니다."""
+    numpy = _numpy()
+    dtype, typecode, _ = _FIXED_TYPES[oid]
+    if numpy is not None:
+        values = numpy.frombuffer(raw, dtype=dtype).astype(dtype[1:] if dtype[0] == ">" else dtype)
+    else:
+        values = array.array(typecode, raw)
+        if sys.byteorder == "little":
+            values.byteswap()
+    return _epoch_values(values, oid)
+
+
+def _epoch_values(values, oid: int):
+    """2000-01-01 기준 정수(date: 일, timestamp: 마이크로초) 컬럼을 날짜/시각 배열로 바꿉니다. 그 외 타입은 그대로 둡니다."""
+    numpy = _numpy()
+    if numpy is not None:
+        if oid == 1082:
+            return (values + _PG_EPOCH_DAYS).astype("datetime64[D]")
+        if oid in (1114, 1184):
+            return (values + _PG_EPOCH_DAYS * 86_400_000_000).astype("datetime64[us]")
+        return values
+    if oid == 1082:
+        return [_PG_EPOCH + timedelta(days=v) for v in values]
+    if oid in (1114, 1184):
+        epoch = datetime(2000, 1, 1)
+        return [epoch + timedelta(microseconds=v) for v in values]
+    return values
+
+
+def _parse_header(buf: memoryview) -> int:
+    if bytes(buf[:11]) != _COPY_SIGNATURE:
+        raise ValueError("바이너리 COPY 형식이 아닙니다.")
+    (extension_length,) = struct.unpack_from(">i", buf, 15)
+    return 19 + extension_length
+
+
+def _parse_fixed_fast(body: memoryview, oids: Sequence[int]):
+    """
+    모든 컬럼이 고정 길이이고 NULL이 없을 때 결과 전체를 구조화 dtype으로 한 번에 해석합니다.
+    행마다 [필드 수 int16][길이 int32][값]... 배치가 같아야 하며, 아니면 None을 반환합니다.
+    """
+    numpy = _numpy()
+    fields = [("count", ">i2")]
+    for i, oid in enumerate(oids):
+        fields += [(f"len{i}", ">i4"), (f"val{i}", _FIXED_TYPES[oid][0])]
+    dtype = numpy.dtype(fields)
+    if len(body) % dtype.itemsize:
+        return None
+    records = numpy.frombuffer(body, dtype=dtype)
+    if not (records["count"] == len(oids)).all():
+        return None
+    for i, oid in enumerate(oids):
+        if not (records[f"len{i}"] == _FIXED_TYPES[oid][2]).all():
+            return None  # NULL(-1)이 섞여 있음
+    return [numpy.ascontiguousarray(records[f"val{i}"]).tobytes() for i in range(len(oids))]
+
+
+def parse_binary_copy(data: bytes, oids: Sequence[int]) -> Tuple[List[Any], Dict[int, Any]]:
+    """
+    바이너리 COPY 출력 전체를 컬럼 배열 목록과 {컬럼 번호: NULL 마스크}로 해석합니다.
+    oids는 각 컬럼의 타입 OID이며, 고정 길이/문자열 이외의 타입은 미리 ::text로 바꿔 두어야 합니다.
+    """
+    numpy = _numpy()
+    buf = memoryview(data)
+    start = _parse_header(buf)
+    body = buf[start:len(buf) - 2]  # 끝의 -1(int16) 종료 표시 제외
+    ncols = len(oids)
+
+    if numpy is not None and all(oid in _FIXED_TYPES for oid in oids):
+        raw_columns = _parse_fixed_fast(body, oids)
+        if raw_columns is not None:
+            return [_fixed_array(raw, oid) for raw, oid in zip(raw_columns, oids)], {}
+
+    parts: List[List[Any]] = [[] for _ in range(ncols)]
+    null_rows: Dict[int, List[int]] = {}
+    unpack_from = struct.unpack_from
+    pos, end, row = 0, len(body), 0
+    while pos < end:
+        (count,) = unpack_from(">h", body, pos)
+        pos += 2
+        if count != ncols:
+            raise ValueError(f"필드 수가 맞지 않습니다: {count} != {ncols}")
+        for i in range(ncols):
+            (length,) = unpack_from(">i", body, pos)
+            pos += 4
+            if length < 0:
+                null_rows.setdefault(i, []).append(row)
+                parts[i].append(None)
+                continue
+            parts[i].append(body[pos:pos + length])
+            pos += length
+        row += 1
+
+    columns: List[Any] = []
+    nulls: Dict[int, Any] = {}
+    for i, oid in enumerate(oids):
+        values = parts[i]
+        if i in null_rows:
+            mask = [False] * row
+            for r in null_rows[i]:
+                mask[r] = True
+            nulls[i] = numpy.array(mask, dtype=bool) if numpy is not None else mask
+        if oid in _FIXED_TYPES:
+            zero = bytes(_FIXED_TYPES[oid][2])
+            columns.append(_fixed_array(b"".join(zero if v is None else v for v in values), oid))
+        elif oid in _TEXT_TYPES:
+            decoded = [None if v is None else str(v, "utf-8") for v in values]
+            columns.append(numpy.array(decoded, dtype=object) if numpy is not None else decoded)
+        else:
+            raise ValueError(f"지원하지 않는 타입 OID입니다: {oid}")
+    return columns, nulls
+
+
+# ----------------------------------------------------------------------
+# 텍스트 COPY 해석 (가변 길이 컬럼이 섞인 결과)
+# ----------------------------------------------------------------------
+
+def _unescape(value: str) -> str:
+    return _TEXT_ESCAPE.sub(lambda m: _TEXT_UNESCAPES.get(m.group(1), m.group(1)), value)
+
+
+def _text_column(values: List[str], oid: int, escaped: bool) -> Tuple[Any, Optional[List[bool]]]:
+    """
+    텍스트 COPY 한 컬럼의 값(str)들을 (컬럼 배열, NULL 마스크 또는 None)으로 변환합니다.
+    escaped는 컬럼에 역슬래시(NULL 표시 \\N 또는 이스케이프)가 있을 수 있는지 여부입니다.
+    """
+    numpy = _numpy()
+    mask = None
+    if escaped:
+        mask = [v == "\\N" for v in values]
+        if not any(mask):
+            mask = None
+
+    if oid in _TEXT_TYPES:
+        if escaped:
+            values = [None if v == "\\N" else _unescape(v) if "\\" in v else v for v in values]
+        return (numpy.array(values, dtype=object) if numpy is not None else values), mask
+
+    if mask is not None:
+        values = [("f" if oid == 16 else "0") if m else v for v, m in zip(values, mask)]
+    if oid == 16:
+        if numpy is not None:
+            return numpy.fromiter(map("t".__eq__, values), dtype=bool, count=len(values)), mask
+        return array.array("B", map("t".__eq__, values)), mask
+
+    dtype, typecode, _ = _FIXED_TYPES[oid]
+    convert = float if typecode in ("f", "d") else int
+    if numpy is not None:
+        parsed = numpy.fromiter(map(convert, values), dtype=dtype[1:], count=len(values))
+    else:
+        parsed = array.array(typecode, map(convert, values))
+    return _epoch_values(parsed, oid), mask
+
+
+def parse_text_copy(data: bytes, oids: Sequence[int], encoding: str = "utf-8") -> Tuple[List[Any], Dict[int, Any]]:
+    """
+    텍스트 COPY 출력 전체를 컬럼 배열 목록과 {컬럼 번호: NULL 마스크}로 해석합니다.
+    oids의 의미는 parse_binary_copy()와 같으며, 날짜/시각(date/timestamp/timestamptz) 컬럼은
+    2000-01-01 기준 정수(일/마이크로초)로 보내야 합니다. (fetch_columns()가 서버에서 변환)
+    """
+    numpy = _numpy()
+    ncols = len(oids)
+    text = data.decode(encoding)
+    # 값 안의 탭/줄바꿈은 이스케이프되어 있으므로 행/필드 구분자를 한 번에 나눈 뒤 컬럼별로 건너뛰며 잘라 냅니다.
+    fields = text[:-1].replace("\n", "\t").split("\t") if text else []
+    if len(fields) % ncols:
+        raise ValueError(f"필드 수가 {ncols}의 배수가 아닙니다: {len(fields)}")
+    # NULL(\\N)과 이스케이프는 모두 역슬래시를 포함하므로, 역슬래시가 없으면 값별 검사를 건너뜁니다.
+    escaped = "\\" in text
+
+    columns: List[Any] = []
+    nulls: Dict[int, Any] = {}
+    for i, oid in enumerate(oids):
+        if oid not in _FIXED_TYPES and oid not in _TEXT_TYPES:
+            raise ValueError(f"지원하지 않는 타입 OID입니다: {oid}")
+        values = fields[i::ncols]
+        column, mask = _text_column(values, oid, escaped and "\\" in "".join(values))
+        columns.append(column)
+        if mask is not None:
+            nulls[i] = numpy.array(mask, dtype=bool) if numpy is not None else mask
+    return columns, nulls
+
+
+# ----------------------------------------------------------------------
+# 조회
+# ----------------------------------------------------------------------
+
+def _all_not_null(cur) -> bool:
+    """직전 결과의 모든 컬럼이 NOT NULL 테이블 컬럼을 그대로 가리키는지 카탈로그로 확인합니다."""
+    origins = [(d.table_oid, d.table_column) for d in cur.description]
+    if not origins or any(not table_oid or not column for table_oid, column in origins):
+        return False  # 식/집계 결과 컬럼
+    cur.execute(
+        "SELECT count(*) FROM unnest(%s::oid[], %s::int2[]) AS o(rel, num) "
+        "JOIN pg_attribute a ON a.attrelid = o.rel AND a.attnum = o.num WHERE a.attnotnull",
+        ([o for o, _ in origins], [c for _, c in origins]),
+    )
+    return cur.fetchone()[0] == len(origins)
+
+
+def fetch_columns(cur, query: Any, params: Optional[Sequence[Any]] = None) -> Columns:
+    """
+    query 결과를 COPY로 받아 Columns로 반환합니다.
+    먼저 LIMIT 0으로 결과 컬럼의 타입을 확인하고, 지원하지 않는 타입은 ::text로 바꿔 COPY합니다.
+    모든 컬럼이 고정 길이의 NOT NULL 컬럼이면 바이너리 COPY, 그 밖에는 텍스트 COPY를 사용합니다.
+    """
+    if isinstance(query, sql.Composable):
+        query = query.as_string(cur)
+    encoding = encodings.get(cur.connection.encoding, "utf-8")
+    inner = cur.mogrify(query, params).decode(encoding).rstrip().rstrip(";")
+
+    cur.execute(f"SELECT * FROM ({inner}) AS q LIMIT 0")
+    described = [(d.name, d.type_code) for d in cur.description]
+    names = [name for name, _ in described]
+    binary = all(oid in _FIXED_TYPES for _, oid in described) and _all_not_null(cur)
+    select_list, oids = [], []
+    for name, oid in described:
+        column = "q." + sql.Identifier(name).as_string(cur)
+        if oid not in _FIXED_TYPES and oid not in _TEXT_TYPES:
+            column, oid = f"{column}::text", 25
+        elif not binary and oid == 1082:
+            column = f"({column} - DATE '2000-01-01')"
+        elif not binary and oid in (1114, 1184):
+            column = f"((extract(epoch FROM {column}) - 946684800) * 1000000)::int8"
+        select_list.append(column)
+        oids.append(oid)
+
+    buffer = io.BytesIO()
+    copy_format = "binary" if binary else "text"
+    cur.copy_expert(f"COPY (SELECT {', '.join(select_list)} FROM ({inner}) AS q) TO STDOUT "
+                    f"WITH (FORMAT {copy_format})", buffer)
+    if binary:
+        columns, nulls = parse_binary_copy(buffer.getvalue(), oids)
+    else:
+        columns, nulls = parse_text_copy(buffer.getvalue(), oids, encoding)
+    return Columns(names, dict(zip(names, columns)), {names[i]: m for i, m in nulls.items()})
+
+
+# ----------------------------------------------------------------------
+# 벡터 연산 헬퍼
+# ----------------------------------------------------------------------
+
+def threshold_mask(values, minimum: Optional[float] = None, maximum: Optional[float] = None):
+    """minimum <= 값 (<= maximum) 인 위치의 불리언 마스크를 반환합니다."""
+    numpy = _numpy()
+    if numpy is not None:
+        values = numpy.asarray(values)
+        mask = numpy.ones(len(values), dtype=bool)
+        if minimum is not None:
+            mask &= values >= minimum
+        if maximum is not None:
+            mask &= values <= maximum
+        return mask
+    return [(minimum is None or v >= minimum) and (maximum is None or v <= maximum) for v in values]
+
+
+def _percentile(sorted_values: Sequence[float], q: float) -> float:
+    """선형 보간 분위수 (numpy.percentile 기본 방식과 같음)"""
+    position = (len(sorted_values) - 1) * q
+    low = math.floor(position)
+    high = min(low + 1, len(sorted_values) - 1)
+    return sorted_values[low] + (sorted_values[high] - sorted_values[low]) * (position - low)
+
+
+def aggregate(values, mask=None) -> Dict[str, Optional[float]]:
+    """count / sum / min / max / mean / std / p50 / p90 / p99 를 계산합니다. mask가 참인 위치만 사용합니다."""
+    numpy = _numpy()
+    if numpy is not None:
+        values = numpy.asarray(values, dtype=float)
+        if mask is not None:
+            values = values[numpy.asarray(mask, dtype=bool)]
+        if not len(values):
+            return {"count": 0, "sum": 0.0, "min": None, "max": None, "mean": None, "std": None,
+                    "p50": None, "p90": None, "p99": None}
+        p50, p90, p99 = numpy.percentile(values, [50, 90, 99])
+        return {"count": int(len(values)), "sum": float(values.sum()), "min": float(values.min()),
+                "max": float(values.max()), "mean": float(values.mean()), "std": float(values.std()),
+                "p50": float(p50), "p90": float(p90), "p99": float(p99)}
+
+    selected = sorted(v for v, m in zip(values, mask if mask is not None else [True] * len(values)) if m)
+    if not selected:
+        return {"count": 0, "sum": 0.0, "min": None, "max": None, "mean": None, "std": None,
+                "p50": None, "p90": None, "p99": None}
+    total = float(sum(selected))
+    mean = total / len(selected)
+    return {"count": len(selected), "sum": total, "min": float(selected[0]), "max": float(selected[-1]),
+            "mean": mean, "std": math.sqrt(sum((v - mean) ** 2 for v in selected) / len(selected)),
+            "p50": _percentile(selected, 0.5), "p90": _percentile(selected, 0.9),
+            "p99": _percentile(selected, 0.99)}
+
+
+def histogram(values, bins: int = 10, value_range: Optional[Tuple[float, float]] = None,
+              mask=None) -> Tuple[List[int], List[float]]:
+    """등간격 히스토그램 (구간별 개수, 구간 경계 bins+1개) 을 반환합니다."""
+    numpy = _numpy()
+    if numpy is not None:
+        values = numpy.asarray(values)
+        if mask is not None:
+            values = values[numpy.asarray(mask, dtype=bool)]
+        counts, edges = numpy.histogram(values, bins=bins, range=value_range)
+        return counts.tolist(), edges.tolist()
+
+    selected = [v for v, m in zip(values, mask if mask is not None else [True] * len(values)) if m]
+    low, high = value_range or ((min(selected), max(selected)) if selected else (0.0, 1.0))
+    if low == high:
+        low, high = low - 0.5, high + 0.5
+    width = (high - low) / bins
+    counts = [0] * bins
+    for v in selected:
+        if low <= v <= high:
+            counts[min(int((v - low) / width), bins - 1)] += 1
+    return counts, [low + width * i for i in range(bins + 1)]
+
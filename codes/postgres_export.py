@@ -0,0 +1,313 @@
+import argparse
+import json
+import math
+import os
+import sys
+import time
+from concurrent.futures import as_completed
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import psycopg2
+import psycopg2.extensions
+from psycopg2 import sql
+
+# ----------------------------------------------------------------------
+# 병렬 대량 내보내기 (Parallel Export to CSV / Parquet)
+# ----------------------------------------------------------------------
+# 테이블을 키 범위(정수 기본 키/UNIQUE 컬럼, 없으면 ctid 블록 범위)로 나누고,
+# 프로세스 풀의 작업자들이 각자 연결에서 같은 스냅숏(pg_export_snapshot)을 가져와
+# COPY (SELECT ...) TO STDOUT 으로 범위별 파일을 씁니다.
+# - 모든 조각은 코디네이터가 연 REPEATABLE READ 트랜잭션의 같은 시점 데이터를 봅니다.
+# - CSV는 COPY 출력을 파일로 바로 스트리밍하고, Parquet은 CSV 조각을 pyarrow로 배치 변환합니다.
+#
+# 사용 예:
+#   python codes/postgres_export.py books scraping_html_results --format parquet --workers 4
+#   → exports/books/part-00000.parquet ..., exports/books/_manifest.json
+
+DEFAULT_OUT_DIR = "exports"
+DEFAULT_WORKERS = 4
+PARTS_PER_WORKER = 2          # 작업자당 범위 수 (조각 크기 편차를 줄이기 위해 작업자 수보다 잘게 나눔)
+PARQUET_BLOCK_SIZE = 8 << 20  # Parquet 변환 시 CSV를 읽는 블록 크기(바이트)
+
+# PostgreSQL 타입 -> Arrow 타입 (그 외 타입은 문자열로 내보냄)
+_ARROW_TYPES = {
+    "smallint": "int16", "integer": "int32", "bigint": "int64",
+    "real": "float32", "double precision": "float64", "boolean": "bool_",
+    "date": "date32",
+}
+
+
+# ----------------------------------------------------------------------
+# 범위 계획
+# ----------------------------------------------------------------------
+
+def integer_key(cur, table: str) -> Optional[str]:
+    """정수형 단일 컬럼 기본 키(없으면 UNIQUE) 컬럼 이름을 찾습니다."""
+    cur.execute(
+        "SELECT a.attname FROM pg_index x "
+        "JOIN pg_attribute a ON a.attrelid = x.indrelid AND a.attnum = x.indkey[0] "
+        "WHERE x.indrelid = %s::regclass AND x.indisunique AND x.indnatts = 1 "
+        "AND a.atttypid IN ('int2'::regtype, 'int4'::regtype, 'int8'::regtype) "
+        "ORDER BY x.indisprimary DESC LIMIT 1",
+        (table,),
+    )
+    row = cur.fetchone()
+    return row[0] if row else None
+
+
+def plan_ranges(cur, table: str, parts: int, key: Optional[str] = None) -> Tuple[str, List[Dict[str, Any]]]:
+    """
+    테이블을 parts개의 범위로 나눕니다. 반환값: (분할 방식 설명, [{"where": SQL 문자열, "params": [...]}...])
+    key가 "ctid"이거나 정수 키를 찾지 못하면 물리 블록(ctid) 범위로 나눕니다.
+    """
+    key = key or integer_key(cur, table)
+    if key and key != "ctid":
+        cur.execute(sql.SQL("SELECT min({k}), max({k}) FROM {t}").format(
+            k=sql.Identifier(key), t=sql.Identifier(table)))
+        low, high = cur.fetchone()
+        if low is None:
+            return key, [{"where": "", "params": []}]
+        step = max(1, math.ceil((high - low + 1) / parts))
+        column = sql.Identifier(key).as_string(cur)
+        ranges = []
+        for start in range(low, high + 1, step):
+            if start == low:  # 첫 조각은 NULL 키(UNIQUE 컬럼인 경우)도 함께 내보냄
+                ranges.append({"where": f"WHERE ({column} < %s OR {column} IS NULL)", "params": [start + step]})
+            elif start + step > high:
+                ranges.append({"where": f"WHERE {column} >= %s", "params": [start]})
+            else:
+                ranges.append({"where": f"WHERE {column} >= %s AND {column} < %s", "params": [start, start + step]})
+        if len(ranges) == 1:
+            ranges = [{"where": "", "params": []}]
+        return key, ranges
+
+    cur.execute("SELECT pg_relation_size(%s::regclass) / current_setting('block_size')::bigint", (table,))
+    pages = cur.fetchone()[0]
+    step = max(1, math.ceil(pages / parts))
+    ranges = []
+    for start in range(0, max(pages, 1), step):
+        if start + step >= pages:  # 마지막 조각은 끝을 열어 둠
+            ranges.append({"where": "WHERE ctid >= %s::tid", "params": [f"({start},0)"]})
+        else:
+            ranges.append({"where": "WHERE ctid >= %s::tid AND ctid < %s::tid",
+                           "params": [f"({start},0)", f"({start + step},0)"]})
+    return "ctid", ranges
+
+
+def column_info(cur, table: str, include_generated: bool = False) -> List[Tuple[str, str]]:
+    """
+    테이블 컬럼의 (이름, 타입 이름) 목록을 정의 순서대로 반환합니다.
+    생성 컬럼(GENERATED ... STORED, 예: books.title_ngrams)은 다른 컬럼에서 다시 계산할 수 있으므로
+    include_generated=True가 아니면 제외합니다.
+    """
+    cur.execute(
+        "SELECT attname, format_type(atttypid, NULL) FROM pg_attribute "
+        "WHERE attrelid = %s::regclass AND attnum > 0 AND NOT attisdropped AND (%s OR attgenerated = '') "
+        "ORDER BY attnum",
+        (table, include_generated),
+    )
+    return cur.fetchall()
+
+
+# ----------------------------------------------------------------------
+# 작업자 (프로세스 풀에서 실행)
+# ----------------------------------------------------------------------
+
+def _import_pyarrow():
+    """
+    Parquet 출력에만 필요한 선택 의존성 pyarrow를 불러옵니다.
+    import 비용(수십~수백 ms)이 커서 CSV 내보내기나 이 모듈을 import만 하는 스크립트가 부담하지 않도록
+    처음 사용할 때 불러옵니다. 설치되어 있지 않으면 RuntimeError가 발생합니다.
+    """
+    try:
+        import pyarrow
+        import pyarrow.csv
+        import pyarrow.parquet
+    except ImportError:
+        raise RuntimeError("Parquet 내보내기에는 pyarrow가 필요합니다. (pip install pyarrow)") from None
+    return pyarrow
+
+
+def _csv_to_parquet(csv_path: str, parquet_path: str, columns: Sequence[Tuple[str, str]]) -> None:
+    """CSV 조각을 블록 단위로 읽어 Parquet 파일로 씁니다. (조각 전체를 메모리에 올리지 않음)"""
+    pyarrow = _import_pyarrow()
+    column_types = {name: getattr(pyarrow, _ARROW_TYPES.get(type_name, "string"))()
+                    for name, type_name in columns}
+    reader = pyarrow.csv.open_csv(
+        csv_path,
+        read_options=pyarrow.csv.ReadOptions(column_names=[c for c, _ in columns], block_size=PARQUET_BLOCK_SIZE),
+        # COPY csv: NULL은 따옴표 없는 빈 값, 빈 문자열은 "" 로 구분되며 값 안에 줄바꿈이 있을 수 있습니다.
+        parse_options=pyarrow.csv.ParseOptions(newlines_in_values=True),
+        # COPY는 boolean을 t/f로 쓰므로 pyarrow 기본값(true/false/1/0) 대신 명시합니다.
+        convert_options=pyarrow.csv.ConvertOptions(column_types=column_types, strings_can_be_null=True,
+                                                   quoted_strings_can_be_null=False,
+                                                   true_values=["t"], false_values=["f"]),
+    )
+    writer = None
+    try:
+        for batch in reader:
+            if writer is None:
+                writer = pyarrow.parquet.ParquetWriter(parquet_path, batch.schema)
+            writer.write_batch(batch)
+        if writer is None:  # 빈 조각도 스키마가 있는 파일로 남김
+            schema = pyarrow.schema([(name, t) for name, t in column_types.items()])
+            writer = pyarrow.parquet.ParquetWriter(parquet_path, schema)
+    finally:
+        if writer is not None:
+            writer.close()
+
+
+def _export_range(task: Dict[str, Any]) -> Dict[str, Any]:
+    """범위 하나를 내보냅니다. 코디네이터의 스냅숏을 가져와 같은 시점의 데이터를 읽습니다."""
+    start = time.monotonic()
+    conn = psycopg2.connect(**task["conn_kwargs"])
+    try:
+        conn.set_session(isolation_level=psycopg2.extensions.ISOLATION_LEVEL_REPEATABLE_READ, readonly=True)
+        with conn.cursor() as cur:
+            # 트랜잭션의 첫 문장이어야 합니다.
+            cur.execute("SET TRANSACTION SNAPSHOT %s", (task["snapshot"],))
+            select = cur.mogrify(f"SELECT {task['select_list']} FROM {task['table_sql']} {task['where']}",
+                                 task["params"]).decode(psycopg2.extensions.encodings[conn.encoding])
+            header = "true" if task["format"] == "csv" and task["header"] else "false"
+            csv_path = task["path"] if task["format"] == "csv" else task["path"] + ".csv.tmp"
+            with open(csv_path, "w", encoding="utf-8", newline="") as f:
+                cur.copy_expert(f"COPY ({select}) TO STDOUT WITH (FORMAT csv, HEADER {header})", f)
+            rows = cur.rowcount
+        conn.rollback()
+    finally:
+        conn.close()
+
+    if task["format"] == "parquet":
+        try:
+            _csv_to_parquet(csv_path, task["path"], task["columns"])
+        finally:
+            os.remove(csv_path)
+
+    return {"part": task["part"], "path": task["path"], "rows": rows,
+            "bytes": os.path.getsize(task["path"]), "seconds": round(time.monotonic() - start, 3)}
+
+
+# ----------------------------------------------------------------------
+# 코디네이터
+# ----------------------------------------------------------------------
+
+def _print_progress(table: str, done: int, total: int, rows: int, estimated_rows: int, elapsed: float) -> None:
+    percent = f"{min(rows / estimated_rows * 100, 100):5.1f}%" if estimated_rows > 0 else "  -  "
+    print(f"[{table}] {done}/{total} 조각 완료, {rows:,}행 ({percent}), {rows / elapsed if elapsed else 0:,.0f}행/초",
+          file=sys.stderr)
+
+
+def export_table(table: str, out_dir: str = DEFAULT_OUT_DIR, fmt: str = "csv", workers: int = DEFAULT_WORKERS,
+                 parts: Optional[int] = None, key: Optional[str] = None, header: bool = True,
+                 include_generated: bool = False, progress: Optional[Callable[..., None]] = _print_progress, **conn_kwargs: Any) -> Dict[str, Any]:
+    """
+    table을 out_dir/<table>/part-NNNNN.<fmt> 파일들로 병렬 내보내고 manifest(dict)를 반환합니다.
+
+    - fmt: "csv" 또는 "parquet"(pyarrow 필요)
+    - parts: 범위 수 (기본 workers * PARTS_PER_WORKER)
+    - key: 분할 기준 컬럼. 생략하면 정수 기본 키/UNIQUE 컬럼, 없으면 ctid 블록 범위
+    - include_generated: 생성 컬럼도 내보낼지 여부 (기본은 제외)
+    - progress(table, 완료 조각 수, 전체 조각 수, 누적 행 수, 추정 전체 행 수, 경과 초)
+    """
+    if fmt not in ("csv", "parquet"):
+        raise ValueError(f"지원하지 않는 형식입니다: {fmt}")
+    if fmt == "parquet":
+        _import_pyarrow()  # 작업자를 띄우기 전에 설치 여부를 확인
+
+    parts = parts or workers * PARTS_PER_WORKER
+    target_dir = os.path.join(out_dir, table)
+    os.makedirs(target_dir, exist_ok=True)
+    started = time.monotonic()
+
+    # 코디네이터 트랜잭션은 모든 작업자가 끝날 때까지 열어 두어 스냅숏을 유지합니다.
+    coordinator = psycopg2.connect(**conn_kwargs)
+    try:
+        coordinator.set_session(isolation_level=psycopg2.extensions.ISOLATION_LEVEL_REPEATABLE_READ, readonly=True)
+        with coordinator.cursor() as cur:
+            cur.execute("SELECT pg_export_snapshot()")
+            snapshot = cur.fetchone()[0]
+            columns = column_info(cur, table, include_generated)
+            if not columns:
+                raise ValueError(f"테이블이 없거나 컬럼이 없습니다: {table}")
+            split_by, ranges = plan_ranges(cur, table, parts, key)
+            cur.execute("SELECT GREATEST(reltuples, 0)::bigint FROM pg_class WHERE oid = %s::regclass", (table,))
+            estimated_rows = cur.fetchone()[0]
+            table_sql = sql.Identifier(table).as_string(cur)
+            select_list = sql.SQL(", ").join(sql.Identifier(c) for c, _ in columns).as_string(cur)
+
+        tasks = [{
+            "conn_kwargs": conn_kwargs, "snapshot": snapshot, "table_sql": table_sql, "select_list": select_list,
+            "columns": columns, "format": fmt, "header": header, "part": i,
+            "path": os.path.join(target_dir, f"part-{i:05d}.{fmt}"), **r,
+        } for i, r in enumerate(ranges)]
+
+        from concurrent.futures import ProcessPoolExecutor  # multiprocessing은 내보내기 때만 불러옵니다.
+
+        results = []
+        with ProcessPoolExecutor(max_workers=min(workers, len(tasks))) as pool:
+            futures = [pool.submit(_export_range, t) for t in tasks]
+            total_rows = 0
+            for future in as_completed(futures):
+                result = future.result()
+                results.append(result)
+                total_rows += result["rows"]
+                if progress:
+                    progress(table, len(results), len(tasks), total_rows, estimated_rows,
+                             time.monotonic() - started)
+    finally:
+        coordinator.close()
+
+    results.sort(key=lambda r: r["part"])
+    manifest = {
+        "table": table,
+        "format": fmt,
+        "snapshot": snapshot,
+        "split_by": split_by,
+        "columns": [{"name": c, "type": t} for c, t in columns],
+        "rows": sum(r["rows"] for r in results),
+        "bytes": sum(r["bytes"] for r in results),
+        "seconds": round(time.monotonic() - started, 3),
+        "parts": [{**r, "path": os.path.basename(r["path"]), "where": t["where"], "params": t["params"]}
+                  for r, t in zip(results, tasks)],
+    }
+    with open(os.path.join(target_dir, "_manifest.json"), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    return manifest
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="테이블을 범위별로 병렬 COPY하여 CSV/Parquet 파일로 내보냅니다.")
+    parser.add_argument("tables", nargs="+", help="내보낼 테이블 이름 (예: books scraping_html_results)")
+    parser.add_argument("--host", default=os.environ.get("PGHOST", "localhost"))
+    parser.add_argument("--port", default=os.environ.get("PGPORT", "5432"))
+    parser.add_argument("--dbname", default=os.environ.get("PGDATABASE", "main_db"))
+    parser.add_argument("--user", default=os.environ.get("PGUSER", "admin"))
+    parser.add_argument("--password", default=os.environ.get("PGPASSWORD", "admin123"))
+    parser.add_argument("--format", choices=["csv", "parquet"], default="csv")
+    parser.add_argument("--out", default=DEFAULT_OUT_DIR, help="출력 디렉터리")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS)
+    parser.add_argument("--parts", type=int, help="범위 수 (기본: workers x 2)")
+    parser.add_argument("--key", help="분할 기준 정수 컬럼 또는 ctid (기본: 자동 선택)")
+    parser.add_argument("--no-header", action="store_true", help="CSV 헤더 행을 쓰지 않음")
+    parser.add_argument("--include-generated", action="store_true", help="생성 컬럼(GENERATED ... STORED)도 내보냄")
+    args = parser.parse_args(argv)
+
+    conn_kwargs = dict(host=args.host, port=args.port, dbname=args.dbname, user=args.user, password=args.password)
+    status = 0
+    for table in args.tables:
+        try:
+            manifest = export_table(table, args.out, args.format, args.workers, args.parts, args.key,
+                                    header=not args.no_header, include_generated=args.include_generated,
+                                    **conn_kwargs)
+        except (psycopg2.Error, OSError, ValueError, RuntimeError) as e:
+            print(f"[{table}] 내보내기 오류: {e}", file=sys.stderr)
+            status = 1
+            continue
+        print(f"=> {table}: {manifest['rows']:,}행, {len(manifest['parts'])}개 조각 ({manifest['split_by']} 기준), "
+              f"{manifest['bytes'] / 1024 / 1024:.1f}MB, {manifest['seconds']}초 -> "
+              f"{os.path.join(args.out, table)}")
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
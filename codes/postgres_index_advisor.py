@@ -0,0 +1,351 @@
+import argparse
+import glob
+import json
+import os
+import re
+import sys
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import psycopg2
+
+# ----------------------------------------------------------------------
+# 인덱스 어드바이저 (Index Advisor)
+# ----------------------------------------------------------------------
+# 저장소의 SQL 파일(sql/, quests/10_DMLs/*.sql)에 정의된 테이블을 대상으로
+# 1) 정적 분석: CREATE TABLE의 PRIMARY KEY/UNIQUE, CREATE INDEX와 WHERE/ORDER BY에 쓰인 컬럼을 수집하고,
+# 2) 실행 통계: pg_stat_user_tables(순차 스캔 수), pg_index(기존 인덱스),
+#    pg_stat_statements(설치된 경우, 실제 실행된 쿼리의 조건 컬럼)를 읽어
+# 순차 스캔 비중이 큰 테이블과 인덱스가 없는 조건 컬럼을 보고합니다.
+# 같은 이름의 테이블이 여러 파일에 (예: 일반 테이블과 파티션 테이블로) 정의되어 있으면 한 테이블로 합쳐 보며,
+# 이미 있는 인덱스(SQL 파일의 CREATE INDEX 또는 DB의 인덱스)와 이름이나 선두 컬럼이 겹치는 제안은 하지 않습니다.
+#
+# 사용 예:
+#   python codes/postgres_index_advisor.py
+#   python codes/postgres_index_advisor.py --min-rows 1000 --json
+
+REPO_ROOT = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+DEFAULT_SQL_PATHS = (os.path.join(REPO_ROOT, "sql"), os.path.join(REPO_ROOT, "quests", "10_DMLs"))
+EXTRA_TABLES = ("books",)      # SQL 파일이 아니라 파이썬 코드(create_books_table)에서 만드는 테이블
+DEFAULT_MIN_ROWS = 10_000      # 이보다 작은 테이블은 순차 스캔이 더 빠를 수 있으므로 경고하지 않음
+TOP_STATEMENTS = 10
+
+_COMMENT = re.compile(r"--[^\n]*")
+_CREATE_TABLE = re.compile(
+    r"^\s*CREATE\s+TABLE\s+(?:IF\s+NOT\s+EXISTS\s+)?\"?(\w+)\"?\s*\((.*?)\)"
+    r"\s*(PARTITION\s+BY\s+\w+\s*\([^)]*\))?\s*$",
+    re.IGNORECASE | re.DOTALL,
+)
+_CREATE_INDEX = re.compile(
+    r"^\s*CREATE\s+(?:UNIQUE\s+)?INDEX\s+(?:CONCURRENTLY\s+)?(?:IF\s+NOT\s+EXISTS\s+)?(?:\"?(\w+)\"?\s+)?"
+    r"ON\s+(?:ONLY\s+)?\"?(\w+)\"?(?:\s+USING\s+\w+)?\s*\(\s*\"?(\w+)",
+    re.IGNORECASE,
+)
+_TARGET_TABLE = re.compile(r"\b(?:DELETE\s+FROM|UPDATE|FROM|JOIN)\s+\"?(\w+)\"?", re.IGNORECASE)
+_WHERE = re.compile(
+    r"\bWHERE\b(.*?)(?=\bORDER\s+BY\b|\bGROUP\s+BY\b|\bLIMIT\b|\bOFFSET\b|\bRETURNING\b|\bFOR\s+UPDATE\b|\)\s*$|$)",
+    re.IGNORECASE | re.DOTALL,
+)
+_PREDICATE = re.compile(
+    r"(?:\"?\w+\"?\.)?\"?(\w+)\"?\s*(?:=|<>|!=|<=|>=|<|>|\bI?LIKE\b|\bIN\b|\bBETWEEN\b|\bIS\b)", re.IGNORECASE
+)
+_ORDER_BY = re.compile(r"\bORDER\s+BY\s+(?:\"?\w+\"?\.)?\"?(\w+)\"?", re.IGNORECASE)
+
+
+# ----------------------------------------------------------------------
+# 정적 분석 (SQL 파일)
+# ----------------------------------------------------------------------
+
+def _split_top_level(body: str) -> List[str]:
+    """괄호 깊이 0의 쉼표로 CREATE TABLE 본문을 항목별로 나눕니다."""
+    items, depth, current = [], 0, []
+    for ch in body:
+        if ch == "(":
+            depth += 1
+        elif ch == ")":
+            depth -= 1
+        if ch == "," and depth == 0:
+            items.append("".join(current).strip())
+            current = []
+        else:
+            current.append(ch)
+    if "".join(current).strip():
+        items.append("".join(current).strip())
+    return items
+
+
+def _new_table(name: str) -> Dict[str, Any]:
+    return {"name": name, "columns": [], "indexed": set(), "indexes": {}, "partitioned": False,
+            "predicates": Counter(), "order_by": Counter(), "sources": set()}
+
+
+def statement_columns(statement: str) -> Tuple[Optional[str], List[str], List[str]]:
+    """DML/SELECT 문장에서 (대상 테이블, WHERE 조건 컬럼, ORDER BY 첫 컬럼) 을 추출합니다."""
+    if re.match(r"^\s*(INSERT|CREATE|DROP|ALTER|COPY|TRUNCATE)\b", statement, re.IGNORECASE):
+        return None, [], []
+    target = _TARGET_TABLE.search(statement)
+    if not target:
+        return None, [], []
+    where = _WHERE.search(statement)
+    predicates = _PREDICATE.findall(where.group(1)) if where else []
+    order_by = _ORDER_BY.findall(statement)
+    return target.group(1).lower(), [c.lower() for c in predicates], [c.lower() for c in order_by]
+
+
+def parse_sql_files(paths: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+    """
+    SQL 파일(또는 디렉터리 안의 *.sql)을 읽어 테이블별 컬럼/키/인덱스/조건 컬럼을 수집합니다.
+    indexes는 CREATE INDEX로 정의된 {인덱스 이름: (선두 컬럼, 원래 문장)} 입니다.
+    """
+    tables: Dict[str, Dict[str, Any]] = {}
+    files: List[str] = []
+    for path in paths:
+        files.extend(sorted(glob.glob(os.path.join(path, "*.sql"))) if os.path.isdir(path) else [path])
+
+    statements: List[Tuple[str, str]] = []
+    for file in files:
+        with open(file, encoding="utf-8") as f:
+            text = _COMMENT.sub("", f.read())
+        statements.extend((file, s) for s in text.split(";") if s.strip())
+
+    for file, statement in statements:
+        match = _CREATE_TABLE.match(statement)
+        if not match:
+            continue
+        table = tables.setdefault(match.group(1).lower(), _new_table(match.group(1).lower()))
+        table["sources"].add(os.path.relpath(file, REPO_ROOT))
+        table["partitioned"] |= match.group(3) is not None
+        for item in _split_top_level(match.group(2)):
+            upper = item.upper()
+            key = re.match(r"^(?:CONSTRAINT\s+\w+\s+)?(?:PRIMARY\s+KEY|UNIQUE)\s*\(\s*\"?(\w+)", item, re.IGNORECASE)
+            if key:
+                table["indexed"].add(key.group(1).lower())  # 복합 키는 첫 컬럼만 인덱스 선두 컬럼
+                continue
+            column = item.split()[0].strip('"').lower()
+            if column not in table["columns"]:
+                table["columns"].append(column)
+            if "PRIMARY KEY" in upper or "UNIQUE" in upper:
+                table["indexed"].add(column)
+
+    for file, statement in statements:
+        match = _CREATE_INDEX.match(statement)
+        if match and match.group(2).lower() in tables:
+            table, column = tables[match.group(2).lower()], match.group(3).lower()
+            index_name = (match.group(1) or f"{table['name']}_{column}_idx").lower()
+            table["indexed"].add(column)
+            table["indexes"][index_name] = (column, " ".join(statement.split()) + ";")
+
+    for file, statement in statements:
+        name, predicates, order_by = statement_columns(statement)
+        if name not in tables:
+            continue
+        table = tables[name]
+        table["predicates"].update(c for c in predicates if c in table["columns"])
+        table["order_by"].update(c for c in order_by if c in table["columns"])
+    return tables
+
+
+# ----------------------------------------------------------------------
+# 실행 통계 (카탈로그 / 통계 뷰)
+# ----------------------------------------------------------------------
+
+def table_stats(cur, tables: Sequence[str]) -> Dict[str, Dict[str, Any]]:
+    cur.execute(
+        "SELECT relname, seq_scan, seq_tup_read, COALESCE(idx_scan, 0), n_live_tup "
+        "FROM pg_stat_user_tables WHERE relname = ANY(%s) AND schemaname = ANY(current_schemas(false))",
+        (list(tables),),
+    )
+    return {
+        name: {"seq_scan": seq_scan, "seq_tup_read": seq_tup_read, "idx_scan": idx_scan, "live_rows": live}
+        for name, seq_scan, seq_tup_read, idx_scan, live in cur.fetchall()
+    }
+
+
+def leading_index_columns(cur, tables: Sequence[str]) -> Dict[str, Dict[str, List[str]]]:
+    """테이블별 {인덱스 선두 컬럼: [인덱스 이름...]} 을 반환합니다."""
+    cur.execute(
+        "SELECT t.relname, i.relname, a.attname FROM pg_index x "
+        "JOIN pg_class t ON t.oid = x.indrelid JOIN pg_class i ON i.oid = x.indexrelid "
+        "JOIN pg_attribute a ON a.attrelid = t.oid AND a.attnum = x.indkey[0] "
+        "WHERE t.relname = ANY(%s) AND pg_table_is_visible(t.oid)",
+        (list(tables),),
+    )
+    result: Dict[str, Dict[str, List[str]]] = {}
+    for table, index, column in cur.fetchall():
+        result.setdefault(table, {}).setdefault(column, []).append(index)
+    return result
+
+
+def index_names(cur) -> set:
+    """현재 search_path에서 보이는 모든 인덱스 이름 (제안할 인덱스 이름이 이미 쓰였는지 확인용)"""
+    cur.execute("SELECT relname FROM pg_class WHERE relkind IN ('i', 'I') AND pg_table_is_visible(oid)")
+    return {name for name, in cur.fetchall()}
+
+
+def statement_stats(cur, tables: Sequence[str], limit: int = TOP_STATEMENTS) -> Optional[List[Dict[str, Any]]]:
+    """
+    pg_stat_statements에서 대상 테이블을 읽는 쿼리를 누적 실행 시간 순으로 반환합니다.
+    확장이 설치되지 않았거나 읽을 수 없으면 None을 반환합니다.
+    """
+    cur.execute("SELECT 1 FROM pg_extension WHERE extname = 'pg_stat_statements'")
+    if cur.fetchone() is None:
+        return None
+    total_column = "total_exec_time" if cur.connection.server_version >= 130000 else "total_time"
+    try:
+        cur.execute(
+            f"SELECT query, calls, {total_column}, rows FROM pg_stat_statements "
+            "WHERE dbid = (SELECT oid FROM pg_database WHERE datname = current_database()) "
+            f"ORDER BY {total_column} DESC LIMIT 500"
+        )
+        rows = cur.fetchall()
+    except psycopg2.Error as e:
+        # shared_preload_libraries에 등록되지 않은 경우 등
+        print(f"pg_stat_statements 조회 오류: {e}", file=sys.stderr)
+        cur.connection.rollback()
+        return None
+
+    result = []
+    for query, calls, total_ms, n_rows in rows:
+        name, predicates, order_by = statement_columns(query)
+        if name not in tables:
+            continue
+        result.append({"table": name, "query": " ".join(query.split()), "calls": calls,
+                       "total_ms": round(total_ms, 3), "rows": n_rows,
+                       "predicates": predicates, "order_by": order_by})
+    return result[:limit] if limit else result
+
+
+# ----------------------------------------------------------------------
+# 분석 / 보고
+# ----------------------------------------------------------------------
+
+def advise(conn, paths: Iterable[str] = DEFAULT_SQL_PATHS, extra_tables: Sequence[str] = EXTRA_TABLES,
+           min_rows: int = DEFAULT_MIN_ROWS) -> Dict[str, Any]:
+    """정적 분석과 실행 통계를 합쳐 테이블별 진단 결과를 반환합니다."""
+    tables = parse_sql_files(paths)
+    for name in extra_tables:
+        tables.setdefault(name, _new_table(name))
+    names = sorted(tables)
+
+    with conn.cursor() as cur:
+        stats = table_stats(cur, names)
+        indexes = leading_index_columns(cur, names)
+        taken = index_names(cur)
+        statements = statement_stats(cur, names, limit=0)
+    conn.rollback()
+
+    # pg_stat_statements의 실제 쿼리 조건은 호출 횟수만큼 가중합니다.
+    for s in statements or []:
+        table = tables[s["table"]]
+        table["predicates"].update({c: s["calls"] for c in s["predicates"]})
+        table["order_by"].update({c: s["calls"] for c in s["order_by"][:1]})
+
+    report_tables = []
+    for name in names:
+        table = tables[name]
+        in_db = name in stats
+        indexed = set(indexes.get(name, {})) if in_db else table["indexed"]
+        stat = stats.get(name)
+        taken_names = taken if in_db else taken | set(table["indexes"])
+
+        seq_heavy = bool(stat and stat["live_rows"] >= min_rows and stat["seq_scan"] > stat["idx_scan"])
+        candidates = table["predicates"] + table["order_by"]
+        missing = []
+        for column, uses in candidates.most_common():
+            if column in indexed:
+                continue
+            declared = [statement for leading, statement in table["indexes"].values() if leading == column]
+            if declared:
+                # SQL 파일에는 정의되어 있지만 DB에는 없는 인덱스: 새 이름을 만들지 않고 같은 정의를 제안
+                suggestion = declared[0]
+            elif f"{name}_{column}_idx" in taken_names:
+                # 관례적인 이름이 이미 다른 인덱스에 쓰였으면 이름은 서버가 정하게 둡니다.
+                suggestion = f"CREATE INDEX ON {name} ({column});"
+            else:
+                suggestion = f"CREATE INDEX {name}_{column}_idx ON {name} ({column});"
+            missing.append({"column": column, "uses": uses, "suggestion": suggestion})
+        report_tables.append({
+            "table": name,
+            "sources": sorted(table["sources"]),
+            "in_database": in_db,
+            "stats": stat,
+            "avg_rows_per_seq_scan": (round(stat["seq_tup_read"] / stat["seq_scan"], 1)
+                                      if stat and stat["seq_scan"] else None),
+            "seq_scan_heavy": seq_heavy,
+            "partitioned": table["partitioned"],
+            "declared_indexes": sorted(table["indexes"]),
+            "indexed_columns": sorted(indexed),
+            "missing_indexes": missing,
+        })
+
+    return {
+        "min_rows": min_rows,
+        "pg_stat_statements": statements is not None,
+        "top_statements": (statements or [])[:TOP_STATEMENTS],
+        "tables": report_tables,
+    }
+
+
+def format_report(report: Dict[str, Any]) -> str:
+    lines = ["=" * 70, " 인덱스 어드바이저 보고서", "=" * 70]
+    if not report["pg_stat_statements"]:
+        lines.append("(pg_stat_statements 확장이 없어 SQL 파일의 정적 분석과 테이블 통계만 사용합니다)")
+
+    for t in report["tables"]:
+        lines.append("")
+        source = ", ".join(t["sources"]) or "파이썬 코드"
+        lines.append(f"[{t['table']}] ({source})")
+        if t["partitioned"]:
+            lines.append("  - 파티션 테이블 정의가 포함되어 있습니다.")
+        if not t["in_database"]:
+            lines.append("  - DB에 테이블이 없습니다. (정의 파일 기준으로만 분석)")
+        else:
+            s = t["stats"]
+            lines.append(f"  - 행 수 {s['live_rows']:,}, 순차 스캔 {s['seq_scan']:,}회 "
+                         f"(평균 {t['avg_rows_per_seq_scan'] or 0:,}행), 인덱스 스캔 {s['idx_scan']:,}회")
+            if t["seq_scan_heavy"]:
+                lines.append(f"  ! 순차 스캔 비중이 큽니다. (행 수 {report['min_rows']:,} 이상, 순차 스캔 > 인덱스 스캔)")
+        lines.append(f"  - 인덱스 선두 컬럼: {', '.join(t['indexed_columns']) or '(없음)'}")
+        if t["declared_indexes"]:
+            lines.append(f"  - SQL 파일의 인덱스: {', '.join(t['declared_indexes'])}")
+        for m in t["missing_indexes"]:
+            lines.append(f"  ! 인덱스 없는 조건/정렬 컬럼 '{m['column']}' (사용 {m['uses']}회) -> {m['suggestion']}")
+
+    if report["top_statements"]:
+        lines.append("")
+        lines.append("누적 실행 시간 상위 쿼리 (pg_stat_statements)")
+        for s in report["top_statements"]:
+            lines.append(f"  {s['total_ms']:>12,.1f}ms {s['calls']:>8,}회  {s['query'][:100]}")
+    return "\n".join(lines)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="순차 스캔이 많은 테이블과 누락된 인덱스를 보고합니다.")
+    parser.add_argument("--host", default=os.environ.get("PGHOST", "localhost"))
+    parser.add_argument("--port", default=os.environ.get("PGPORT", "5432"))
+    parser.add_argument("--dbname", default=os.environ.get("PGDATABASE", "main_db"))
+    parser.add_argument("--user", default=os.environ.get("PGUSER", "admin"))
+    parser.add_argument("--password", default=os.environ.get("PGPASSWORD", "admin123"))
+    parser.add_argument("--paths", nargs="+", default=list(DEFAULT_SQL_PATHS),
+                        help="분석할 SQL 파일 또는 디렉터리 (기본: sql/, quests/10_DMLs/)")
+    parser.add_argument("--min-rows", type=int, default=DEFAULT_MIN_ROWS)
+    parser.add_argument("--json", action="store_true", help="JSON으로 출력")
+    args = parser.parse_args(argv)
+
+    try:
+        conn = psycopg2.connect(host=args.host, port=args.port, dbname=args.dbname,
+                                user=args.user, password=args.password)
+    except psycopg2.Error as e:
+        print(f"데이터베이스 연결 오류: {e}", file=sys.stderr)
+        return 1
+    try:
+        report = advise(conn, args.paths, min_rows=args.min_rows)
+    finally:
+        conn.close()
+
+    print(json.dumps(report, ensure_ascii=False, indent=2) if args.json else format_report(report))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
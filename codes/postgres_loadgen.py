@@ -0,0 +1,474 @@
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, wait
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import psycopg2
+from psycopg2 import sql
+
+from postgres_benchmark import (BENCH_SCHEMA, EXPENSIVE_THRESHOLD, PRICE_RANGE, percentile,
+                                prepare_table, seed)
+from postgres_bulk import bulk_insert
+from postgres_modify import delete_nth, update_nth
+
+# ----------------------------------------------------------------------
+# 동시성 부하 생성기 (Load Generator / Contention Stress)
+# ----------------------------------------------------------------------
+# postgres_benchmark가 작업 하나씩의 지연을 재는 것과 달리, 이 도구는 N개의 작업자(스레드 또는 프로세스)가
+# 조회/삽입/순번 기반 수정/삭제를 섞어서 목표 처리량으로 동시에 실행할 때의 동작을 봅니다.
+#
+#   - 작업 종류와 비율: --mix read_title=40,read_expensive=20,insert=15,update=15,delete=10
+#     (SQL은 예제 스크립트의 get_book_by_title / get_expensive_books / insert_books /
+#      update_second_book_price / delete_third_book과 같은 문장)
+#   - 수정/삭제 방식: --modify-style two_step  기존 "SELECT ... LIMIT 1 OFFSET n" 후 id로 UPDATE/DELETE
+#                     --modify-style cte       대상 선택(FOR UPDATE)과 수정을 한 문장으로 (postgres_modify)
+#   - 목표 처리량(--rate, 전체 ops/s)과 ramp-up(--ramp-up 초 동안 작업자를 차례로 투입, 측정에서 제외)
+#
+# 결과: 작업별 처리량, 지연 시간 p50/p95/p99, 오류(SQLSTATE별), 대상이 없어 아무것도 바꾸지 못한 작업 수,
+#       pg_stat_activity / pg_locks 표본으로 본 락 대기(최대 대기 세션 수, 대기 표본 비율, 락 종류),
+#       pg_stat_database의 deadlock 증가 수, 잃어버린 갱신(lost update) 수
+#
+# 잃어버린 갱신: 수정 작업은 대상 행의 revision을 1 올립니다. two_step은 읽은 값 + 1을 쓰므로 두 작업자가
+# 같은 행을 동시에 읽으면 한쪽 갱신이 사라집니다. 측정 후 (작업자가 올린 횟수 - 실제 revision)을 합산합니다.
+#
+# 테이블은 bench.books(search_path=bench,public)를 사용하므로 public.books에는 영향을 주지 않습니다.
+#   python codes/postgres_loadgen.py --workers 16 --rate 500 --duration 30 --ramp-up 5 --modify-style two_step
+#   python codes/postgres_loadgen.py --workers 16 --rate 500 --duration 30 --modify-style cte --output load.json
+
+APPLICATION_NAME = "books_loadgen"
+DEFAULT_MIX = "read_title=40,read_expensive=20,insert=15,update=15,delete=10"
+
+LOADGEN_DDL = [
+    'CREATE EXTENSION IF NOT EXISTS "uuid-ossp"',
+    f"CREATE SCHEMA IF NOT EXISTS {BENCH_SCHEMA}",
+    f"DROP TABLE IF EXISTS {BENCH_SCHEMA}.books",
+    f"""
+    CREATE TABLE {BENCH_SCHEMA}.books (
+        serial_no SERIAL UNIQUE NOT NULL,
+        id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+        title VARCHAR(100) NOT NULL,
+        price INT NOT NULL,
+        revision INT NOT NULL DEFAULT 0  -- 수정 횟수 (잃어버린 갱신 확인용)
+    )
+    """,
+]
+
+
+# ----------------------------------------------------------------------
+# 작업 (예제 스크립트와 같은 SQL)
+# ----------------------------------------------------------------------
+# 각 작업은 (conn, rng, config)를 받아 수정/삭제한 행의 id(없으면 None)를 반환합니다. 커밋은 호출자가 합니다.
+
+def op_read_title(conn, rng: random.Random, config: Dict[str, Any]) -> None:
+    with conn.cursor() as cur:
+        cur.execute("SELECT id, title, price FROM books WHERE title = %s;",
+                    (f"도서-{rng.randrange(config['distinct_titles'])}",))
+        cur.fetchall()
+
+
+def op_read_expensive(conn, rng: random.Random, config: Dict[str, Any]) -> None:
+    with conn.cursor() as cur:
+        cur.execute("SELECT id, title, price FROM books WHERE price >= %s ORDER BY price DESC;",
+                    (EXPENSIVE_THRESHOLD,))
+        cur.fetchall()
+
+
+def op_insert(conn, rng: random.Random, config: Dict[str, Any]) -> None:
+    rows = [(f"도서-{rng.randrange(config['distinct_titles'])}", rng.randrange(PRICE_RANGE))
+            for _ in range(rng.randint(1, 3))]
+    bulk_insert(conn, rows)
+
+
+def op_update(conn, rng: random.Random, config: Dict[str, Any]) -> Optional[str]:
+    """두 번째 도서(title, id 순)의 가격을 바꾸고 revision을 1 올립니다."""
+    price = rng.randrange(PRICE_RANGE)
+    with conn.cursor() as cur:
+        if config["modify_style"] == "cte":
+            row = update_nth(cur, "books", ("title", "id"), 1,
+                             {"price": price, "revision": sql.SQL("t.revision + 1")}, returning=("id",))
+            return str(row[0]) if row else None
+        cur.execute("SELECT id, revision FROM books ORDER BY title ASC LIMIT 1 OFFSET 1")
+        row = cur.fetchone()
+        if row is None:
+            return None
+        cur.execute("UPDATE books SET price = %s, revision = %s WHERE id = %s", (price, row[1] + 1, row[0]))
+        return str(row[0]) if cur.rowcount else None
+
+
+def op_delete(conn, rng: random.Random, config: Dict[str, Any]) -> Optional[str]:
+    """세 번째 도서(title, id 순)를 삭제합니다."""
+    with conn.cursor() as cur:
+        if config["modify_style"] == "cte":
+            row = delete_nth(cur, "books", ("title", "id"), 2, returning=("id",))
+            return str(row[0]) if row else None
+        cur.execute("SELECT id FROM books ORDER BY title ASC LIMIT 1 OFFSET 2")
+        row = cur.fetchone()
+        if row is None:
+            return None
+        cur.execute("DELETE FROM books WHERE id = %s", (row[0],))
+        return str(row[0]) if cur.rowcount else None
+
+
+OPERATIONS: Dict[str, Callable[..., Optional[str]]] = {
+    "read_title": op_read_title,
+    "read_expensive": op_read_expensive,
+    "insert": op_insert,
+    "update": op_update,
+    "delete": op_delete,
+}
+
+
+def parse_mix(text: str) -> Dict[str, float]:
+    """'read_title=40,update=10' 형식의 작업 비율을 해석합니다."""
+    mix: Dict[str, float] = {}
+    for part in filter(None, (p.strip() for p in text.split(","))):
+        name, _, weight = part.partition("=")
+        if name not in OPERATIONS:
+            raise ValueError(f"알 수 없는 작업입니다: {name} ({', '.join(OPERATIONS)})")
+        mix[name] = float(weight or 1)
+    if not mix or sum(mix.values()) <= 0:
+        raise ValueError("작업 비율이 비어 있습니다.")
+    return mix
+
+
+# ----------------------------------------------------------------------
+# 작업자
+# ----------------------------------------------------------------------
+
+def _connect(config: Dict[str, Any]):
+    options = f"-c search_path={BENCH_SCHEMA},public"
+    if config.get("lock_timeout_ms"):
+        options += f" -c lock_timeout={int(config['lock_timeout_ms'])}"
+    conn = psycopg2.connect(application_name=APPLICATION_NAME, options=options, **config["conn_kwargs"])
+    conn.autocommit = False
+    return conn
+
+
+def run_worker(config: Dict[str, Any], worker_id: int) -> Dict[str, Any]:
+    """
+    작업자 하나를 실행합니다. (스레드/프로세스 공용, 결과는 직렬화 가능한 dict)
+    작업자 i는 ramp-up 구간에 고르게 나뉘어 시작하고, 목표 간격(workers / rate초)마다 작업을 하나씩 실행합니다.
+    일정보다 밀리면 쉬지 않고 바로 다음 작업을 실행하며, 1초 이상 밀린 일정은 버리고 late로 셉니다.
+    """
+    rng = random.Random(config["seed"] * 1000 + worker_id)
+    names = list(config["mix"])
+    weights = [config["mix"][n] for n in names]
+    workers = config["workers"]
+    start_at = config["start_at"] + config["ramp_up"] * worker_id / workers
+    measure_from = config["start_at"] + config["ramp_up"]
+    end_at = measure_from + config["duration"]
+    interval = workers / config["rate"] if config["rate"] else 0.0
+
+    stats = {name: {"latencies": [], "errors": Counter(), "empty": 0} for name in names}
+    updated: Counter = Counter()
+    deleted: List[str] = []
+    late = 0
+
+    conn = _connect(config)
+    try:
+        delay = start_at - time.time()
+        if delay > 0:
+            time.sleep(delay)
+        next_at = time.time()
+        while True:
+            now = time.time()
+            if now >= end_at:
+                break
+            if interval:
+                if next_at > now:
+                    time.sleep(min(next_at - now, end_at - now))
+                    if time.time() >= end_at:
+                        break
+                elif now - next_at > 1.0:
+                    late += int((now - next_at) / interval)
+                    next_at = now
+                next_at += interval
+
+            name = rng.choices(names, weights)[0]
+            measured = time.time() >= measure_from
+            started = time.perf_counter()
+            try:
+                target = OPERATIONS[name](conn, rng, config)
+                conn.commit()
+            except psycopg2.Error as e:
+                if not conn.closed:
+                    conn.rollback()
+                else:
+                    conn = _connect(config)
+                if measured:
+                    stats[name]["errors"][e.pgcode or type(e).__name__] += 1
+                continue
+            if name == "update" and target:
+                updated[target] += 1  # ramp-up 구간 갱신도 revision에 반영되므로 항상 셉니다.
+            elif name == "delete" and target:
+                deleted.append(target)
+            if not measured:
+                continue
+            stats[name]["latencies"].append(time.perf_counter() - started)
+            if name in ("update", "delete") and target is None:
+                stats[name]["empty"] += 1
+    finally:
+        conn.close()
+    return {"stats": stats, "updated": updated, "deleted": deleted, "late": late}
+
+
+# ----------------------------------------------------------------------
+# 서버 상태 표본 (pg_stat_activity / pg_locks / pg_stat_database)
+# ----------------------------------------------------------------------
+
+class LockSampler:
+    """부하 생성 중 주기적으로 락 대기 상태를 표본 추출합니다."""
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.conn.autocommit = True
+        self.samples = 0
+        self.samples_waiting = 0
+        self.max_waiting = 0
+        self.total_waiting = 0
+        self.max_wait_seconds = 0.0
+        self.active_total = 0
+        self.lock_modes: Counter = Counter()
+        self.deadlocks_start = self.deadlocks()
+
+    def deadlocks(self) -> int:
+        with self.conn.cursor() as cur:
+            cur.execute("SELECT deadlocks FROM pg_stat_database WHERE datname = current_database()")
+            return cur.fetchone()[0]
+
+    def sample(self) -> None:
+        with self.conn.cursor() as cur:
+            cur.execute(
+                "SELECT count(*) FILTER (WHERE state = 'active'), "
+                "       count(*) FILTER (WHERE wait_event_type = 'Lock'), "
+                "       coalesce(max(extract(epoch FROM now() - state_change)) "
+                "                FILTER (WHERE wait_event_type = 'Lock'), 0) "
+                "FROM pg_stat_activity WHERE application_name = %s",
+                (APPLICATION_NAME,),
+            )
+            active, waiting, longest = cur.fetchone()
+            cur.execute(
+                "SELECT l.locktype, l.mode, count(*) FROM pg_locks l "
+                "JOIN pg_stat_activity a ON a.pid = l.pid "
+                "WHERE NOT l.granted AND a.application_name = %s GROUP BY 1, 2",
+                (APPLICATION_NAME,),
+            )
+            for locktype, mode, count in cur.fetchall():
+                self.lock_modes[f"{locktype}/{mode}"] += count
+        self.samples += 1
+        self.active_total += active
+        self.total_waiting += waiting
+        self.samples_waiting += waiting > 0
+        self.max_waiting = max(self.max_waiting, waiting)
+        self.max_wait_seconds = max(self.max_wait_seconds, float(longest))
+
+    def summary(self) -> Dict[str, Any]:
+        samples = max(self.samples, 1)
+        return {
+            "samples": self.samples,
+            "mean_active": round(self.active_total / samples, 2),
+            "mean_lock_waiting": round(self.total_waiting / samples, 2),
+            "max_lock_waiting": self.max_waiting,
+            "pct_samples_with_lock_wait": round(100.0 * self.samples_waiting / samples, 1),
+            "max_lock_wait_seconds": round(self.max_wait_seconds, 3),
+            "waiting_lock_modes": dict(self.lock_modes.most_common()),
+            "deadlocks": self.deadlocks() - self.deadlocks_start,
+        }
+
+
+def count_lost_updates(conn, updated: Counter, deleted: Sequence[str]) -> Tuple[int, int]:
+    """(잃어버린 갱신 수, 확인한 행 수)를 반환합니다. 삭제된 행은 제외합니다."""
+    gone = set(deleted)
+    ids = [i for i in updated if i not in gone]
+    if not ids:
+        return 0, 0
+    with conn.cursor() as cur:
+        cur.execute("SELECT id::text, revision FROM books WHERE id = ANY(%s::uuid[])", (ids,))
+        revisions = dict(cur.fetchall())
+    lost = sum(max(updated[i] - revisions[i], 0) for i in ids if i in revisions)
+    return lost, len(revisions)
+
+
+# ----------------------------------------------------------------------
+# 실행 / 보고
+# ----------------------------------------------------------------------
+
+def summarize_operation(name: str, latencies: List[float], errors: Counter, empty: int,
+                        duration: float) -> Dict[str, Any]:
+    ordered = sorted(latencies)
+    return {
+        "operation": name,
+        "ops": len(ordered),
+        "ops_per_sec": round(len(ordered) / duration, 2) if duration else None,
+        "p50_ms": round(percentile(ordered, 50) * 1000, 3),
+        "p95_ms": round(percentile(ordered, 95) * 1000, 3),
+        "p99_ms": round(percentile(ordered, 99) * 1000, 3),
+        "max_ms": round(ordered[-1] * 1000, 3) if ordered else None,
+        "empty": empty,
+        "errors": dict(errors),
+    }
+
+
+def run_load(args: argparse.Namespace) -> Dict[str, Any]:
+    conn_kwargs = dict(host=args.host, port=args.port, dbname=args.dbname, user=args.user, password=args.password)
+    admin = psycopg2.connect(options=f"-c search_path={BENCH_SCHEMA},public", **conn_kwargs)
+    try:
+        if not args.reuse_table:
+            print(f"[준비] bench.books를 {args.size:,}행으로 채우는 중...", file=sys.stderr)
+            prepare_table(admin, with_indexes=True, ddl=LOADGEN_DDL)
+            seed(admin, args.size, random.Random(args.seed))
+
+        config = {
+            "conn_kwargs": conn_kwargs,
+            "mix": parse_mix(args.mix),
+            "modify_style": args.modify_style,
+            "workers": args.workers,
+            "rate": args.rate,
+            "duration": args.duration,
+            "ramp_up": args.ramp_up,
+            "seed": args.seed,
+            "distinct_titles": max(1, args.size // 4),
+            "lock_timeout_ms": args.lock_timeout,
+            "start_at": time.time() + 1.0,  # 모든 작업자가 연결을 마칠 시간
+        }
+        sampler = LockSampler(psycopg2.connect(**conn_kwargs))
+        executor_class = ProcessPoolExecutor if args.processes else ThreadPoolExecutor
+        print(f"[실행] 작업자 {args.workers}개 ({'프로세스' if args.processes else '스레드'}), "
+              f"목표 {args.rate or '최대'} ops/s, ramp-up {args.ramp_up}s + 측정 {args.duration}s", file=sys.stderr)
+        try:
+            with executor_class(max_workers=args.workers) as executor:
+                futures = [executor.submit(run_worker, config, i) for i in range(args.workers)]
+                measure_from = config["start_at"] + args.ramp_up
+                while True:
+                    done, pending = wait(futures, timeout=args.sample_interval)
+                    if not pending:
+                        break
+                    if time.time() >= measure_from:
+                        sampler.sample()
+                results = [f.result() for f in futures]
+            locks = sampler.summary()
+        finally:
+            sampler.conn.close()
+
+        updated: Counter = Counter()
+        deleted: List[str] = []
+        for result in results:
+            updated.update(result["updated"])
+            deleted.extend(result["deleted"])
+        lost, checked = count_lost_updates(admin, updated, deleted)
+        admin.commit()
+        with admin.cursor() as cur:
+            cur.execute("SHOW server_version")
+            server_version = cur.fetchone()[0]
+        admin.commit()
+    finally:
+        admin.close()
+
+    operations = []
+    total_ops = 0
+    all_errors: Counter = Counter()
+    for name in config["mix"]:
+        latencies: List[float] = []
+        errors: Counter = Counter()
+        empty = 0
+        for result in results:
+            stat = result["stats"][name]
+            latencies.extend(stat["latencies"])
+            errors.update(stat["errors"])
+            empty += stat["empty"]
+        operations.append(summarize_operation(name, latencies, errors, empty, args.duration))
+        total_ops += len(latencies)
+        all_errors.update(errors)
+
+    return {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "server_version": server_version,
+            "args": {k: v for k, v in vars(args).items() if k != "password"},
+        },
+        "summary": {
+            "ops": total_ops,
+            "ops_per_sec": round(total_ops / args.duration, 2),
+            "target_ops_per_sec": args.rate or None,
+            "late_schedules": sum(r["late"] for r in results),
+            "errors": dict(all_errors),
+            "deadlocks_client": all_errors.get("40P01", 0),
+            "lock_timeouts": all_errors.get("55P03", 0),
+            "lost_updates": lost,
+            "lost_update_rows_checked": checked,
+        },
+        "locks": locks,
+        "operations": operations,
+    }
+
+
+def parse_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="books DML 혼합 부하 생성 / 동시성 스트레스 (로컬 PostgreSQL)")
+    parser.add_argument("--host", default=os.environ.get("PGHOST", "localhost"))
+    parser.add_argument("--port", default=os.environ.get("PGPORT", "5432"))
+    parser.add_argument("--dbname", default=os.environ.get("PGDATABASE", "main_db"))
+    parser.add_argument("--user", default=os.environ.get("PGUSER", "admin"))
+    parser.add_argument("--password", default=os.environ.get("PGPASSWORD", "admin123"))
+    parser.add_argument("--workers", type=int, default=8, help="동시 작업자 수 (작업자마다 연결 1개)")
+    parser.add_argument("--processes", action="store_true", help="스레드 대신 프로세스로 작업자 실행")
+    parser.add_argument("--rate", type=float, default=0, help="전체 목표 처리량(ops/s), 0이면 제한 없음")
+    parser.add_argument("--duration", type=float, default=30.0, help="측정 시간(초)")
+    parser.add_argument("--ramp-up", type=float, default=5.0, help="작업자를 차례로 투입하는 시간(초, 측정 제외)")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help=f"작업 비율 (기본: {DEFAULT_MIX})")
+    parser.add_argument("--modify-style", choices=["two_step", "cte"], default="two_step",
+                        help="순번 기반 수정/삭제 방식 (two_step: SELECT OFFSET 후 id로 수정, cte: 한 문장)")
+    parser.add_argument("--lock-timeout", type=int, default=0, help="작업자 세션의 lock_timeout(ms), 0이면 무제한")
+    parser.add_argument("--size", type=int, default=10_000, help="시작 시 bench.books 행 수")
+    parser.add_argument("--reuse-table", action="store_true", help="bench.books를 다시 만들지 않고 그대로 사용")
+    parser.add_argument("--sample-interval", type=float, default=0.5, help="락 상태 표본 간격(초)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="결과 JSON 파일 경로")
+    args = parser.parse_args(argv)
+    if args.workers < 1 or args.duration <= 0:
+        parser.error("--workers는 1 이상, --duration은 0보다 커야 합니다.")
+    try:
+        parse_mix(args.mix)
+    except ValueError as e:
+        parser.error(str(e))
+    return args
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    args = parse_args(argv)
+    try:
+        report = run_load(args)
+    except psycopg2.Error as e:
+        print(f"부하 생성 오류: {e}", file=sys.stderr)
+        return 1
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+    print(f"{'operation':<16} {'ops':>8} {'ops/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} "
+          f"{'max ms':>9} {'empty':>7} errors")
+    for r in report["operations"]:
+        errors = ", ".join(f"{code}={count}" for code, count in r["errors"].items())
+        print(f"{r['operation']:<16} {r['ops']:>8,} {r['ops_per_sec'] or 0:>9,.1f} {r['p50_ms']:>9.3f} "
+              f"{r['p95_ms']:>9.3f} {r['p99_ms']:>9.3f} {r['max_ms'] or 0:>9.3f} {r['empty']:>7,} {errors}")
+    summary, locks = report["summary"], report["locks"]
+    target = f" (목표 {summary['target_ops_per_sec']:,.0f})" if summary["target_ops_per_sec"] else ""
+    print(f"=> 처리량 {summary['ops_per_sec']:,.1f} ops/s{target}, 일정 지연 {summary['late_schedules']:,}건")
+    print(f"=> 락 대기: 최대 {locks['max_lock_waiting']}세션, 평균 {locks['mean_lock_waiting']}세션, "
+          f"대기 표본 {locks['pct_samples_with_lock_wait']}%, 최장 {locks['max_lock_wait_seconds']}s "
+          f"{locks['waiting_lock_modes'] or ''}")
+    print(f"=> deadlock: 서버 {locks['deadlocks']}건 / 작업자 {summary['deadlocks_client']}건, "
+          f"lock_timeout {summary['lock_timeouts']}건, 잃어버린 갱신 {summary['lost_updates']:,}건")
+    if args.output:
+        print(f"=> 결과가 {args.output}에 저장되었습니다.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
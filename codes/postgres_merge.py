@@ -0,0 +1,217 @@
+from itertools import chain, islice
+from typing import Any, Dict, Iterable, Optional, Sequence, Tuple
+
+from psycopg2 import sql
+
+from postgres_bulk import DEFAULT_BATCH_SIZE, RowStream
+
+# ----------------------------------------------------------------------
+# 대량 병합 / Upsert (Idempotent Bulk Merge)
+# ----------------------------------------------------------------------
+# 갱신된 가격표를 bulk_insert()로 다시 적재하면 같은 제목의 행이 계속 늘어납니다.
+# bulk_merge()는 자연 키(예: title)를 기준으로
+#   1) 입력 행을 COPY로 임시 스테이징 테이블에 적재하고
+#   2) 키가 같은 입력 행은 마지막 값만 남긴 뒤 (DISTINCT ON)
+#   3) 집합 연산 한 문장으로 없는 행은 INSERT, 값이 바뀐 행만 UPDATE 합니다.
+# 값이 같은 행은 다시 쓰지 않으므로(IS DISTINCT FROM) 같은 파일을 여러 번 적용해도 결과와 WAL이 늘지 않습니다.
+#
+# 적용 방식 (method)
+#   on_conflict: INSERT ... ON CONFLICT (key) DO UPDATE. 키에 UNIQUE 인덱스가 필요하며, 동시에 다른 세션이
+#                같은 키를 삽입해도 안전합니다. RETURNING (xmax = 0)으로 삽입/갱신 수를 한 번에 셉니다.
+#   merge:       MERGE (PostgreSQL 15+). UNIQUE 인덱스가 없어도 되지만, 동시에 같은 키를 삽입하는 세션이
+#                있으면 중복 행이 생길 수 있으므로 야간 동기화처럼 단독으로 쓰는 작업에 사용합니다.
+#   auto:        키에 UNIQUE 인덱스가 있으면 on_conflict, 없으면 merge (PG15 미만이면 오류)
+#
+# 반환 값: {"method", "staged", "duplicates", "inserted", "updated", "unchanged"}
+#   staged는 입력 행 수, duplicates는 같은 배치에서 키가 겹쳐 버려진 행 수입니다.
+#   키가 UNIQUE가 아닌 테이블에서 한 입력 행이 기존 행 여러 개와 일치하면 updated는 갱신된 기존 행 수입니다.
+
+MERGE_METHODS = ("auto", "on_conflict", "merge")
+
+
+def _stage_name(table: str) -> str:
+    return f"_merge_stage_{table}"
+
+
+def _create_stage(cur, table: str, columns: Sequence[str]) -> sql.Identifier:
+    """
+    대상 테이블의 컬럼 타입을 그대로 쓰는 임시 스테이징 테이블을 만듭니다. (병합 호출마다 새로 생성)
+    _ord는 입력 순서이며, 같은 키가 여러 번 들어오면 나중 행을 적용하는 데 사용합니다.
+    """
+    stage = sql.Identifier(_stage_name(table))
+    cur.execute(sql.SQL("DROP TABLE IF EXISTS pg_temp.{}").format(stage))  # 이전 호출과 컬럼이 다를 수 있음
+    cur.execute(sql.SQL("CREATE TEMP TABLE {} AS SELECT {} FROM {} WITH NO DATA").format(
+        stage, sql.SQL(", ").join(map(sql.Identifier, columns)), sql.Identifier(table)
+    ))
+    cur.execute(sql.SQL("ALTER TABLE {} ADD COLUMN _ord BIGSERIAL").format(stage))
+    return stage
+
+
+def has_unique_key(cur, table: str, key: Sequence[str]) -> bool:
+    """table에 key 컬럼 집합과 정확히 같은 (부분/표현식이 아닌) UNIQUE 인덱스가 있는지 확인합니다."""
+    cur.execute(
+        "SELECT EXISTS (SELECT 1 FROM pg_index i "
+        "WHERE i.indrelid = %s::regclass AND i.indisunique AND i.indpred IS NULL AND i.indexprs IS NULL "
+        "AND (SELECT array_agg(a.attname::text ORDER BY a.attname) FROM pg_attribute a "
+        "     WHERE a.attrelid = i.indrelid AND a.attnum = ANY((i.indkey::int2[])[0:i.indnkeyatts - 1])) = %s)",
+        (table, sorted(key)),
+    )
+    return cur.fetchone()[0]
+
+
+def resolve_method(cur, table: str, key: Sequence[str], method: str = "auto") -> str:
+    """method가 auto이면 테이블의 UNIQUE 인덱스와 서버 버전을 보고 실제 적용 방식을 고릅니다."""
+    if method not in MERGE_METHODS:
+        raise ValueError(f"지원하지 않는 병합 방식입니다: {method} ({', '.join(MERGE_METHODS)})")
+    if method in ("auto", "on_conflict") and has_unique_key(cur, table, key):
+        return "on_conflict"
+    if method == "on_conflict":
+        raise ValueError(f"ON CONFLICT에는 {table} ({', '.join(key)})에 UNIQUE 인덱스가 필요합니다.")
+    if cur.connection.server_version < 150000:
+        raise ValueError(f"MERGE는 PostgreSQL 15 이상이 필요합니다. "
+                         f"{table} ({', '.join(key)})에 UNIQUE 인덱스를 만들면 ON CONFLICT로 병합합니다.")
+    return "merge"
+
+
+def _source(stage: sql.Identifier, columns: Sequence[str], key: Sequence[str]) -> sql.Composable:
+    """키별로 마지막 입력 행만 남긴 스테이징 행 (병합 원본)"""
+    return sql.SQL("SELECT DISTINCT ON ({key}) {cols} FROM {stage} ORDER BY {key}, _ord DESC").format(
+        key=sql.SQL(", ").join(map(sql.Identifier, key)),
+        cols=sql.SQL(", ").join(map(sql.Identifier, columns)),
+        stage=stage,
+    )
+
+
+def _changed(columns: Sequence[str], target: str, source: str) -> sql.Composable:
+    """(t.a, t.b) IS DISTINCT FROM (s.a, s.b) — 값이 실제로 바뀐 행만 갱신하기 위한 조건"""
+    def row(alias: str) -> sql.Composable:
+        return sql.SQL("ROW({})").format(
+            sql.SQL(", ").join(sql.SQL("{}.{}").format(sql.Identifier(alias), sql.Identifier(c)) for c in columns)
+        )
+    return sql.SQL("{} IS DISTINCT FROM {}").format(row(target), row(source))
+
+
+def _apply_on_conflict(cur, table: str, stage: sql.Identifier, columns: Sequence[str], key: Sequence[str],
+                       updates: Sequence[str]) -> Tuple[int, int, int]:
+    """INSERT ... ON CONFLICT 한 문장으로 병합하고 (원본 행 수, 삽입 수, 갱신 수)를 반환합니다."""
+    column_list = sql.SQL(", ").join(map(sql.Identifier, columns))
+    if updates:
+        action = sql.SQL("DO UPDATE SET {sets} WHERE {changed}").format(
+            sets=sql.SQL(", ").join(sql.SQL("{0} = EXCLUDED.{0}").format(sql.Identifier(c)) for c in updates),
+            changed=_changed(updates, table, "excluded"),
+        )
+    else:
+        action = sql.SQL("DO NOTHING")
+    # xmax = 0 이면 새로 삽입된 행, 아니면 ON CONFLICT로 갱신된 행입니다.
+    cur.execute(sql.SQL(
+        "WITH src AS MATERIALIZED ({source}), "
+        "upserted AS (INSERT INTO {table} ({cols}) SELECT {cols} FROM src "
+        "ON CONFLICT ({key}) {action} RETURNING (xmax = 0) AS inserted) "
+        "SELECT (SELECT count(*) FROM src), count(*) FILTER (WHERE inserted), count(*) FILTER (WHERE NOT inserted) "
+        "FROM upserted"
+    ).format(
+        source=_source(stage, columns, key),
+        table=sql.Identifier(table),
+        cols=column_list,
+        key=sql.SQL(", ").join(map(sql.Identifier, key)),
+        action=action,
+    ))
+    return cur.fetchone()
+
+
+def _apply_merge(cur, table: str, stage: sql.Identifier, columns: Sequence[str], key: Sequence[str],
+                 updates: Sequence[str]) -> Tuple[int, int, int]:
+    """MERGE 한 문장으로 병합하고 (원본 행 수, 삽입 수, 갱신 수)를 반환합니다."""
+    match = sql.SQL(" AND ").join(
+        sql.SQL("t.{0} = s.{0}").format(sql.Identifier(c)) for c in key
+    )
+    # MERGE는 PG17 미만에서 RETURNING이 없으므로 삽입될 행 수를 같은 트랜잭션에서 먼저 셉니다.
+    cur.execute(sql.SQL(
+        "SELECT count(*), count(*) FILTER (WHERE NOT EXISTS (SELECT 1 FROM {table} AS t WHERE {match})) "
+        "FROM ({source}) AS s"
+    ).format(table=sql.Identifier(table), match=match, source=_source(stage, columns, key)))
+    total, inserted = cur.fetchone()
+
+    matched = sql.SQL("")
+    if updates:
+        matched = sql.SQL(" WHEN MATCHED AND {changed} THEN UPDATE SET {sets}").format(
+            changed=_changed(updates, "t", "s"),
+            sets=sql.SQL(", ").join(sql.SQL("{0} = s.{0}").format(sql.Identifier(c)) for c in updates),
+        )
+    cur.execute(sql.SQL(
+        "MERGE INTO {table} AS t USING ({source}) AS s ON {match}{matched} "
+        "WHEN NOT MATCHED THEN INSERT ({cols}) VALUES ({values})"
+    ).format(
+        table=sql.Identifier(table),
+        source=_source(stage, columns, key),
+        match=match,
+        matched=matched,
+        cols=sql.SQL(", ").join(map(sql.Identifier, columns)),
+        values=sql.SQL(", ").join(sql.SQL("s.{}").format(sql.Identifier(c)) for c in columns),
+    ))
+    return total, inserted, cur.rowcount - inserted
+
+
+def bulk_merge(
+    conn,
+    rows: Iterable[Sequence[Any]],
+    table: str = "books",
+    columns: Sequence[str] = ("title", "price"),
+    key: Sequence[str] = ("title",),
+    method: str = "auto",
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> Dict[str, Any]:
+    """
+    rows를 key 기준으로 table에 병합(없으면 INSERT, 값이 다르면 UPDATE)하고 처리 건수를 반환합니다.
+
+    - batch_size 행마다 스테이징 → 병합 → 커밋합니다. 오류가 나면 해당 배치만 롤백되고 예외가 전달됩니다.
+      autocommit 연결이면 문장마다 커밋되어 배치를 롤백할 수 없으므로, 병합하는 동안만 autocommit을 끕니다.
+    - 같은 배치에서 키가 같은 행은 나중 행이 적용됩니다.
+    - key 외의 columns가 갱신 대상입니다. (key만 주면 없는 행만 삽입)
+    """
+    if batch_size < 1:
+        raise ValueError("batch_size는 1 이상이어야 합니다.")
+    if not key or any(k not in columns for k in key):
+        raise ValueError("key 컬럼은 columns에 포함되어야 합니다.")
+    updates = [c for c in columns if c not in key]
+
+    stats: Dict[str, Any] = {"method": None, "staged": 0, "duplicates": 0,
+                             "inserted": 0, "updated": 0, "unchanged": 0}
+    autocommit = conn.autocommit
+    if autocommit:
+        conn.autocommit = False
+    try:
+        it = iter(rows)
+        stage: Optional[sql.Identifier] = None
+        while True:
+            first = next(it, None)
+            if first is None:
+                break
+            stream = RowStream(chain([first], islice(it, batch_size - 1)))
+            try:
+                with conn.cursor() as cur:
+                    if stage is None:
+                        stats["method"] = resolve_method(cur, table, key, method)
+                        stage = _create_stage(cur, table, columns)
+                    else:
+                        cur.execute(sql.SQL("TRUNCATE {} RESTART IDENTITY").format(stage))
+                    cur.copy_expert(sql.SQL("COPY {} ({}) FROM STDIN").format(
+                        stage, sql.SQL(", ").join(map(sql.Identifier, columns))
+                    ), stream)
+                    cur.execute(sql.SQL("ANALYZE {}").format(stage))  # 임시 테이블은 autovacuum 통계가 없음
+                    apply = _apply_on_conflict if stats["method"] == "on_conflict" else _apply_merge
+                    distinct, inserted, updated = apply(cur, table, stage, columns, key, updates)
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+
+            stats["staged"] += stream.count
+            stats["duplicates"] += stream.count - distinct
+            stats["inserted"] += inserted
+            stats["updated"] += updated
+            stats["unchanged"] += max(distinct - inserted - updated, 0)
+    finally:
+        if autocommit:
+            conn.autocommit = True
+    return stats
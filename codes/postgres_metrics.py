@@ -0,0 +1,377 @@
+import json
+import re
+import sys
+import threading
+import time
+from collections import deque
+from functools import lru_cache
+from typing import Any, Callable, Deque, Dict, List, Optional, Sequence, Tuple
+
+import psycopg2
+import psycopg2.extensions
+import psycopg2.sql
+
+# ----------------------------------------------------------------------
+# 쿼리 계측 / 느린 쿼리 로그 (Query Instrumentation)
+# ----------------------------------------------------------------------
+# 커서 실행(execute / executemany / copy_expert)을 감싸 문장별 실행 시간과 행 수를,
+# 연결 풀에서는 연결 대여 대기 시간을 기록합니다.
+# - 쿼리 형태(shape): 리터럴과 VALUES 목록을 '?'로 바꾼 정규화 SQL. 형태별로 히스토그램을 집계합니다.
+# - 느린 쿼리: slow_threshold(초)를 넘으면 로그를 남기고, explain_slow=True이면
+#   읽기 전용 SELECT에 대해 EXPLAIN (ANALYZE, BUFFERS) 결과를 함께 저장합니다.
+# - 내보내기: to_prometheus()(텍스트 노출 형식), to_json()/snapshot()
+# - 준비된 문장: "EXECUTE repo_<hash> (...)"처럼 원래 문장이 드러나지 않는 실행은 호출자가 실행 직전
+#   cur.recorded_as = (원래 쿼리, 파라미터)를 지정하면 그 문장으로 형태를 기록하고 EXPLAIN도 그 문장으로 실행합니다.
+#   (postgres_repository.PreparedStatementCache가 사용)
+#
+# 사용 예:
+#   metrics = QueryMetrics(slow_threshold=0.2, explain_slow=True)
+#   pool = ConnectionPool(metrics=metrics, host=..., ...)   # 커서/대여 시간이 자동 기록됨
+
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+DEFAULT_SLOW_THRESHOLD = 0.5   # 느린 쿼리 기준(초)
+SLOW_LOG_SIZE = 100            # 보관할 최근 느린 쿼리 수
+MAX_LOGGED_QUERY_LENGTH = 2000
+
+_PLACEHOLDER = re.compile(r"%\((\w+)\)s|%s")
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"(?<![\w.$])-?\d+(?:\.\d+)?(?:[eE][-+]?\d+)?\b")
+_CAST = re.compile(r"CAST\(\s*\?\s+AS\s+[^)]+\)", re.IGNORECASE)
+_TUPLE = re.compile(r"\(\s*\?(?:\s*(?:::[\w ]+)?\s*,\s*\?)*(?:::[\w ]+)?\s*\)")
+_TUPLE_LIST = re.compile(r"\(\.\.\.\)(?:\s*,\s*\(\.\.\.\))+")
+_READ_ONLY = re.compile(r"^\s*SELECT\b", re.IGNORECASE)
+_LOCKING = re.compile(r"\bFOR\s+(?:NO\s+KEY\s+)?(?:UPDATE|SHARE)\b|\bINTO\b", re.IGNORECASE)
+
+
+def query_shape(query: str) -> str:
+    """
+    쿼리 문자열을 집계용 형태로 정규화합니다.
+    자리표시자/리터럴은 '?'로, 값 목록 "(?, ?), (?, ?)"은 "(...)"로 바꿉니다.
+    """
+    shape = _PLACEHOLDER.sub("?", query)
+    shape = _STRING.sub("?", shape)
+    shape = _NUMBER.sub("?", shape)
+    shape = _CAST.sub("?", shape)
+    shape = _TUPLE.sub("(...)", shape)
+    shape = _TUPLE_LIST.sub("(...)", shape)
+    return " ".join(shape.split()).rstrip(";").rstrip()
+
+
+# 자리표시자가 있는 쿼리 템플릿은 종류가 적으므로 정규화 결과를 캐시합니다.
+_cached_query_shape = lru_cache(maxsize=2048)(query_shape)
+
+
+class _Histogram:
+    """누적 버킷 히스토그램 (Prometheus histogram과 같은 의미)"""
+
+    __slots__ = ("buckets", "counts", "count", "sum", "max")
+
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * len(self.buckets)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float) -> None:
+        self.count += 1
+        self.sum += value
+        if value > self.max:
+            self.max = value
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+
+    def cumulative(self) -> List[Tuple[float, int]]:
+        total = 0
+        result = []
+        for bound, n in zip(self.buckets, self.counts):
+            total += n
+            result.append((bound, total))
+        return result
+
+    def quantile(self, q: float) -> Optional[float]:
+        """버킷 상한으로 근사한 분위수 (마지막 버킷을 넘으면 관측 최댓값)"""
+        if not self.count:
+            return None
+        target = q * self.count
+        for bound, total in self.cumulative():
+            if total >= target:
+                return min(bound, self.max)
+        return self.max
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "sum_seconds": round(self.sum, 6),
+            "max_seconds": round(self.max, 6),
+            "p50_seconds": self.quantile(0.5),
+            "p99_seconds": self.quantile(0.99),
+            "buckets": {str(bound): total for bound, total in self.cumulative()},
+        }
+
+
+class _ShapeStats:
+    __slots__ = ("latency", "rows", "errors")
+
+    def __init__(self, buckets: Sequence[float]):
+        self.latency = _Histogram(buckets)
+        self.rows = 0
+        self.errors = 0
+
+
+class QueryMetrics:
+    """
+    쿼리 형태별 실행 시간/행 수와 연결 대여 시간을 집계하는 스레드 안전 수집기입니다.
+
+    - slow_threshold: 이 시간(초) 이상 걸린 문장을 느린 쿼리로 기록합니다. (None이면 사용 안 함)
+    - explain_slow: 느린 읽기 전용 SELECT를 EXPLAIN (ANALYZE, BUFFERS)로 다시 실행해 계획을 저장합니다.
+      (쿼리를 한 번 더 실행하므로 운영 환경에서는 필요할 때만 켭니다)
+    - log: 느린 쿼리 로그를 받을 함수. 기본값은 표준 에러 출력입니다.
+    """
+
+    def __init__(self, slow_threshold: Optional[float] = DEFAULT_SLOW_THRESHOLD, explain_slow: bool = False,
+                 buckets: Sequence[float] = DEFAULT_BUCKETS, slow_log_size: int = SLOW_LOG_SIZE,
+                 log: Optional[Callable[[str], None]] = None):
+        self.slow_threshold = slow_threshold
+        self.explain_slow = explain_slow
+        self.buckets = tuple(sorted(buckets))
+        self.log = log or (lambda message: print(message, file=sys.stderr))
+        self._shapes: Dict[str, _ShapeStats] = {}
+        self._acquire = _Histogram(self.buckets)
+        self._acquire_timeouts = 0
+        self.slow_queries: Deque[Dict[str, Any]] = deque(maxlen=slow_log_size)
+        self._lock = threading.Lock()
+        self.cursor_factory = _make_cursor_class(self)
+
+    # ------------------------------------------------------------------
+    # 기록
+    # ------------------------------------------------------------------
+
+    def observe(self, shape: str, seconds: float, rows: Optional[int] = None, error: bool = False) -> None:
+        """한 문장의 실행 결과를 기록합니다."""
+        with self._lock:
+            stats = self._shapes.get(shape)
+            if stats is None:
+                stats = self._shapes[shape] = _ShapeStats(self.buckets)
+            stats.latency.observe(seconds)
+            if rows is not None and rows > 0:
+                stats.rows += rows
+            if error:
+                stats.errors += 1
+
+    def observe_acquire(self, seconds: float, timed_out: bool = False) -> None:
+        """연결 풀에서 연결을 빌리는 데 걸린 시간을 기록합니다."""
+        with self._lock:
+            if timed_out:
+                self._acquire_timeouts += 1
+            else:
+                self._acquire.observe(seconds)
+
+    def is_slow(self, seconds: float) -> bool:
+        return self.slow_threshold is not None and seconds >= self.slow_threshold
+
+    def record_slow(self, shape: str, query: str, seconds: float, rows: Optional[int],
+                    plan: Optional[str] = None) -> None:
+        """느린 쿼리를 로그로 남기고 최근 목록에 보관합니다."""
+        if len(query) > MAX_LOGGED_QUERY_LENGTH:
+            query = query[:MAX_LOGGED_QUERY_LENGTH] + " ..."
+        entry = {
+            "timestamp": time.time(),
+            "seconds": round(seconds, 6),
+            "rows": rows,
+            "shape": shape,
+            "query": query,
+            "plan": plan,
+        }
+        with self._lock:
+            self.slow_queries.append(entry)
+        message = f"[느린 쿼리] {seconds * 1000:.1f}ms rows={rows} {shape}"
+        if plan:
+            message += "\n" + plan
+        self.log(message)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._shapes.clear()
+            self._acquire = _Histogram(self.buckets)
+            self._acquire_timeouts = 0
+            self.slow_queries.clear()
+
+    # ------------------------------------------------------------------
+    # 내보내기
+    # ------------------------------------------------------------------
+
+    def snapshot(self) -> Dict[str, Any]:
+        """현재 집계를 dict로 반환합니다. (쿼리 형태는 누적 실행 시간이 큰 순)"""
+        with self._lock:
+            queries = [
+                {"shape": shape, "rows": s.rows, "errors": s.errors, **s.latency.as_dict()}
+                for shape, s in self._shapes.items()
+            ]
+            acquire = {"timeouts": self._acquire_timeouts, **self._acquire.as_dict()}
+            slow = list(self.slow_queries)
+        queries.sort(key=lambda q: q["sum_seconds"], reverse=True)
+        return {"queries": queries, "pool_acquire": acquire, "slow_queries": slow}
+
+    def to_json(self, indent: Optional[int] = 2) -> str:
+        return json.dumps(self.snapshot(), ensure_ascii=False, indent=indent)
+
+    def to_prometheus(self, prefix: str = "pg") -> str:
+        """Prometheus 텍스트 노출 형식(0.0.4)으로 카운터와 히스토그램을 내보냅니다."""
+        lines: List[str] = []
+
+        def histogram(name: str, help_text: str, items: List[Tuple[str, _Histogram]]) -> None:
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} histogram")
+            for labels, h in items:
+                sep = "," if labels else ""
+                for bound, total in h.cumulative():
+                    lines.append(f'{name}_bucket{{{labels}{sep}le="{bound}"}} {total}')
+                lines.append(f'{name}_bucket{{{labels}{sep}le="+Inf"}} {h.count}')
+                suffix = f"{{{labels}}}" if labels else ""
+                lines.append(f"{name}_sum{suffix} {h.sum}")
+                lines.append(f"{name}_count{suffix} {h.count}")
+
+        with self._lock:
+            shapes = sorted(self._shapes.items())
+            labelled = [(f'query="{_escape_label(shape)}"', s) for shape, s in shapes]
+            histogram(f"{prefix}_query_duration_seconds", "쿼리 형태별 실행 시간(초)",
+                      [(labels, s.latency) for labels, s in labelled])
+
+            lines.append(f"# HELP {prefix}_query_rows_total 쿼리 형태별 반환/영향 행 수")
+            lines.append(f"# TYPE {prefix}_query_rows_total counter")
+            lines.extend(f"{prefix}_query_rows_total{{{labels}}} {s.rows}" for labels, s in labelled)
+
+            lines.append(f"# HELP {prefix}_query_errors_total 쿼리 형태별 오류 수")
+            lines.append(f"# TYPE {prefix}_query_errors_total counter")
+            lines.extend(f"{prefix}_query_errors_total{{{labels}}} {s.errors}" for labels, s in labelled)
+
+            histogram(f"{prefix}_pool_acquire_seconds", "연결 풀 대여 대기 시간(초)", [("", self._acquire)])
+            lines.append(f"# HELP {prefix}_pool_acquire_timeouts_total 연결 풀 대여 시간 초과 수")
+            lines.append(f"# TYPE {prefix}_pool_acquire_timeouts_total counter")
+            lines.append(f"{prefix}_pool_acquire_timeouts_total {self._acquire_timeouts}")
+
+            lines.append(f"# HELP {prefix}_slow_queries_total 기록된 느린 쿼리 수 (최근 보관분)")
+            lines.append(f"# TYPE {prefix}_slow_queries_total gauge")
+            lines.append(f"{prefix}_slow_queries_total {len(self.slow_queries)}")
+        return "\n".join(lines) + "\n"
+
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+# ----------------------------------------------------------------------
+# 계측 커서
+# ----------------------------------------------------------------------
+
+def _decode(query: Any, conn) -> str:
+    if isinstance(query, bytes):
+        return query.decode(psycopg2.extensions.encodings.get(conn.encoding, "utf-8"), "replace")
+    return str(query)
+
+
+def statement_shape(query: Any, cur) -> str:
+    """
+    cur.execute()에 넘긴 쿼리의 형태를 구합니다.
+    문자열 템플릿은 캐시하고, execute_values처럼 값이 이미 채워진 bytes 쿼리는 매번 정규화합니다.
+    """
+    if isinstance(query, psycopg2.sql.Composable):
+        query = query.as_string(cur)
+    if isinstance(query, bytes):
+        return query_shape(_decode(query, cur.connection))
+    return _cached_query_shape(str(query))
+
+
+def explain_analyze(conn, query: str) -> Optional[str]:
+    """
+    query를 EXPLAIN (ANALYZE, BUFFERS)로 실행해 계획 텍스트를 반환합니다. (실패 시 None)
+    트랜잭션 안이면 SAVEPOINT로 감싸 실패해도 호출자의 트랜잭션을 깨뜨리지 않습니다.
+    """
+    status = conn.info.transaction_status
+    if status not in (psycopg2.extensions.TRANSACTION_STATUS_IDLE, psycopg2.extensions.TRANSACTION_STATUS_INTRANS):
+        return None
+    in_transaction = status == psycopg2.extensions.TRANSACTION_STATUS_INTRANS
+    cur = psycopg2.extensions.cursor(conn)  # 계측되지 않는 기본 커서
+    try:
+        if in_transaction:
+            cur.execute("SAVEPOINT _metrics_explain")
+        try:
+            cur.execute("EXPLAIN (ANALYZE, BUFFERS) " + query)
+            plan = "\n".join(row[0] for row in cur.fetchall())
+        except psycopg2.Error as e:
+            print(f"EXPLAIN 수집 오류: {e}", file=sys.stderr)
+            plan = None
+            if in_transaction:
+                cur.execute("ROLLBACK TO SAVEPOINT _metrics_explain")
+        if in_transaction:
+            cur.execute("RELEASE SAVEPOINT _metrics_explain")
+        elif not conn.autocommit:
+            conn.rollback()  # EXPLAIN이 새로 연 트랜잭션만 정리합니다.
+        return plan
+    except psycopg2.Error as e:
+        print(f"EXPLAIN 수집 오류: {e}", file=sys.stderr)
+        return None
+    finally:
+        cur.close()
+
+
+def _make_cursor_class(metrics: QueryMetrics):
+    """metrics에 기록하는 cursor_factory 클래스를 만듭니다. (psycopg2.connect(cursor_factory=...))"""
+
+    class InstrumentedCursor(psycopg2.extensions.cursor):
+        recorded_as: Optional[Tuple[Any, Optional[Sequence[Any]]]] = None  # 다음 실행을 대신 기록할 (쿼리, 파라미터)
+
+        def _record(self, query: Any, start: float, error: bool) -> None:
+            seconds = time.perf_counter() - start
+            source, self.recorded_as = self.recorded_as, None
+            if source is not None:
+                query = source[0]
+            shape = statement_shape(query, self)
+            # 이름 있는(서버 측) 커서는 execute 시점에 행 수를 알 수 없습니다.
+            rows = None if self.name or self.rowcount < 0 else self.rowcount
+            metrics.observe(shape, seconds, rows, error)
+            if error or not metrics.is_slow(seconds):
+                return
+            if source is not None:
+                sent = _decode(self.mogrify(*source), self.connection)
+            else:
+                sent = _decode(self.query, self.connection) if self.query else shape
+            plan = None
+            if metrics.explain_slow and not self.name and _READ_ONLY.match(sent) and not _LOCKING.search(sent):
+                plan = explain_analyze(self.connection, sent)
+            metrics.record_slow(shape, sent, seconds, rows, plan)
+
+        def execute(self, query, vars=None):
+            start = time.perf_counter()
+            try:
+                result = super().execute(query, vars)
+            except BaseException:
+                self._record(query, start, True)
+                raise
+            self._record(query, start, False)
+            return result
+
+        def executemany(self, query, vars_list):
+            start = time.perf_counter()
+            try:
+                result = super().executemany(query, vars_list)
+            except BaseException:
+                self._record(query, start, True)
+                raise
+            self._record(query, start, False)
+            return result
+
+        def copy_expert(self, sql, file, size=8192):
+            start = time.perf_counter()
+            try:
+                result = super().copy_expert(sql, file, size)
+            except BaseException:
+                self._record(sql, start, True)
+                raise
+            self._record(sql, start, False)
+            return result
+
+    return InstrumentedCursor
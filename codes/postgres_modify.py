@@ -0,0 +1,220 @@
+from collections import Counter
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from psycopg2 import sql
+from psycopg2.extras import execute_values
+
+# ----------------------------------------------------------------------
+# 순번 기반 UPDATE / DELETE (Positional Modify)
+# ----------------------------------------------------------------------
+# "정렬 순서에서 n번째 행"을 SELECT로 찾은 뒤 다시 UPDATE/DELETE를 보내면
+# 서버 왕복이 두 번이고, 두 문장 사이에 다른 세션이 행을 바꿀 수 있습니다.
+# 여기서는 대상 행 선택(FOR UPDATE 잠금)과 수정을 CTE 하나로 묶어
+# 한 문장으로 처리하고, RETURNING으로 수정된 행을 바로 돌려받습니다.
+#
+#   WITH target AS (SELECT id FROM books ORDER BY title, id
+#                   LIMIT 1 OFFSET %s FOR UPDATE [SKIP LOCKED])
+#   UPDATE books AS t SET price = %s FROM target
+#   WHERE t.id = target.id RETURNING t.*
+
+_column_types_cache: Dict[Tuple[str, str, str], str] = {}
+
+
+def _returning(returning: Optional[Sequence[str]]) -> sql.Composable:
+    if returning is None:
+        return sql.SQL("t.*")
+    return sql.SQL(", ").join(sql.SQL("t.{}").format(sql.Identifier(c)) for c in returning)
+
+
+def _order_by(order_by: Sequence[str], descending: bool, alias: Optional[str] = None) -> sql.Composable:
+    direction = sql.SQL("DESC" if descending else "ASC")
+    if alias:
+        return sql.SQL(", ").join(
+            sql.SQL("{}.{} {}").format(sql.Identifier(alias), sql.Identifier(c), direction) for c in order_by
+        )
+    return sql.SQL(", ").join(sql.SQL("{} {}").format(sql.Identifier(c), direction) for c in order_by)
+
+
+def _lock_clause(skip_locked: bool) -> sql.Composable:
+    return sql.SQL(" FOR UPDATE SKIP LOCKED" if skip_locked else " FOR UPDATE")
+
+
+def _target_cte(table: str, key: str, order_by: Sequence[str], descending: bool,
+                skip_locked: bool) -> sql.Composable:
+    """정렬 순서의 n번째 행 key를 잠그며 고르는 CTE입니다. (OFFSET 값은 %s 자리표시자)"""
+    return sql.SQL("WITH target AS (SELECT {key} FROM {table} ORDER BY {order} LIMIT 1 OFFSET %s{lock})").format(
+        key=sql.Identifier(key),
+        table=sql.Identifier(table),
+        order=_order_by(order_by, descending),
+        lock=_lock_clause(skip_locked),
+    )
+
+
+def column_types(cur, table: str, columns: Sequence[str]) -> List[str]:
+    """
+    컬럼의 SQL 타입 이름(예: 'uuid', 'integer')을 조회합니다.
+    VALUES 목록의 값을 대상 컬럼 타입으로 CAST하는 데 사용하며, 연결(DSN)별로 캐시합니다.
+    """
+    dsn = cur.connection.dsn
+    missing = [c for c in columns if (dsn, table, c) not in _column_types_cache]
+    if missing:
+        cur.execute(
+            "SELECT attname, format_type(atttypid, atttypmod) FROM pg_attribute "
+            "WHERE attrelid = %s::regclass AND attname = ANY(%s) AND NOT attisdropped",
+            (table, list(missing)),
+        )
+        for name, type_name in cur.fetchall():
+            _column_types_cache[(dsn, table, name)] = type_name
+    try:
+        return [_column_types_cache[(dsn, table, c)] for c in columns]
+    except KeyError as e:
+        raise ValueError(f"{table} 테이블에 컬럼이 없습니다: {e}") from None
+
+
+def update_nth_query(table: str, order_by: Sequence[str], n: int, values: Dict[str, Any],
+                     key: str = "id", descending: bool = False, skip_locked: bool = False,
+                     returning: Optional[Sequence[str]] = None) -> Tuple[sql.Composed, List[Any]]:
+    """
+    update_nth()가 실행할 (쿼리, 파라미터)를 만듭니다. 비동기 엔진에서도 같은 문장을 사용합니다.
+    values의 값이 sql.Composable이면 파라미터 대신 식으로 사용합니다. (예: sql.SQL("t.revision + 1"))
+    """
+    if not values:
+        raise ValueError("수정할 값이 없습니다.")
+    query = _target_cte(table, key, order_by, descending, skip_locked) + sql.SQL(
+        " UPDATE {table} AS t SET {assignments} FROM target WHERE t.{key} = target.{key} RETURNING {returning}"
+    ).format(
+        table=sql.Identifier(table),
+        assignments=sql.SQL(", ").join(
+            sql.SQL("{} = {}").format(sql.Identifier(c), v if isinstance(v, sql.Composable) else sql.SQL("%s"))
+            for c, v in values.items()
+        ),
+        key=sql.Identifier(key),
+        returning=_returning(returning),
+    )
+    return query, [n, *(v for v in values.values() if not isinstance(v, sql.Composable))]
+
+
+def update_nth(cur, table: str, order_by: Sequence[str], n: int, values: Dict[str, Any],
+               key: str = "id", descending: bool = False, skip_locked: bool = False,
+               returning: Optional[Sequence[str]] = None) -> Optional[Tuple]:
+    """
+    order_by 순서에서 n번째(0부터 시작) 행을 한 문장으로 수정하고, 수정된 행을 반환합니다.
+    대상 행이 없으면 None을 반환합니다.
+
+    - order_by의 마지막 컬럼은 유일해야(예: id) 순서가 안정적입니다.
+    - skip_locked=True이면 다른 트랜잭션이 잠근 행은 건너뛰고 그다음 행을 n번째로 셉니다.
+      (작업 큐처럼 여러 작업자가 서로 다른 행을 가져갈 때 사용)
+    - returning이 None이면 전체 컬럼(t.*)을 반환합니다.
+    - 커밋은 호출자가 합니다.
+    """
+    query, params = update_nth_query(table, order_by, n, values, key, descending, skip_locked, returning)
+    cur.execute(query, params)
+    return cur.fetchone()
+
+
+def delete_nth_query(table: str, order_by: Sequence[str], n: int, key: str = "id",
+                     descending: bool = False, skip_locked: bool = False,
+                     returning: Optional[Sequence[str]] = None) -> Tuple[sql.Composed, List[Any]]:
+    """delete_nth()가 실행할 (쿼리, 파라미터)를 만듭니다."""
+    query = _target_cte(table, key, order_by, descending, skip_locked) + sql.SQL(
+        " DELETE FROM {table} AS t USING target WHERE t.{key} = target.{key} RETURNING {returning}"
+    ).format(
+        table=sql.Identifier(table),
+        key=sql.Identifier(key),
+        returning=_returning(returning),
+    )
+    return query, [n]
+
+
+def delete_nth(cur, table: str, order_by: Sequence[str], n: int, key: str = "id",
+               descending: bool = False, skip_locked: bool = False,
+               returning: Optional[Sequence[str]] = None) -> Optional[Tuple]:
+    """
+    order_by 순서에서 n번째(0부터 시작) 행을 한 문장으로 삭제하고, 삭제된 행을 반환합니다.
+    대상 행이 없으면 None을 반환합니다. 인자 의미는 update_nth()와 같습니다.
+    """
+    query, params = delete_nth_query(table, order_by, n, key, descending, skip_locked, returning)
+    cur.execute(query, params)
+    return cur.fetchone()
+
+
+def update_many(cur, table: str, key: str, columns: Sequence[str], rows: Sequence[Sequence[Any]],
+                returning: Optional[Sequence[str]] = None, page_size: int = 1000) -> List[Tuple]:
+    """
+    여러 행을 key 기준으로 한 번에 수정합니다. rows의 각 항목은 (key 값, columns 값...) 입니다.
+
+        UPDATE books AS t SET price = v.price
+        FROM (VALUES (...), (...)) AS v(id, price) WHERE t.id = v.id
+
+    page_size 행마다 한 문장으로 전송하며, 수정된 행 목록을 반환합니다.
+    """
+    if not rows:
+        return []
+    all_columns = [key, *columns]
+    types = column_types(cur, table, all_columns)
+    template = sql.SQL("({})").format(sql.SQL(", ").join(
+        sql.SQL("CAST(%s AS {})").format(sql.SQL(t)) for t in types
+    ))
+    query = sql.SQL(
+        "UPDATE {table} AS t SET {assignments} FROM (VALUES %s) AS v ({names}) "
+        "WHERE t.{key} = v.{key} RETURNING {returning}"
+    ).format(
+        table=sql.Identifier(table),
+        assignments=sql.SQL(", ").join(
+            sql.SQL("{0} = v.{0}").format(sql.Identifier(c)) for c in columns
+        ),
+        names=sql.SQL(", ").join(map(sql.Identifier, all_columns)),
+        key=sql.Identifier(key),
+        returning=_returning(returning),
+    )
+    return execute_values(cur, query.as_string(cur), rows, template=template.as_string(cur),
+                          page_size=page_size, fetch=True)
+
+
+def update_positions(cur, table: str, order_by: Sequence[str], columns: Sequence[str],
+                     rows: Sequence[Sequence[Any]], key: str = "id", descending: bool = False,
+                     skip_locked: bool = False, returning: Optional[Sequence[str]] = None) -> List[Tuple]:
+    """
+    order_by 순서의 여러 위치를 한 문장으로 수정합니다. rows의 각 항목은 (위치, columns 값...) 입니다.
+    가장 큰 위치까지만 정렬 인덱스를 읽어 잠그고 번호를 매긴 뒤 VALUES 목록과 조인합니다.
+    반환 행의 첫 번째 값은 위치이고, 그 뒤에 returning 컬럼이 옵니다.
+    위치가 음수이거나 같은 위치가 여러 번 있으면 ValueError를 발생시킵니다. (한 행을 두 번 수정할 수 없음)
+    """
+    if not rows:
+        return []
+    positions = [r[0] for r in rows]
+    if min(positions) < 0:
+        raise ValueError(f"위치는 0 이상이어야 합니다: {min(positions)}")
+    duplicates = sorted(p for p, n in Counter(positions).items() if n > 1)
+    if duplicates:
+        raise ValueError(f"같은 위치가 여러 번 있습니다: {duplicates}")
+    types = column_types(cur, table, columns)
+    max_position = max(positions)
+    order_columns = list(dict.fromkeys([key, *order_by]))
+
+    query = sql.SQL(
+        "WITH head AS (SELECT {head_columns} FROM {table} ORDER BY {order} LIMIT %s{lock}), "
+        "target AS (SELECT {key}, row_number() OVER (ORDER BY {order}) - 1 AS pos FROM head) "
+        "UPDATE {table} AS t SET {assignments} "
+        "FROM target JOIN (VALUES {values}) AS v (pos, {names}) ON target.pos = v.pos "
+        "WHERE t.{key} = target.{key} RETURNING target.pos, {returning}"
+    ).format(
+        head_columns=sql.SQL(", ").join(map(sql.Identifier, order_columns)),
+        table=sql.Identifier(table),
+        order=_order_by(order_by, descending),
+        lock=_lock_clause(skip_locked),
+        key=sql.Identifier(key),
+        assignments=sql.SQL(", ").join(sql.SQL("{0} = v.{0}").format(sql.Identifier(c)) for c in columns),
+        values=sql.SQL(", ").join(
+            sql.SQL("(CAST(%s AS bigint), {})").format(sql.SQL(", ").join(
+                sql.SQL("CAST(%s AS {})").format(sql.SQL(t)) for t in types
+            )) for _ in rows
+        ),
+        names=sql.SQL(", ").join(map(sql.Identifier, columns)),
+        returning=_returning(returning),
+    )
+    params: List[Any] = [max_position + 1]
+    for row in rows:
+        params.extend(row)
+    cur.execute(query, params)
+    return cur.fetchall()
@@ -0,0 +1,111 @@
+import base64
+import json
+from typing import Any, List, Optional, Sequence, Tuple
+
+from psycopg2 import sql
+
+# ----------------------------------------------------------------------
+# 키셋(Seek) 페이지네이션 (Keyset Pagination)
+# ----------------------------------------------------------------------
+# LIMIT n OFFSET m 은 서버가 앞의 m개 행을 매번 읽고 버려야 하므로 깊은 페이지일수록 느려집니다.
+# 키셋 방식은 직전 페이지의 마지막 키 값 이후부터 인덱스를 바로 탐색합니다.
+#     WHERE (price, id) < (%s, %s) ORDER BY price DESC, id DESC LIMIT n
+# 정렬 키 컬럼(예: serial_no 또는 (price, id))에 같은 순서의 인덱스가 있어야 효과가 있습니다.
+#
+# 다음 페이지 위치는 불투명한(opaque) 토큰 문자열로 주고받으며,
+# 토큰에는 마지막 행의 키 값과 정렬 조건이 함께 들어 있어 다른 정렬에 잘못 쓰이면 거부됩니다.
+
+DEFAULT_PAGE_SIZE = 100
+
+
+def _signature(table: str, keys: Sequence[str], descending: bool) -> str:
+    return f"{table}:{','.join(keys)}:{'desc' if descending else 'asc'}"
+
+
+def encode_page_token(values: Sequence[Any], signature: str) -> str:
+    """마지막 행의 키 값을 URL-safe 토큰 문자열로 인코딩합니다. (UUID 등은 문자열로 변환)"""
+    payload = json.dumps({"s": signature, "k": list(values)}, default=str, ensure_ascii=False)
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_page_token(token: str, signature: str) -> List[Any]:
+    """토큰을 키 값 리스트로 되돌립니다. 형식이 잘못되었거나 정렬 조건이 다르면 ValueError가 발생합니다."""
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")).decode("utf-8"))
+        values = payload["k"]
+        token_signature = payload["s"]
+    except (ValueError, KeyError, TypeError) as e:
+        raise ValueError(f"잘못된 페이지 토큰입니다: {e}") from None
+    if token_signature != signature:
+        raise ValueError("다른 정렬 조건에서 발급된 페이지 토큰입니다.")
+    return values
+
+
+def fetch_page(
+    cur,
+    table: str,
+    columns: Sequence[str],
+    keys: Sequence[str],
+    page_size: int = DEFAULT_PAGE_SIZE,
+    page_token: Optional[str] = None,
+    descending: bool = False,
+    where: Optional[str] = None,
+    params: Sequence[Any] = (),
+) -> Tuple[List[Tuple], Optional[str]]:
+    """
+    keys 순서로 정렬된 한 페이지를 조회하고 (행 목록, 다음 페이지 토큰)을 반환합니다.
+    마지막 페이지이면 다음 페이지 토큰은 None입니다.
+
+    - keys는 columns에 포함되어야 하며, 마지막 키는 유일해야(예: serial_no, id) 순서가 안정적입니다.
+    - 모든 키는 같은 방향(descending)으로 정렬되어 행 값 비교 (k1, k2) > (v1, v2) 로 인덱스를 탐색합니다.
+    - where/params로 추가 조건(예: "price >= %s")을 줄 수 있습니다.
+    """
+    if page_size < 1:
+        raise ValueError("page_size는 1 이상이어야 합니다.")
+    missing = [k for k in keys if k not in columns]
+    if missing:
+        raise ValueError(f"정렬 키가 조회 컬럼에 없습니다: {missing}")
+
+    signature = _signature(table, keys, descending)
+    key_idents = sql.SQL(", ").join(map(sql.Identifier, keys))
+    direction = sql.SQL("DESC" if descending else "ASC")
+
+    conditions: List[sql.Composable] = []
+    query_params: List[Any] = []
+    if where:
+        conditions.append(sql.SQL("(") + sql.SQL(where) + sql.SQL(")"))
+        query_params.extend(params)
+    if page_token:
+        last_values = decode_page_token(page_token, signature)
+        if len(last_values) != len(keys):
+            raise ValueError("페이지 토큰의 키 개수가 정렬 키와 다릅니다.")
+        conditions.append(sql.SQL("({}) {} ({})").format(
+            key_idents,
+            sql.SQL("<" if descending else ">"),
+            sql.SQL(", ").join(sql.Placeholder() * len(keys)),
+        ))
+        query_params.extend(last_values)
+
+    query = sql.SQL("SELECT {} FROM {}").format(
+        sql.SQL(", ").join(map(sql.Identifier, columns)),
+        sql.Identifier(table),
+    )
+    if conditions:
+        query += sql.SQL(" WHERE ") + sql.SQL(" AND ").join(conditions)
+    query += sql.SQL(" ORDER BY {} LIMIT %s").format(
+        sql.SQL(", ").join(sql.SQL("{} {}").format(sql.Identifier(k), direction) for k in keys)
+    )
+    # 다음 페이지 존재 여부를 알기 위해 한 행을 더 읽습니다.
+    query_params.append(page_size + 1)
+
+    cur.execute(query, query_params)
+    rows = cur.fetchall()
+    if len(rows) <= page_size:
+        return rows, None
+
+    rows = rows[:page_size]
+    key_positions = [list(columns).index(k) for k in keys]
+    last = rows[-1]
+    return rows, encode_page_token([last[i] for i in key_positions], signature)
+
@@ -0,0 +1,402 @@
+import argparse
+import os
+import re
+import sys
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import psycopg2
+from psycopg2 import sql
+
+# ----------------------------------------------------------------------
+# 시간 범위 파티셔닝 (Range Partitioning for Log Tables)
+# ----------------------------------------------------------------------
+# keyword_search_logs, scraping_html_results 처럼 추가만 되는 로그 테이블은 행이 수십억 개가 되면
+#   DELETE FROM scraping_html_results WHERE scraped_at < ...
+# 같은 정리 작업이 행마다 삭제 표시 + WAL + VACUUM을 일으켜 끝나지 않습니다.
+# 여기서는 테이블을 시간 컬럼 기준 PARTITION BY RANGE로 만들고
+#   - ensure_partitions(): 현재 구간부터 앞으로 premake개 구간의 파티션을 미리 만들고
+#   - drop_expired_partitions(): 보존 기간이 지난 파티션을 DETACH 후 DROP(또는 보관)하며
+#   - delete_before(): 시간 조건 삭제를 "통째로 지난 파티션 DROP + 경계 파티션만 DELETE"로 바꿉니다.
+# 시간 컬럼 조건(WHERE scraped_at >= ...)이 있는 조회는 플래너가 해당 파티션만 읽습니다. (partition pruning)
+# 기본 키/유니크 제약에는 파티션 컬럼이 포함되어야 하므로 (id, 시간 컬럼) 복합 키를 사용합니다.
+# 파티션 경계는 세션 시간대의 영향을 받지 않도록 TIMESTAMP(시간대 없음) 컬럼을 사용합니다.
+#
+# 사용 예 (cron 등으로 하루 한 번 실행):
+#   python codes/postgres_partition.py create
+#   python codes/postgres_partition.py maintain --premake 3 --retention 12
+#   python codes/postgres_partition.py migrate keyword_search_logs
+
+INTERVALS = ("day", "week", "month")
+DEFAULT_PREMAKE = 3  # 현재 구간 이후로 미리 만들 파티션 수
+
+_BOUND = re.compile(r"FROM \('([^']+)'\) TO \('([^']+)'\)")
+
+
+class PartitionedTable:
+    """
+    시간 범위로 파티션되는 테이블 정의입니다.
+    - columns: [(컬럼명, 타입)], key: 기본 키 컬럼(파티션 컬럼이 자동으로 추가됨)
+    - partition_column: 범위 기준 TIMESTAMP 컬럼, interval: 파티션 하나의 구간 (day/week/month)
+    - retention: 보관할 구간 수 (None이면 삭제하지 않음)
+    """
+
+    def __init__(self, name: str, columns: Sequence[Tuple[str, str]], key: str, partition_column: str,
+                 interval: str = "month", retention: Optional[int] = None,
+                 indexes: Sequence[Sequence[str]] = ()):
+        if interval not in INTERVALS:
+            raise ValueError(f"interval은 {', '.join(INTERVALS)} 중 하나여야 합니다: {interval}")
+        self.name = name
+        self.columns = [tuple(c) for c in columns]
+        self.key = key
+        self.partition_column = partition_column
+        self.interval = interval
+        self.retention = retention
+        self.indexes = [tuple(i) for i in indexes]
+
+    def create_statements(self) -> List[sql.Composable]:
+        definitions = [sql.SQL("{} {}").format(sql.Identifier(c), sql.SQL(t)) for c, t in self.columns]
+        definitions.append(sql.SQL("PRIMARY KEY ({}, {})").format(
+            sql.Identifier(self.key), sql.Identifier(self.partition_column)
+        ))
+        statements: List[sql.Composable] = [
+            sql.SQL("CREATE TABLE IF NOT EXISTS {} ({}) PARTITION BY RANGE ({})").format(
+                sql.Identifier(self.name), sql.SQL(", ").join(definitions), sql.Identifier(self.partition_column)
+            )
+        ]
+        # 부모 테이블의 인덱스는 기존/새 파티션 모두에 자동으로 만들어집니다.
+        for index in self.indexes:
+            statements.append(sql.SQL("CREATE INDEX IF NOT EXISTS {} ON {} ({})").format(
+                sql.Identifier(f"{self.name}_{'_'.join(index)}_idx"), sql.Identifier(self.name),
+                sql.SQL(", ").join(map(sql.Identifier, index)),
+            ))
+        return statements
+
+    # -- 구간 계산 ------------------------------------------------------
+
+    def period_start(self, moment: datetime) -> datetime:
+        """moment가 속한 구간의 시작 시각"""
+        day = datetime(moment.year, moment.month, moment.day)
+        if self.interval == "day":
+            return day
+        if self.interval == "week":
+            return day - timedelta(days=day.weekday())  # 월요일 시작
+        return datetime(moment.year, moment.month, 1)
+
+    def next_period(self, start: datetime) -> datetime:
+        if self.interval == "day":
+            return start + timedelta(days=1)
+        if self.interval == "week":
+            return start + timedelta(days=7)
+        return datetime(start.year + start.month // 12, start.month % 12 + 1, 1)
+
+    def shift(self, start: datetime, periods: int) -> datetime:
+        """start에서 periods 구간 이동한 구간의 시작 시각 (음수면 과거)"""
+        if self.interval == "month":
+            months = start.year * 12 + start.month - 1 + periods
+            return datetime(months // 12, months % 12 + 1, 1)
+        return start + timedelta(days=periods * (1 if self.interval == "day" else 7))
+
+    def partition_name(self, start: datetime) -> str:
+        suffix = start.strftime("%Y%m" if self.interval == "month" else "%Y%m%d")
+        return f"{self.name}_p{suffix}"
+
+
+# quests/10_DMLs의 로그 테이블 (원래 정의에 시간 컬럼을 TIMESTAMP로 추가/변경)
+LOG_TABLES: Dict[str, PartitionedTable] = {t.name: t for t in (
+    PartitionedTable("keyword_search_logs",
+                     [("log_id", "INT NOT NULL"), ("keyword", "VARCHAR(500)"), ("result_count", "INT"),
+                      ("search_time", "TIMESTAMP NOT NULL DEFAULT now()")],
+                     key="log_id", partition_column="search_time", interval="month", retention=12,
+                     indexes=[("keyword",)]),
+    PartitionedTable("scraping_html_results",
+                     [("result_id", "INT NOT NULL"), ("page_title", "VARCHAR(500)"), ("page_url", "VARCHAR(500)"),
+                      ("html_length", "INT"), ("status_code", "INT"),
+                      ("scraped_at", "TIMESTAMP NOT NULL DEFAULT now()")],
+                     key="result_id", partition_column="scraped_at", interval="month", retention=6,
+                     indexes=[("status_code",)]),
+)}
+
+
+# ----------------------------------------------------------------------
+# 파티션 조회 / 생성
+# ----------------------------------------------------------------------
+
+def list_partitions(cur, table: str) -> List[Tuple[str, datetime, datetime]]:
+    """table의 범위 파티션 목록 [(이름, 시작, 끝)]을 시작 시각 순으로 반환합니다. (DEFAULT 파티션 제외)"""
+    cur.execute(
+        "SELECT c.relname, pg_get_expr(c.relpartbound, c.oid) FROM pg_inherits i "
+        "JOIN pg_class c ON c.oid = i.inhrelid WHERE i.inhparent = %s::regclass",
+        (table,),
+    )
+    partitions = []
+    for name, bound in cur.fetchall():
+        match = _BOUND.search(bound or "")
+        if match:
+            partitions.append((name, datetime.fromisoformat(match.group(1)), datetime.fromisoformat(match.group(2))))
+    return sorted(partitions, key=lambda p: p[1])
+
+
+def is_partitioned(cur, table: str) -> bool:
+    cur.execute("SELECT relkind FROM pg_class WHERE oid = to_regclass(%s)", (table,))
+    row = cur.fetchone()
+    return row is not None and row[0] == "p"
+
+
+def create_partition(cur, spec: PartitionedTable, start: datetime) -> Optional[str]:
+    """
+    start가 속한 구간의 파티션을 만듭니다. 이미 있으면 None, 새로 만들었으면 파티션 이름을 반환합니다.
+    같은 이름의 테이블이 파티션이 아닌 채로 있으면(예: 분리해 보관 중인 파티션) CREATE ... IF NOT EXISTS가
+    아무것도 하지 않으므로 ValueError를 발생시킵니다. (확인 후 ATTACH PARTITION으로 다시 붙이거나 이름을 바꿈)
+    """
+    start = spec.period_start(start)
+    end = spec.next_period(start)
+    if any(p_start == start for _, p_start, _ in list_partitions(cur, spec.name)):
+        return None
+    name = spec.partition_name(start)
+    cur.execute(sql.SQL("CREATE TABLE IF NOT EXISTS {} PARTITION OF {} FOR VALUES FROM (%s) TO (%s)").format(
+        sql.Identifier(name), sql.Identifier(spec.name)
+    ), (start, end))
+    cur.execute(
+        "SELECT EXISTS (SELECT 1 FROM pg_inherits WHERE inhrelid = to_regclass(%s) AND inhparent = to_regclass(%s))",
+        (name, spec.name),
+    )
+    if not cur.fetchone()[0]:
+        raise ValueError(f"{name} 테이블이 이미 있지만 {spec.name}의 파티션이 아닙니다. "
+                         f"ALTER TABLE {spec.name} ATTACH PARTITION {name} FOR VALUES FROM ('{start}') TO ('{end}')"
+                         f"로 다시 붙이거나 테이블 이름을 바꾼 뒤 실행하세요.")
+    return name
+
+
+def ensure_partitions(cur, spec: PartitionedTable, premake: int = DEFAULT_PREMAKE,
+                      since: Optional[datetime] = None, now: Optional[datetime] = None) -> List[str]:
+    """
+    since(기본: 현재 구간)부터 현재 구간 이후 premake개 구간까지 빠진 파티션을 만들고, 만든 이름 목록을 반환합니다.
+    파티션이 없는 시각의 행을 삽입하면 오류가 나므로, 정기적으로(예: 하루 한 번) 실행해 두어야 합니다.
+    """
+    now = now or datetime.now()
+    start = spec.period_start(since or now)
+    last = spec.shift(spec.period_start(now), premake)
+    created = []
+    while start <= last:
+        name = create_partition(cur, spec, start)
+        if name:
+            created.append(name)
+        start = spec.next_period(start)
+    return created
+
+
+def create_table(cur, spec: PartitionedTable, premake: int = DEFAULT_PREMAKE,
+                 since: Optional[datetime] = None) -> List[str]:
+    """파티션 부모 테이블과 인덱스를 만들고 ensure_partitions()로 파티션을 준비합니다. 커밋은 호출자가 합니다."""
+    for statement in spec.create_statements():
+        cur.execute(statement)
+    return ensure_partitions(cur, spec, premake, since)
+
+
+# ----------------------------------------------------------------------
+# 보존 기간 / 삭제
+# ----------------------------------------------------------------------
+
+def _detach_and_drop(cur, spec: PartitionedTable, name: str, drop: bool, concurrently: bool) -> None:
+    cur.execute(sql.SQL("ALTER TABLE {} DETACH PARTITION {}{}").format(
+        sql.Identifier(spec.name), sql.Identifier(name), sql.SQL(" CONCURRENTLY" if concurrently else "")
+    ))
+    if drop:
+        cur.execute(sql.SQL("DROP TABLE {}").format(sql.Identifier(name)))
+
+
+def drop_expired_partitions(cur, spec: PartitionedTable, retention: Optional[int] = None,
+                            now: Optional[datetime] = None, drop: bool = True,
+                            concurrently: bool = False) -> List[str]:
+    """
+    현재 구간을 포함해 최근 retention개 구간보다 오래된 파티션을 분리(DETACH)하고 삭제합니다.
+    - drop=False이면 분리만 하고 일반 테이블로 남겨 둡니다. (보관/내보내기 후 직접 삭제)
+    - concurrently=True이면 DETACH ... CONCURRENTLY로 조회를 막지 않고 분리합니다.
+      (PostgreSQL 14+, 트랜잭션 블록 밖에서만 실행 가능하므로 autocommit 연결이 필요)
+    처리한 파티션 이름 목록을 반환합니다.
+    """
+    retention = spec.retention if retention is None else retention
+    if retention is None:
+        return []
+    if concurrently and not cur.connection.autocommit:
+        raise ValueError("DETACH CONCURRENTLY는 autocommit 연결에서만 실행할 수 있습니다.")
+    cutoff = spec.shift(spec.period_start(now or datetime.now()), -(retention - 1))
+    expired = [name for name, _, end in list_partitions(cur, spec.name) if end <= cutoff]
+    for name in expired:
+        _detach_and_drop(cur, spec, name, drop, concurrently)
+    return expired
+
+
+def delete_before(cur, spec: PartitionedTable, cutoff: datetime) -> Tuple[List[str], int]:
+    """
+    partition_column < cutoff 인 행을 삭제합니다.
+    구간 전체가 cutoff 이전인 파티션은 DETACH + DROP으로 한 번에 지우고,
+    cutoff가 걸친 경계 파티션에서만 DELETE를 실행합니다. (삭제한 파티션 목록, DELETE한 행 수)를 반환합니다.
+    """
+    dropped, deleted = [], 0
+    for name, start, end in list_partitions(cur, spec.name):
+        if end <= cutoff:
+            _detach_and_drop(cur, spec, name, drop=True, concurrently=False)
+            dropped.append(name)
+        elif start < cutoff:
+            cur.execute(sql.SQL("DELETE FROM {} WHERE {} < %s").format(
+                sql.Identifier(name), sql.Identifier(spec.partition_column)
+            ), (cutoff,))
+            deleted += cur.rowcount
+    return dropped, deleted
+
+
+def maintain(cur, spec: PartitionedTable, premake: int = DEFAULT_PREMAKE, retention: Optional[int] = None,
+             now: Optional[datetime] = None) -> Dict[str, List[str]]:
+    """정기 작업: 미래 파티션을 만들고 보존 기간이 지난 파티션을 삭제합니다."""
+    return {
+        "created": ensure_partitions(cur, spec, premake, now=now),
+        "dropped": drop_expired_partitions(cur, spec, retention, now=now),
+    }
+
+
+# ----------------------------------------------------------------------
+# 기존 테이블 전환 / 파티션 프루닝 확인
+# ----------------------------------------------------------------------
+
+def migrate_table(cur, spec: PartitionedTable, keep_old: bool = True,
+                  time_expression: Optional[str] = None) -> int:
+    """
+    일반 테이블 spec.name을 같은 이름의 파티션 테이블로 전환하고 복사한 행 수를 반환합니다.
+    - 기존 테이블은 {name}_unpartitioned로 이름을 바꾼 뒤 데이터를 복사합니다. (keep_old=False이면 삭제)
+    - 기존 테이블에 파티션 컬럼이 없거나 타입이 다르면 time_expression(예: "now()")으로 값을 채웁니다.
+      기본값은 같은 이름 컬럼을 TIMESTAMP로 변환한 값이며, 없으면 now()입니다.
+    한 트랜잭션에서 실행되며 커밋은 호출자가 합니다. (복사하는 동안 기존 테이블 쓰기는 잠깁니다)
+    """
+    if is_partitioned(cur, spec.name):
+        return 0
+    old = f"{spec.name}_unpartitioned"
+    cur.execute(sql.SQL("ALTER TABLE {} RENAME TO {}").format(sql.Identifier(spec.name), sql.Identifier(old)))
+    # 기존 인덱스(기본 키 포함) 이름이 새 테이블의 인덱스와 겹치면 CREATE INDEX IF NOT EXISTS가
+    # 조용히 건너뛰므로, 모든 인덱스 이름을 {name}_unpartitioned 접두어로 함께 바꿉니다.
+    # 제약 조건(기본 키/유니크)에 딸린 인덱스는 제약 이름을 바꿔야 인덱스 이름도 따라 바뀝니다.
+    cur.execute(
+        """
+        SELECT i.relname, c.conname
+        FROM pg_index x
+        JOIN pg_class i ON i.oid = x.indexrelid
+        LEFT JOIN pg_constraint c ON c.conindid = x.indexrelid AND c.conrelid = x.indrelid
+        WHERE x.indrelid = %s::regclass
+        """,
+        (old,),
+    )
+    for index, constraint in cur.fetchall():
+        suffix = index[len(spec.name):] if index.startswith(spec.name) else f"_{index}"
+        renamed = sql.Identifier(f"{old}{suffix}"[:63])
+        if constraint:
+            cur.execute(sql.SQL("ALTER TABLE {} RENAME CONSTRAINT {} TO {}").format(
+                sql.Identifier(old), sql.Identifier(constraint), renamed
+            ))
+        else:
+            cur.execute(sql.SQL("ALTER INDEX {} RENAME TO {}").format(sql.Identifier(index), renamed))
+
+    cur.execute(
+        "SELECT attname FROM pg_attribute WHERE attrelid = %s::regclass AND attnum > 0 AND NOT attisdropped",
+        (old,),
+    )
+    old_columns = {row[0] for row in cur.fetchall()}
+    if time_expression is None:
+        if spec.partition_column in old_columns:
+            time_expression = f"{sql.Identifier(spec.partition_column).as_string(cur)}::timestamp"
+        else:
+            time_expression = "now()"
+    copied = [c for c, _ in spec.columns if c in old_columns and c != spec.partition_column]
+
+    cur.execute(sql.SQL("SELECT min({0}), max({0}) FROM {1}").format(sql.SQL(time_expression), sql.Identifier(old)))
+    oldest, _ = cur.fetchone()
+    create_table(cur, spec, since=oldest)
+    cur.execute(sql.SQL("INSERT INTO {} ({}, {}) SELECT {}, {} FROM {}").format(
+        sql.Identifier(spec.name),
+        sql.SQL(", ").join(map(sql.Identifier, copied)), sql.Identifier(spec.partition_column),
+        sql.SQL(", ").join(map(sql.Identifier, copied)), sql.SQL(time_expression),
+        sql.Identifier(old),
+    ))
+    count = cur.rowcount
+    if not keep_old:
+        cur.execute(sql.SQL("DROP TABLE {}").format(sql.Identifier(old)))
+    return count
+
+
+def scanned_partitions(cur, query: Any, params: Optional[Sequence[Any]] = None) -> List[str]:
+    """
+    EXPLAIN 결과에서 실제로 읽게 될 파티션 이름을 찾아 반환합니다.
+    시간 조건이 있는 조회가 필요한 파티션만 읽는지(partition pruning) 확인하는 데 사용합니다.
+    """
+    if isinstance(query, sql.Composable):
+        query = query.as_string(cur)
+    cur.execute("EXPLAIN (FORMAT JSON) " + query, params)
+    plan = cur.fetchone()[0]
+    names: List[str] = []
+
+    def walk(node: Dict[str, Any]) -> None:
+        relation = node.get("Relation Name")
+        if relation and relation not in names:
+            names.append(relation)
+        for child in node.get("Plans", []):
+            walk(child)
+
+    walk(plan[0]["Plan"])
+    return names
+
+
+# ----------------------------------------------------------------------
+# 명령줄 실행
+# ----------------------------------------------------------------------
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="로그 테이블의 시간 범위 파티션을 생성/유지/전환합니다.")
+    parser.add_argument("command", choices=["create", "maintain", "migrate", "list"])
+    parser.add_argument("tables", nargs="*", help=f"대상 테이블 (기본: {', '.join(LOG_TABLES)})")
+    parser.add_argument("--host", default=os.environ.get("PGHOST", "localhost"))
+    parser.add_argument("--port", default=os.environ.get("PGPORT", "5432"))
+    parser.add_argument("--dbname", default=os.environ.get("PGDATABASE", "main_db"))
+    parser.add_argument("--user", default=os.environ.get("PGUSER", "admin"))
+    parser.add_argument("--password", default=os.environ.get("PGPASSWORD", "admin123"))
+    parser.add_argument("--premake", type=int, default=DEFAULT_PREMAKE, help="미리 만들 미래 파티션 수")
+    parser.add_argument("--retention", type=int, help="보관할 구간 수 (기본: 테이블 정의 값)")
+    parser.add_argument("--drop-old", action="store_true", help="migrate 후 기존 테이블 삭제")
+    args = parser.parse_args(argv)
+
+    unknown = [t for t in args.tables if t not in LOG_TABLES]
+    if unknown:
+        print(f"알 수 없는 테이블입니다: {', '.join(unknown)}", file=sys.stderr)
+        return 2
+
+    status = 0
+    conn = psycopg2.connect(host=args.host, port=args.port, dbname=args.dbname, user=args.user,
+                            password=args.password)
+    try:
+        for table in args.tables or LOG_TABLES:
+            spec = LOG_TABLES[table]
+            try:
+                with conn.cursor() as cur:
+                    if args.command == "create":
+                        created = create_table(cur, spec, args.premake)
+                        print(f"=> {table}: 파티션 {len(created)}개 생성 {created}")
+                    elif args.command == "maintain":
+                        result = maintain(cur, spec, args.premake, args.retention)
+                        print(f"=> {table}: 생성 {result['created']}, 삭제 {result['dropped']}")
+                    elif args.command == "migrate":
+                        count = migrate_table(cur, spec, keep_old=not args.drop_old)
+                        print(f"=> {table}: {count}행을 파티션 테이블로 복사했습니다.")
+                    else:
+                        for name, start, end in list_partitions(cur, table):
+                            print(f"{name}\t{start:%Y-%m-%d} ~ {end:%Y-%m-%d}")
+                conn.commit()
+            except (psycopg2.Error, ValueError) as e:
+                conn.rollback()
+                print(f"[{table}] 파티션 작업 오류: {e}", file=sys.stderr)
+                status = 1
+    finally:
+        conn.close()
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
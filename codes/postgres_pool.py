@@ -0,0 +1,276 @@
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+import psycopg2
+import psycopg2.extensions
+from psycopg2.pool import PoolError
+
+# ----------------------------------------------------------------------
+# 공용 PostgreSQL 연결 풀 (Shared Connection Pool)
+# ----------------------------------------------------------------------
+# 매 함수 호출마다 psycopg2.connect()를 수행하면 TCP 연결 + 인증 과정이
+# 전체 지연 시간의 대부분을 차지합니다. 이 모듈은 연결을 재사용하기 위한
+# 스레드 안전 풀을 제공하며, quests/prompts 예제 스크립트가 함께 사용합니다.
+
+
+class PoolTimeoutError(PoolError):
+    """지정된 시간 안에 풀에서 연결을 빌려오지 못했을 때 발생합니다."""
+
+
+class ConnectionPool:
+    """
+    스레드 안전 연결 풀입니다.
+
+    - minconn / maxconn: 유지할 최소 연결 수와 동시에 열 수 있는 최대 연결 수
+    - timeout: 모든 연결이 사용 중일 때 대기할 최대 시간(초)
+    - max_lifetime: 연결을 재사용할 최대 시간(초), 초과 시 닫고 새로 연결
+    - health_check: 대여 시 'SELECT 1'로 연결 상태를 확인할지 여부
+    - health_check_idle: 이 시간(초) 이상 유휴 상태였던 연결만 'SELECT 1'로 확인 (그보다 짧으면
+      conn.closed / 트랜잭션 상태만 확인하고, 끊어진 소켓은 첫 쿼리 오류로 드러나 재시도 계층이 처리)
+    - autocommit: 새 연결에 적용할 autocommit 설정
+    - metrics: QueryMetrics(postgres_metrics) 객체를 주면 커서 실행 시간과 연결 대여 시간을 기록
+    """
+
+    def __init__(
+        self,
+        minconn: int = 1,
+        maxconn: int = 10,
+        timeout: float = 30.0,
+        max_lifetime: Optional[float] = 1800.0,
+        health_check: bool = True,
+        health_check_idle: float = 30.0,
+        autocommit: bool = False,
+        metrics: Optional[Any] = None,
+        **conn_kwargs: Any,
+    ):
+        if minconn < 0 or maxconn < 1 or minconn > maxconn:
+            raise ValueError("minconn/maxconn 값이 올바르지 않습니다.")
+
+        self.minconn = minconn
+        self.maxconn = maxconn
+        self.timeout = timeout
+        self.max_lifetime = max_lifetime
+        self.health_check = health_check
+        self.health_check_idle = health_check_idle
+        self.autocommit = autocommit
+        self.metrics = metrics
+        if metrics is not None:
+            conn_kwargs.setdefault("cursor_factory", metrics.cursor_factory)
+        self._conn_kwargs = conn_kwargs
+
+        self._idle: List[Any] = []              # 대여 가능한 연결 (LIFO)
+        self._created_at: Dict[int, float] = {}  # id(conn) -> 생성 시각
+        self._idle_since: Dict[int, float] = {}  # id(conn) -> 풀에 반환된 시각
+        self._size = 0                           # 현재 열려 있는 전체 연결 수
+        self._closed = False
+        self._cond = threading.Condition(threading.Lock())
+
+        for _ in range(minconn):
+            self._size += 1
+            self._idle.append(self._connect())
+
+    # ------------------------------------------------------------------
+    # 내부 헬퍼
+    # ------------------------------------------------------------------
+
+    def _connect(self):
+        """
+        새 연결을 생성합니다. 호출 전에 _size를 미리 1 증가시켜 자리를 예약해야 하며,
+        연결에 실패하면 예약을 취소합니다.
+        """
+        try:
+            conn = psycopg2.connect(**self._conn_kwargs)
+            conn.autocommit = self.autocommit
+        except BaseException:
+            with self._cond:
+                self._size -= 1
+                self._cond.notify()
+            raise
+        with self._cond:
+            self._created_at[id(conn)] = self._idle_since[id(conn)] = time.monotonic()
+        return conn
+
+    def _discard(self, conn) -> None:
+        """연결을 닫고 풀에서 제거합니다. (대기 중인 스레드를 깨웁니다)"""
+        try:
+            if not conn.closed:
+                conn.close()
+        except psycopg2.Error:
+            pass
+        with self._cond:
+            self._size -= 1
+            self._created_at.pop(id(conn), None)
+            self._idle_since.pop(id(conn), None)
+            self._cond.notify()
+
+    def _is_expired(self, conn) -> bool:
+        if self.max_lifetime is None:
+            return False
+        created = self._created_at.get(id(conn), 0.0)
+        return time.monotonic() - created > self.max_lifetime
+
+    def _is_healthy(self, conn) -> bool:
+        if conn.closed or conn.info.transaction_status == psycopg2.extensions.TRANSACTION_STATUS_UNKNOWN:
+            return False
+        if not self.health_check:
+            return True
+        if time.monotonic() - self._idle_since.get(id(conn), 0.0) < self.health_check_idle:
+            return True
+        try:
+            # 지표(metrics) 커서가 아닌 기본 커서로 확인하여 쿼리 통계에 섞이지 않게 합니다.
+            with conn.cursor(cursor_factory=psycopg2.extensions.cursor) as cur:
+                cur.execute("SELECT 1")
+            if not conn.autocommit:
+                conn.rollback()
+            return True
+        except psycopg2.Error:
+            return False
+
+    # ------------------------------------------------------------------
+    # 공개 API
+    # ------------------------------------------------------------------
+
+    def getconn(self, timeout: Optional[float] = None):
+        """
+        풀에서 연결을 빌려옵니다.
+        유휴 연결이 없고 maxconn에 도달했다면 timeout(초)까지 대기합니다.
+        """
+        if self.metrics is None:
+            return self._getconn(timeout)
+        start = time.perf_counter()
+        try:
+            conn = self._getconn(timeout)
+        except PoolTimeoutError:
+            self.metrics.observe_acquire(time.perf_counter() - start, timed_out=True)
+            raise
+        self.metrics.observe_acquire(time.perf_counter() - start)
+        return conn
+
+    def _getconn(self, timeout: Optional[float]):
+        timeout = self.timeout if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+
+        while True:
+            with self._cond:
+                if self._closed:
+                    raise PoolError("연결 풀이 이미 닫혔습니다.")
+                while not self._idle and self._size >= self.maxconn:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise PoolTimeoutError(
+                            f"{timeout}초 안에 사용 가능한 연결을 얻지 못했습니다."
+                        )
+                    self._cond.wait(remaining)
+                    if self._closed:
+                        raise PoolError("연결 풀이 이미 닫혔습니다.")
+                if self._idle:
+                    conn = self._idle.pop()
+                else:
+                    conn = None
+                    self._size += 1  # 새 연결을 위한 자리 예약
+
+            # 네트워크 I/O는 락 밖에서 수행합니다.
+            if conn is None:
+                return self._connect()
+            if self._is_expired(conn) or not self._is_healthy(conn):
+                self._discard(conn)
+                continue
+            return conn
+
+    def putconn(self, conn, close: bool = False) -> None:
+        """빌려간 연결을 풀에 반환합니다. 진행 중인 트랜잭션은 롤백됩니다."""
+        if close or conn.closed or self._closed or self._is_expired(conn):
+            self._discard(conn)
+            return
+
+        try:
+            status = conn.info.transaction_status
+            if status == psycopg2.extensions.TRANSACTION_STATUS_UNKNOWN:
+                self._discard(conn)
+                return
+            if status != psycopg2.extensions.TRANSACTION_STATUS_IDLE:
+                conn.rollback()
+            if conn.autocommit != self.autocommit:
+                conn.autocommit = self.autocommit
+        except psycopg2.Error:
+            self._discard(conn)
+            return
+
+        with self._cond:
+            self._idle_since[id(conn)] = time.monotonic()
+            self._idle.append(conn)
+            self._cond.notify()
+
+    @contextmanager
+    def connection(self, timeout: Optional[float] = None) -> Iterator[Any]:
+        """
+        with 문으로 연결을 빌려 쓰는 컨텍스트 매니저입니다.
+        블록에서 예외가 발생하면 롤백 후 반환하고, 연결 자체가 끊어졌다면 폐기합니다.
+        """
+        conn = self.getconn(timeout)
+        try:
+            yield conn
+        except BaseException:
+            broken = conn.closed != 0
+            if not broken:
+                try:
+                    conn.rollback()
+                except psycopg2.Error:
+                    broken = True
+            self.putconn(conn, close=broken)
+            raise
+        else:
+            self.putconn(conn)
+
+    def closeall(self) -> None:
+        """유휴 연결을 모두 닫고 풀을 종료합니다. 대여 중인 연결은 반환 시 닫힙니다."""
+        with self._cond:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._cond.notify_all()
+        for conn in idle:
+            self._discard(conn)
+
+    @property
+    def size(self) -> int:
+        """현재 열려 있는 전체 연결 수 (대여 중 + 유휴)"""
+        return self._size
+
+    def __enter__(self) -> "ConnectionPool":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.closeall()
+
+
+# ----------------------------------------------------------------------
+# 모듈 단위 공용 풀 (스크립트별로 하나의 풀을 공유)
+# ----------------------------------------------------------------------
+
+_pools: Dict[tuple, ConnectionPool] = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(**kwargs: Any) -> ConnectionPool:
+    """
+    동일한 연결 설정에 대해 하나의 ConnectionPool을 반환합니다. (없으면 생성)
+    kwargs는 ConnectionPool 생성자 인자와 psycopg2.connect() 인자를 함께 받습니다.
+    """
+    key = tuple(sorted((k, str(v)) for k, v in kwargs.items()))
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None or pool._closed:
+            pool = ConnectionPool(**kwargs)
+            _pools[key] = pool
+        return pool
+
+
+def close_all_pools() -> None:
+    """get_pool()로 생성된 모든 풀을 닫습니다."""
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.closeall()
@@ -0,0 +1,347 @@
+import hashlib
+import itertools
+import re
+import threading
+import weakref
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+import psycopg2
+import psycopg2.extensions
+from psycopg2 import sql
+
+from postgres_bulk import bulk_insert
+
+# ----------------------------------------------------------------------
+# 공용 테이블 매퍼 / 저장소 (Table Repository)
+# ----------------------------------------------------------------------
+# books와 퀘스트 테이블(news_articles, web_links, ...)의 CRUD 문장을 테이블마다 손으로
+# 쓰지 않고, 스키마 설명(TableSchema)에서 생성합니다.
+#
+# 자주 실행되는 문장은 서버 측 PREPARE로 한 번만 파싱/계획하고 이후에는 EXECUTE만 보냅니다.
+# 준비된 문장은 연결(세션)마다 존재하므로 연결별로 캐시합니다.
+#
+#   PREPARE repo_3f2a... AS SELECT ... FROM news_articles WHERE article_id = $1
+#   EXECUTE repo_3f2a... (1)
+#
+# 문장 이름은 쿼리 문자열의 해시이므로 모든 연결에서 같은 쿼리는 같은 이름을 갖습니다.
+#
+# 주의: PREPARE는 트랜잭션이 롤백되면 함께 취소되므로, 열린 트랜잭션이 없을 때(또는 autocommit)만
+# 준비하고, 트랜잭션 도중에 처음 보는 문장은 준비 없이 일반 실행합니다.
+# (트랜잭션 단위 연결 풀러(PgBouncer transaction mode) 뒤에서는 prepare=False로 사용합니다)
+
+DEFAULT_MAX_PREPARED = 256  # 연결당 준비해 둘 최대 문장 수
+
+_OPERATORS = {"=", "<>", "!=", "<", "<=", ">", ">=", "LIKE", "ILIKE"}
+_POSITIONAL = re.compile(r"%%|%s|%\(")
+
+
+def to_dollar_params(query: str) -> Optional[str]:
+    """'%s' 자리표시자를 PREPARE용 '$1, $2, ...'로 바꿉니다. 이름 있는 자리표시자가 있으면 None입니다."""
+    counter = itertools.count(1)
+    named = False
+
+    def replace(match: "re.Match[str]") -> str:
+        nonlocal named
+        token = match.group(0)
+        if token == "%%":
+            return "%"
+        if token == "%(":
+            named = True
+            return token
+        return f"${next(counter)}"
+
+    converted = _POSITIONAL.sub(replace, query)
+    return None if named else converted.rstrip().rstrip(";")
+
+
+class PreparedStatementCache:
+    """
+    쿼리 문자열 -> 준비된 문장 이름을 연결별로 기억하는 LRU 캐시입니다.
+    execute(cur, query, params)는 처음에는 PREPARE 후 EXECUTE하고, 이후에는 EXECUTE만 보냅니다.
+    """
+
+    def __init__(self, max_statements: int = DEFAULT_MAX_PREPARED):
+        self.max_statements = max_statements
+        self._per_conn: "weakref.WeakKeyDictionary[Any, OrderedDict[str, str]]" = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _can_change_session(conn) -> bool:
+        """PREPARE/DEALLOCATE가 롤백으로 취소되지 않는 상태인지 확인합니다."""
+        return conn.autocommit or conn.info.transaction_status == psycopg2.extensions.TRANSACTION_STATUS_IDLE
+
+    def _finish(self, conn) -> None:
+        """준비 작업만 담긴 암묵적 트랜잭션을 커밋해 확정합니다."""
+        if not conn.autocommit:
+            conn.commit()
+
+    def execute(self, cur, query: Any, params: Optional[Sequence[Any]] = None) -> None:
+        conn = cur.connection
+        if isinstance(query, sql.Composable):
+            query = query.as_string(cur)
+        with self._lock:
+            statements = self._per_conn.setdefault(conn, OrderedDict())
+            name = statements.get(query)
+            if name is not None:
+                statements.move_to_end(query)
+
+        if name is None:
+            prepared = to_dollar_params(query)
+            if prepared is None or not self._can_change_session(conn):
+                cur.execute(query, params)
+                return
+            name = "repo_" + hashlib.sha1(query.encode("utf-8")).hexdigest()[:16]
+            cur.execute(f"PREPARE {name} AS {prepared}")
+            evicted = None
+            with self._lock:
+                statements[query] = name
+                if len(statements) > self.max_statements:
+                    evicted = statements.popitem(last=False)[1]
+            if evicted:
+                cur.execute(f"DEALLOCATE {evicted}")
+            self._finish(conn)
+
+        if hasattr(cur, "recorded_as"):
+            # 계측 커서(postgres_metrics)에는 EXECUTE 이름 대신 원래 문장을 기록하게 합니다.
+            cur.recorded_as = (query, params)
+        if params:
+            cur.execute(f"EXECUTE {name} ({', '.join(['%s'] * len(params))})", params)
+        else:
+            cur.execute(f"EXECUTE {name}")
+
+    def forget(self, conn) -> None:
+        """conn의 캐시를 비웁니다. (DISCARD ALL 등으로 세션의 준비된 문장이 사라졌을 때 호출)"""
+        with self._lock:
+            self._per_conn.pop(conn, None)
+
+    def prepared_count(self, conn) -> int:
+        with self._lock:
+            return len(self._per_conn.get(conn, ()))
+
+
+# 모듈 공용 캐시 (저장소들과 예제 스크립트가 함께 사용)
+PREPARED_STATEMENTS = PreparedStatementCache()
+
+
+# ----------------------------------------------------------------------
+# 스키마 설명
+# ----------------------------------------------------------------------
+
+class TableSchema:
+    """
+    테이블 한 개의 설명입니다.
+
+    - columns: (컬럼명, 타입 SQL) 목록. 타입 SQL에 DEFAULT/NOT NULL 등을 함께 적을 수 있습니다.
+    - key: 기본 키 컬럼
+    - generated: DB가 값을 채우는 컬럼(DEFAULT/SERIAL). insert 시 값을 주지 않으면 생략합니다.
+    - indexes: 추가로 만들 인덱스의 컬럼 목록들
+    - extensions: 테이블 생성 전에 필요한 확장 (예: uuid-ossp)
+    """
+
+    def __init__(self, name: str, columns: Sequence[Tuple[str, str]], key: str,
+                 generated: Sequence[str] = (), indexes: Sequence[Sequence[str]] = (),
+                 extensions: Sequence[str] = ()):
+        names = [c for c, _ in columns]
+        if key not in names:
+            raise ValueError(f"{name}: 기본 키 {key}가 컬럼 목록에 없습니다.")
+        self.name = name
+        self.columns = list(columns)
+        self.column_names = names
+        self.key = key
+        self.generated = tuple(generated)
+        self.indexes = [tuple(i) for i in indexes]
+        self.extensions = tuple(extensions)
+
+    def create_statements(self) -> List[sql.Composable]:
+        statements: List[sql.Composable] = [
+            sql.SQL("CREATE EXTENSION IF NOT EXISTS {}").format(sql.Identifier(e)) for e in self.extensions
+        ]
+        definitions = [
+            sql.SQL("{} {}{}").format(sql.Identifier(c), sql.SQL(t),
+                                      sql.SQL(" PRIMARY KEY" if c == self.key else ""))
+            for c, t in self.columns
+        ]
+        statements.append(sql.SQL("CREATE TABLE IF NOT EXISTS {} ({})").format(
+            sql.Identifier(self.name), sql.SQL(", ").join(definitions)
+        ))
+        for index in self.indexes:
+            statements.append(sql.SQL("CREATE INDEX IF NOT EXISTS {} ON {} ({})").format(
+                sql.Identifier(f"{self.name}_{'_'.join(index)}_idx"), sql.Identifier(self.name),
+                sql.SQL(", ").join(map(sql.Identifier, index)),
+            ))
+        return statements
+
+    def check_columns(self, columns: Iterable[str]) -> None:
+        unknown = [c for c in columns if c not in self.column_names]
+        if unknown:
+            raise ValueError(f"{self.name} 테이블에 없는 컬럼입니다: {', '.join(unknown)}")
+
+
+# quests/10_DMLs/*.sql 과 books 예제의 테이블 정의
+QUEST_TABLES: Dict[str, TableSchema] = {s.name: s for s in (
+    TableSchema("books", [("id", "UUID DEFAULT uuid_generate_v4()"), ("title", "VARCHAR(100) NOT NULL"),
+                          ("price", "INT NOT NULL")],
+                key="id", generated=("id",), indexes=[("title", "id")], extensions=("uuid-ossp",)),
+    TableSchema("news_articles", [("article_id", "INT"), ("title", "VARCHAR(500)"), ("url", "VARCHAR(500)"),
+                                  ("author", "VARCHAR(500)"), ("published_at", "DATE")],
+                key="article_id"),
+    TableSchema("web_links", [("link_id", "INT"), ("link_text", "VARCHAR(500)"), ("link_url", "VARCHAR(500)"),
+                              ("category", "VARCHAR(500)")],
+                key="link_id"),
+    TableSchema("scraping_html_results", [("result_id", "INT"), ("page_title", "VARCHAR(500)"),
+                                          ("page_url", "VARCHAR(500)"), ("html_length", "INT"),
+                                          ("status_code", "INT")],
+                key="result_id"),
+    TableSchema("keyword_search_logs", [("log_id", "INT"), ("keyword", "VARCHAR(500)"), ("result_count", "INT"),
+                                        ("search_time", "VARCHAR(500)")],
+                key="log_id"),
+    TableSchema("shop_products", [("product_id", "INT"), ("name", "VARCHAR(500)"), ("price", "INT"),
+                                  ("stock", "INT"), ("category", "VARCHAR(500)")],
+                key="product_id"),
+)}
+
+
+# ----------------------------------------------------------------------
+# 저장소 (CRUD)
+# ----------------------------------------------------------------------
+
+Where = Union[Dict[str, Any], Sequence[Tuple[str, str, Any]]]
+
+
+class Repository:
+    """
+    TableSchema에서 CRUD 문장을 생성해 실행합니다. 결과 행은 스키마 컬럼 순서의 튜플입니다.
+
+    where 조건은 {"컬럼": 값} (모두 등치, AND) 또는 [("컬럼", "연산자", 값), ...] 형태이며,
+    연산자는 =, <>, !=, <, <=, >, >=, LIKE, ILIKE 를 지원합니다. 값이 None인 등치 조건은 IS NULL입니다.
+    커밋은 호출자가 합니다.
+    """
+
+    def __init__(self, schema: TableSchema, prepare: bool = True,
+                 statements: Optional[PreparedStatementCache] = None):
+        self.schema = schema
+        self.prepare = prepare
+        self.statements = statements or PREPARED_STATEMENTS
+        self._table = sql.Identifier(schema.name)
+        self._all_columns = sql.SQL(", ").join(map(sql.Identifier, schema.column_names))
+
+    # -- 내부 헬퍼 ------------------------------------------------------
+
+    def _run(self, cur, query: sql.Composable, params: Sequence[Any]) -> None:
+        if self.prepare:
+            self.statements.execute(cur, query, params)
+        else:
+            cur.execute(query, params)
+
+    def _where(self, where: Optional[Where]) -> Tuple[sql.Composable, List[Any]]:
+        if not where:
+            return sql.SQL(""), []
+        conditions = list(where.items()) if isinstance(where, dict) else list(where)
+        parts, params = [], []
+        for condition in conditions:
+            column, op, value = (condition[0], "=", condition[1]) if len(condition) == 2 else condition
+            self.schema.check_columns([column])
+            op = op.upper()
+            if op not in _OPERATORS:
+                raise ValueError(f"지원하지 않는 연산자입니다: {op}")
+            if value is None and op in ("=", "<>", "!="):
+                parts.append(sql.SQL("{} IS {}NULL").format(sql.Identifier(column),
+                                                           sql.SQL("" if op == "=" else "NOT ")))
+                continue
+            parts.append(sql.SQL("{} {} %s").format(sql.Identifier(column), sql.SQL(op)))
+            params.append(value)
+        return sql.SQL(" WHERE ") + sql.SQL(" AND ").join(parts), params
+
+    def _order(self, order_by: Optional[Sequence[str]], descending: bool) -> sql.Composable:
+        if not order_by:
+            return sql.SQL("")
+        self.schema.check_columns(order_by)
+        direction = sql.SQL(" DESC" if descending else " ASC")
+        return sql.SQL(" ORDER BY ") + sql.SQL(", ").join(
+            sql.Identifier(c) + direction for c in order_by
+        )
+
+    # -- 공개 API ------------------------------------------------------
+
+    def create_table(self, cur) -> None:
+        for statement in self.schema.create_statements():
+            cur.execute(statement)
+
+    def get(self, cur, key_value: Any) -> Optional[Tuple]:
+        """기본 키로 한 행을 조회합니다. (준비된 문장으로 실행되는 대표적인 점 조회)"""
+        query = sql.SQL("SELECT {} FROM {} WHERE {} = %s").format(
+            self._all_columns, self._table, sql.Identifier(self.schema.key)
+        )
+        self._run(cur, query, (key_value,))
+        return cur.fetchone()
+
+    def find(self, cur, where: Optional[Where] = None, order_by: Optional[Sequence[str]] = None,
+             descending: bool = False, limit: Optional[int] = None,
+             columns: Optional[Sequence[str]] = None) -> List[Tuple]:
+        """조건에 맞는 행을 조회합니다. columns를 주면 해당 컬럼만 그 순서대로 반환합니다."""
+        if columns:
+            self.schema.check_columns(columns)
+        where_sql, params = self._where(where)
+        query = sql.SQL("SELECT {} FROM {}").format(
+            sql.SQL(", ").join(map(sql.Identifier, columns)) if columns else self._all_columns, self._table
+        ) + where_sql + self._order(order_by, descending)
+        if limit is not None:
+            query += sql.SQL(" LIMIT %s")
+            params.append(limit)
+        self._run(cur, query, params)
+        return cur.fetchall()
+
+    def insert(self, cur, row: Dict[str, Any]) -> Tuple:
+        """한 행을 삽입하고, DB가 채운 값을 포함한 전체 행을 반환합니다."""
+        self.schema.check_columns(row)
+        columns = list(row)
+        query = sql.SQL("INSERT INTO {} ({}) VALUES ({}) RETURNING {}").format(
+            self._table, sql.SQL(", ").join(map(sql.Identifier, columns)),
+            sql.SQL(", ").join(sql.Placeholder() * len(columns)), self._all_columns,
+        )
+        self._run(cur, query, [row[c] for c in columns])
+        return cur.fetchone()
+
+    def insert_many(self, conn, rows: Iterable[Sequence[Any]], columns: Optional[Sequence[str]] = None,
+                    **bulk_kwargs: Any) -> Union[int, List[Tuple]]:
+        """
+        여러 행을 bulk_insert(execute_values/COPY)로 적재합니다. 배치마다 커밋됩니다.
+        columns를 생략하면 generated 컬럼을 제외한 전체 컬럼 순서로 값을 받습니다.
+        """
+        columns = list(columns or [c for c in self.schema.column_names if c not in self.schema.generated])
+        self.schema.check_columns(columns)
+        return bulk_insert(conn, rows, table=self.schema.name, columns=columns, **bulk_kwargs)
+
+    def update(self, cur, values: Dict[str, Any], where: Optional[Where]) -> List[Tuple]:
+        """조건에 맞는 행의 값을 바꾸고, 수정된 행 목록을 반환합니다. where=None이면 전체 행입니다."""
+        if not values:
+            raise ValueError("수정할 값이 없습니다.")
+        self.schema.check_columns(values)
+        where_sql, params = self._where(where)
+        query = sql.SQL("UPDATE {} SET {}").format(
+            self._table,
+            sql.SQL(", ").join(sql.SQL("{} = %s").format(sql.Identifier(c)) for c in values),
+        ) + where_sql + sql.SQL(" RETURNING {}").format(self._all_columns)
+        self._run(cur, query, [*values.values(), *params])
+        return cur.fetchall()
+
+    def delete(self, cur, where: Optional[Where]) -> List[Tuple]:
+        """조건에 맞는 행을 삭제하고, 삭제된 행 목록을 반환합니다. where=None이면 전체 행입니다."""
+        where_sql, params = self._where(where)
+        query = sql.SQL("DELETE FROM {}").format(self._table) + where_sql + \
+            sql.SQL(" RETURNING {}").format(self._all_columns)
+        self._run(cur, query, params)
+        return cur.fetchall()
+
+    def as_dict(self, row: Optional[Sequence[Any]]) -> Optional[Dict[str, Any]]:
+        """전체 컬럼 순서의 행을 {컬럼: 값} dict로 바꿉니다."""
+        return dict(zip(self.schema.column_names, row)) if row is not None else None
+
+
+def get_repository(table: str, prepare: bool = True) -> Repository:
+    """QUEST_TABLES에 정의된 테이블의 저장소를 반환합니다."""
+    try:
+        return Repository(QUEST_TABLES[table], prepare=prepare)
+    except KeyError:
+        raise ValueError(f"정의되지 않은 테이블입니다: {table}") from None
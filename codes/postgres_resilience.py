@@ -0,0 +1,324 @@
+import itertools
+import random
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import psycopg2
+import psycopg2.extensions
+from psycopg2.pool import PoolError
+
+from postgres_pool import ConnectionPool, get_pool
+
+# ----------------------------------------------------------------------
+# 재시도 / 서킷 브레이커 / 읽기 복제본 라우팅 (Resilient Execution)
+# ----------------------------------------------------------------------
+# 연결 풀만으로는 DB 재시작(admin_shutdown), 네트워크 끊김, 직렬화 실패를 견디지 못합니다.
+# - 재시도: 일시적 오류(연결 끊김, 08xxx/57P0x 등)는 지수 백오프(+지터) 후 새 연결로 다시 실행합니다.
+#   단, 커밋 도중 끊긴 쓰기는 반영 여부를 알 수 없으므로 idempotent=True인 작업만 재시도합니다.
+# - 트랜잭션 재실행: 직렬화 실패(40001)/교착 상태(40P01)는 서버가 트랜잭션 전체를 롤백한 것이므로
+#   idempotent 여부와 관계없이 트랜잭션 함수를 처음부터 다시 실행합니다.
+# - 서킷 브레이커: 호스트별로 연속 실패가 failure_threshold회에 이르면 reset_timeout초 동안
+#   연결을 시도하지 않고 바로 CircuitOpenError를 발생시킵니다. 그 뒤 한 번 시험 연결(half-open)을
+#   허용해 성공하면 닫습니다. DB가 죽었을 때 모든 요청 스레드가 연결 시간 초과까지 묶이지 않습니다.
+# - 복제본 라우팅: readonly=True 작업은 replicas 목록을 돌아가며 보내고, 모든 복제본의 회로가
+#   열려 있으면 primary로 보냅니다. (복제본은 복제 지연만큼 오래된 데이터를 반환할 수 있습니다)
+
+DEFAULT_RETRY_ATTEMPTS = 5
+DEFAULT_RETRY_BASE_DELAY = 0.05  # 첫 재시도 전 대기 시간(초), 재시도마다 두 배
+DEFAULT_RETRY_MAX_DELAY = 2.0    # 재시도 간 최대 대기 시간(초)
+DEFAULT_FAILURE_THRESHOLD = 5    # 회로를 여는 연속 실패 횟수
+DEFAULT_RESET_TIMEOUT = 10.0     # 회로를 연 뒤 시험 연결까지 대기 시간(초)
+
+# SQLSTATE 분류
+SERIALIZATION_FAILURE_CODES = {"40001", "40P01"}           # serialization_failure, deadlock_detected
+TRANSIENT_CODES = {"57P01", "57P02", "57P03", "53300"}     # admin/crash_shutdown, cannot_connect_now, too_many_connections
+TRANSIENT_CLASSES = {"08"}                                 # connection_exception
+
+
+class CircuitOpenError(psycopg2.OperationalError):
+    """회로가 열려 있어 연결을 시도하지 않았을 때 발생합니다. (기존 psycopg2.Error 처리에 그대로 잡힙니다)"""
+
+
+def is_serialization_failure(exc: BaseException) -> bool:
+    return isinstance(exc, psycopg2.Error) and getattr(exc, "pgcode", None) in SERIALIZATION_FAILURE_CODES
+
+
+def is_transient(exc: BaseException) -> bool:
+    """새 연결로 다시 시도하면 성공할 수 있는 오류인지 판단합니다."""
+    if isinstance(exc, CircuitOpenError):
+        return False
+    if not isinstance(exc, psycopg2.Error):
+        return False
+    code = getattr(exc, "pgcode", None)
+    if code is None:
+        # SQLSTATE가 없는 OperationalError/InterfaceError는 연결 실패나 끊김입니다.
+        return isinstance(exc, (psycopg2.OperationalError, psycopg2.InterfaceError))
+    return code in TRANSIENT_CODES or code[:2] in TRANSIENT_CLASSES
+
+
+def is_connection_failure(exc: BaseException) -> bool:
+    """
+    호스트에 연결하지 못한 오류인지 판단합니다. (서킷 브레이커에 실패로 기록할 대상)
+    PoolError(풀 대기 시간 초과, 닫힌 풀)는 호스트가 아니라 이 프로세스의 풀 상태이므로 제외합니다.
+    """
+    if isinstance(exc, (CircuitOpenError, PoolError)) or not isinstance(exc, psycopg2.Error):
+        return False
+    code = getattr(exc, "pgcode", None)
+    return isinstance(exc, psycopg2.OperationalError) or (code is not None and code[:2] in TRANSIENT_CLASSES)
+
+
+class RetryPolicy:
+    """지수 백오프 + 전체 지터(full jitter) 재시도 정책입니다."""
+
+    def __init__(self, attempts: int = DEFAULT_RETRY_ATTEMPTS, base_delay: float = DEFAULT_RETRY_BASE_DELAY,
+                 max_delay: float = DEFAULT_RETRY_MAX_DELAY, jitter: bool = True):
+        if attempts < 1:
+            raise ValueError("attempts는 1 이상이어야 합니다.")
+        self.attempts = attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.jitter = jitter
+
+    def delay(self, attempt: int) -> float:
+        """attempt번째(1부터) 실패 후 기다릴 시간(초)"""
+        delay = min(self.max_delay, self.base_delay * (2 ** (attempt - 1)))
+        return random.uniform(0, delay) if self.jitter else delay
+
+
+class CircuitBreaker:
+    """
+    호스트 하나의 연결 가능 여부를 추적합니다.
+    closed(정상) -> 연속 실패 failure_threshold회 -> open(차단) -> reset_timeout초 후 half_open(시험 1회)
+    시험이 성공하면 closed, 실패하면 다시 open이 됩니다.
+    """
+
+    CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+    def __init__(self, name: str, failure_threshold: int = DEFAULT_FAILURE_THRESHOLD,
+                 reset_timeout: float = DEFAULT_RESET_TIMEOUT):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = 0.0
+        self._state = self.CLOSED
+        self._trial_running = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == self.OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+                return self.HALF_OPEN
+            return self._state
+
+    def allow(self) -> bool:
+        """지금 연결을 시도해도 되는지 반환합니다. half-open 상태에서는 한 스레드만 시험합니다."""
+        with self._lock:
+            if self._state == self.CLOSED:
+                return True
+            if time.monotonic() - self.opened_at < self.reset_timeout or self._trial_running:
+                return False
+            self._state = self.HALF_OPEN
+            self._trial_running = True
+            return True
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._state = self.CLOSED
+            self.failures = 0
+            self._trial_running = False
+
+    def release(self) -> None:
+        """성공/실패를 판단할 수 없는 시도를 끝냅니다. half-open 상태면 다음 호출이 다시 시험할 수 있습니다."""
+        with self._lock:
+            self._trial_running = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            self._trial_running = False
+            if self._state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                if self._state != self.OPEN:
+                    print(f"{self.name}: 회로를 엽니다. (연속 실패 {self.failures}회)", file=sys.stderr)
+                self._state = self.OPEN
+                self.opened_at = time.monotonic()
+
+
+def parse_hosts(hosts: Any, default_port: str = "5432") -> List[Tuple[str, str]]:
+    """"host1:5432,host2" 형식 문자열 또는 (host, port) 목록을 [(host, port), ...]로 변환합니다."""
+    if isinstance(hosts, str):
+        hosts = [h.strip() for h in hosts.split(",") if h.strip()]
+    result = []
+    for item in hosts:
+        if isinstance(item, str):
+            host, _, port = item.partition(":")
+            result.append((host, port or default_port))
+        else:
+            host, port = item
+            result.append((host, str(port)))
+    return result
+
+
+class ResilientDatabase:
+    """
+    primary와 읽기 복제본 풀을 묶어 재시도/서킷 브레이커/읽기 라우팅을 제공합니다.
+
+        db = ResilientDatabase("db1:5432", replicas="db2:5432,db3:5432", dbname=..., user=..., password=...)
+        rows = db.run(lambda conn: fetch(conn), readonly=True)
+        db.run(lambda conn: transfer(conn), idempotent=False)  # 직렬화 실패만 재실행
+
+    풀은 get_pool()로 만들므로 같은 설정을 쓰는 다른 코드와 연결을 공유합니다.
+    pool_kwargs에는 ConnectionPool 인자와 psycopg2.connect() 인자(host/port 제외)를 함께 줍니다.
+    """
+
+    def __init__(self, primary: Any, replicas: Any = (), retry: Optional[RetryPolicy] = None,
+                 failure_threshold: int = DEFAULT_FAILURE_THRESHOLD,
+                 reset_timeout: float = DEFAULT_RESET_TIMEOUT, **pool_kwargs: Any):
+        self.retry = retry or RetryPolicy()
+        self._pool_kwargs = pool_kwargs
+        self.primary = parse_hosts(primary)[0]
+        self.replicas = parse_hosts(replicas)
+        self.breakers: Dict[Tuple[str, str], CircuitBreaker] = {
+            address: CircuitBreaker(f"{address[0]}:{address[1]}", failure_threshold, reset_timeout)
+            for address in [self.primary, *self.replicas]
+        }
+        self._next_replica = itertools.count()
+        self._borrowed: Dict[int, Tuple[str, str]] = {}  # id(conn) -> 빌려온 호스트
+        self._lock = threading.Lock()
+
+    # ------------------------------------------------------------------
+    # 연결 대여
+    # ------------------------------------------------------------------
+
+    def pool(self, address: Tuple[str, str]) -> ConnectionPool:
+        host, port = address
+        return get_pool(host=host, port=port, **self._pool_kwargs)
+
+    def _candidates(self, readonly: bool) -> List[Tuple[str, str]]:
+        """연결을 시도할 호스트 순서: 읽기는 복제본(라운드 로빈) 다음 primary, 쓰기는 primary만"""
+        if not readonly or not self.replicas:
+            return [self.primary]
+        start = next(self._next_replica) % len(self.replicas)
+        return [*self.replicas[start:], *self.replicas[:start], self.primary]
+
+    def getconn(self, readonly: bool = False):
+        """
+        회로가 닫힌 호스트에서 연결을 빌려옵니다. 반환은 putconn()으로 합니다.
+        모든 후보 호스트의 회로가 열려 있으면 CircuitOpenError, 연결에 실패하면 마지막 오류를 발생시킵니다.
+        풀 대기 시간 초과(PoolTimeoutError) 등 PoolError는 호스트 장애가 아니므로 회로에 기록하지 않고 그대로 전달합니다.
+        """
+        last_error: Optional[BaseException] = None
+        for address in self._candidates(readonly):
+            breaker = self.breakers[address]
+            if not breaker.allow():
+                last_error = last_error or CircuitOpenError(f"{breaker.name}: 회로가 열려 있습니다.")
+                continue
+            try:
+                conn = self.pool(address).getconn()
+            except psycopg2.Error as e:
+                if not is_connection_failure(e):
+                    breaker.release()
+                    raise
+                breaker.record_failure()
+                last_error = e
+                continue
+            breaker.record_success()
+            if readonly and address != self.primary and not conn.readonly:
+                # 복제본이 잘못 설정되어 쓰기가 가능한 서버여도 읽기 전용으로만 사용합니다.
+                conn.set_session(readonly=True)
+            with self._lock:
+                self._borrowed[id(conn)] = address
+            return conn
+        raise last_error
+
+    def putconn(self, conn, close: bool = False) -> None:
+        with self._lock:
+            address = self._borrowed.pop(id(conn), self.primary)
+        if not close and not conn.closed and conn.readonly:
+            try:
+                if conn.info.transaction_status != psycopg2.extensions.TRANSACTION_STATUS_IDLE:
+                    conn.rollback()
+                conn.set_session(readonly="default")
+            except psycopg2.Error:
+                close = True
+        self.pool(address).putconn(conn, close=close)
+
+    def _note_failure(self, conn, exc: BaseException) -> None:
+        """실행 중 연결이 끊겼다면 그 호스트의 실패로 기록합니다."""
+        if conn is not None and is_transient(exc):
+            with self._lock:
+                address = self._borrowed.get(id(conn), self.primary)
+            self.breakers[address].record_failure()
+
+    @contextmanager
+    def connection(self, readonly: bool = False) -> Iterator[Any]:
+        """
+        with 문으로 연결을 빌려 쓰는 컨텍스트 매니저입니다. (재시도는 하지 않음, 회로가 열려 있으면 즉시 실패)
+        블록에서 예외가 발생하면 롤백 후 반환하고, 연결이 끊어졌다면 폐기합니다.
+        """
+        conn = self.getconn(readonly)
+        try:
+            yield conn
+        except BaseException as e:
+            self._note_failure(conn, e)
+            broken = conn.closed != 0
+            if not broken:
+                try:
+                    conn.rollback()
+                except psycopg2.Error:
+                    broken = True
+            self.putconn(conn, close=broken)
+            raise
+        else:
+            self.putconn(conn)
+
+    # ------------------------------------------------------------------
+    # 재시도 실행
+    # ------------------------------------------------------------------
+
+    def run(self, fn: Callable[[Any], Any], readonly: bool = False, idempotent: bool = True,
+            retry: Optional[RetryPolicy] = None) -> Any:
+        """
+        fn(conn)을 한 트랜잭션으로 실행하고 커밋한 뒤 fn의 반환값을 돌려줍니다.
+
+        - 직렬화 실패/교착 상태: 항상 새 트랜잭션으로 fn을 다시 실행합니다.
+        - 일시적 연결 오류: idempotent=True일 때만 다시 실행합니다.
+        - 그 밖의 오류나 재시도 횟수를 넘긴 경우 마지막 예외를 그대로 전달합니다.
+        fn은 여러 번 호출될 수 있으므로 트랜잭션 밖의 부수 효과를 두지 않아야 합니다.
+        """
+        policy = retry or self.retry
+        attempt = 0
+        while True:
+            attempt += 1
+            try:
+                with self.connection(readonly) as conn:
+                    if conn.autocommit:
+                        conn.autocommit = False
+                    result = fn(conn)
+                    conn.commit()
+                    return result
+            except psycopg2.Error as e:
+                retryable = is_serialization_failure(e) or (idempotent and is_transient(e))
+                if not retryable or attempt >= policy.attempts:
+                    raise
+                delay = policy.delay(attempt)
+                print(f"일시적 오류로 재시도합니다 ({attempt}/{policy.attempts - 1}, {delay:.2f}초 후): "
+                      f"{str(e).strip().splitlines()[0]}", file=sys.stderr)
+                time.sleep(delay)
+
+    def execute(self, query: Any, params: Optional[Sequence[Any]] = None, readonly: bool = False,
+                idempotent: bool = True, fetch: bool = True) -> Optional[List[Tuple]]:
+        """문장 하나를 run()으로 실행합니다. fetch=True이면 결과 행 목록을 반환합니다."""
+        def statement(conn):
+            with conn.cursor() as cur:
+                cur.execute(query, params)
+                return cur.fetchall() if fetch and cur.description is not None else None
+        return self.run(statement, readonly=readonly, idempotent=idempotent)
+
+    def status(self) -> Dict[str, str]:
+        """호스트별 회로 상태를 반환합니다."""
+        return {breaker.name: breaker.state for breaker in self.breakers.values()}
@@ -0,0 +1,76 @@
+import hashlib
+import threading
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+from psycopg2 import sql
+
+# ----------------------------------------------------------------------
+# 스키마 버전 캐시 (Schema Version Cache)
+# ----------------------------------------------------------------------
+# 스크립트를 실행할 때마다 CREATE EXTENSION / CREATE TABLE IF NOT EXISTS / CREATE INDEX IF NOT EXISTS 를
+# 다시 보내면 아무것도 바뀌지 않아도 문장마다 서버 왕복과 카탈로그 잠금이 생깁니다.
+# ensure_schema()는 DDL 문장 목록의 해시를 스키마 버전으로 삼아 테이블 주석에 기록해 두고,
+#   - 주석의 버전이 같으면 DDL을 건너뜁니다. (조회 1회)
+#   - 같은 프로세스에서 이미 확인한 버전이면 조회도 하지 않습니다. (상주 데몬 모드)
+# DDL 목록이 바뀌면(인덱스 추가 등) 해시가 달라지므로 다음 실행에서 자동으로 다시 적용됩니다.
+
+SCHEMA_COMMENT_PREFIX = "schema_version="
+
+_verified: Dict[Tuple[str, str], str] = {}  # (DSN, 테이블) -> 확인된 버전
+_lock = threading.Lock()
+
+
+def schema_version(cur, statements: Sequence[Any]) -> str:
+    """DDL 문장 목록의 버전 문자열(정규화한 문장의 SHA-1 앞 16자리)을 계산합니다."""
+    digest = hashlib.sha1()
+    for statement in statements:
+        if isinstance(statement, sql.Composable):
+            statement = statement.as_string(cur)
+        digest.update(" ".join(statement.split()).encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()[:16]
+
+
+def installed_version(cur, table: str) -> Optional[str]:
+    """테이블 주석에 기록된 스키마 버전을 반환합니다. 테이블이 없거나 기록이 없으면 None입니다."""
+    cur.execute("SELECT obj_description(to_regclass(%s), 'pg_class')", (table,))
+    row = cur.fetchone()
+    comment = row[0] if row else None
+    if comment and comment.startswith(SCHEMA_COMMENT_PREFIX):
+        return comment[len(SCHEMA_COMMENT_PREFIX):]
+    return None
+
+
+def ensure_schema(cur, table: str, statements: Sequence[Any], force: bool = False) -> bool:
+    """
+    statements를 실행해 table의 스키마를 준비합니다. 이미 같은 버전이 적용되어 있으면 건너뜁니다.
+    DDL을 실행했으면 True, 건너뛰었으면 False를 반환합니다. 커밋은 호출자가 합니다.
+    force=True이면 버전과 관계없이 다시 실행합니다. (테이블을 수동으로 바꾼 경우 등)
+    """
+    version = schema_version(cur, statements)
+    key = (cur.connection.dsn, table)
+    if not force:
+        with _lock:
+            if _verified.get(key) == version:
+                return False
+        if installed_version(cur, table) == version:
+            with _lock:
+                _verified[key] = version
+            return False
+
+    for statement in statements:
+        cur.execute(statement)
+    cur.execute(sql.SQL("COMMENT ON TABLE {} IS {}").format(
+        sql.Identifier(table), sql.Literal(SCHEMA_COMMENT_PREFIX + version)
+    ))
+    # 커밋 전이므로 프로세스 캐시는 다음 확인 때 채웁니다. (롤백되면 다시 적용)
+    with _lock:
+        _verified.pop(key, None)
+    return True
+
+
+def forget_schema(table: Optional[str] = None) -> None:
+    """프로세스 캐시를 비웁니다. (테이블을 DROP한 뒤 같은 프로세스에서 다시 만들 때 호출)"""
+    with _lock:
+        for key in [k for k in _verified if table is None or k[1] == table]:
+            del _verified[key]
@@ -0,0 +1,228 @@
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import psycopg2
+from psycopg2 import sql
+
+from postgres_pagination import DEFAULT_PAGE_SIZE, decode_page_token, encode_page_token
+
+# ----------------------------------------------------------------------
+# 제목 부분 검색 (N-gram Full-text Search)
+# ----------------------------------------------------------------------
+# title = %s 는 정확히 같은 제목만 찾고, LIKE '%알고리즘%' 은 인덱스를 쓰지 못해 전체를 읽습니다.
+# PostgreSQL 기본 텍스트 검색 파서는 한국어를 형태소로 나누지 못하므로, 여기서는 제목을 2글자 단위
+# (bigram)로 잘라 tsvector 생성 컬럼에 저장하고 GIN 인덱스로 찾습니다.
+#   '알고리즘 기초' -> {알고, 고리, 리즘, 즘, 기초, 초}  (단어별 bigram + 단어 끝 글자)
+#   검색어 '고리즘'  -> '고리' & '리즘'                  (한 글자 검색어는 '알':* 접두 검색)
+# bigram이 모두 포함되어도 연속하지 않을 수 있으므로 ILIKE '%검색어%' 로 한 번 더 확인(recheck)합니다.
+# 이 재확인은 GIN 인덱스가 좁힌 후보 행에만 적용되므로 제목 수가 많아도 빠릅니다.
+#
+# 순위: 정확히 일치 > 검색어로 시작 > 단어가 검색어로 시작 > 제목 중 검색어 비율(짧은 제목 우대)
+#       (+ pg_trgm 설치 시 similarity)
+# 페이지: (점수, id) 키셋 토큰을 사용하므로 깊은 페이지도 OFFSET 없이 이어서 조회합니다.
+# 후보 제한: 짧은 검색어('t2', 한 글자 접두 검색)는 일치하는 행이 매우 많아 모두 점수를 매기고 정렬하면
+#   느려지므로, key 순서 앞의 max_candidates개와 검색어로 시작하는 제목(정확히 일치 포함)만 순위를 매깁니다.
+#   잘린 경우 반환된 행 목록의 truncated가 True입니다.
+#
+# 대량 적재: title_ngrams는 생성 컬럼이라 COPY/INSERT 행마다 text_bigrams()와 GIN 인덱스 갱신이 일어납니다.
+#   수십만 행 이상을 한 번에 넣을 때는 검색 인덱스를 지우고(DROP INDEX books_title_ngrams_idx)
+#   postgres_bulk.bulk_insert()로 적재한 뒤 install_title_search()로 인덱스를 다시 만드는 편이 빠릅니다.
+#
+# pg_trgm 확장을 설치할 수 있는 환경이면 install_title_search(use_trgm=True)가 gin_trgm_ops 인덱스를
+# 함께 만들어 순위에 문자열 유사도를 반영합니다. (C 로케일 DB에서는 pg_trgm이 한글을 무시하므로
+# 한국어 검색은 bigram 컬럼이 담당합니다)
+
+BIGRAM_FUNCTIONS_SQL = r"""
+CREATE OR REPLACE FUNCTION text_bigrams(text) RETURNS tsvector AS $$
+    -- 단어별 2글자 조각과 단어의 마지막 글자(한 글자 검색어의 접두 검색용)를 lexeme으로 저장합니다.
+    -- 생성 컬럼으로 행마다(COPY 포함) 실행되므로 집합 반환 함수/LATERAL 없이 배열 한 번으로 만듭니다.
+    -- (array_to_tsvector가 중복 lexeme을 제거합니다)
+DECLARE
+    word text;
+    grams text[] := '{}';
+    n int;
+BEGIN
+    FOREACH word IN ARRAY regexp_split_to_array(lower(coalesce($1, '')), '[[:space:][:punct:]]+') LOOP
+        n := char_length(word);
+        CONTINUE WHEN n = 0;
+        FOR i IN 1 .. n - 1 LOOP
+            grams := grams || substr(word, i, 2);
+        END LOOP;
+        grams := grams || right(word, 1);
+    END LOOP;
+    RETURN array_to_tsvector(grams);
+END
+$$ LANGUAGE plpgsql IMMUTABLE PARALLEL SAFE;
+
+CREATE OR REPLACE FUNCTION text_bigram_query(text) RETURNS tsquery AS $$
+    -- 검색어의 bigram을 모두 포함(&)하는 tsquery를 만듭니다. 한 글자 단어는 접두 검색(:*)입니다.
+    SELECT coalesce(string_agg(
+               '''' || replace(replace(gram, '\', '\\'), '''', '''''') || ''''
+               || CASE WHEN char_length(gram) = 1 THEN ':*' ELSE '' END, ' & '), '')::tsquery
+    FROM regexp_split_to_table(lower(coalesce($1, '')), '[[:space:][:punct:]]+') AS word,
+         LATERAL (
+             SELECT DISTINCT substr(word, i, 2) AS gram
+             FROM generate_series(1, greatest(char_length(word) - 1, 1)) AS i
+         ) AS grams
+    WHERE word <> ''
+$$ LANGUAGE sql IMMUTABLE PARALLEL SAFE;
+"""
+
+DEFAULT_MAX_CANDIDATES = 1_000  # 순위를 매기기 전에 읽을 최대 후보 행 수
+
+_trgm_cache: Dict[str, bool] = {}
+
+
+def search_column(column: str) -> str:
+    return f"{column}_ngrams"
+
+
+def title_search_statements(table: str = "books", column: str = "title") -> List[sql.Composable]:
+    """bigram 함수, tsvector 생성 컬럼, GIN 인덱스와 접두 검색용 인덱스를 만드는 문장 목록을 반환합니다."""
+    vector = search_column(column)
+    return [
+        sql.SQL(BIGRAM_FUNCTIONS_SQL),
+        # 생성 컬럼 추가는 기존 행 전체를 다시 쓰므로 큰 테이블에서는 트래픽이 적을 때 실행합니다.
+        sql.SQL("ALTER TABLE {} ADD COLUMN IF NOT EXISTS {} tsvector GENERATED ALWAYS AS (text_bigrams({})) STORED")
+        .format(sql.Identifier(table), sql.Identifier(vector), sql.Identifier(column)),
+        sql.SQL("CREATE INDEX IF NOT EXISTS {} ON {} USING gin ({})").format(
+            sql.Identifier(f"{table}_{vector}_idx"), sql.Identifier(table), sql.Identifier(vector)
+        ),
+        # 검색어와 같거나 검색어로 시작하는 제목을 사전순으로 찾는 인덱스 (후보 제한 시 이 행들은 항상 포함)
+        sql.SQL('CREATE INDEX IF NOT EXISTS {} ON {} ((lower({}) COLLATE "C"))').format(
+            sql.Identifier(f"{table}_{column}_lower_idx"), sql.Identifier(table), sql.Identifier(column)
+        ),
+    ]
+
+
+def install_title_search(cur, table: str = "books", column: str = "title", use_trgm: bool = False) -> bool:
+    """
+    검색용 함수/컬럼/인덱스를 만듭니다. use_trgm=True이면 pg_trgm 확장과 gin_trgm_ops 인덱스도 시도하며,
+    확장을 설치할 수 없으면 bigram 검색만 사용합니다. pg_trgm 인덱스를 만들었으면 True를 반환합니다.
+    커밋은 호출자가 합니다.
+    """
+    for statement in title_search_statements(table, column):
+        cur.execute(statement)
+    if not use_trgm:
+        return False
+    cur.execute("SAVEPOINT title_search_trgm")
+    try:
+        cur.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        cur.execute(sql.SQL("CREATE INDEX IF NOT EXISTS {} ON {} USING gin ({} gin_trgm_ops)").format(
+            sql.Identifier(f"{table}_{column}_trgm_idx"), sql.Identifier(table), sql.Identifier(column)
+        ))
+    except psycopg2.Error:
+        cur.execute("ROLLBACK TO SAVEPOINT title_search_trgm")
+        return False
+    cur.execute("RELEASE SAVEPOINT title_search_trgm")
+    _trgm_cache.pop(cur.connection.dsn, None)
+    return True
+
+
+def has_trgm(cur) -> bool:
+    """현재 데이터베이스에 pg_trgm이 설치되어 있는지 확인합니다. (연결 DSN별 캐시)"""
+    dsn = cur.connection.dsn
+    if dsn not in _trgm_cache:
+        cur.execute("SELECT EXISTS (SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm')")
+        _trgm_cache[dsn] = cur.fetchone()[0]
+    return _trgm_cache[dsn]
+
+
+def _like_pattern(text: str) -> str:
+    escaped = text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+
+class SearchResults(list):
+    """search()가 반환하는 한 페이지의 행 목록입니다. truncated: 후보 제한으로 일부 일치 행을 순위에서 뺐는지 여부"""
+
+    def __init__(self, rows: Sequence[Tuple] = (), truncated: bool = False):
+        super().__init__(rows)
+        self.truncated = truncated
+
+
+def search(cur, text: str, table: str = "books", column: str = "title",
+           columns: Sequence[str] = ("id", "title", "price"), key: str = "id",
+           page_size: int = DEFAULT_PAGE_SIZE, page_token: Optional[str] = None,
+           use_trgm: Optional[bool] = None,
+           max_candidates: Optional[int] = DEFAULT_MAX_CANDIDATES) -> Tuple[SearchResults, Optional[str]]:
+    """
+    column에 text가 포함된 행을 순위순으로 한 페이지 조회하고 (행 목록, 다음 페이지 토큰)을 반환합니다.
+    행은 columns 값 뒤에 점수(score)가 붙은 튜플입니다. 검색어에 글자가 없으면 빈 결과를 반환합니다.
+    use_trgm이 None이면 pg_trgm 설치 여부를 확인해 자동으로 사용합니다.
+    max_candidates: 순위를 매길 후보 수의 상한입니다. (None이면 일치하는 행 전체)
+      후보는 key 순서로 앞의 max_candidates개와, 제목이 검색어와 같거나 검색어로 시작하는 행 중
+      사전순 앞의 max_candidates개(정확히 일치하는 제목이 맨 앞)입니다. 데이터가 바뀌지 않으면 모든 페이지가
+      같은 후보를 사용하며, 일치하는 행이 더 있어 잘렸으면 반환된 행 목록의 truncated가 True입니다.
+    """
+    text = " ".join(text.split())
+    if page_size < 1:
+        raise ValueError("page_size는 1 이상이어야 합니다.")
+    if max_candidates is not None and max_candidates < 1:
+        raise ValueError("max_candidates는 1 이상이어야 합니다.")
+    if not any(ch.isalnum() for ch in text):
+        return SearchResults(), None
+    if use_trgm is None:
+        use_trgm = has_trgm(cur)
+
+    target = sql.Identifier(column)
+    vector = sql.Identifier(search_column(column))
+    score = sql.SQL(
+        "(lower({col}) = lower(%(text)s))::int * 3 + ({col} ILIKE %(prefix)s)::int * 2"
+        " + ({col} ILIKE %(word)s)::int + char_length(%(text)s)::float8 / greatest(char_length({col}), 1)"
+    ).format(col=target)
+    if use_trgm:
+        score += sql.SQL(" + similarity({}, %(text)s)::float8").format(target)
+
+    params: Dict[str, Any] = {
+        "text": text,
+        "pattern": _like_pattern(text),
+        "prefix": _like_pattern(text)[1:],
+        "word": "% " + _like_pattern(text)[1:],
+        "limit": page_size + 1,
+        "candidates": max_candidates,
+        "probe": None if max_candidates is None else max_candidates + 1,
+        "prefixed": 0 if max_candidates is None else max_candidates,  # 제한이 없으면 matched에 이미 모두 포함
+    }
+    signature = f"search:{table}:{column}:{text}:{max_candidates}"
+    seek = sql.SQL("")
+    if page_token:
+        last_score, last_key = decode_page_token(page_token, signature)
+        seek = sql.SQL(" WHERE (score, {key}) < (%(last_score)s, %(last_key)s)").format(key=sql.Identifier(key))
+        params.update(last_score=last_score, last_key=last_key)
+
+    # 후보 제한은 순서가 정해진 두 갈래로 만듭니다. (LIMIT만 두면 비트맵 스캔이 먼저 준 행이 남아
+    # 정확히 일치하는 제목이 빠지거나 페이지마다 후보가 달라질 수 있음)
+    #  - matched: 일치하는 행을 key 순서로 max_candidates + 1개 (1개 더 읽어 잘렸는지 확인)
+    #  - prefixed: lower(제목)이 검색어로 시작하는 행을 사전순으로 max_candidates개
+    #             ({table}_{column}_lower_idx 인덱스를 순서대로 읽으며, 정확히 일치하는 제목이 맨 앞)
+    # NULL LIMIT은 제한이 없으므로 max_candidates=None이면 일치하는 행 전체가 후보입니다.
+    query = sql.SQL(
+        "WITH matched AS ("
+        "SELECT {fetched} FROM {table} WHERE {vec} @@ text_bigram_query(%(text)s) AND {col} ILIKE %(pattern)s "
+        "ORDER BY {key} LIMIT %(probe)s), "
+        "prefixed AS ("
+        "SELECT {fetched} FROM {table} WHERE lower({col}) COLLATE \"C\" LIKE lower(%(prefix)s) "
+        "ORDER BY lower({col}) COLLATE \"C\", {key} LIMIT %(prefixed)s), "
+        "candidates AS ("
+        "(SELECT * FROM matched ORDER BY {key} LIMIT %(candidates)s) UNION SELECT * FROM prefixed) "
+        "SELECT *, (SELECT count(*) FROM matched) > %(candidates)s AS truncated FROM ("
+        "SELECT {columns}, {score} AS score FROM candidates) AS ranked"
+        "{seek} ORDER BY score DESC, {key} DESC LIMIT %(limit)s"
+    ).format(
+        columns=sql.SQL(", ").join(map(sql.Identifier, columns)),
+        fetched=sql.SQL(", ").join(map(sql.Identifier, dict.fromkeys([*columns, column, key]))),
+        score=score,
+        table=sql.Identifier(table),
+        vec=vector,
+        col=target,
+        seek=seek,
+        key=sql.Identifier(key),
+    )
+    cur.execute(query, params)
+    fetched = cur.fetchall()
+    truncated = bool(fetched) and bool(fetched[0][-1])
+    rows = SearchResults([row[:-1] for row in fetched[:page_size]], truncated)
+    if len(fetched) <= page_size:
+        return rows, None
+    last = rows[-1]
+    return rows, encode_page_token([last[-1], last[list(columns).index(key)]], signature)
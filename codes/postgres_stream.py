@@ -0,0 +1,40 @@
+import itertools
+from typing import Any, Iterator, Optional, Sequence, Tuple
+
+# ----------------------------------------------------------------------
+# 서버 측 커서 스트리밍 (Server-side Cursor Streaming)
+# ----------------------------------------------------------------------
+# fetchall()은 결과 전체를 파이썬 리스트로 만든 뒤에야 반환하므로
+# 메모리가 테이블 크기에 비례하고, 첫 행을 받기까지 마지막 행을 기다려야 합니다.
+# 이름 있는(named) 커서는 결과를 서버에 두고 itersize 행씩 가져오므로
+# 큰 테이블도 일정한 메모리로 첫 행부터 바로 처리할 수 있습니다.
+
+DEFAULT_ITERSIZE = 2000  # 서버에서 한 번에 가져올 행 수
+
+_cursor_seq = itertools.count(1)
+
+
+def stream_query(conn, query: Any, params: Optional[Sequence[Any]] = None,
+                 itersize: int = DEFAULT_ITERSIZE, name: Optional[str] = None) -> Iterator[Tuple]:
+    """
+    query 결과를 서버 측 커서로 한 행씩 생성하는 제너레이터입니다.
+
+    이름 있는 커서는 트랜잭션 안에서만 동작하므로, autocommit 연결이면
+    스트리밍 동안만 autocommit을 끄고 끝나면(중간에 멈춰도) 원래대로 되돌립니다.
+    """
+    restore_autocommit = conn.autocommit
+    if restore_autocommit:
+        conn.autocommit = False
+
+    cursor_name = name or f"stream_cursor_{next(_cursor_seq)}"
+    try:
+        with conn.cursor(name=cursor_name) as cur:
+            cur.itersize = itersize
+            cur.execute(query, params)
+            for row in cur:
+                yield row
+    finally:
+        if restore_autocommit and not conn.closed:
+            # 읽기 전용 트랜잭션을 정리하고 autocommit을 복원합니다.
+            conn.rollback()
+            conn.autocommit = True
@@ -0,0 +1,92 @@
+import os
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import Optional
+
+from psycopg2 import sql
+
+# ----------------------------------------------------------------------
+# 시간 순서 UUID (UUIDv7, RFC 9562)
+# ----------------------------------------------------------------------
+# uuid_generate_v4()의 무작위 키는 삽입 위치가 B-tree 전체에 흩어져 페이지 분할과
+# 인덱스 팽창, 버퍼 캐시 교체가 잦아집니다. UUIDv7은 앞 48비트가 밀리초 Unix 시각이므로
+# 새 키가 항상 인덱스 오른쪽 끝에 쌓여 순차 삽입과 비슷하게 동작합니다.
+#
+#   | unix_ts_ms (48) | ver=7 (4) | rand_a (12) | var=10 (2) | rand_b (62) |
+#
+# - 클라이언트 생성: uuid7() (같은 밀리초 안에서는 rand_a를 카운터로 사용해 단조 증가)
+# - 서버 생성: UUID7_FUNCTION_SQL의 uuid_generate_v7() (확장 없이 PostgreSQL 13+ 기본 함수만 사용)
+
+UUID7_FUNCTION_SQL = """
+CREATE OR REPLACE FUNCTION uuid_generate_v7() RETURNS uuid AS $$
+    -- gen_random_uuid()(v4)의 앞 6바이트를 밀리초 시각으로 덮어쓰고 버전 비트를 0111로 바꿉니다.
+    SELECT encode(
+        set_bit(
+            set_bit(
+                overlay(uuid_send(gen_random_uuid())
+                        placing substring(int8send(floor(extract(epoch FROM clock_timestamp()) * 1000)::bigint) FROM 3)
+                        FROM 1 FOR 6),
+                52, 1),
+            53, 1),
+        'hex')::uuid
+$$ LANGUAGE sql VOLATILE PARALLEL SAFE;
+"""
+
+_lock = threading.Lock()
+_last_ms = 0
+_counter = 0
+
+
+def uuid7(timestamp_ms: Optional[int] = None) -> uuid.UUID:
+    """
+    UUIDv7을 생성합니다. timestamp_ms를 주지 않으면 현재 시각을 사용합니다.
+    같은 프로세스에서 연속으로 생성한 값은 (시계가 되돌아가도) 항상 증가합니다.
+    """
+    global _last_ms, _counter
+    with _lock:
+        ms = time.time_ns() // 1_000_000 if timestamp_ms is None else timestamp_ms
+        if ms > _last_ms:
+            _last_ms = ms
+            _counter = int.from_bytes(os.urandom(2), "big") & 0x7FF  # 상위 1비트를 남겨 오버플로 여유 확보
+        else:
+            _counter += 1
+            if _counter > 0xFFF:  # 같은 밀리초에 4096개 초과: 다음 밀리초로 넘김
+                _last_ms += 1
+                _counter = 0
+        ms, counter = _last_ms, _counter
+
+    rand_b = int.from_bytes(os.urandom(8), "big") & ((1 << 62) - 1)
+    value = (ms & ((1 << 48) - 1)) << 80 | 0x7 << 76 | counter << 64 | 0b10 << 62 | rand_b
+    return uuid.UUID(int=value)
+
+
+def uuid7_timestamp(value: uuid.UUID) -> datetime:
+    """UUIDv7에 기록된 생성 시각(UTC)을 반환합니다."""
+    if value.version != 7:
+        raise ValueError(f"UUIDv7이 아닙니다: {value}")
+    return datetime.fromtimestamp((value.int >> 80) / 1000, tz=timezone.utc)
+
+
+def install_uuid7_function(cur) -> None:
+    """현재 데이터베이스에 uuid_generate_v7() 함수를 만듭니다. (이미 있으면 교체)"""
+    cur.execute(UUID7_FUNCTION_SQL)
+
+
+def migrate_to_uuid7(cur, table: str, column: str = "id", reindex: bool = False) -> None:
+    """
+    기존 테이블의 UUID 키 기본값을 uuid_generate_v7()로 바꿉니다.
+
+    - 기존 행의 v4 키는 그대로 둡니다. (외래 키/외부 시스템이 참조할 수 있으므로 값을 바꾸지 않음)
+      이후 삽입되는 행부터 인덱스 오른쪽 끝에 쌓입니다.
+    - reindex=True이면 그동안 무작위 삽입으로 팽창한 테이블 인덱스를 다시 만듭니다.
+      (REINDEX는 쓰기를 막으므로 트래픽이 적을 때 실행합니다)
+    - 커밋은 호출자가 합니다.
+    """
+    install_uuid7_function(cur)
+    cur.execute(sql.SQL("ALTER TABLE {} ALTER COLUMN {} SET DEFAULT uuid_generate_v7()").format(
+        sql.Identifier(table), sql.Identifier(column)
+    ))
+    if reindex:
+        cur.execute(sql.SQL("REINDEX TABLE {}").format(sql.Identifier(table)))
@@ -0,0 +1,272 @@
+import sys
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, ContextManager, Dict, List, Optional, Sequence, Tuple
+
+from psycopg2 import sql
+from psycopg2.extras import execute_values
+
+from postgres_modify import update_many
+
+# ----------------------------------------------------------------------
+# 쓰기 지연 버퍼 (Write-behind Batching)
+# ----------------------------------------------------------------------
+# 여러 요청 스레드가 한두 행씩 insert/update를 보내면 호출마다 연결 대여 + 트랜잭션 + 커밋 비용이 듭니다.
+# WriteBehindBuffer는 쓰기를 메모리에 모았다가 백그라운드 스레드에서 한 트랜잭션으로 내보냅니다.
+#   - INSERT: 모인 행 전체를 INSERT ... VALUES (...), (...) RETURNING 한 문장으로
+#   - UPDATE: 같은 키의 수정은 마지막 값만 남기고 UPDATE ... FROM (VALUES ...) 한 문장으로
+# 버퍼가 max_batch개에 도달하거나 가장 오래된 쓰기가 max_delay초를 넘으면 내보냅니다.
+# 호출자는 Future를 받으며, 커밋 후 생성된 값(RETURNING) 또는 수정된 행으로 완료됩니다.
+# 한 트랜잭션이 실패하면 그 배치에 포함된 모든 Future가 같은 예외로 완료됩니다.
+# 커밋 전에 프로세스가 죽으면 버퍼의 쓰기는 사라지므로, 종료 시에는 반드시 flush()/close()를 호출합니다.
+
+DEFAULT_MAX_BATCH = 500        # 한 트랜잭션에 모을 최대 쓰기 수
+DEFAULT_MAX_DELAY = 0.05       # 첫 쓰기 후 내보내기까지 최대 대기 시간(초)
+DEFAULT_MAX_PENDING = 10_000   # 버퍼가 이만큼 차면 새 쓰기는 자리가 날 때까지 대기
+
+
+class WriteBehindBuffer:
+    """
+    한 테이블에 대한 insert/update를 모아 일괄 반영하는 스레드 안전 버퍼입니다.
+
+        buffer = WriteBehindBuffer(get_connection, "books", ("title", "price"), ("price",))
+        future = buffer.insert(("파이썬 입문", 19000))
+        buffer.update(book_id, (27000,))
+        new_id = future.result()[0]
+        buffer.close()
+
+    connection_factory는 호출할 때마다 연결을 빌려주는 컨텍스트 매니저를 반환해야 합니다. (예: pool.connection)
+    on_flush(conn)는 커밋 직후 같은 연결로 호출됩니다. (캐시 무효화 등)
+    쓰기는 이미 커밋되었으므로 on_flush가 실패해도 Future는 정상 완료되며, 오류는 로그와 flush_errors로만 남습니다.
+    """
+
+    def __init__(self, connection_factory: Callable[[], ContextManager], table: str = "books",
+                 insert_columns: Sequence[str] = ("title", "price"),
+                 update_columns: Sequence[str] = ("price",), key: str = "id",
+                 returning: Sequence[str] = ("id",),
+                 max_batch: int = DEFAULT_MAX_BATCH, max_delay: float = DEFAULT_MAX_DELAY,
+                 max_pending: int = DEFAULT_MAX_PENDING,
+                 on_flush: Optional[Callable[[Any], None]] = None):
+        if max_batch < 1 or max_pending < max_batch:
+            raise ValueError("max_batch는 1 이상, max_pending은 max_batch 이상이어야 합니다.")
+        self.connection_factory = connection_factory
+        self.table = table
+        self.insert_columns = tuple(insert_columns)
+        self.update_columns = tuple(update_columns)
+        self.key = key
+        self.returning = tuple(returning)
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.max_pending = max_pending
+        self.on_flush = on_flush
+
+        self.batches = 0    # 내보낸 트랜잭션 수
+        self.written = 0    # 반영된 쓰기 수
+        self.failed = 0     # 실패한 쓰기 수
+        self.flush_errors = 0  # on_flush 호출이 실패한 횟수 (쓰기 자체는 커밋됨)
+
+        self._inserts: List[Tuple[Sequence[Any], Future]] = []
+        self._updates: List[Tuple[Any, Sequence[Any], Future]] = []
+        self._first_at: Optional[float] = None  # 버퍼의 가장 오래된 쓰기 시각
+        self._enqueued = 0   # 지금까지 받은 쓰기 수
+        self._completed = 0  # 지금까지 처리(성공/실패)가 끝난 쓰기 수
+        self._flush_requested = False
+        self._closed = False
+        self._cond = threading.Condition()
+        self._thread = threading.Thread(target=self._run, name=f"write-behind-{table}", daemon=True)
+        self._thread.start()
+
+    # ------------------------------------------------------------------
+    # 쓰기 요청
+    # ------------------------------------------------------------------
+
+    def _enqueue(self, item: tuple, queue: list) -> Future:
+        with self._cond:
+            while not self._closed and self._pending() >= self.max_pending:
+                self._cond.wait()
+            if self._closed:
+                raise RuntimeError("닫힌 쓰기 버퍼입니다.")
+            queue.append(item)
+            self._enqueued += 1
+            if self._first_at is None:
+                self._first_at = time.monotonic()
+            self._cond.notify_all()
+        return item[-1]
+
+    def insert(self, row: Sequence[Any]) -> Future:
+        """insert_columns 순서의 행 하나를 삽입 예약합니다. Future는 RETURNING 값 튜플로 완료됩니다."""
+        if len(row) != len(self.insert_columns):
+            raise ValueError(f"삽입 컬럼 수가 맞지 않습니다: {len(row)} != {len(self.insert_columns)}")
+        return self._enqueue((tuple(row), Future()), self._inserts)
+
+    def update(self, key_value: Any, values: Sequence[Any]) -> Future:
+        """
+        key가 key_value인 행의 update_columns를 values로 수정 예약합니다.
+        Future는 수정된 행의 (key, update_columns...) 튜플로, 해당 행이 없으면 None으로 완료됩니다.
+        """
+        if len(values) != len(self.update_columns):
+            raise ValueError(f"수정 컬럼 수가 맞지 않습니다: {len(values)} != {len(self.update_columns)}")
+        return self._enqueue((key_value, tuple(values), Future()), self._updates)
+
+    # ------------------------------------------------------------------
+    # 내보내기
+    # ------------------------------------------------------------------
+
+    def _pending(self) -> int:
+        return len(self._inserts) + len(self._updates)
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        지금까지 받은 쓰기가 모두 커밋(또는 실패 처리)될 때까지 기다립니다.
+        timeout 안에 끝나면 True를 반환합니다. 개별 실패는 각 Future의 예외로 전달됩니다.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            target = self._enqueued
+            self._flush_requested = True
+            self._cond.notify_all()
+            while self._completed < target:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+        return True
+
+    def close(self, timeout: Optional[float] = None) -> bool:
+        """새 쓰기를 막고 남은 쓰기를 모두 내보낸 뒤 백그라운드 스레드를 종료합니다."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self._thread.join(timeout)
+        return not self._thread.is_alive()
+
+    def __enter__(self) -> "WriteBehindBuffer":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def _take_batch(self) -> Tuple[list, list]:
+        """
+        버퍼 앞쪽에서 최대 max_batch개의 쓰기를 꺼냅니다. (잠금을 잡은 상태에서 호출)
+        호출자가 이미 취소한 쓰기는 버리고 처리된 것으로 셉니다. 나머지 Future는 실행 중 상태가 되어
+        더 이상 취소할 수 없으므로, 결과를 설정할 때 InvalidStateError가 나지 않습니다.
+        """
+        inserts = self._inserts[:self.max_batch]
+        updates = self._updates[:self.max_batch - len(inserts)]
+        del self._inserts[:len(inserts)]
+        del self._updates[:len(updates)]
+        taken = len(inserts) + len(updates)
+        inserts = [item for item in inserts if item[-1].set_running_or_notify_cancel()]
+        updates = [item for item in updates if item[-1].set_running_or_notify_cancel()]
+        self._completed += taken - len(inserts) - len(updates)
+        self._first_at = time.monotonic() if self._pending() else None
+        if not self._pending():
+            self._flush_requested = False
+        self._cond.notify_all()  # max_pending으로 대기 중인 쓰기 요청을 깨움
+        return inserts, updates
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while True:
+                    pending = self._pending()
+                    if pending >= self.max_batch or (pending and (self._flush_requested or self._closed)):
+                        break
+                    if self._closed:
+                        return
+                    if pending:
+                        wait = self._first_at + self.max_delay - time.monotonic()
+                        if wait <= 0:
+                            break
+                        self._cond.wait(wait)
+                    else:
+                        self._cond.wait()
+                inserts, updates = self._take_batch()
+                if not inserts and not updates:  # 모두 취소됨
+                    continue
+
+            try:
+                self._write(inserts, updates)
+            except Exception as e:
+                # 예상하지 못한 오류로 스레드가 끝나면 이후 쓰기와 flush()가 영원히 기다리므로,
+                # 아직 완료되지 않은 Future만 실패로 완료하고 계속 진행합니다.
+                self._fail([item for item in inserts + updates if not item[-1].done()], e)
+            finally:
+                with self._cond:
+                    self._completed += len(inserts) + len(updates)
+                    self._cond.notify_all()
+
+    def _write(self, inserts: list, updates: list) -> None:
+        """꺼낸 쓰기를 한 트랜잭션으로 반영하고 Future를 완료합니다."""
+        # 같은 키의 수정은 마지막 값만 반영하고, 결과는 모든 Future에 전달합니다.
+        latest: Dict[Any, Sequence[Any]] = {}
+        for key_value, values, _ in updates:
+            latest[key_value] = values
+
+        committed = False
+        try:
+            with self.connection_factory() as conn:
+                with conn.cursor() as cur:
+                    inserted = self._insert_rows(cur, [row for row, _ in inserts])
+                    updated = update_many(cur, self.table, self.key, self.update_columns,
+                                          [(k, *v) for k, v in latest.items()],
+                                          returning=(self.key, *self.update_columns)) if latest else []
+                conn.commit()
+                committed = True
+                if self.on_flush is not None:
+                    self._call_on_flush(conn)
+        except Exception as e:
+            if committed:  # 커밋 후 연결 반환 중 오류: 쓰기는 반영되었으므로 Future는 성공으로 완료
+                print(f"쓰기 버퍼 연결 반환 오류: {e}", file=sys.stderr)
+            else:
+                self._fail(inserts + updates, e)
+                return
+
+        self.batches += 1
+        self.written += len(inserts) + len(updates)
+        for (_, future), result in zip(inserts, inserted):
+            future.set_result(result)
+        rows_by_key = {str(row[0]): row for row in updated}
+        for key_value, _, future in updates:
+            future.set_result(rows_by_key.get(str(key_value)))
+
+    def _fail(self, writes: list, error: Exception) -> None:
+        """커밋되지 않은 배치의 Future를 모두 같은 예외로 완료합니다."""
+        self.failed += len(writes)
+        print(f"쓰기 버퍼 반영 오류 ({len(writes)}건): {error}", file=sys.stderr)
+        for *_, future in writes:
+            future.set_exception(error)
+
+    def _call_on_flush(self, conn) -> None:
+        """
+        커밋 후 on_flush(conn)를 호출합니다. 실패해도 예외를 전달하지 않습니다.
+        (Future를 실패로 완료하면 이미 커밋된 쓰기를 호출자가 다시 시도해 중복 행이 생깁니다)
+        """
+        try:
+            self.on_flush(conn)
+        except Exception as e:
+            self.flush_errors += 1
+            print(f"쓰기 버퍼 on_flush 오류 (쓰기는 커밋됨): {e}", file=sys.stderr)
+            try:
+                conn.rollback()  # on_flush가 남긴 실패한 트랜잭션 정리
+            except Exception:
+                pass
+
+    def _insert_rows(self, cur, rows: List[Sequence[Any]]) -> List[Tuple]:
+        """행 전체를 INSERT ... VALUES 한 문장으로 삽입하고 RETURNING 값을 입력 순서대로 반환합니다."""
+        if not rows:
+            return []
+        query = sql.SQL("INSERT INTO {} ({}) VALUES %s RETURNING {}").format(
+            sql.Identifier(self.table),
+            sql.SQL(", ").join(map(sql.Identifier, self.insert_columns)),
+            sql.SQL(", ").join(map(sql.Identifier, self.returning)),
+        )
+        return execute_values(cur, query, rows, page_size=len(rows), fetch=True)
+
+    def stats(self) -> Dict[str, int]:
+        with self._cond:
+            pending = self._pending()
+        return {"pending": pending, "batches": self.batches, "written": self.written, "failed": self.failed,
+                "flush_errors": self.flush_errors}
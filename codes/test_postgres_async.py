@@ -0,0 +1,87 @@
+import asyncio
+
+from psycopg2.pool import PoolError
+import pytest
+
+from postgres_async import AsyncConnection, AsyncConnectionPool
+from postgres_metrics import QueryMetrics
+
+
+@pytest.fixture
+def pings(monkeypatch):
+    """AsyncConnection.ping 호출 횟수를 셉니다."""
+    calls = []
+    ping = AsyncConnection.ping
+
+    async def counting_ping(self):
+        calls.append(self)
+        await ping(self)
+
+    monkeypatch.setattr(AsyncConnection, "ping", counting_ping)
+    return calls
+
+
+def _shapes(metrics: QueryMetrics):
+    return [q["shape"] for q in metrics.snapshot()["queries"]]
+
+
+def test_recently_used_connection_is_not_pinged(pg_params, pings):
+    metrics = QueryMetrics()
+
+    async def main():
+        async with AsyncConnectionPool(minconn=1, maxconn=1, health_check_idle=60.0, metrics=metrics,
+                                       **pg_params) as pool:
+            for _ in range(3):
+                async with pool.connection() as conn:
+                    assert await conn.fetchone("SELECT 2") == (2,)
+
+    asyncio.run(main())
+    assert pings == []
+    assert _shapes(metrics) == ["SELECT ?"]
+
+
+def test_idle_connection_ping_is_not_recorded(pg_params, pings):
+    metrics = QueryMetrics()
+
+    async def main():
+        async with AsyncConnectionPool(minconn=1, maxconn=1, health_check_idle=0.0, metrics=metrics,
+                                       **pg_params) as pool:
+            async with pool.connection():
+                pass
+            async with pool.connection() as conn:
+                await conn.run("SELECT 2")
+
+    asyncio.run(main())
+    assert len(pings) == 2
+    assert [q["count"] for q in metrics.snapshot()["queries"]] == [1]  # SELECT 2만 기록
+
+
+def test_dead_idle_connection_is_replaced(pg_params, pg_conn):
+    async def main():
+        async with AsyncConnectionPool(minconn=1, maxconn=1, health_check_idle=0.0, **pg_params) as pool:
+            async with pool.connection() as conn:
+                pid = conn.raw.get_backend_pid()
+            with pg_conn.cursor() as cur:
+                cur.execute("SELECT pg_terminate_backend(%s)", (pid,))
+            async with pool.connection() as conn:
+                assert conn.raw.get_backend_pid() != pid
+                assert await conn.fetchone("SELECT 1") == (1,)
+            assert pool.size == 1
+
+    asyncio.run(main())
+
+
+def test_close_nowait_closes_idle_connections(pg_params):
+    async def main():
+        return await AsyncConnectionPool(minconn=2, maxconn=2, **pg_params).open()
+
+    pool = asyncio.run(main())  # 루프가 끝나 close()를 await할 수 없는 풀
+    idle = list(pool._idle)
+    pool.close_nowait()
+    assert pool.size == 0 and all(conn.closed for conn in idle)
+
+    async def reuse():
+        await pool.getconn()
+
+    with pytest.raises(PoolError):
+        asyncio.run(reuse())
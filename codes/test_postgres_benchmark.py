@@ -0,0 +1,53 @@
+import json
+import math
+import random
+
+from postgres_benchmark import PRICE_RANGE, compare, make_rows, parse_args, percentile, summarize
+
+
+def test_percentile_nearest_rank():
+    values = [float(v) for v in range(1, 101)]
+    assert percentile(values, 50) == 50.0
+    assert percentile(values, 99) == 99.0
+    assert percentile(values, 0) == 1.0
+    assert percentile([3.0], 99) == 3.0
+    assert math.isnan(percentile([], 50))
+
+
+def test_summarize():
+    result = summarize("read", 1000, [0.002, 0.001, 0.003, 0.002], rows_per_op=10)
+    assert result["ops"] == 4 and result["total_seconds"] == 0.008
+    assert result["ops_per_sec"] == 500.0 and result["rows_per_sec"] == 5000.0
+    assert (result["mean_ms"], result["p50_ms"], result["p99_ms"], result["max_ms"]) == (2.0, 2.0, 3.0, 3.0)
+    empty = summarize("read", 1000, [], rows_per_op=1)
+    assert empty["ops_per_sec"] is None and empty["max_ms"] is None
+
+
+def test_make_rows_is_reproducible():
+    rows = make_rows(random.Random(1), 100, size_hint=40)
+    assert rows == make_rows(random.Random(1), 100, size_hint=40)
+    assert len({title for title, _ in rows}) <= 10
+    assert all(0 <= price < PRICE_RANGE for _, price in rows)
+
+
+def test_compare_reports_p50_regressions(tmp_path):
+    baseline = tmp_path / "baseline.json"
+    baseline.write_text(json.dumps({"results": [
+        {"case": "read", "size": 10, "p50_ms": 1.0},
+        {"case": "insert", "size": 10, "p50_ms": 2.0},
+        {"case": "zero", "size": 10, "p50_ms": 0},
+    ]}), encoding="utf-8")
+    results = [
+        {"case": "read", "size": 10, "p50_ms": 1.5},
+        {"case": "insert", "size": 10, "p50_ms": 2.1},
+        {"case": "zero", "size": 10, "p50_ms": 1.0},
+        {"case": "read", "size": 100, "p50_ms": 9.0},  # 기준에 없는 크기는 비교하지 않음
+    ]
+    regressions = compare(results, str(baseline), threshold_pct=20.0)
+    assert len(regressions) == 1 and regressions[0].startswith("read (size=10)")
+
+
+def test_parse_args():
+    args = parse_args(["--sizes", "100", "200", "--cases", "read", "--repeat", "3"])
+    assert args.sizes == [100, 200] and args.cases == ["read"] and args.repeat == 3
+    assert parse_args([]).cases == ["insert", "read", "positional", "uuid"]
@@ -0,0 +1,75 @@
+import psycopg2
+import pytest
+
+from postgres_bulk import RowStream, _copy_escape, bulk_insert, bulk_insert_file, iter_file_rows
+
+
+def test_copy_escape():
+    assert _copy_escape(None) == "\\N"
+    assert _copy_escape(12) == "12"
+    assert _copy_escape("a\\b\tc\nd\re") == "a\\\\b\\tc\\nd\\re"
+
+
+def test_row_stream_reads_in_chunks():
+    rows = [("a", 1), ("b\tc", None), ("d", 3)]
+    whole = RowStream(rows).read()
+    assert whole == "a\t1\nb\\tc\t\\N\nd\t3\n"
+
+    stream = RowStream(rows)
+    chunks = []
+    while True:
+        chunk = stream.read(4)
+        if not chunk:
+            break
+        assert len(chunk) <= 4
+        chunks.append(chunk)
+    assert "".join(chunks) == whole and stream.count == 3
+
+
+def test_iter_file_rows(tmp_path):
+    csv_path = tmp_path / "rows.csv"
+    csv_path.write_text("price,title\n100,\"a, b\"\n200,c\n", encoding="utf-8")
+    assert list(iter_file_rows(str(csv_path))) == [("a, b", "100"), ("c", "200")]
+    jsonl_path = tmp_path / "rows.jsonl"
+    jsonl_path.write_text('{"title": "a", "price": 1}\n\n{"title": "b"}\n', encoding="utf-8")
+    assert list(iter_file_rows(str(jsonl_path))) == [("a", 1), ("b", None)]
+    with pytest.raises(ValueError):
+        iter_file_rows(str(tmp_path / "rows.txt"))
+
+
+@pytest.fixture
+def bulk_table(pg_conn):
+    # bulk_insert가 배치마다 커밋하므로 세션이 끝나면 사라지는 임시 테이블을 사용합니다.
+    with pg_conn.cursor() as cur:
+        cur.execute("CREATE TEMP TABLE bulk_fixture (id serial PRIMARY KEY, title text NOT NULL, price int)")
+    pg_conn.commit()
+    return pg_conn
+
+
+def _rows(conn):
+    with conn.cursor() as cur:
+        cur.execute("SELECT id, title, price FROM bulk_fixture ORDER BY id")
+        return cur.fetchall()
+
+
+def test_bulk_insert_values_and_copy_paths_return_in_input_order(bulk_table):
+    rows = [(f"t{i}", i) for i in range(25)]
+    assert bulk_insert(bulk_table, rows[:3], table="bulk_fixture", small_batch_size=5) == 3
+    # 10행 배치 COPY(스테이징 테이블 경유) 2번 + 남은 2행은 execute_values
+    ids = bulk_insert(bulk_table, iter(rows[3:]), table="bulk_fixture", batch_size=10, small_batch_size=5,
+                      returning=("id", "title"))
+    assert [title for _, title in ids] == [title for title, _ in rows[3:]]
+    assert [(title, price) for _, title, price in _rows(bulk_table)] == rows
+
+
+def test_bulk_insert_file_and_failed_batch(bulk_table, tmp_path):
+    path = tmp_path / "rows.jsonl"
+    path.write_text('{"title": "a", "price": 1}\n{"title": "b\\tx\\ny", "price": null}\n', encoding="utf-8")
+    assert bulk_insert_file(bulk_table, str(path), table="bulk_fixture", small_batch_size=1) == 2
+    assert [r[1:] for r in _rows(bulk_table)] == [("a", 1), ("b\tx\ny", None)]
+
+    with pytest.raises(psycopg2.IntegrityError):
+        bulk_insert(bulk_table, [("ok", 1), (None, 2)], table="bulk_fixture", small_batch_size=1)
+    assert len(_rows(bulk_table)) == 2  # 실패한 배치는 롤백됨
+    with pytest.raises(ValueError):
+        bulk_insert(bulk_table, [], table="bulk_fixture", batch_size=0)
@@ -0,0 +1,78 @@
+import time
+
+import postgres_cache
+from postgres_cache import CacheInvalidationListener, QueryCache, normalize_query, publish_invalidation
+
+
+def test_normalize_query_and_make_key():
+    assert normalize_query("SELECT *\n  FROM books\tWHERE id = %s ;") == "SELECT * FROM books WHERE id = %s"
+    assert QueryCache.make_key("SELECT 1;", [1]) == QueryCache.make_key(" SELECT   1", (1,))
+    assert QueryCache.make_key("SELECT 1") == ("SELECT 1", ())
+
+
+def test_lru_eviction_and_ttl(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(postgres_cache.time, "monotonic", lambda: now[0])
+    cache = QueryCache(maxsize=2, ttl=10)
+    cache.put(("a", ()), [(1,)], ["books"])
+    cache.put(("b", ()), [(2,)], ["books"])
+    assert cache.get(("a", ())) == [(1,)]  # a가 최근 사용으로 이동
+    cache.put(("c", ()), [(3,)], ["books"])
+    assert cache.get(("b", ())) is None and len(cache) == 2
+
+    now[0] += 11
+    assert cache.get(("a", ())) is None
+
+
+def test_get_or_load_counts_and_table_invalidation():
+    cache = QueryCache()
+    calls = []
+
+    def loader():
+        calls.append(1)
+        return [(len(calls),)]
+
+    assert cache.get_or_load("SELECT n", None, loader, ["books"]) == [(1,)]
+    assert cache.get_or_load("SELECT  n;", None, loader, ["books"]) == [(1,)]
+    assert (cache.hits, cache.misses) == (1, 1)
+    assert cache.invalidate("authors") == 0
+    assert cache.invalidate("books") == 1
+    assert cache.get_or_load("SELECT n", None, loader, ["books"]) == [(2,)]
+
+
+def test_result_invalidated_during_load_is_not_stored():
+    cache = QueryCache()
+    for table in ("books", None):
+        def loader():
+            cache.invalidate(table)  # 조회 도중 다른 스레드의 쓰기가 무효화한 상황
+            return [("old",)]
+
+        assert cache.get_or_load("SELECT title FROM books", None, loader, ["books"]) == [("old",)]
+        assert len(cache) == 0
+
+    # 관련 없는 테이블의 무효화는 저장을 막지 않습니다.
+    def other_table_loader():
+        cache.invalidate("authors")
+        return [("new",)]
+
+    cache.get_or_load("SELECT title FROM books", None, other_table_loader, ["books"])
+    assert len(cache) == 1
+
+
+def test_listener_invalidates_on_notify(pg_conn, pg_params):
+    cache = QueryCache()
+    cache.put(("q", ()), [(1,)], ["books"])
+    listener = CacheInvalidationListener(cache, channel="cache_test_channel", poll_interval=0.05, **pg_params)
+    listener.start()
+    try:
+        deadline = time.monotonic() + 5
+        while cache._epoch == 0 and time.monotonic() < deadline:  # LISTEN 시작(전체 비움) 대기
+            time.sleep(0.01)
+        cache.put(("q", ()), [(1,)], ["books"])
+        pg_conn.autocommit = True
+        publish_invalidation(pg_conn, "books", channel="cache_test_channel")
+        while len(cache) and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert len(cache) == 0
+    finally:
+        listener.stop(timeout=2)
@@ -0,0 +1,183 @@
+from datetime import datetime, timezone
+
+import pytest
+
+from postgres_cdc import ChangeStream, PgOutputDecoder
+
+# 로컬 PostgreSQL 16에서 pg_logical_slot_get_binary_changes(..., 'proto_version', '1')로 받은 pgoutput 메시지
+#   CREATE TABLE cdc_fixture (id int PRIMARY KEY, title text, price int);
+#   INSERT (1, '파이썬 입문', 19000) / UPDATE price = 21000 / DELETE / TRUNCATE (각각 별도 트랜잭션)
+BEGIN_1 = bytes.fromhex("420000000076e326300003011ccb0d6aa400001efa")
+RELATION = bytes.fromhex(
+    "52000045847075626c6963006364635f66697874757265006400030169640000000017ffffffff"
+    "007469746c650000000019ffffffff0070726963650000000017ffffffff"
+)
+INSERT = bytes.fromhex("49000045844e00037400000001317400000010ed8c8cec9db4ec8dac20ec9e85ebacb874000000053139303030")
+COMMIT_1 = bytes.fromhex("43000000000076e326300000000076e326600003011ccb0d6aa4")
+BEGIN_2 = bytes.fromhex("420000000076e326c00003011ccb0d6cac00001efb")
+UPDATE = bytes.fromhex("55000045844e00037400000001317400000010ed8c8cec9db4ec8dac20ec9e85ebacb874000000053231303030")
+COMMIT_2 = bytes.fromhex("43000000000076e326c00000000076e326f00003011ccb0d6cac")
+DELETE = bytes.fromhex("44000045844b00037400000001316e6e")
+TRUNCATE = bytes.fromhex("54000000010000004584")
+
+FINAL_1_LSN = 0x76E32630  # BEGIN이 알려 주는 커밋 레코드 위치
+COMMIT_1_LSN = 0x76E32660  # COMMIT의 끝 위치 (확인에 사용)
+COMMIT_2_LSN = 0x76E326F0
+
+
+def _decoder() -> PgOutputDecoder:
+    decoder = PgOutputDecoder()
+    assert decoder.decode(RELATION) == ("other", None)
+    return decoder
+
+
+# ----------------------------------------------------------------------
+# PgOutputDecoder
+# ----------------------------------------------------------------------
+
+def test_decode_begin_and_commit():
+    decoder = PgOutputDecoder()
+    assert decoder.decode(BEGIN_1) == ("begin", 0x1EFA)
+    assert decoder.final_lsn == FINAL_1_LSN
+    assert decoder.commit_time.tzinfo is timezone.utc
+    assert decoder.commit_time > datetime(2020, 1, 1, tzinfo=timezone.utc)
+    assert decoder.decode(COMMIT_1) == ("commit", COMMIT_1_LSN)
+
+
+def test_decode_begin_xid_above_2_31_is_unsigned():
+    begin = BEGIN_1[:-4] + bytes.fromhex("fffffffe")  # xid 4294967294 (랩어라운드 직전)
+    assert PgOutputDecoder().decode(begin) == ("begin", 4_294_967_294)
+
+
+def test_decode_insert_casts_values():
+    decoder = _decoder()
+    decoder.decode(BEGIN_1)
+    kind, events = decoder.decode(INSERT)
+    assert kind == "event" and len(events) == 1
+    event = events[0]
+    assert (event.op, event.table, event.old) == ("insert", "public.cdc_fixture", None)
+    assert event.new == {"id": 1, "title": "파이썬 입문", "price": 19000}
+    assert event.xid == 0x1EFA and event.lsn == FINAL_1_LSN
+
+
+def test_decode_update_and_key_only_delete():
+    decoder = _decoder()
+    (update,) = decoder.decode(UPDATE)[1]
+    assert update.op == "update" and update.old is None
+    assert update.new["price"] == 21000
+
+    (delete,) = decoder.decode(DELETE)[1]
+    assert delete.op == "delete" and delete.new is None
+    assert delete.old == {"id": 1}  # REPLICA IDENTITY DEFAULT: 키 컬럼만 전송됨
+    assert delete.key == {"id": 1}
+
+
+def test_decode_truncate():
+    (event,) = _decoder().decode(TRUNCATE)[1]
+    assert (event.op, event.table, event.new, event.old) == ("truncate", "public.cdc_fixture", None, None)
+
+
+def test_decode_unknown_message():
+    assert PgOutputDecoder().decode(b"Mxyz") == ("other", None)
+
+
+# ----------------------------------------------------------------------
+# ChangeStream 배치/확인 위치 (_drain, _take, _ack_idle)
+# ----------------------------------------------------------------------
+
+class _Message:
+    def __init__(self, payload: bytes):
+        self.payload = payload
+
+
+class _ReplicationCursor:
+    """read_message()로 미리 정한 메시지를 돌려주고 send_feedback() 위치를 기록합니다."""
+
+    def __init__(self, payloads, wal_end: int = 0):
+        self._messages = [_Message(p) for p in payloads]
+        self.wal_end = wal_end
+        self.feedback = []
+
+    def read_message(self):
+        return self._messages.pop(0) if self._messages else None
+
+    def send_feedback(self, write_lsn: int, flush_lsn: int, force: bool = False) -> None:
+        self.feedback.append(flush_lsn)
+
+
+def _stream(payloads, batch_size: int, wal_end: int = 0) -> ChangeStream:
+    stream = ChangeStream("slot", "publication", batch_size=batch_size, create=False)
+    stream._cur = _ReplicationCursor(payloads, wal_end)
+    stream._decoder = PgOutputDecoder()
+    return stream
+
+
+def test_take_acks_last_commit_inside_batch():
+    stream = _stream([BEGIN_1, RELATION, INSERT, COMMIT_1, BEGIN_2, UPDATE, COMMIT_2], batch_size=10)
+    stream._drain()
+    batch = stream._take(force=True)
+    assert [e.op for e in batch] == ["insert", "update"]
+    assert batch.ack_lsn == COMMIT_2_LSN
+    assert stream._commit_marks == []
+
+
+def test_take_does_not_ack_transaction_split_across_batches():
+    stream = _stream([BEGIN_1, RELATION, INSERT, COMMIT_1, BEGIN_2, UPDATE, COMMIT_2], batch_size=1)
+    stream._drain()  # INSERT까지 읽고 멈춤 (커밋은 아직 받지 않음)
+    first = stream._take()
+    assert [e.op for e in first] == ["insert"] and first.ack_lsn == 0
+
+    stream._drain()  # COMMIT_1, BEGIN_2, UPDATE
+    second = stream._take()
+    assert [e.op for e in second] == ["update"]
+    assert second.ack_lsn == COMMIT_1_LSN  # 두 번째 트랜잭션은 커밋 전이므로 첫 커밋까지만 확인
+    assert stream._in_transaction
+
+
+def test_take_keeps_commit_marks_of_undelivered_events():
+    stream = _stream([BEGIN_1, RELATION, INSERT, COMMIT_1, BEGIN_2, UPDATE, COMMIT_2], batch_size=10)
+    stream._drain()
+    stream.batch_size = 1
+    first = stream._take()
+    assert first.ack_lsn == COMMIT_1_LSN
+    assert stream._commit_marks == [(1, COMMIT_2_LSN)]
+    second = stream._take()
+    assert second.ack_lsn == COMMIT_2_LSN
+
+
+def test_take_waits_for_full_batch_or_timeout():
+    stream = _stream([BEGIN_1, RELATION, INSERT, COMMIT_1], batch_size=10)
+    stream.batch_timeout = 60.0
+    stream._drain()
+    assert stream._take() is None
+    assert len(stream._take(force=True)) == 1
+
+
+def test_ack_and_idle_ack_send_feedback():
+    stream = _stream([BEGIN_1, RELATION, INSERT, COMMIT_1], batch_size=1, wal_end=COMMIT_2_LSN)
+    stream._drain()
+    batch = stream._take()
+    stream._ack_idle()  # 전달했지만 확인하지 않은 배치가 있으면 아무것도 보내지 않음
+    assert stream._cur.feedback == []
+
+    stream.ack(batch)
+    assert stream._cur.feedback == [] and stream.acked_lsn == 0  # 배치 안에 커밋이 없음
+
+    stream._drain()  # COMMIT_1 (이벤트는 이미 전달됨)
+    stream._ack_idle()
+    assert stream._cur.feedback == [COMMIT_2_LSN]  # 트랜잭션 밖이므로 서버가 보낸 위치까지 확인
+    assert stream.acked_lsn == COMMIT_2_LSN
+
+
+def test_ack_idle_inside_transaction_uses_commit_marks_only():
+    stream = _stream([BEGIN_1, RELATION, INSERT, COMMIT_1, BEGIN_2], batch_size=1, wal_end=COMMIT_2_LSN)
+    stream._drain()
+    stream.ack(stream._take())
+    stream._drain()  # COMMIT_1, BEGIN_2 (트랜잭션 진행 중)
+    stream._ack_idle()
+    assert stream._cur.feedback == [COMMIT_1_LSN]
+
+
+def test_batch_size_must_be_positive():
+    with pytest.raises(ValueError):
+        ChangeStream("slot", "publication", batch_size=0)
@@ -0,0 +1,76 @@
+import os
+import sys
+import threading
+import time
+
+import pytest
+
+from postgres_cli import _request, build_parser, forward, parse_insert_rows, serve, stop
+from postgres_schema import ensure_schema, forget_schema, installed_version, schema_version
+
+
+def test_parse_insert_rows():
+    assert parse_insert_rows(["a", "100", "b c", "200"]) == [["a", 100], ["b c", 200]]
+    assert parse_insert_rows([]) == []
+    with pytest.raises(ValueError):
+        parse_insert_rows(["a", "100", "b"])
+
+
+def test_build_parser():
+    parser = build_parser("books", "test")
+    args = parser.parse_args(["--socket", "/tmp/x.sock", "query", "search", "파이썬", "--limit", "5"])
+    assert (args.socket, args.command, args.kind, args.text, args.limit) == ("/tmp/x.sock", "query", "search",
+                                                                            "파이썬", 5)
+    assert parser.parse_args([]).command is None
+    with pytest.raises(SystemExit):
+        parser.parse_args(["query", "unknown"])
+
+
+def test_daemon_round_trip(tmp_path, capsys):
+    path = str(tmp_path / "books.sock")
+    assert forward(None, ["query", "all"]) is None
+    assert forward(path, ["query", "all"]) is None  # 데몬 없음: 호출자가 직접 실행
+
+    def dispatch(argv):
+        if argv == ["fail"]:
+            raise RuntimeError("boom")
+        print(" ".join(argv))
+        print("warning", file=sys.stderr)
+        return 3
+
+    thread = threading.Thread(target=serve, args=(path, dispatch), daemon=True)
+    thread.start()
+    deadline = time.monotonic() + 5
+    while not os.path.exists(path) and time.monotonic() < deadline:
+        time.sleep(0.01)
+    try:
+        assert _request(path, {"ping": True}, timeout=5) == {"status": 0, "stdout": "", "stderr": ""}
+        assert oct(os.stat(path).st_mode & 0o777) == oct(0o600)
+        capsys.readouterr()  # 데몬 시작 메시지
+        assert forward(path, ["query", "all"]) == 3
+        assert capsys.readouterr() == ("query all\n", "warning\n")
+        assert forward(path, ["fail"]) == 1
+        assert "boom" in capsys.readouterr().err
+        with pytest.raises(RuntimeError):
+            serve(path, dispatch)  # 같은 소켓에 두 번째 데몬은 시작하지 않음
+    finally:
+        assert stop(path)
+        thread.join(5)
+    assert not thread.is_alive() and not os.path.exists(path)
+    assert not stop(path)
+
+
+def test_ensure_schema_skips_unchanged_version(pg_conn):
+    statements = ["CREATE TEMP TABLE IF NOT EXISTS cli_fixture (id int)"]
+    try:
+        with pg_conn.cursor() as cur:
+            version = schema_version(cur, statements)
+            assert version == schema_version(cur, [" CREATE TEMP TABLE IF NOT EXISTS\n cli_fixture (id int)"])
+            assert installed_version(cur, "cli_fixture") is None
+            assert ensure_schema(cur, "cli_fixture", statements)
+            assert installed_version(cur, "cli_fixture") == version
+            assert not ensure_schema(cur, "cli_fixture", statements)
+            assert ensure_schema(cur, "cli_fixture", statements, force=True)
+            assert ensure_schema(cur, "cli_fixture", [*statements, "CREATE INDEX ON cli_fixture (id)"])
+    finally:
+        forget_schema("cli_fixture")
@@ -0,0 +1,106 @@
+import struct
+from datetime import date, datetime
+
+import pytest
+
+from postgres_columnar import parse_binary_copy, parse_text_copy
+
+numpy = pytest.importorskip("numpy")
+
+BOOL, INT4, INT8, FLOAT8, DATE, TIMESTAMP, TEXT, VARCHAR, NUMERIC = 16, 23, 20, 701, 1082, 1114, 25, 1043, 1700
+
+
+def _binary_copy(rows) -> bytes:
+    """바이너리 COPY 출력과 같은 바이트를 만듭니다. (값은 이미 빅엔디언으로 인코딩된 bytes 또는 NULL인 None)"""
+    out = [b"PGCOPY\n\xff\r\n\x00", struct.pack(">ii", 0, 0)]
+    for row in rows:
+        out.append(struct.pack(">h", len(row)))
+        for value in row:
+            out.append(struct.pack(">i", -1) if value is None else struct.pack(">i", len(value)) + value)
+    out.append(struct.pack(">h", -1))
+    return b"".join(out)
+
+
+# ----------------------------------------------------------------------
+# parse_binary_copy
+# ----------------------------------------------------------------------
+
+def test_binary_fixed_columns_without_nulls():
+    data = _binary_copy([(struct.pack(">i", i), struct.pack(">d", i / 2), struct.pack(">q", -i)) for i in range(5)])
+    (ints, floats, bigints), nulls = parse_binary_copy(data, [INT4, FLOAT8, INT8])
+    assert nulls == {}
+    assert ints.tolist() == [0, 1, 2, 3, 4] and ints.dtype == numpy.int32
+    assert floats.tolist() == [0.0, 0.5, 1.0, 1.5, 2.0]
+    assert bigints.tolist() == [0, -1, -2, -3, -4]
+
+
+def test_binary_nulls_and_text():
+    data = _binary_copy([
+        (struct.pack(">i", 7), "파이썬".encode()),
+        (None, b"a\tb"),
+        (struct.pack(">i", 9), None),
+    ])
+    (prices, titles), nulls = parse_binary_copy(data, [INT4, TEXT])
+    assert prices.tolist() == [7, 0, 9]  # NULL 자리는 0으로 채우고 마스크로 표시
+    assert nulls[0].tolist() == [False, True, False]
+    assert titles.tolist() == ["파이썬", "a\tb", None]
+    assert nulls[1].tolist() == [False, False, True]
+
+
+def test_binary_dates_and_timestamps():
+    data = _binary_copy([(struct.pack(">i", 8826), struct.pack(">q", 86_400_000_000 + 1_500_000)),
+                         (struct.pack(">i", -1), struct.pack(">q", 0))])
+    (days, moments), _ = parse_binary_copy(data, [DATE, TIMESTAMP])
+    assert days.tolist() == [date(2024, 3, 1), date(1999, 12, 31)]
+    assert moments.tolist() == [datetime(2000, 1, 2, 0, 0, 1, 500000), datetime(2000, 1, 1)]
+
+
+def test_binary_empty_result():
+    columns, nulls = parse_binary_copy(_binary_copy([]), [INT4, TEXT])
+    assert [len(c) for c in columns] == [0, 0] and nulls == {}
+
+
+def test_binary_rejects_bad_input():
+    with pytest.raises(ValueError):
+        parse_binary_copy(b"not a copy stream", [INT4])
+    with pytest.raises(ValueError):
+        parse_binary_copy(_binary_copy([(struct.pack(">i", 1),)]), [INT4, INT4])  # 필드 수 불일치
+    with pytest.raises(ValueError):
+        parse_binary_copy(_binary_copy([(b"1.5",)]), [NUMERIC])
+
+
+# ----------------------------------------------------------------------
+# parse_text_copy
+# ----------------------------------------------------------------------
+
+def test_text_numbers_and_strings():
+    data = "1\t파이썬 입문\t19000\n2\t알고리즘\t25000\n".encode()
+    (ids, titles, prices), nulls = parse_text_copy(data, [INT8, VARCHAR, INT4])
+    assert nulls == {}
+    assert ids.tolist() == [1, 2] and prices.tolist() == [19000, 25000]
+    assert titles.tolist() == ["파이썬 입문", "알고리즘"]
+
+
+def test_text_escapes_and_nulls():
+    # 서버 출력: SELECT 1, NULL::int, E'a\tb\\c', true  ->  1\t\N\ta\tb\\c\tt
+    data = b"1\t\\N\ta\\tb\\\\c\tt\n\\N\t5\t\\N\tf\n"
+    (first, second, text, flags), nulls = parse_text_copy(data, [INT4, INT4, TEXT, BOOL])
+    assert first.tolist() == [1, 0] and nulls[0].tolist() == [False, True]
+    assert second.tolist() == [0, 5] and nulls[1].tolist() == [True, False]
+    assert text.tolist() == ["a\tb\\c", None] and nulls[2].tolist() == [False, True]
+    assert flags.tolist() == [True, False] and 3 not in nulls
+
+
+def test_text_epoch_offsets_become_dates():
+    (days, moments), _ = parse_text_copy(b"8826\t1500000\n", [DATE, TIMESTAMP])
+    assert days.tolist() == [date(2024, 3, 1)]
+    assert moments.tolist() == [datetime(2000, 1, 1, 0, 0, 1, 500000)]
+
+
+def test_text_empty_and_invalid():
+    columns, nulls = parse_text_copy(b"", [INT4, TEXT])
+    assert [len(c) for c in columns] == [0, 0] and nulls == {}
+    with pytest.raises(ValueError):
+        parse_text_copy(b"1\t2\t3\n", [INT4, INT4])
+    with pytest.raises(ValueError):
+        parse_text_copy(b"1.5\n", [NUMERIC])
@@ -0,0 +1,47 @@
+from postgres_export import column_info, integer_key, plan_ranges
+
+
+def _counts(cur, table, ranges):
+    counts = []
+    for r in ranges:
+        cur.execute(f"SELECT count(*) FROM {table} {r['where']}", r["params"])
+        counts.append(cur.fetchone()[0])
+    return counts
+
+
+def test_plan_ranges_by_integer_key_covers_every_row_once(pg_conn):
+    with pg_conn.cursor() as cur:
+        cur.execute("CREATE TEMP TABLE export_fixture (code int UNIQUE, name text, id bigint PRIMARY KEY)")
+        cur.execute("INSERT INTO export_fixture SELECT g * 3, 'n' || g, g FROM generate_series(1, 100) g")
+        cur.execute("INSERT INTO export_fixture VALUES (NULL, 'no code', 1000)")
+        assert integer_key(cur, "export_fixture") == "id"
+
+        key, ranges = plan_ranges(cur, "export_fixture", 4)
+        assert key == "id" and len(ranges) == 4
+        assert sum(_counts(cur, "export_fixture", ranges)) == 101
+
+        # UNIQUE 컬럼의 NULL 키는 첫 조각에 포함됩니다.
+        key, ranges = plan_ranges(cur, "export_fixture", 3, key="code")
+        assert key == "code"
+        assert sum(_counts(cur, "export_fixture", ranges)) == 101
+
+
+def test_plan_ranges_single_and_empty(pg_conn):
+    with pg_conn.cursor() as cur:
+        cur.execute("CREATE TEMP TABLE export_fixture (id int PRIMARY KEY)")
+        assert plan_ranges(cur, "export_fixture", 4) == ("id", [{"where": "", "params": []}])
+        cur.execute("INSERT INTO export_fixture VALUES (7)")
+        assert plan_ranges(cur, "export_fixture", 4) == ("id", [{"where": "", "params": []}])
+
+
+def test_plan_ranges_falls_back_to_ctid(pg_conn):
+    with pg_conn.cursor() as cur:
+        cur.execute("CREATE TEMP TABLE export_fixture (name text, "
+                    "total int GENERATED ALWAYS AS (length(name)) STORED)")
+        cur.execute("INSERT INTO export_fixture SELECT repeat('x', 200) FROM generate_series(1, 2000)")
+        assert integer_key(cur, "export_fixture") is None
+        key, ranges = plan_ranges(cur, "export_fixture", 4)
+        assert key == "ctid" and len(ranges) == 4
+        assert "<" not in ranges[-1]["where"]  # 마지막 조각은 끝이 열려 있음
+        assert sum(_counts(cur, "export_fixture", ranges)) == 2000
+        assert column_info(cur, "export_fixture") == [("name", "text")]
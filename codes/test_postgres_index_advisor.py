@@ -0,0 +1,59 @@
+from postgres_index_advisor import _split_top_level, advise, format_report, parse_sql_files, statement_columns
+
+
+def test_split_top_level_ignores_nested_commas():
+    assert _split_top_level("id int, price numeric(10, 2) , PRIMARY KEY (id, at)") == [
+        "id int", "price numeric(10, 2)", "PRIMARY KEY (id, at)",
+    ]
+
+
+def test_statement_columns():
+    assert statement_columns(
+        "SELECT * FROM books b WHERE b.price >= %s AND title ILIKE %s ORDER BY b.price DESC LIMIT 10"
+    ) == ("books", ["price", "title"], ["price"])
+    assert statement_columns('UPDATE "Books" SET price = 1 WHERE serial_no IN (1, 2)') == ("books", ["serial_no"], [])
+    assert statement_columns("INSERT INTO books (title) VALUES ('a')") == (None, [], [])
+
+
+def test_parse_sql_files(tmp_path):
+    (tmp_path / "schema.sql").write_text(
+        "-- 주석의 FROM ignored WHERE x = 1 은 무시됩니다\n"
+        "CREATE TABLE IF NOT EXISTS logs (\n"
+        "  id BIGINT, at TIMESTAMP NOT NULL, status INT, code TEXT UNIQUE,\n"
+        "  PRIMARY KEY (id, at)\n"
+        ") PARTITION BY RANGE (at);\n"
+        "CREATE INDEX logs_status_idx ON logs (status);\n",
+        encoding="utf-8",
+    )
+    (tmp_path / "queries.sql").write_text(
+        "SELECT * FROM logs WHERE status = 500 ORDER BY at;\n"
+        "DELETE FROM logs WHERE at < now() AND missing = 1;\n",
+        encoding="utf-8",
+    )
+    tables = parse_sql_files([str(tmp_path)])
+    assert list(tables) == ["logs"]
+    logs = tables["logs"]
+    assert logs["columns"] == ["id", "at", "status", "code"]
+    assert logs["partitioned"]
+    assert logs["indexed"] == {"id", "code", "status"}
+    assert logs["indexes"]["logs_status_idx"][0] == "status"
+    assert logs["predicates"] == {"status": 1, "at": 1}  # 테이블에 없는 컬럼(missing)은 제외
+    assert logs["order_by"] == {"at": 1}
+
+
+def test_advise_suggests_declared_index_for_table_missing_from_database(pg_conn, tmp_path):
+    (tmp_path / "advisor.sql").write_text(
+        "CREATE TABLE advisor_fixture (id INT PRIMARY KEY, status INT, owner TEXT);\n"
+        "CREATE INDEX advisor_fixture_by_status ON advisor_fixture (status);\n"
+        "SELECT * FROM advisor_fixture WHERE status = 1 AND owner = 'a';\n"
+        "SELECT * FROM advisor_fixture WHERE id = 1;\n",
+        encoding="utf-8",
+    )
+    report = advise(pg_conn, paths=[str(tmp_path)], extra_tables=())
+    [table] = report["tables"]
+    assert table["table"] == "advisor_fixture" and not table["in_database"]
+    assert table["indexed_columns"] == ["id", "status"]
+    assert [m["suggestion"] for m in table["missing_indexes"]] == [
+        "CREATE INDEX advisor_fixture_owner_idx ON advisor_fixture (owner);",
+    ]
+    assert "advisor_fixture_owner_idx" in format_report(report)
@@ -0,0 +1,28 @@
+import pytest
+
+from postgres_loadgen import DEFAULT_MIX, OPERATIONS, parse_mix
+
+
+def test_parse_mix_weights():
+    assert parse_mix("read_title=40, update=10.5") == {"read_title": 40.0, "update": 10.5}
+
+
+def test_parse_mix_default_weight_and_empty_parts():
+    assert parse_mix("insert,,delete=2,") == {"insert": 1.0, "delete": 2.0}
+
+
+def test_parse_mix_default_covers_all_operations():
+    assert set(parse_mix(DEFAULT_MIX)) == set(OPERATIONS)
+
+
+@pytest.mark.parametrize("text", ["", " , ", "insert=0", "insert=0,update=0"])
+def test_parse_mix_rejects_empty_mix(text):
+    with pytest.raises(ValueError):
+        parse_mix(text)
+
+
+def test_parse_mix_rejects_unknown_operation_and_bad_weight():
+    with pytest.raises(ValueError, match="select"):
+        parse_mix("select=1")
+    with pytest.raises(ValueError):
+        parse_mix("insert=many")
@@ -0,0 +1,64 @@
+import psycopg2
+import pytest
+from psycopg2 import sql
+
+from postgres_merge import _changed, _source, bulk_merge
+
+
+# ----------------------------------------------------------------------
+# SQL 생성 (식별자 인용에 연결이 필요하므로 서버가 없으면 건너뜀)
+# ----------------------------------------------------------------------
+
+def test_source_keeps_last_input_row_per_key(pg_conn):
+    query = _source(sql.Identifier("_stage"), ("title", "price"), ("title",))
+    assert query.as_string(pg_conn) == (
+        'SELECT DISTINCT ON ("title") "title", "price" FROM "_stage" ORDER BY "title", _ord DESC'
+    )
+
+
+def test_source_with_composite_key(pg_conn):
+    query = _source(sql.Identifier("_stage"), ("a", "b", "c"), ("a", "b"))
+    assert query.as_string(pg_conn) == (
+        'SELECT DISTINCT ON ("a", "b") "a", "b", "c" FROM "_stage" ORDER BY "a", "b", _ord DESC'
+    )
+
+
+def test_changed_compares_rows_null_safely(pg_conn):
+    assert _changed(("price",), "t", "s").as_string(pg_conn) == 'ROW("t"."price") IS DISTINCT FROM ROW("s"."price")'
+    assert _changed(("price", "title"), "books", "excluded").as_string(pg_conn) == (
+        'ROW("books"."price", "books"."title") IS DISTINCT FROM ROW("excluded"."price", "excluded"."title")'
+    )
+
+
+# ----------------------------------------------------------------------
+# bulk_merge
+# ----------------------------------------------------------------------
+
+@pytest.fixture
+def merge_table(pg_conn):
+    with pg_conn.cursor() as cur:
+        cur.execute("CREATE TEMP TABLE merge_fixture (title text PRIMARY KEY, price int NOT NULL CHECK (price > 0))")
+    pg_conn.commit()
+    return pg_conn
+
+
+def _rows(conn):
+    with conn.cursor() as cur:
+        cur.execute("SELECT title, price FROM merge_fixture ORDER BY title")
+        return cur.fetchall()
+
+
+def test_merge_inserts_updates_and_skips_unchanged(merge_table):
+    stats = bulk_merge(merge_table, [("a", 1), ("b", 2), ("a", 3)], table="merge_fixture")
+    assert (stats["method"], stats["inserted"], stats["duplicates"]) == ("on_conflict", 2, 1)
+    stats = bulk_merge(merge_table, [("a", 3), ("b", 5), ("c", 1)], table="merge_fixture")
+    assert (stats["inserted"], stats["updated"], stats["unchanged"]) == (1, 1, 1)
+    assert _rows(merge_table) == [("a", 3), ("b", 5), ("c", 1)]
+
+
+def test_failed_batch_rolls_back_on_autocommit_connection(merge_table):
+    merge_table.autocommit = True
+    with pytest.raises(psycopg2.IntegrityError):
+        bulk_merge(merge_table, [("a", 1), ("b", 2), ("c", 3), ("d", -1)], table="merge_fixture", batch_size=2)
+    assert merge_table.autocommit  # 병합하는 동안만 꺼짐
+    assert _rows(merge_table) == [("a", 1), ("b", 2)]  # 앞 배치만 커밋됨
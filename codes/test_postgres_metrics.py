@@ -0,0 +1,49 @@
+import psycopg2
+import pytest
+
+from postgres_metrics import QueryMetrics, query_shape
+
+
+def test_query_shape_replaces_literals_and_placeholders():
+    assert query_shape("SELECT * FROM books WHERE title = 'it''s' AND price > 10.5 AND id = %s;") == (
+        "SELECT * FROM books WHERE title = ? AND price > ? AND id = ?"
+    )
+    assert query_shape("UPDATE t SET v = CAST(%s AS int) WHERE k = %(key)s") == "UPDATE t SET v = ? WHERE k = ?"
+    # 식별자 안의 숫자는 그대로 둡니다.
+    assert query_shape("SELECT col1, t2.a FROM t2 LIMIT 5") == "SELECT col1, t2.a FROM t2 LIMIT ?"
+
+
+def test_query_shape_collapses_value_lists():
+    assert query_shape("INSERT INTO t (a, b) VALUES (1, 2), (3, 4), (5, 6)") == "INSERT INTO t (a, b) VALUES (...)"
+    assert query_shape("INSERT INTO t (a, b) VALUES (1, 2)") == query_shape("INSERT INTO t (a, b) VALUES (7, 8)")
+    assert query_shape("SELECT * FROM t WHERE id IN (%s, %s, %s)") == "SELECT * FROM t WHERE id IN (...)"
+
+
+def test_snapshot_histogram_and_slow_log():
+    logged = []
+    metrics = QueryMetrics(slow_threshold=0.1, log=logged.append)
+    for seconds in (0.0005, 0.002, 0.02, 0.3):
+        metrics.observe("q", seconds, rows=2)
+    metrics.observe("q", 0.001, error=True)
+    [stats] = metrics.snapshot()["queries"]
+    assert (stats["count"], stats["rows"], stats["errors"]) == (5, 8, 1)
+    assert stats["buckets"]["0.001"] == 2 and stats["buckets"]["0.5"] == 5
+    assert stats["p50_seconds"] == 0.0025 and stats["p99_seconds"] == 0.3
+    assert 'pg_query_duration_seconds_bucket{query="q",le="0.001"} 2' in metrics.to_prometheus()
+
+    assert metrics.is_slow(0.3) and not metrics.is_slow(0.05)
+    metrics.record_slow("q", "SELECT 1", 0.3, 1)
+    assert len(metrics.slow_queries) == 1 and logged
+    metrics.reset()
+    assert metrics.snapshot()["queries"] == [] and not metrics.slow_queries
+
+
+def test_instrumented_cursor_records_shape_and_errors(pg_conn):
+    metrics = QueryMetrics(slow_threshold=None)
+    with pg_conn.cursor(cursor_factory=metrics.cursor_factory) as cur:
+        cur.execute("SELECT generate_series(1, %s)", (3,))
+        with pytest.raises(psycopg2.Error):
+            cur.execute("SELECT 1 / 0")
+    stats = {q["shape"]: q for q in metrics.snapshot()["queries"]}
+    assert stats["SELECT generate_series(...)"]["rows"] == 3
+    assert stats["SELECT ? / ?"]["errors"] == 1
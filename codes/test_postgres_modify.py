@@ -0,0 +1,23 @@
+import pytest
+
+from postgres_modify import update_positions
+
+
+def test_update_positions_rejects_negative_and_duplicate_positions():
+    # 검증은 쿼리를 보내기 전에 하므로 커서가 필요 없습니다.
+    with pytest.raises(ValueError, match="0 이상"):
+        update_positions(None, "books", ("title",), ("price",), [(0, 100), (-1, 200)])
+    with pytest.raises(ValueError, match=r"\[1\]"):
+        update_positions(None, "books", ("title",), ("price",), [(1, 100), (0, 200), (1, 300)])
+    assert update_positions(None, "books", ("title",), ("price",), []) == []
+
+
+def test_update_positions_updates_each_position_once(pg_conn):
+    with pg_conn.cursor() as cur:
+        cur.execute("CREATE TEMP TABLE modify_fixture (id int PRIMARY KEY, title text, price int)")
+        cur.execute("INSERT INTO modify_fixture VALUES (1, 'c', 10), (2, 'a', 20), (3, 'b', 30)")
+        updated = update_positions(cur, "modify_fixture", ("title", "id"), ("price",), [(2, 300), (0, 100)],
+                                   returning=("id", "price"))
+        assert sorted(updated) == [(0, 2, 100), (2, 1, 300)]
+        cur.execute("SELECT id, price FROM modify_fixture ORDER BY id")
+        assert cur.fetchall() == [(1, 300), (2, 100), (3, 30)]
@@ -0,0 +1,39 @@
+import uuid
+
+import pytest
+
+from postgres_pagination import _signature, decode_page_token, encode_page_token, fetch_page
+
+
+def test_page_token_round_trip_without_padding():
+    signature = _signature("books", ("price", "id"), True)
+    key = uuid.UUID(int=1)
+    token = encode_page_token([15000, key], signature)
+    assert "=" not in token
+    assert decode_page_token(token, signature) == [15000, str(key)]
+
+
+def test_page_token_rejects_other_signature_and_garbage():
+    token = encode_page_token([1], _signature("books", ("id",), False))
+    with pytest.raises(ValueError, match="다른 정렬 조건"):
+        decode_page_token(token, _signature("books", ("id",), True))
+    for garbage in ("not-a-token", encode_page_token([1], "x")[:-2], ""):
+        with pytest.raises(ValueError):
+            decode_page_token(garbage, "x")
+
+
+def test_fetch_page_walks_all_rows_once(pg_conn):
+    with pg_conn.cursor() as cur:
+        cur.execute("CREATE TEMP TABLE page_fixture (id int PRIMARY KEY, price int)")
+        cur.execute("INSERT INTO page_fixture SELECT g, g % 3 FROM generate_series(1, 10) g")
+        seen, token = [], None
+        while True:
+            rows, token = fetch_page(cur, "page_fixture", ("id", "price"), ("price", "id"), page_size=4,
+                                     page_token=token, descending=True)
+            seen.extend(rows)
+            if token is None:
+                break
+        assert seen == sorted(seen, key=lambda r: (r[1], r[0]), reverse=True)
+        assert sorted(r[0] for r in seen) == list(range(1, 11))
+        with pytest.raises(ValueError):
+            fetch_page(cur, "page_fixture", ("id",), ("price",))
@@ -0,0 +1,80 @@
+from datetime import datetime
+
+import pytest
+
+from postgres_partition import LOG_TABLES, PartitionedTable, create_partition
+
+
+def _spec(interval: str) -> PartitionedTable:
+    return PartitionedTable("logs", [("id", "INT"), ("at", "TIMESTAMP NOT NULL")], key="id",
+                            partition_column="at", interval=interval)
+
+
+def test_period_start():
+    moment = datetime(2024, 2, 29, 13, 45)  # 목요일
+    assert _spec("day").period_start(moment) == datetime(2024, 2, 29)
+    assert _spec("week").period_start(moment) == datetime(2024, 2, 26)
+    assert _spec("month").period_start(moment) == datetime(2024, 2, 1)
+
+
+@pytest.mark.parametrize("interval, start, expected", [
+    ("day", datetime(2024, 2, 28), datetime(2024, 2, 29)),
+    ("day", datetime(2023, 12, 31), datetime(2024, 1, 1)),
+    ("week", datetime(2024, 12, 30), datetime(2025, 1, 6)),
+    ("month", datetime(2024, 1, 1), datetime(2024, 2, 1)),
+    ("month", datetime(2024, 11, 1), datetime(2024, 12, 1)),
+    ("month", datetime(2024, 12, 1), datetime(2025, 1, 1)),
+])
+def test_next_period(interval, start, expected):
+    assert _spec(interval).next_period(start) == expected
+
+
+@pytest.mark.parametrize("interval, start, periods, expected", [
+    ("day", datetime(2024, 3, 1), -1, datetime(2024, 2, 29)),
+    ("week", datetime(2024, 1, 1), 2, datetime(2024, 1, 15)),
+    ("week", datetime(2024, 1, 1), -1, datetime(2023, 12, 25)),
+    ("month", datetime(2024, 1, 1), -1, datetime(2023, 12, 1)),
+    ("month", datetime(2024, 1, 1), -13, datetime(2022, 12, 1)),
+    ("month", datetime(2024, 11, 1), 3, datetime(2025, 2, 1)),
+    ("month", datetime(2024, 5, 1), 0, datetime(2024, 5, 1)),
+])
+def test_shift(interval, start, periods, expected):
+    assert _spec(interval).shift(start, periods) == expected
+
+
+@pytest.mark.parametrize("interval", ["day", "week", "month"])
+def test_shift_matches_repeated_next_period(interval):
+    spec = _spec(interval)
+    start = spec.period_start(datetime(2023, 10, 17))
+    current = start
+    for periods in range(1, 30):
+        current = spec.next_period(current)
+        assert spec.shift(start, periods) == current
+        assert spec.shift(current, -periods) == start
+
+
+def test_partition_name_and_invalid_interval():
+    assert _spec("month").partition_name(datetime(2024, 3, 1)) == "logs_p202403"
+    assert _spec("week").partition_name(datetime(2024, 3, 4)) == "logs_p20240304"
+    with pytest.raises(ValueError):
+        _spec("year")
+
+
+def test_create_statements_include_declared_indexes():
+    statements = LOG_TABLES["scraping_html_results"].create_statements()
+    assert len(statements) == 2  # 테이블 + status_code 인덱스
+
+
+def test_create_partition_rejects_unattached_table_with_same_name(pg_conn):
+    spec = PartitionedTable("partition_fixture", [("id", "INT"), ("at", "TIMESTAMP NOT NULL")], key="id",
+                            partition_column="at")
+    start = datetime(2024, 3, 1)
+    with pg_conn.cursor() as cur:  # 테스트가 끝나면 pg_conn이 롤백합니다.
+        for statement in spec.create_statements():
+            cur.execute(statement)
+        assert create_partition(cur, spec, start) == "partition_fixture_p202403"
+        assert create_partition(cur, spec, start) is None
+
+        cur.execute("ALTER TABLE partition_fixture DETACH PARTITION partition_fixture_p202403")
+        with pytest.raises(ValueError):
+            create_partition(cur, spec, start)
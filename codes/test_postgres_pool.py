@@ -0,0 +1,65 @@
+import threading
+
+import psycopg2
+import pytest
+
+from postgres_pool import ConnectionPool, PoolTimeoutError, close_all_pools, get_pool
+
+
+def test_invalid_sizes():
+    for minconn, maxconn in ((-1, 1), (0, 0), (3, 2)):
+        with pytest.raises(ValueError):
+            ConnectionPool(minconn=minconn, maxconn=maxconn)
+
+
+def test_reuse_timeout_and_wakeup(pg_params):
+    with ConnectionPool(minconn=1, maxconn=1, timeout=0.05, **pg_params) as pool:
+        conn = pool.getconn()
+        with pytest.raises(PoolTimeoutError):
+            pool.getconn()
+
+        threading.Timer(0.05, pool.putconn, (conn,)).start()
+        assert pool.getconn(timeout=5) is conn  # 반환을 기다렸다가 같은 연결을 재사용
+        pool.putconn(conn)
+        assert pool.size == 1
+
+
+def test_connection_context_rolls_back_and_discards_broken(pg_params):
+    with ConnectionPool(minconn=0, maxconn=2, **pg_params) as pool:
+        with pool.connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute("CREATE TEMP TABLE pool_fixture (id int)")
+        assert conn.info.transaction_status == psycopg2.extensions.TRANSACTION_STATUS_IDLE
+
+        with pytest.raises(psycopg2.Error):
+            with pool.connection() as conn:
+                with conn.cursor() as cur:
+                    cur.execute("SELECT 1 / 0")
+        assert pool.size == 1 and not conn.closed
+
+        with pytest.raises(RuntimeError):
+            with pool.connection() as conn:
+                conn.close()
+                raise RuntimeError
+        assert pool.size == 0
+
+
+def test_expired_connection_is_replaced(pg_params):
+    with ConnectionPool(minconn=1, maxconn=1, max_lifetime=0, **pg_params) as pool:
+        first = pool.getconn()
+        pool.putconn(first)  # 수명이 지나 반환 시 닫힘
+        assert first.closed and pool.size == 0
+        second = pool.getconn()
+        assert second is not first
+        pool.putconn(second)
+
+
+def test_get_pool_shares_pool_per_settings(pg_params):
+    try:
+        pool = get_pool(minconn=0, **pg_params)
+        assert get_pool(minconn=0, **pg_params) is pool
+        assert get_pool(minconn=0, maxconn=2, **pg_params) is not pool
+    finally:
+        close_all_pools()
+    assert get_pool(minconn=0, **pg_params) is not pool
+    close_all_pools()
@@ -0,0 +1,71 @@
+import pytest
+
+from postgres_repository import PreparedStatementCache, Repository, TableSchema, to_dollar_params
+
+_SCHEMA = TableSchema("repo_fixture", [("id", "SERIAL"), ("title", "TEXT NOT NULL"), ("price", "INT")],
+                      key="id", generated=("id",), indexes=[("title",)])
+
+
+def test_to_dollar_params():
+    assert to_dollar_params("SELECT * FROM t WHERE a = %s AND b LIKE 'x%%' AND c = %s;") == (
+        "SELECT * FROM t WHERE a = $1 AND b LIKE 'x%' AND c = $2"
+    )
+    assert to_dollar_params("SELECT * FROM t WHERE a = %(a)s") is None
+
+
+def test_schema_and_where_validation(pg_conn):
+    with pytest.raises(ValueError):
+        TableSchema("t", [("a", "INT")], key="id")
+    repo = Repository(_SCHEMA)
+    where_sql, params = repo._where([("price", ">=", 10), ("title", "ilike", "a%"), ("price", "<>", None)])
+    assert where_sql.as_string(pg_conn) == ' WHERE "price" >= %s AND "title" ILIKE %s AND "price" IS NOT NULL'
+    assert params == [10, "a%"]
+    with pytest.raises(ValueError):
+        repo._where({"missing": 1})
+    with pytest.raises(ValueError):
+        repo._where([("price", "; DROP", 1)])
+
+
+@pytest.fixture
+def repo_conn(pg_conn):
+    # PREPARE는 세션에 남으므로 autocommit 연결과 세션이 끝나면 사라지는 임시 테이블을 사용합니다.
+    pg_conn.autocommit = True
+    with pg_conn.cursor() as cur:
+        cur.execute("CREATE TEMP TABLE repo_fixture (id serial PRIMARY KEY, title text NOT NULL, price int)")
+    return pg_conn
+
+
+def _prepared(cur):
+    cur.execute("SELECT count(*) FROM pg_prepared_statements WHERE name LIKE 'repo\\_%'")
+    return cur.fetchone()[0]
+
+
+def test_crud_with_prepared_statements(repo_conn):
+    statements = PreparedStatementCache(max_statements=2)
+    repo = Repository(_SCHEMA, statements=statements)
+    with repo_conn.cursor() as cur:
+        row = repo.insert(cur, {"title": "a", "price": 10})
+        assert repo.as_dict(row) == {"id": row[0], "title": "a", "price": 10}
+        repo.insert(cur, {"title": "b", "price": 20})
+        assert repo.get(cur, row[0]) == row
+        assert statements.prepared_count(repo_conn) == 2  # INSERT, SELECT (같은 INSERT는 재사용)
+
+        assert repo.find(cur, [("price", ">", 15)], columns=["title"]) == [("b",)]
+        assert statements.prepared_count(repo_conn) == 2 and _prepared(cur) == 2  # 가장 오래된 문장은 DEALLOCATE
+        assert [r[1] for r in repo.update(cur, {"price": 30}, {"title": "b"})] == ["b"]
+        assert len(repo.delete(cur, {"price": None})) == 0
+        assert [r[1] for r in repo.find(cur, order_by=["price"], descending=True)] == ["b", "a"]
+
+        statements.forget(repo_conn)
+        assert statements.prepared_count(repo_conn) == 0
+
+
+def test_statement_is_not_prepared_inside_open_transaction(repo_conn):
+    statements = PreparedStatementCache()
+    repo = Repository(_SCHEMA, statements=statements)
+    repo_conn.autocommit = False
+    with repo_conn.cursor() as cur:
+        cur.execute("SELECT 1")  # 트랜잭션 시작
+        repo.insert(cur, {"title": "a"})
+        assert statements.prepared_count(repo_conn) == 0 and _prepared(cur) == 0
+    repo_conn.rollback()
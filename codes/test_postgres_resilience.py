@@ -0,0 +1,180 @@
+import os
+import shlex
+import subprocess
+import time
+
+import psycopg2
+import pytest
+from psycopg2.pool import PoolError
+
+from postgres_pool import PoolTimeoutError, close_all_pools
+from postgres_resilience import (CircuitBreaker, CircuitOpenError, ResilientDatabase, RetryPolicy,
+                                 is_connection_failure, is_serialization_failure, is_transient)
+
+
+def _error(cls, pgcode=None):
+    """pgcode가 설정된 psycopg2 예외를 만듭니다. (pgcode는 읽기 전용이라 하위 클래스로 덮어씀)"""
+    return type(cls.__name__, (cls,), {"pgcode": pgcode})("error")
+
+
+# ----------------------------------------------------------------------
+# 오류 분류
+# ----------------------------------------------------------------------
+
+def test_is_transient():
+    assert is_transient(psycopg2.OperationalError("server closed the connection unexpectedly"))
+    assert is_transient(psycopg2.InterfaceError("connection already closed"))
+    assert is_transient(_error(psycopg2.OperationalError, "57P01"))  # admin_shutdown
+    assert is_transient(_error(psycopg2.OperationalError, "08006"))  # connection_failure
+    assert is_transient(_error(psycopg2.OperationalError, "53300"))  # too_many_connections
+    assert not is_transient(_error(psycopg2.IntegrityError, "23505"))
+    assert not is_transient(_error(psycopg2.errors.SerializationFailure, "40001"))
+    assert not is_transient(CircuitOpenError("open"))
+    assert not is_transient(ValueError("not a database error"))
+
+
+def test_is_serialization_failure():
+    assert is_serialization_failure(_error(psycopg2.OperationalError, "40001"))
+    assert is_serialization_failure(_error(psycopg2.OperationalError, "40P01"))
+    assert not is_serialization_failure(_error(psycopg2.OperationalError, "57P01"))
+
+
+def test_pool_errors_are_not_connection_failures():
+    assert is_connection_failure(psycopg2.OperationalError("could not connect to server"))
+    assert is_connection_failure(_error(psycopg2.DatabaseError, "08001"))
+    assert not is_connection_failure(PoolTimeoutError("timeout"))
+    assert not is_connection_failure(PoolError("closed"))
+    assert not is_connection_failure(CircuitOpenError("open"))
+    assert not is_connection_failure(_error(psycopg2.ProgrammingError, "42P01"))
+
+
+# ----------------------------------------------------------------------
+# RetryPolicy
+# ----------------------------------------------------------------------
+
+def test_retry_backoff_doubles_up_to_max_delay():
+    policy = RetryPolicy(attempts=6, base_delay=0.1, max_delay=0.5, jitter=False)
+    assert [policy.delay(n) for n in range(1, 6)] == [0.1, 0.2, 0.4, 0.5, 0.5]
+
+
+def test_retry_jitter_stays_within_backoff():
+    policy = RetryPolicy(base_delay=0.1, max_delay=0.5)
+    for attempt in range(1, 6):
+        assert all(0 <= policy.delay(attempt) <= min(0.5, 0.1 * 2 ** (attempt - 1)) for _ in range(50))
+    with pytest.raises(ValueError):
+        RetryPolicy(attempts=0)
+
+
+# ----------------------------------------------------------------------
+# CircuitBreaker
+# ----------------------------------------------------------------------
+
+def test_breaker_opens_after_threshold_and_half_opens_after_timeout():
+    breaker = CircuitBreaker("db", failure_threshold=3, reset_timeout=60.0)
+    for _ in range(2):
+        breaker.record_failure()
+    assert breaker.state == CircuitBreaker.CLOSED and breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN and not breaker.allow()
+
+    breaker.opened_at -= 60.0  # reset_timeout 경과
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert breaker.allow()
+    assert not breaker.allow()  # 시험은 한 번에 하나만
+
+
+def test_breaker_half_open_trial_success_closes_and_failure_reopens():
+    breaker = CircuitBreaker("db", failure_threshold=1, reset_timeout=60.0)
+    breaker.record_failure()
+    breaker.opened_at -= 60.0
+    assert breaker.allow()
+    breaker.record_failure()  # 시험 실패: 바로 다시 open
+    assert breaker.state == CircuitBreaker.OPEN and not breaker.allow()
+
+    breaker.opened_at -= 60.0
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED and breaker.failures == 0 and breaker.allow()
+
+
+def test_breaker_release_lets_another_trial_run():
+    breaker = CircuitBreaker("db", failure_threshold=1, reset_timeout=60.0)
+    breaker.record_failure()
+    breaker.opened_at -= 60.0
+    assert breaker.allow() and not breaker.allow()
+    breaker.release()
+    assert breaker.allow()
+
+
+# ----------------------------------------------------------------------
+# ResilientDatabase.getconn
+# ----------------------------------------------------------------------
+
+class _Pool:
+    def __init__(self, error=None):
+        self.error = error
+
+    def getconn(self):
+        raise self.error
+
+
+def test_pool_timeout_propagates_without_opening_circuit(monkeypatch):
+    db = ResilientDatabase("db1:5432", failure_threshold=1)
+    monkeypatch.setattr(db, "pool", lambda address: _Pool(PoolTimeoutError("timeout")))
+    for _ in range(3):
+        with pytest.raises(PoolTimeoutError):
+            db.getconn()
+    assert db.status() == {"db1:5432": "closed"} and db.breakers[db.primary].failures == 0
+
+
+def test_connection_failures_open_circuit(monkeypatch):
+    db = ResilientDatabase("db1:5432", failure_threshold=2)
+    monkeypatch.setattr(db, "pool", lambda address: _Pool(psycopg2.OperationalError("could not connect")))
+    for _ in range(2):
+        with pytest.raises(psycopg2.OperationalError):
+            db.getconn()
+    assert db.status() == {"db1:5432": "open"}
+    with pytest.raises(CircuitOpenError):
+        db.getconn()
+
+
+# ----------------------------------------------------------------------
+# 서버 재시작 (로컬 PostgreSQL)
+# ----------------------------------------------------------------------
+# 서버를 멈췄다 다시 켜야 하므로 pg_ctl 명령을 알려줄 때만 실행합니다. 예)
+#   POSTGRES_TEST_PG_CTL="runuser -u postgres -- pg_ctl -D /var/lib/postgresql/data" python -m pytest codes
+
+PG_CTL = os.environ.get("POSTGRES_TEST_PG_CTL")
+
+
+def _pg_ctl(*args: str) -> None:
+    # 서버 프로세스가 출력을 물려받으므로 파이프로 받으면 start가 끝나지 않습니다.
+    subprocess.run([*shlex.split(PG_CTL), *args], check=True, timeout=60,
+                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+@pytest.mark.skipif(not PG_CTL, reason="POSTGRES_TEST_PG_CTL이 없으면 서버를 재시작할 수 없습니다.")
+def test_recovers_after_server_restart(pg_params):
+    params = {k: v for k, v in pg_params.items() if k not in ("host", "port")}
+    db = ResilientDatabase(f"{pg_params.get('host', 'localhost')}:{pg_params.get('port', '5432')}",
+                           retry=RetryPolicy(attempts=2, base_delay=0.01, jitter=False),
+                           failure_threshold=2, reset_timeout=0.5, minconn=1, maxconn=2, connect_timeout=3,
+                           **params)
+    try:
+        assert db.execute("SELECT 1") == [(1,)]
+        _pg_ctl("stop", "-m", "fast", "-w")
+        try:
+            with pytest.raises(psycopg2.OperationalError):
+                db.execute("SELECT 1")  # 풀의 연결이 끊겼고 새 연결도 실패
+            with pytest.raises(psycopg2.OperationalError):
+                db.execute("SELECT 1")
+            assert list(db.status().values()) == ["open"]
+            with pytest.raises(CircuitOpenError):
+                db.execute("SELECT 1")  # 연결을 시도하지 않고 바로 실패
+        finally:
+            _pg_ctl("start", "-w")
+        time.sleep(0.5)  # reset_timeout 경과 후 시험 연결
+        assert db.execute("SELECT 1") == [(1,)]
+        assert list(db.status().values()) == ["closed"]
+    finally:
+        close_all_pools()
@@ -0,0 +1,47 @@
+import pytest
+
+from postgres_search import install_title_search, search
+
+
+@pytest.fixture
+def cur(pg_conn):
+    """search_fixture 테이블에 '알고리즘 문제집 N' 3,000권과 제목이 정확히 '알고리즘'인 1권을 넣습니다."""
+    with pg_conn.cursor() as cur:
+        cur.execute("CREATE TEMP TABLE search_fixture (id int PRIMARY KEY, title varchar(100) NOT NULL)")
+        install_title_search(cur, "search_fixture", "title")
+        cur.execute("INSERT INTO search_fixture SELECT n, '알고리즘 문제집 ' || n FROM generate_series(1, 3000) n")
+        cur.execute("INSERT INTO search_fixture VALUES (5000, '알고리즘')")
+        cur.execute("ANALYZE search_fixture")
+        yield cur
+
+
+def _search(cur, text, **kwargs):
+    return search(cur, text, "search_fixture", "title", ("id", "title"), use_trgm=False, **kwargs)
+
+
+def test_exact_match_beyond_candidate_cap_ranks_first(cur):
+    rows, _ = _search(cur, "알고리즘", max_candidates=100, page_size=5)
+    assert rows[0][:2] == (5000, "알고리즘")
+    assert rows.truncated
+
+
+def test_uncapped_search_is_not_truncated(cur):
+    rows, _ = _search(cur, "알고리즘", max_candidates=None, page_size=5)
+    assert rows[0][:2] == (5000, "알고리즘") and rows[0][2] == 6.0
+    assert not rows.truncated
+
+
+def test_capped_pages_are_stable_and_disjoint(cur):
+    seen, token = [], None
+    while True:
+        rows, token = _search(cur, "문제집", max_candidates=50, page_size=20, page_token=token)
+        seen += [row[0] for row in rows]
+        if token is None:
+            break
+    assert len(seen) == len(set(seen)) == 50
+    assert seen == [row[0] for row in _search(cur, "문제집", max_candidates=50, page_size=100)[0]]
+
+
+def test_small_result_is_not_truncated(cur):
+    rows, token = _search(cur, "문제집 2999")
+    assert [row[0] for row in rows] == [2999] and token is None and not rows.truncated
@@ -0,0 +1,24 @@
+import psycopg2.extensions
+
+from postgres_stream import stream_query
+
+_SERIES = "SELECT g FROM generate_series(1, %s) g"
+
+
+def test_stream_query_yields_all_rows_in_batches(pg_conn):
+    assert [r[0] for r in stream_query(pg_conn, _SERIES, (25,), itersize=4)] == list(range(1, 26))
+    # autocommit이 아니면 트랜잭션은 호출자에게 남겨 둡니다.
+    assert pg_conn.info.transaction_status == psycopg2.extensions.TRANSACTION_STATUS_INTRANS
+    # 커서 이름이 겹치지 않으므로 같은 연결에서 여러 스트림을 동시에 읽을 수 있습니다.
+    first, second = stream_query(pg_conn, _SERIES, (3,)), stream_query(pg_conn, _SERIES, (3,))
+    assert list(zip(first, second)) == [((1,), (1,)), ((2,), (2,)), ((3,), (3,))]
+
+
+def test_stream_query_restores_autocommit_when_stopped_early(pg_conn):
+    pg_conn.autocommit = True
+    rows = stream_query(pg_conn, _SERIES, (1000,), itersize=10)
+    assert next(rows) == (1,)
+    assert not pg_conn.autocommit
+    rows.close()
+    assert pg_conn.autocommit
+    assert pg_conn.info.transaction_status == psycopg2.extensions.TRANSACTION_STATUS_IDLE
@@ -0,0 +1,54 @@
+import uuid
+from datetime import datetime, timezone
+
+import pytest
+
+import postgres_uuid7
+from postgres_uuid7 import install_uuid7_function, uuid7, uuid7_timestamp
+
+
+@pytest.fixture(autouse=True)
+def _fresh_generator_state(monkeypatch):
+    # 고정 시각으로 만든 값이 다른 테스트의 단조 증가 상태에 남지 않도록 합니다.
+    monkeypatch.setattr(postgres_uuid7, "_last_ms", 0)
+    monkeypatch.setattr(postgres_uuid7, "_counter", 0)
+
+
+def test_version_variant_and_timestamp():
+    ms = 1_700_000_000_123
+    value = uuid7(ms)
+    assert value.version == 7
+    assert value.variant == uuid.RFC_4122
+    assert value.int >> 80 == ms
+    assert uuid7_timestamp(value) == datetime(2023, 11, 14, 22, 13, 20, 123000, tzinfo=timezone.utc)
+    with pytest.raises(ValueError):
+        uuid7_timestamp(uuid.uuid4())
+
+
+def test_monotonic_within_millisecond_and_when_clock_goes_back():
+    ms = 1_700_000_000_000
+    values = [uuid7(ms) for _ in range(1000)] + [uuid7(ms - 5) for _ in range(10)]
+    assert values == sorted(values)
+    assert len(set(values)) == len(values)
+    assert {v.int >> 80 for v in values} == {ms}
+    assert uuid7() > values[-1]
+
+
+def test_counter_overflow_moves_to_next_millisecond(monkeypatch):
+    ms = 1_700_000_000_000
+    monkeypatch.setattr(postgres_uuid7, "_last_ms", ms)
+    monkeypatch.setattr(postgres_uuid7, "_counter", 0xFFF)
+    value = uuid7(ms)
+    assert value.int >> 80 == ms + 1
+    assert (value.int >> 64) & 0xFFF == 0
+
+
+def test_server_function_generates_v7(pg_conn):
+    with pg_conn.cursor() as cur:
+        install_uuid7_function(cur)
+        cur.execute("SELECT uuid_generate_v7()::text, now() FROM generate_series(1, 3)")
+        rows = cur.fetchall()
+    for text, now in rows:
+        value = uuid.UUID(text)
+        assert value.version == 7 and value.variant == uuid.RFC_4122
+        assert abs((uuid7_timestamp(value) - now).total_seconds()) < 60
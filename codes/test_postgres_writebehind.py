@@ -0,0 +1,147 @@
+from contextlib import contextmanager
+
+import pytest
+
+import postgres_writebehind
+from postgres_writebehind import WriteBehindBuffer
+
+
+class _Connection:
+    def __init__(self, log: list):
+        self.log = log
+
+    @contextmanager
+    def cursor(self):
+        yield None
+
+    def commit(self) -> None:
+        self.log.append("commit")
+
+    def rollback(self) -> None:
+        self.log.append("rollback")
+
+
+@pytest.fixture
+def db(monkeypatch):
+    """
+    INSERT/UPDATE 문장 대신 호출 인자를 기록하는 가짜 연결입니다.
+    db["inserts"]: 배치마다 삽입한 행 목록, db["updates"]: 배치마다 update_many에 넘긴 (키, 값...) 목록
+    """
+    state = {"inserts": [], "updates": [], "log": [], "fail": None}
+
+    def insert_rows(self, cur, rows):
+        if state["fail"]:
+            raise state["fail"]
+        state["inserts"].append(list(rows))
+        return [(f"id-{row[0]}",) for row in rows]
+
+    def update_many(cur, table, key, columns, rows, returning=()):
+        state["updates"].append(list(rows))
+        return [tuple(row) for row in rows if row[0] != "missing"]
+
+    @contextmanager
+    def connection():
+        yield _Connection(state["log"])
+
+    monkeypatch.setattr(WriteBehindBuffer, "_insert_rows", insert_rows)
+    monkeypatch.setattr(postgres_writebehind, "update_many", update_many)
+    state["connection"] = connection
+    return state
+
+
+def test_inserts_are_written_in_batches_of_max_batch(db):
+    with WriteBehindBuffer(db["connection"], max_batch=3, max_delay=60.0) as buffer:
+        futures = [buffer.insert((f"book{i}", i)) for i in range(7)]
+        assert buffer.flush(timeout=5)
+    assert [f.result() for f in futures] == [(f"id-book{i}",) for i in range(7)]
+    assert [len(batch) for batch in db["inserts"]] == [3, 3, 1]
+    assert [row for batch in db["inserts"] for row in batch] == [(f"book{i}", i) for i in range(7)]
+    assert buffer.stats() == {"pending": 0, "batches": 3, "written": 7, "failed": 0, "flush_errors": 0}
+
+
+def test_max_delay_writes_without_flush(db):
+    with WriteBehindBuffer(db["connection"], max_batch=100, max_delay=0.01) as buffer:
+        future = buffer.insert(("book", 1))
+        assert future.result(timeout=5) == ("id-book",)
+    assert db["inserts"] == [[("book", 1)]]
+
+
+def test_updates_to_same_key_are_coalesced(db):
+    with WriteBehindBuffer(db["connection"], max_batch=10, max_delay=60.0) as buffer:
+        first = buffer.update(1, (100,))
+        second = buffer.update(2, (300,))
+        last = buffer.update(1, (200,))
+        missing = buffer.update("missing", (1,))
+        assert buffer.flush(timeout=5)
+    assert db["updates"] == [[(1, 200), (2, 300), ("missing", 1)]]  # 같은 키는 마지막 값만, 한 문장으로
+    assert first.result() == last.result() == (1, 200)
+    assert second.result() == (2, 300)
+    assert missing.result() is None
+    assert db["log"] == ["commit"]
+
+
+def test_failed_batch_fails_every_future(db):
+    db["fail"] = RuntimeError("insert failed")
+    with WriteBehindBuffer(db["connection"], max_batch=10, max_delay=60.0) as buffer:
+        futures = [buffer.insert(("book", 1)), buffer.update(1, (100,))]
+        assert buffer.flush(timeout=5)
+    for future in futures:
+        with pytest.raises(RuntimeError, match="insert failed"):
+            future.result()
+    assert buffer.stats()["failed"] == 2
+    assert "commit" not in db["log"]
+
+
+def test_on_flush_error_does_not_fail_committed_writes(db):
+    def on_flush(conn):
+        raise RuntimeError("cache down")
+
+    with WriteBehindBuffer(db["connection"], max_batch=10, max_delay=60.0, on_flush=on_flush) as buffer:
+        future = buffer.insert(("book", 1))
+        assert buffer.flush(timeout=5)
+    assert future.result() == ("id-book",)
+    assert buffer.stats()["flush_errors"] == 1 and buffer.stats()["failed"] == 0
+    assert db["log"] == ["commit", "rollback"]
+
+
+def test_rejects_wrong_arity_and_closed_buffer(db):
+    buffer = WriteBehindBuffer(db["connection"])
+    with pytest.raises(ValueError):
+        buffer.insert(("only title",))
+    with pytest.raises(ValueError):
+        buffer.update(1, (1, 2))
+    buffer.close()
+    with pytest.raises(RuntimeError):
+        buffer.insert(("book", 1))
+
+
+def test_cancelled_writes_are_dropped(db):
+    with WriteBehindBuffer(db["connection"], max_batch=10, max_delay=60.0) as buffer:
+        cancelled = buffer.insert(("cancelled", 1))
+        kept = buffer.insert(("kept", 2))
+        dropped_update = buffer.update(1, (100,))
+        assert cancelled.cancel() and dropped_update.cancel()
+        assert buffer.flush(timeout=5)
+        assert kept.result() == ("id-kept",)
+        only_cancelled = buffer.insert(("cancelled again", 3))
+        assert only_cancelled.cancel()
+        assert buffer.flush(timeout=5)  # 취소된 쓰기도 처리된 것으로 세어 flush가 끝남
+        later = buffer.insert(("later", 4))  # 버퍼 스레드가 InvalidStateError로 죽지 않았음
+        assert buffer.flush(timeout=5)
+    assert later.result() == ("id-later",)
+    assert db["inserts"] == [[("kept", 2)], [("later", 4)]] and db["updates"] == []
+
+
+def test_unexpected_error_fails_batch_and_keeps_thread(db):
+    with WriteBehindBuffer(db["connection"], max_batch=10, max_delay=60.0) as buffer:
+        write = buffer._write
+        buffer._write = lambda inserts, updates: 1 / 0  # _write 밖으로 새는 예상하지 못한 오류
+        failed = buffer.insert(("book", 1))
+        assert buffer.flush(timeout=5)
+        with pytest.raises(ZeroDivisionError):
+            failed.result()
+        buffer._write = write
+        later = buffer.insert(("later", 2))
+        assert buffer.flush(timeout=5)
+    assert later.result() == ("id-later",)
+    assert buffer.stats()["failed"] == 1
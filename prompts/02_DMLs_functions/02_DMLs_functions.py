@@ -1,6 +1,21 @@
-import psycopg2
-from psycopg2 import sql
-from typing import List, Dict, Any
+import os
+import sys
+
+# 공용 모듈(codes/) 경로 등록
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "codes"))
+from postgres_cli import build_parser, forward, forward_command, parse_insert_rows, serve, stop
+
+# 데몬이 실행 중이면 공용 모듈(psycopg2 포함)을 불러오기 전에 명령을 전달하고 끝냅니다.
+if __name__ == '__main__':
+    _status = forward_command("02_DMLs_functions.py", "books 테이블 CRUD 명령", sys.argv[1:])
+    if _status is not None:
+        sys.exit(_status)
+
+# 연결 풀, 쿼리 계측, 조회 캐시는 모든 명령이 사용합니다.
+# 나머지 공용 모듈은 각 함수 안에서 불러오므로 명령마다 필요한 모듈만 읽습니다.
+from postgres_cache import QueryCache
+from postgres_metrics import QueryMetrics
+from postgres_resilience import ResilientDatabase, RetryPolicy
 
 # ==============================================================================
 # 🌟 데이터베이스 연결 정보 (상수 정의)
@@ -11,16 +26,66 @@ DB_NAME = "main_db"
 DB_USER = "admin"
 DB_PASSWORD = "admin123"
 
+# 연결 풀 설정 (최소/최대 연결 수, 대기 시간 초과, 연결 최대 수명)
+POOL_MIN_SIZE = 1
+POOL_MAX_SIZE = 10
+POOL_TIMEOUT = 30.0
+POOL_MAX_LIFETIME = 1800.0
+
+# 조회 결과 캐시 설정 (최대 항목 수, 유효 시간, 프로세스 간 NOTIFY 무효화 여부/채널)
+CACHE_SIZE = 1024
+CACHE_TTL = 60.0
+CACHE_NOTIFY_ENABLED = False
+CACHE_NOTIFY_CHANNEL = "books_cache_invalidation"
+
+# 쿼리 계측 설정 (느린 쿼리 기준 시간(초), 느린 SELECT의 EXPLAIN (ANALYZE, BUFFERS) 자동 수집 여부)
+SLOW_QUERY_THRESHOLD = 0.5
+SLOW_QUERY_EXPLAIN = False
+
+QUERY_METRICS = QueryMetrics(slow_threshold=SLOW_QUERY_THRESHOLD, explain_slow=SLOW_QUERY_EXPLAIN)
+
+# 장애 대응 설정 (읽기 복제본 "host:port,..." 목록, 최대 실행 횟수, 회로를 여는 연속 실패 횟수, 회로 유지 시간(초))
+DB_REPLICA_HOSTS = ""
+RETRY_ATTEMPTS = 5
+CIRCUIT_FAILURE_THRESHOLD = 5
+CIRCUIT_RESET_TIMEOUT = 10.0
+
+# True이면 id 기본값을 시간 순서 UUIDv7(uuid_generate_v7(), 확장 불필요)로 전환합니다.
+# 기존 테이블은 기본값만 바뀌고 이미 저장된 v4 키는 유지됩니다.
+BOOKS_ID_UUID7 = False
+
 # ==============================================================================
 # ⚙️ 연결/종료 함수
 # ==============================================================================
 
+_database = None
+
+def get_database():
+    """primary/복제본 풀을 묶어 재시도·서킷 브레이커·읽기 라우팅을 제공하는 ResilientDatabase를 반환합니다."""
+    global _database
+    if _database is None:
+        # autocommit=True로 설정하여 매 쿼리 후 즉시 변경사항을 반영합니다.
+        _database = ResilientDatabase(f"{DB_HOST}:{DB_PORT}", DB_REPLICA_HOSTS,
+                                      retry=RetryPolicy(attempts=RETRY_ATTEMPTS),
+                                      failure_threshold=CIRCUIT_FAILURE_THRESHOLD,
+                                      reset_timeout=CIRCUIT_RESET_TIMEOUT,
+                                      minconn=POOL_MIN_SIZE, maxconn=POOL_MAX_SIZE, timeout=POOL_TIMEOUT,
+                                      max_lifetime=POOL_MAX_LIFETIME, autocommit=True, metrics=QUERY_METRICS,
+                                      dbname=DB_NAME, user=DB_USER, password=DB_PASSWORD)
+    return _database
+
+def get_db_pool():
+    """primary 연결 풀을 반환합니다. (최초 호출 시 생성)"""
+    database = get_database()
+    return database.pool(database.primary)
+
 def connect_db():
-    """데이터베이스 연결을 설정하고 connection 및 cursor 객체를 반환합니다."""
+    """
+    연결 풀에서 connection을 빌려오고 connection 및 cursor 객체를 반환합니다.
+    DB가 계속 응답하지 않으면 회로가 열려 연결 시간 초과를 기다리지 않고 바로 (None, None)을 반환합니다.
+    """
     try:
-        conn = psycopg2.connect(host=DB_HOST, port=DB_PORT, dbname=DB_NAME, user=DB_USER, password=DB_PASSWORD)
-        # autocommit=True로 설정하여 매 쿼리 후 즉시 변경사항을 반영합니다.
-        conn.autocommit = True
+        conn = get_database().getconn()
         cur = conn.cursor()
         return conn, cur
     except Exception as e:
@@ -28,36 +93,108 @@ def connect_db():
         return None, None
 
 def close_db(conn, cur):
-    """데이터베이스 연결을 닫습니다."""
+    """cursor를 닫고 connection을 연결 풀에 반환합니다."""
     if cur:
         cur.close()
     if conn:
-        conn.close()
+        get_database().putconn(conn)
+
+def export_metrics(fmt: str = "prometheus"):
+    """쿼리 형태별 실행 시간/행 수, 연결 대여 시간, 느린 쿼리 기록을 Prometheus 텍스트 또는 JSON("json")으로 반환합니다."""
+    if fmt == "json":
+        return QUERY_METRICS.to_json()
+    return QUERY_METRICS.to_prometheus()
+
+BOOK_CACHE = QueryCache(maxsize=CACHE_SIZE, ttl=CACHE_TTL)
+
+def books_changed(conn):
+    """books 테이블을 변경한 뒤 호출하여 관련 캐시 항목을 무효화합니다."""
+    BOOK_CACHE.invalidate("books")
+    if CACHE_NOTIFY_ENABLED:
+        from postgres_cache import publish_invalidation
+        publish_invalidation(conn, "books", CACHE_NOTIFY_CHANNEL)
+
+def start_cache_listener():
+    """다른 프로세스의 쓰기 알림(LISTEN/NOTIFY)을 받아 BOOK_CACHE를 무효화하는 스레드를 시작합니다."""
+    from postgres_cache import CacheInvalidationListener
+    return CacheInvalidationListener(BOOK_CACHE, CACHE_NOTIFY_CHANNEL, host=DB_HOST, port=DB_PORT,
+                                     dbname=DB_NAME, user=DB_USER, password=DB_PASSWORD).start()
+
+def fetch_records(query, params, use_cache: bool = True):
+    """
+    조회 결과 전체를 반환합니다. use_cache=True이면 캐시에 있는 결과를 DB 접속 없이 재사용합니다.
+    DB 조회는 연결별로 PREPARE해 둔 문장을 EXECUTE하여 반복 시 파싱/계획 단계를 건너뜁니다.
+    조회는 읽기 복제본으로 보내며, 연결 끊김 같은 일시적 오류는 백오프 후 다시 시도합니다.
+    """
+    from postgres_repository import PREPARED_STATEMENTS
+
+    def fetch(conn):
+        with conn.cursor() as cur:
+            PREPARED_STATEMENTS.execute(cur, query, params)
+            return cur.fetchall()
+    def load():
+        return get_database().run(fetch, readonly=True)
+    if use_cache:
+        return BOOK_CACHE.get_or_load(query, params, load, tables=("books",))
+    return load()
+
+def print_records(records):
+    """조회 결과를 한 행씩 출력합니다. 리스트와 iter_* 제너레이터 모두 받을 수 있습니다."""
+    for record in records:
+        print(f"순번: {record[0]}, ID: {record[1]}, 제목: {record[2]}, 가격: {record[3]}원")
 
 # ==============================================================================
 # 📚 CRUD 연산 함수
 # ==============================================================================
 
 # [문제 1] 테이블 생성 (CREATE)
-def create_books_table():
-    """'books' 테이블을 생성합니다. uuid-ossp 확장 기능과 요청된 ID 정의를 사용합니다."""
-    conn, cur = connect_db()
-    if not conn: return
-    try:
+def create_books_statements():
+    """books 스키마 생성 문장 목록을 반환합니다. 목록의 해시가 스키마 버전이 되어 테이블 주석에 기록됩니다. (postgres_schema 참고)"""
+    from postgres_search import title_search_statements
+
+    statements = [
         # uuid_generate_v4() 사용을 위해 'uuid-ossp' 확장이 필요합니다.
         # 대부분의 최신 PostgreSQL 환경에 기본 포함되지만, 명시적으로 실행해 줍니다.
-        cur.execute("CREATE EXTENSION IF NOT EXISTS \"uuid-ossp\"")
-        
+        "CREATE EXTENSION IF NOT EXISTS \"uuid-ossp\"",
         # **** 사용자가 강력히 요청한 'id UUID PRIMARY KEY DEFAULT uuid_generate_v4()' 구문 사용 ****
-        cur.execute("""
+        """
             CREATE TABLE IF NOT EXISTS books (
                 serial_no SERIAL UNIQUE NOT NULL,  -- 순서 보장용 순번
                 id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),  -- 요청된 PRIMARY KEY 정의
                 title VARCHAR(100) NOT NULL,
                 price INT NOT NULL
             )
-        """)
-        print("books 테이블이 생성되었습니다.")
+        """,
+        # 조회/키셋 페이지네이션용 인덱스 (serial_no는 UNIQUE 제약의 인덱스를 사용)
+        # - title: get_book_by_title()의 등치 조건
+        # - price: get_expensive_books()의 범위 조건과 가격순 페이지. 조회 컬럼을 INCLUDE하여
+        #   index-only scan이 가능하도록 합니다. (이전 books_price_id_idx를 대체)
+        "CREATE INDEX IF NOT EXISTS books_title_idx ON books (title)",
+        "CREATE INDEX IF NOT EXISTS books_price_covering_idx ON books (price, id) INCLUDE (serial_no, title)",
+        "DROP INDEX IF EXISTS books_price_id_idx",
+        # 제목 부분 검색(search_books)용 bigram tsvector 생성 컬럼과 GIN 인덱스
+        *title_search_statements("books", "title"),
+    ]
+    if BOOKS_ID_UUID7:
+        # 무작위 v4 키는 인덱스 전체에 흩어져 삽입되므로, 새 행은 시간 순서 키로 오른쪽 끝에 쌓이게 합니다.
+        # (postgres_uuid7.migrate_to_uuid7과 같은 문장)
+        from postgres_uuid7 import UUID7_FUNCTION_SQL
+        statements += [UUID7_FUNCTION_SQL, "ALTER TABLE books ALTER COLUMN id SET DEFAULT uuid_generate_v7()"]
+    return statements
+
+def create_books_table(force: bool = False):
+    """
+    'books' 테이블을 생성합니다. uuid-ossp 확장 기능과 요청된 ID 정의를 사용합니다.
+    이미 같은 스키마 버전이 적용되어 있으면 DDL을 보내지 않습니다. (force=True이면 다시 실행)
+    """
+    from postgres_schema import ensure_schema
+    conn, cur = connect_db()
+    if not conn: return
+    try:
+        if ensure_schema(cur, "books", create_books_statements(), force=force):
+            print("books 테이블이 생성되었습니다.")
+        else:
+            print("books 테이블이 이미 최신 스키마입니다.")
     except Exception as e:
         print(f"테이블 생성 중 오류가 발생했습니다: {e}")
     finally:
@@ -66,6 +203,7 @@ def create_books_table():
 # [문제 2] 데이터 삽입 (INSERT)
 def insert_books():
     """테스트용 도서 데이터를 삽입합니다. id는 uuid_generate_v4()에 의해 자동 생성됩니다."""
+    from postgres_bulk import bulk_insert
     conn, cur = connect_db()
     if not conn: return
     data = [
@@ -73,29 +211,74 @@ def insert_books():
         ('알고리즘 기초', 25000),
         ('네트워크 이해', 30000)
     ]
-    # sql.SQL을 사용하여 쿼리를 안전하게 구성합니다.
-    insert_query = sql.SQL("INSERT INTO books (title, price) VALUES ({}, {})").format(sql.Placeholder(), sql.Placeholder())
     try:
-        # executemany를 사용하여 여러 행을 효율적으로 삽입합니다.
-        cur.executemany(insert_query, data)
-        print(f"{len(data)}개 도서가 삽입되었습니다.")
+        # bulk_insert는 적은 행을 execute_values 한 번(서버 왕복 1회)으로 삽입합니다.
+        count = bulk_insert(conn, data, table="books", columns=("title", "price"))
+        books_changed(conn)
+        print(f"{count}개 도서가 삽입되었습니다.")
     except Exception as e:
         print(f"데이터 삽입 중 오류가 발생했습니다: {e}")
     finally:
         close_db(conn, cur)
 
+def load_books(source, batch_size: int = 100_000, return_ids: bool = False):
+    """
+    대량의 도서 데이터를 COPY ... FROM STDIN으로 적재합니다.
+    source는 (title, price) 행의 iterable 또는 CSV/JSONL 파일 경로이며,
+    return_ids=True이면 생성된 (id, serial_no) 목록을 입력 순서대로 반환합니다.
+    """
+    from postgres_bulk import bulk_insert, bulk_insert_file
+    conn, cur = connect_db()
+    if not conn: return [] if return_ids else 0
+    returning = ("id", "serial_no") if return_ids else None
+    try:
+        if isinstance(source, str):
+            result = bulk_insert_file(conn, source, batch_size=batch_size, returning=returning)
+        else:
+            result = bulk_insert(conn, source, batch_size=batch_size, returning=returning)
+        books_changed(conn)
+        print(f"{len(result) if return_ids else result}개 도서가 적재되었습니다.")
+        return result
+    except Exception as e:
+        print(f"대량 적재 중 오류가 발생했습니다: {e}")
+        return [] if return_ids else 0
+    finally:
+        close_db(conn, cur)
+
+def merge_books(source, method: str = "auto", batch_size: int = 100_000):
+    """
+    (title, price) 행을 제목 기준으로 병합합니다. 없는 제목은 삽입하고 가격이 다른 도서만 수정하며,
+    처리 건수 딕셔너리를 반환합니다. source는 행의 iterable 또는 CSV/JSONL 파일 경로입니다.
+    """
+    from postgres_bulk import iter_file_rows
+    from postgres_merge import bulk_merge
+    conn, cur = connect_db()
+    if not conn: return None
+    try:
+        rows = iter_file_rows(source) if isinstance(source, str) else source
+        stats = bulk_merge(conn, rows, table="books", columns=("title", "price"), key=("title",),
+                           method=method, batch_size=batch_size)
+        books_changed(conn)
+        print(f"병합 결과: 삽입 {stats['inserted']}건, 수정 {stats['updated']}건, 변경 없음 {stats['unchanged']}건")
+        return stats
+    except Exception as e:
+        print(f"병합 중 오류가 발생했습니다: {e}")
+        return None
+    finally:
+        close_db(conn, cur)
+
 # [문제 3] 데이터 조회 (READ)
-def get_all_books():
-    """전체 도서 데이터를 serial_no 순으로 조회하고 출력합니다."""
+def get_all_books(print_results: bool = True):
+    """전체 도서 데이터를 serial_no 순으로 조회하고 출력합니다. (print_results=False이면 출력 생략)"""
     conn, cur = connect_db()
     if not conn: return []
     try:
         # serial_no는 삽입 순서를 유지합니다.
         cur.execute("SELECT serial_no, id, title, price FROM books ORDER BY serial_no ASC")
         records = cur.fetchall()
-        print("--- 전체 도서 목록 (serial_no 순) ---")
-        for record in records:
-            print(f"순번: {record[0]}, ID: {record[1]}, 제목: {record[2]}, 가격: {record[3]}원")
+        if print_results:
+            print("--- 전체 도서 목록 (serial_no 순) ---")
+            print_records(records)
         return records
     except Exception as e:
         print(f"전체 조회 중 오류가 발생했습니다: {e}")
@@ -103,80 +286,185 @@ def get_all_books():
     finally:
         close_db(conn, cur)
 
-def get_expensive_books():
-    """가격이 25000원 이상인 도서 데이터를 조회하고 출력합니다."""
-    conn, cur = connect_db()
-    if not conn: return []
+def get_expensive_books(print_results: bool = True, min_price: int = 25000, use_cache: bool = True):
+    """
+    가격이 min_price(기본 25000)원 이상인 도서 데이터를 조회하고 출력합니다. (print_results=False이면 출력 생략)
+    use_cache=True이면 같은 조건의 결과를 캐시에서 재사용합니다.
+    """
     try:
         # %s 플레이스홀더를 사용한 안전한 쿼리 실행
-        cur.execute("SELECT serial_no, id, title, price FROM books WHERE price >= %s ORDER BY serial_no ASC", (25000,))
-        records = cur.fetchall()
-        print("--- 25000원 이상 도서 목록 ---")
-        for record in records:
-            print(f"순번: {record[0]}, ID: {record[1]}, 제목: {record[2]}, 가격: {record[3]}원")
+        records = fetch_records("SELECT serial_no, id, title, price FROM books WHERE price >= %s ORDER BY serial_no ASC",
+                                (min_price,), use_cache)
+        if print_results:
+            print(f"--- {min_price}원 이상 도서 목록 ---")
+            print_records(records)
         return records
     except Exception as e:
         print(f"가격 조회 중 오류가 발생했습니다: {e}")
         return []
-    finally:
-        close_db(conn, cur)
 
-def get_book_by_title(title: str):
-    """특정 제목의 도서 데이터를 조회하고 출력합니다."""
-    conn, cur = connect_db()
-    if not conn: return []
+def get_book_by_title(title: str, print_results: bool = True, use_cache: bool = True):
+    """
+    특정 제목의 도서 데이터를 조회하고 출력합니다. (print_results=False이면 출력 생략)
+    use_cache=True이면 같은 제목의 결과를 캐시에서 재사용합니다.
+    """
     try:
-        cur.execute("SELECT serial_no, id, title, price FROM books WHERE title = %s ORDER BY serial_no ASC", (title,))
-        records = cur.fetchall()
-        print(f"--- 제목 '{title}' 도서 목록 ---")
-        for record in records:
-            print(f"순번: {record[0]}, ID: {record[1]}, 제목: {record[2]}, 가격: {record[3]}원")
+        records = fetch_records("SELECT serial_no, id, title, price FROM books WHERE title = %s ORDER BY serial_no ASC",
+                                (title,), use_cache)
+        if print_results:
+            print(f"--- 제목 '{title}' 도서 목록 ---")
+            print_records(records)
         return records
     except Exception as e:
         print(f"제목 조회 중 오류가 발생했습니다: {e}")
         return []
+
+def search_books(keyword: str, page_size: int = 20, page_token=None, print_results: bool = True):
+    """
+    제목에 keyword가 포함된 도서를 관련도순으로 한 페이지 조회하고 (행 목록, 다음 페이지 토큰)을 반환합니다.
+    '알고리즘'처럼 제목 일부만 입력해도 bigram GIN 인덱스로 찾습니다. 행은 (순번, ID, 제목, 가격, 점수)입니다.
+    """
+    from postgres_search import DEFAULT_MAX_CANDIDATES, search
+    conn, cur = connect_db()
+    if not conn: return [], None
+    try:
+        records, next_token = search(cur, keyword, "books", "title", ("serial_no", "id", "title", "price"),
+                                     page_size=page_size, page_token=page_token)
+        if print_results:
+            print(f"--- 제목 검색 '{keyword}' 결과 ---")
+            print_records(records)
+            if records.truncated:
+                print(f"(일치하는 도서가 많아 앞의 {DEFAULT_MAX_CANDIDATES}권과 '{keyword}'(으)로 시작하는 제목만 순위를 매겼습니다.)")
+        return records, next_token
+    except Exception as e:
+        print(f"제목 검색 중 오류가 발생했습니다: {e}")
+        return [], None
     finally:
         close_db(conn, cur)
 
+# [문제 3] 페이지 조회 (키셋 페이지네이션)
+# 페이지 정렬 방식: 이름 -> (정렬 키, 내림차순 여부)
+BOOK_PAGE_ORDERS = {
+    "serial_no": (("serial_no",), False),  # 삽입 순서
+    "price": (("price", "id"), True),      # 가격 내림차순 (books_price_covering_idx 사용)
+}
+
+def get_books_page(page_size: int = 100, page_token=None, order: str = "serial_no"):
+    """
+    도서 한 페이지를 조회하고 (행 목록, 다음 페이지 토큰)을 반환합니다.
+    반환된 토큰을 page_token으로 넘기면 다음 페이지를 조회하며, 마지막 페이지이면 토큰은 None입니다.
+    """
+    from postgres_pagination import fetch_page
+    conn, cur = connect_db()
+    if not conn: return [], None
+    keys, descending = BOOK_PAGE_ORDERS[order]
+    try:
+        return fetch_page(cur, "books", ("serial_no", "id", "title", "price"), keys,
+                          page_size=page_size, page_token=page_token, descending=descending)
+    except Exception as e:
+        print(f"페이지 조회 중 오류가 발생했습니다: {e}")
+        return [], None
+    finally:
+        close_db(conn, cur)
+
+# [문제 3] 스트리밍 조회 (서버 측 커서)
+# 결과를 리스트로 모으지 않고 itersize 행씩 서버에서 가져와 한 행씩 반환하는 제너레이터입니다.
+# 순회가 끝나거나 중단될 때까지 풀의 연결 하나를 점유하며, 오류는 호출자에게 그대로 전달됩니다.
+# itersize를 생략하면 postgres_stream.DEFAULT_ITERSIZE 행씩 가져옵니다.
+def stream_books(query, params=None, itersize=None):
+    from postgres_stream import DEFAULT_ITERSIZE, stream_query
+    with get_db_pool().connection() as conn:
+        yield from stream_query(conn, query, params, itersize=itersize or DEFAULT_ITERSIZE)
+
+def iter_all_books(itersize=None):
+    """전체 도서 데이터를 serial_no 순으로 한 행씩 반환합니다."""
+    return stream_books("SELECT serial_no, id, title, price FROM books ORDER BY serial_no ASC", itersize=itersize)
+
+def iter_expensive_books(min_price: int = 25000, itersize=None):
+    """가격이 min_price 이상인 도서 데이터를 serial_no 순으로 한 행씩 반환합니다."""
+    return stream_books("SELECT serial_no, id, title, price FROM books WHERE price >= %s ORDER BY serial_no ASC",
+                        (min_price,), itersize)
+
+def iter_books_by_title(title: str, itersize=None):
+    """특정 제목의 도서 데이터를 serial_no 순으로 한 행씩 반환합니다."""
+    return stream_books("SELECT serial_no, id, title, price FROM books WHERE title = %s ORDER BY serial_no ASC",
+                        (title,), itersize)
+
 # [문제 4] 데이터 수정 (UPDATE)
-def update_second_book_price():
-    """serial_no 순으로 두 번째 도서의 가격을 27000으로 수정합니다."""
+def update_second_book_price(new_price: int = 27000):
+    """serial_no 순으로 두 번째 도서의 가격을 new_price(기본 27000)로 수정하고, 수정된 행을 반환합니다."""
+    from postgres_modify import update_nth
     conn, cur = connect_db()
     if not conn: return
     try:
-        # serial_no 순으로 정렬하여 두 번째 도서의 ID를 조회 (OFFSET 1)
-        cur.execute("SELECT id FROM books ORDER BY serial_no ASC LIMIT 1 OFFSET 1")
-        result = cur.fetchone()
+        # 두 번째 도서 선택과 가격 수정을 한 문장(CTE + RETURNING)으로 처리합니다. (서버 왕복 1회)
+        result = update_nth(cur, "books", ("serial_no",), 1, {"price": new_price},
+                            returning=("serial_no", "id", "title", "price"))
+        books_changed(conn)
         
         if result:
-            second_book_id = result[0]
-            # 조회된 ID를 사용하여 가격을 업데이트합니다.
-            cur.execute("UPDATE books SET price = %s WHERE id = %s", (27000, second_book_id))
-            print("두 번째 도서 가격이 27000으로 수정되었습니다.")
+            print(f"두 번째 도서 가격이 {new_price}으로 수정되었습니다.")
         else:
             print("두 번째 도서를 찾을 수 없어 가격 수정에 실패했습니다.")
+        return result
     except Exception as e:
         print(f"가격 수정 중 오류가 발생했습니다: {e}")
     finally:
         close_db(conn, cur)
 
+def update_book_prices(id_price_pairs):
+    """(id, 새 가격) 목록으로 여러 도서의 가격을 한 문장(UPDATE ... FROM (VALUES ...))으로 수정합니다."""
+    from postgres_modify import update_many
+    conn, cur = connect_db()
+    if not conn: return []
+    try:
+        result = update_many(cur, "books", "id", ("price",), id_price_pairs,
+                             returning=("serial_no", "id", "title", "price"))
+        books_changed(conn)
+        print(f"{len(result)}개 도서 가격이 수정되었습니다.")
+        return result
+    except Exception as e:
+        print(f"일괄 가격 수정 중 오류가 발생했습니다: {e}")
+        return []
+    finally:
+        close_db(conn, cur)
+
+def update_prices_by_position(position_price_pairs):
+    """
+    (serial_no 순 위치(0부터), 새 가격) 목록으로 여러 위치의 도서 가격을 한 문장으로 수정합니다.
+    반환 행은 (위치, serial_no, id, title, price) 입니다.
+    """
+    from postgres_modify import update_positions
+    conn, cur = connect_db()
+    if not conn: return []
+    try:
+        result = update_positions(cur, "books", ("serial_no",), ("price",), position_price_pairs,
+                                  returning=("serial_no", "id", "title", "price"))
+        books_changed(conn)
+        print(f"{len(result)}개 도서 가격이 수정되었습니다.")
+        return result
+    except Exception as e:
+        print(f"위치 기반 가격 수정 중 오류가 발생했습니다: {e}")
+        return []
+    finally:
+        close_db(conn, cur)
+
 # [문제 5] 데이터 삭제 (DELETE)
 def delete_third_book():
-    """serial_no 순으로 세 번째 도서 데이터를 삭제합니다."""
+    """serial_no 순으로 세 번째 도서 데이터를 삭제하고, 삭제된 행을 반환합니다."""
+    from postgres_modify import delete_nth
     conn, cur = connect_db()
     if not conn: return
     try:
-        # serial_no 순으로 정렬하여 세 번째 도서의 ID를 조회 (OFFSET 2)
-        cur.execute("SELECT id FROM books ORDER BY serial_no ASC LIMIT 1 OFFSET 2")
-        result = cur.fetchone()
+        # 세 번째 도서 선택과 삭제를 한 문장(CTE + RETURNING)으로 처리합니다. (서버 왕복 1회)
+        result = delete_nth(cur, "books", ("serial_no",), 2, returning=("serial_no", "id", "title", "price"))
+        books_changed(conn)
         
         if result:
-            third_book_id = result[0]
-            # 조회된 ID를 사용하여 데이터를 삭제합니다.
-            cur.execute("DELETE FROM books WHERE id = %s", (third_book_id,))
             print("세 번째 도서가 삭제되었습니다.")
         else:
             print("세 번째 도서를 찾을 수 없어 삭제에 실패했습니다.")
+        return result
     except Exception as e:
         print(f"데이터 삭제 중 오류가 발생했습니다: {e}")
     finally:
@@ -185,7 +473,8 @@ def delete_third_book():
 # ==============================================================================
 # 🚀 메인 실행 블록
 # ==============================================================================
-if __name__ == '__main__':
+def run_demo():
+    """문제 1~5 함수를 순서대로 실행합니다."""
     print("--- [문제 1] 테이블 생성 --- ")
     create_books_table()
 
@@ -205,4 +494,77 @@ if __name__ == '__main__':
 
     print("\n--- [문제 5] 데이터 삭제 --- ")
     delete_third_book()
-    get_all_books() # 삭제 확인
\ No newline at end of file
+    get_all_books() # 삭제 확인
+
+def run_command(argv=None):
+    """하위 명령 하나를 이 프로세스에서 실행하고 종료 코드를 반환합니다. (하위 명령이 없으면 전체 데모)"""
+    parser = build_parser("02_DMLs_functions.py", "books 테이블 CRUD 명령")
+    args = parser.parse_args(argv)
+    if args.command in (None, "demo"):
+        run_demo()
+    elif args.command == "init-schema":
+        create_books_table(force=args.force)
+    elif args.command == "insert":
+        if args.file:
+            load_books(args.file)
+        elif args.rows:
+            try:
+                load_books(parse_insert_rows(args.rows))
+            except ValueError as e:
+                parser.error(str(e))
+        else:
+            insert_books()  # 인자가 없으면 테스트용 도서 3권
+    elif args.command == "merge":
+        merge_books(args.file, method=args.method)
+    elif args.command == "query":
+        if args.kind in ("title", "search") and not args.text:
+            parser.error(f"query {args.kind}에는 검색할 제목이 필요합니다.")
+        if args.kind == "all":
+            get_all_books()
+        elif args.kind == "expensive":
+            get_expensive_books(min_price=args.min_price)
+        elif args.kind == "title":
+            get_book_by_title(args.text)
+        else:
+            search_books(args.text, page_size=args.limit)
+    elif args.command == "update":
+        if args.id:
+            update_book_prices([(args.id, args.price)])
+        else:
+            update_second_book_price(args.price)
+    elif args.command == "delete":
+        delete_third_book()
+    else:
+        parser.error(f"데몬 안에서는 실행할 수 없는 명령입니다: {args.command}")
+    return 0
+
+def main(argv=None):
+    """
+    명령줄 진입점입니다. 인자가 없으면 기존과 같이 문제 1~5를 순서대로 실행합니다.
+    --socket의 데몬(serve 명령으로 시작)이 실행 중이면 명령을 데몬에 전달해 연결/DDL 비용 없이 실행합니다.
+    """
+    argv = sys.argv[1:] if argv is None else list(argv)
+    args = build_parser("02_DMLs_functions.py", "books 테이블 CRUD 명령").parse_args(argv)
+    if args.command == "serve":
+        socket_path = args.serve_socket or args.socket
+        if not socket_path:
+            print("serve에는 --socket 경로가 필요합니다.")
+            return 2
+        try:
+            serve(socket_path, run_command)
+        except (RuntimeError, OSError) as e:
+            print(f"데몬 시작 중 오류가 발생했습니다: {e}")
+            return 1
+        return 0
+    if args.command == "stop":
+        if args.socket and stop(args.socket):
+            return 0
+        print(f"실행 중인 데몬이 없습니다: {args.socket}")
+        return 1
+    status = forward(args.socket, argv)
+    if status is not None:
+        return status
+    return run_command(argv)
+
+if __name__ == '__main__':
+    sys.exit(main())
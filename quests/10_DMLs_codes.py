@@ -1,6 +1,35 @@
-import psycopg2
+import os
 import sys
-from typing import List, Tuple, Any, Optional
+
+# 공용 모듈(codes/) 경로 등록
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "codes"))
+from postgres_cli import build_parser, forward, forward_command, parse_insert_rows, serve, stop
+
+# 데몬이 실행 중이면(cron 등) psycopg2와 공용 모듈을 불러오기 전에 명령을 전달하고 끝냅니다. (시작 시간 단축)
+if __name__ == '__main__':
+    _status = forward_command("10_DMLs_codes.py", "books 테이블 CRUD 명령", sys.argv[1:])
+    if _status is not None:
+        sys.exit(_status)
+
+import psycopg2
+import atexit
+import itertools
+import threading
+from typing import TYPE_CHECKING, Callable, Dict, List, Tuple, Any, Optional, Iterable, Iterator, Union
+
+# 연결 풀/재시도, 쿼리 계측, 조회 캐시는 모든 명령이 사용합니다.
+# 나머지 공용 모듈은 사용하는 함수 안에서 불러오므로, 명령마다 필요한 모듈만 읽습니다. (CLI 시작 시간 단축)
+from postgres_cache import QueryCache
+from postgres_metrics import QueryMetrics
+from postgres_resilience import ResilientDatabase, RetryPolicy
+
+if TYPE_CHECKING:
+    from concurrent.futures import Future
+    from postgres_async import AsyncConnection, AsyncConnectionPool
+    from postgres_cache import CacheInvalidationListener
+    from postgres_cdc import ChangeEvent, ChangeStream
+    from postgres_columnar import Columns
+    from postgres_writebehind import WriteBehindBuffer
 
 # PostgreSQL 연결 설정 (Common Configuration)
 DB_HOST = "db_postgresql"
@@ -16,27 +45,100 @@ TEST_BOOK_DATA = [
     ["네트워크 이해", 30000]
 ]
 
-def get_connection():
-    """데이터베이스 연결 객체를 생성하고 반환합니다."""
-    try:
-        conn = psycopg2.connect(
-            host=DB_HOST,
-            port=DB_PORT,
+# 연결 풀 설정
+POOL_MIN_SIZE = 1
+POOL_MAX_SIZE = 10
+POOL_TIMEOUT = 30.0         # 연결 대기 최대 시간(초)
+POOL_MAX_LIFETIME = 1800.0  # 연결 최대 재사용 시간(초)
+
+# 쿼리 계측 설정
+SLOW_QUERY_THRESHOLD = 0.5  # 이 시간(초) 이상 걸린 문장을 느린 쿼리로 기록
+SLOW_QUERY_EXPLAIN = False  # True이면 느린 SELECT의 EXPLAIN (ANALYZE, BUFFERS) 결과를 함께 기록
+
+QUERY_METRICS = QueryMetrics(slow_threshold=SLOW_QUERY_THRESHOLD, explain_slow=SLOW_QUERY_EXPLAIN)
+
+# 장애 대응 설정
+DB_REPLICA_HOSTS = ""             # 읽기 복제본 목록 ("host1:5432,host2:5432"), 비어 있으면 primary만 사용
+RETRY_ATTEMPTS = 5                # 일시적 오류 시 최대 실행 횟수
+CIRCUIT_FAILURE_THRESHOLD = 5     # 호스트별 연속 연결 실패가 이 횟수에 이르면 회로를 엶
+CIRCUIT_RESET_TIMEOUT = 10.0      # 회로를 연 뒤 다시 연결을 시도하기까지 대기 시간(초)
+
+_database: Optional[ResilientDatabase] = None
+
+def get_database() -> ResilientDatabase:
+    """
+    primary/복제본 연결 풀을 묶은 ResilientDatabase를 반환합니다. (최초 호출 시 생성)
+    회로 상태는 프로세스 안의 모든 호출이 공유합니다.
+    """
+    global _database
+    if _database is None:
+        _database = ResilientDatabase(
+            f"{DB_HOST}:{DB_PORT}", DB_REPLICA_HOSTS,
+            retry=RetryPolicy(attempts=RETRY_ATTEMPTS),
+            failure_threshold=CIRCUIT_FAILURE_THRESHOLD,
+            reset_timeout=CIRCUIT_RESET_TIMEOUT,
+            minconn=POOL_MIN_SIZE,
+            maxconn=POOL_MAX_SIZE,
+            timeout=POOL_TIMEOUT,
+            max_lifetime=POOL_MAX_LIFETIME,
+            metrics=QUERY_METRICS,
             dbname=DB_NAME,
             user=DB_USER,
             password=DB_PASSWORD
         )
-        return conn
-    except psycopg2.Error as e:
-        print(f"데이터베이스 연결 오류: {e}", file=sys.stderr)
-        return None
+    return _database
+
+def get_connection(readonly: bool = False):
+    """
+    공용 연결 풀에서 연결을 빌려오는 컨텍스트 매니저를 반환합니다.
+    with 블록이 끝나면 연결은 닫히지 않고 풀로 반환되며, 예외 시 롤백됩니다.
+    연결 실패/대기 시간 초과는 psycopg2.Error로 전달되며, DB가 계속 응답하지 않으면
+    대기 없이 바로 CircuitOpenError(psycopg2.OperationalError)가 발생합니다.
+    readonly=True이면 DB_REPLICA_HOSTS의 복제본에서 연결을 빌려옵니다.
+    """
+    return get_database().connection(readonly)
 
-def print_books_results(results: List[Tuple]) -> None:
+def export_metrics(fmt: str = "prometheus") -> str:
+    """
+    동기/비동기 함수가 실행한 쿼리의 형태별 실행 시간·행 수, 연결 대여 시간, 느린 쿼리 기록을 내보냅니다.
+    fmt: "prometheus"(텍스트 노출 형식) 또는 "json"
+    """
+    if fmt == "json":
+        return QUERY_METRICS.to_json()
+    return QUERY_METRICS.to_prometheus()
+
+# 조회 결과 캐시 설정
+CACHE_SIZE = 1024                   # 최대 캐시 항목 수
+CACHE_TTL = 60.0                    # 캐시 유효 시간(초)
+CACHE_NOTIFY_ENABLED = False        # True이면 쓰기 후 다른 프로세스에 NOTIFY로 무효화를 알림
+CACHE_NOTIFY_CHANNEL = "books_cache_invalidation"
+
+BOOK_CACHE = QueryCache(maxsize=CACHE_SIZE, ttl=CACHE_TTL)
+
+def _books_changed(conn) -> None:
+    """books 테이블 변경(커밋) 후 호출하여 관련 캐시 항목을 무효화합니다."""
+    BOOK_CACHE.invalidate("books")
+    if CACHE_NOTIFY_ENABLED:
+        from postgres_cache import publish_invalidation
+        publish_invalidation(conn, "books", CACHE_NOTIFY_CHANNEL)
+
+def start_cache_listener() -> "CacheInvalidationListener":
+    """다른 프로세스의 쓰기 알림(LISTEN/NOTIFY)을 받아 BOOK_CACHE를 무효화하는 스레드를 시작합니다."""
+    from postgres_cache import CacheInvalidationListener
+    return CacheInvalidationListener(
+        BOOK_CACHE, CACHE_NOTIFY_CHANNEL,
+        host=DB_HOST, port=DB_PORT, dbname=DB_NAME, user=DB_USER, password=DB_PASSWORD
+    ).start()
+
+def print_books_results(results: Iterable[Tuple]) -> None:
     """
     조회 결과를 보기 좋게 출력하는 헬퍼 함수입니다.
     UUID는 문자열로 변환한 후 앞 8자리만 슬라이싱하여 출력합니다.
+    리스트뿐 아니라 iter_* 제너레이터도 받을 수 있으며, 행이 도착하는 대로 출력합니다.
     """
-    if not results:
+    rows = iter(results)
+    first = next(rows, None)
+    if first is None:
         print("  |-- (결과 없음) --|")
         return
 
@@ -47,7 +149,7 @@ def print_books_results(results: List[Tuple]) -> None:
     print("-" * 50)
 
     # 데이터 출력
-    for row in results:
+    for row in itertools.chain([first], rows):
         # row: (id: UUID, title: str, price: int)
         book_id_str = str(row[0]) # UUID 객체를 문자열로 변환
         short_id = book_id_str[:8] # 앞 8자리 슬라이싱
@@ -63,229 +165,689 @@ def print_books_results(results: List[Tuple]) -> None:
 # 문제 1: 테이블 생성 (CREATE)
 # ----------------------------------------------------------------------
 
-def create_books_table():
+# books 기본 키 생성 방식
+# False: 요구사항의 uuid_generate_v4() (무작위)
+# True:  시간 순서 UUIDv7 (uuid_generate_v7(), 확장 불필요). 이미 있는 테이블은 기본값만 바꾸며
+#        기존 행의 키는 유지됩니다. (postgres_uuid7.migrate_to_uuid7 참고)
+BOOKS_ID_UUID7 = False
+
+def create_books_statements() -> List[str]:
+    """books 스키마 생성 문장 목록을 반환합니다. (동기/비동기 create_books_table이 함께 사용)"""
+    from postgres_search import title_search_statements
+
+    statements = [
+        # 1. UUID 생성을 위해 'uuid-ossp' 확장을 먼저 생성합니다. (IF NOT EXISTS 사용)
+        "CREATE EXTENSION IF NOT EXISTS \"uuid-ossp\";",
+        # 2. books 테이블 생성
+        """
+        CREATE TABLE IF NOT EXISTS books (
+            id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+            title VARCHAR(100) NOT NULL,
+            price INT NOT NULL
+        );
+        """,
+        # 3. 조회/키셋 페이지네이션용 인덱스
+        #  - title: get_book_by_title()의 등치 조건과 제목순 페이지 (title, id)
+        #  - price: get_expensive_books()의 범위 조건 + 가격순 정렬. id, title을 INCLUDE하여
+        #    테이블을 읽지 않는 index-only scan이 가능하도록 합니다. (이전 books_price_id_idx를 대체)
+        "CREATE INDEX IF NOT EXISTS books_title_id_idx ON books (title, id);",
+        "CREATE INDEX IF NOT EXISTS books_price_covering_idx ON books (price, id) INCLUDE (title);",
+        "DROP INDEX IF EXISTS books_price_id_idx;",
+        # 4. 제목 부분 검색(search_books)용 bigram tsvector 생성 컬럼과 GIN 인덱스
+        *title_search_statements("books", "title"),
+    ]
+    if BOOKS_ID_UUID7:
+        # 5. (선택) 기본 키를 UUIDv7로 전환
+        from postgres_uuid7 import UUID7_FUNCTION_SQL
+        statements += [UUID7_FUNCTION_SQL, "ALTER TABLE books ALTER COLUMN id SET DEFAULT uuid_generate_v7();"]
+    return statements
+
+def create_books_table(force: bool = False) -> None:
     """
     UUID 생성을 위한 'uuid-ossp' 확장 생성 및 'books' 테이블을 생성합니다.
     id: UUID PRIMARY KEY DEFAULT uuid_generate_v4()
     title: VARCHAR(100)
     price: INT
+    테이블 주석의 스키마 버전이 create_books_statements()와 같으면 DDL을 건너뜁니다. (force=True이면 다시 실행)
     """
-    conn = get_connection()
-    if conn is None:
-        return
-
+    from postgres_schema import ensure_schema
     try:
-        with conn.cursor() as cur:
-            # 1. UUID 생성을 위해 'uuid-ossp' 확장을 먼저 생성합니다. (IF NOT EXISTS 사용)
-            cur.execute("CREATE EXTENSION IF NOT EXISTS \"uuid-ossp\";")
-            
-            # 2. books 테이블 생성
-            cur.execute("""
-                CREATE TABLE IF NOT EXISTS books (
-                    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
-                    title VARCHAR(100) NOT NULL,
-                    price INT NOT NULL
-                );
-            """)
-            conn.commit()
-            print("=> [문제 1] books 테이블이 생성되었습니다.")
+        with get_connection() as conn, conn.cursor() as cur:
+            if ensure_schema(cur, "books", create_books_statements(), force=force):
+                conn.commit()
+                print("=> [문제 1] books 테이블이 생성되었습니다.")
+            else:
+                print("=> [문제 1] books 스키마가 이미 최신 버전입니다.")
     except psycopg2.Error as e:
+        # 롤백과 연결 반환은 연결 풀의 컨텍스트 매니저가 처리합니다.
         print(f"테이블 생성 오류: {e}", file=sys.stderr)
-        conn.rollback()
-    finally:
-        conn.close()
 
 # ----------------------------------------------------------------------
 # 문제 2: 대량 데이터 삽입 (INSERT)
 # ----------------------------------------------------------------------
 
-def insert_books(books_data: List[List[Any]]) -> None:
+def insert_books(books_data: Iterable[List[Any]]) -> None:
     """
-    다수의 책 데이터를 executemany를 사용하여 효율적이고 안전하게 삽입합니다.
+    다수의 책 데이터를 bulk_insert를 사용하여 효율적이고 안전하게 삽입합니다.
+    행이 적으면 execute_values 한 번, 많으면 COPY로 스트리밍합니다.
     id는 자동 생성됩니다.
     """
-    conn = get_connection()
-    if conn is None:
-        return
-
-    # SQL: id는 제외하고 title, price만 삽입
-    sql = "INSERT INTO books (title, price) VALUES (%s, %s);"
-    
+    from postgres_bulk import bulk_insert
     try:
-        with conn.cursor() as cur:
-            # executemany를 사용하여 일괄 삽입
-            cur.executemany(sql, books_data)
-            count = cur.rowcount
-            conn.commit()
+        with get_connection() as conn:
+            # id는 제외하고 title, price만 삽입
+            count = bulk_insert(conn, books_data, table="books", columns=("title", "price"))
+            _books_changed(conn)
             print(f"=> [문제 2] {count}개 도서가 삽입되었습니다.")
     except psycopg2.Error as e:
         print(f"데이터 삽입 오류: {e}", file=sys.stderr)
-        conn.rollback()
-    finally:
-        conn.close()
+
+def load_books(source: Union[str, Iterable[List[Any]]], batch_size: int = 100_000,
+               return_ids: bool = False) -> Union[int, List[Tuple]]:
+    """
+    대량의 도서 데이터를 COPY로 적재합니다.
+    source는 (title, price) 행의 iterable 또는 CSV/JSONL 파일 경로입니다.
+    batch_size 행마다 커밋하며, return_ids=True이면 생성된 id 목록을 입력 순서대로 반환합니다.
+    """
+    from postgres_bulk import bulk_insert, bulk_insert_file
+    returning = ("id",) if return_ids else None
+    try:
+        with get_connection() as conn:
+            if isinstance(source, str):
+                result = bulk_insert_file(conn, source, batch_size=batch_size, returning=returning)
+            else:
+                result = bulk_insert(conn, source, batch_size=batch_size, returning=returning)
+            _books_changed(conn)
+            count = len(result) if return_ids else result
+            print(f"=> [대량 적재] {count}개 도서가 적재되었습니다.")
+            return result
+    except (psycopg2.Error, OSError, ValueError) as e:
+        print(f"대량 적재 오류: {e}", file=sys.stderr)
+        return [] if return_ids else 0
+
+def merge_books(source: Union[str, Iterable[List[Any]]], method: str = "auto",
+                batch_size: int = 100_000) -> Optional[dict]:
+    """
+    (title, price) 행을 제목 기준으로 병합합니다. 없는 제목은 삽입하고, 가격이 다른 도서만 갱신합니다.
+    source는 행의 iterable 또는 CSV/JSONL 파일 경로이며, 같은 가격표를 다시 적용해도 중복이 생기지 않습니다.
+    처리 건수 {"inserted", "updated", "unchanged", ...}를 반환합니다. (postgres_merge 참고)
+    """
+    from postgres_bulk import iter_file_rows
+    from postgres_merge import bulk_merge
+    try:
+        rows = iter_file_rows(source) if isinstance(source, str) else source
+        with get_connection() as conn:
+            stats = bulk_merge(conn, rows, table="books", columns=("title", "price"), key=("title",),
+                               method=method, batch_size=batch_size)
+            _books_changed(conn)
+        print(f"=> [병합] 삽입 {stats['inserted']}, 갱신 {stats['updated']}, 변경 없음 {stats['unchanged']}"
+              f" (중복 입력 {stats['duplicates']}, 방식 {stats['method']})")
+        return stats
+    except (psycopg2.Error, OSError, ValueError) as e:
+        print(f"병합 오류: {e}", file=sys.stderr)
+        return None
 
 # ----------------------------------------------------------------------
 # 문제 3: 데이터 조회 (READ)
 # ----------------------------------------------------------------------
 
-def get_all_books() -> List[Tuple]:
-    """전체 도서 데이터를 조회합니다."""
-    conn = get_connection()
-    if conn is None:
-        return []
+# 조회 SQL (리스트 반환 함수와 스트리밍 함수가 함께 사용)
+SELECT_ALL_BOOKS_SQL = "SELECT id, title, price FROM books ORDER BY price DESC;"
+SELECT_EXPENSIVE_BOOKS_SQL = "SELECT id, title, price FROM books WHERE price >= %s ORDER BY price DESC;"
+SELECT_BOOKS_BY_TITLE_SQL = "SELECT id, title, price FROM books WHERE title = %s;"
 
+def get_all_books(print_results: bool = True) -> List[Tuple]:
+    """전체 도서 데이터를 조회합니다. print_results=False이면 출력을 생략합니다."""
     results = []
-    sql = "SELECT id, title, price FROM books ORDER BY price DESC;"
+    sql = SELECT_ALL_BOOKS_SQL
     
     try:
-        with conn.cursor() as cur:
+        with get_connection() as conn, conn.cursor() as cur:
             cur.execute(sql)
             results = cur.fetchall()
-            print(f"=> [문제 3-1] 전체 도서 {len(results)}권을 조회했습니다.")
-            print_books_results(results)
+            if print_results:
+                print(f"=> [문제 3-1] 전체 도서 {len(results)}권을 조회했습니다.")
+                print_books_results(results)
     except psycopg2.Error as e:
         print(f"전체 조회 오류: {e}", file=sys.stderr)
-    finally:
-        conn.close()
     return results
 
-def get_expensive_books() -> List[Tuple]:
-    """가격이 25000원 이상인 도서를 조회합니다."""
-    conn = get_connection()
-    if conn is None:
-        return []
+def _fetch_books(sql: str, params: Tuple) -> List[Tuple]:
+    """
+    풀에서 연결을 빌려 조회 결과 전체를 반환합니다. (캐시 로더로 사용)
+    연결마다 PREPARE해 둔 문장을 EXECUTE하므로 반복 조회 시 파싱/계획 단계를 건너뜁니다.
+    조회는 복제본으로 보내며, 연결이 끊기는 등 일시적 오류는 백오프 후 다시 시도합니다.
+    """
+    from postgres_repository import PREPARED_STATEMENTS
+
+    def fetch(conn) -> List[Tuple]:
+        with conn.cursor() as cur:
+            PREPARED_STATEMENTS.execute(cur, sql, params)
+            return cur.fetchall()
+    return get_database().run(fetch, readonly=True)
 
+def get_expensive_books(print_results: bool = True, min_price: int = 25000,
+                        use_cache: bool = True) -> List[Tuple]:
+    """
+    가격이 min_price(기본 25000)원 이상인 도서를 조회합니다. print_results=False이면 출력을 생략합니다.
+    use_cache=True이면 같은 조건의 결과를 BOOK_CACHE에서 재사용합니다.
+    """
     results = []
     # 매개변수화된 쿼리를 사용하여 가격 조건 명시
-    sql = "SELECT id, title, price FROM books WHERE price >= %s ORDER BY price DESC;"
+    sql = SELECT_EXPENSIVE_BOOKS_SQL
+    params = (min_price,) # 튜플 형태로 전달
     
     try:
-        with conn.cursor() as cur:
-            cur.execute(sql, (25000,)) # 튜플 형태로 전달
-            results = cur.fetchall()
-            print(f"=> [문제 3-2] 가격이 25000원 이상인 도서 {len(results)}권을 조회했습니다.")
+        if use_cache:
+            results = BOOK_CACHE.get_or_load(sql, params, lambda: _fetch_books(sql, params), tables=("books",))
+        else:
+            results = _fetch_books(sql, params)
+        if print_results:
+            print(f"=> [문제 3-2] 가격이 {min_price}원 이상인 도서 {len(results)}권을 조회했습니다.")
             print_books_results(results)
     except psycopg2.Error as e:
         print(f"고가 도서 조회 오류: {e}", file=sys.stderr)
-    finally:
-        conn.close()
     return results
 
-def get_book_by_title(title: str) -> List[Tuple]:
-    """title이 일치하는 도서를 조회합니다."""
-    conn = get_connection()
-    if conn is None:
-        return []
-
+def get_book_by_title(title: str, print_results: bool = True, use_cache: bool = True) -> List[Tuple]:
+    """
+    title이 일치하는 도서를 조회합니다. print_results=False이면 출력을 생략합니다.
+    use_cache=True이면 같은 제목의 결과를 BOOK_CACHE에서 재사용합니다.
+    """
     results = []
     # 매개변수화된 쿼리 사용
-    sql = "SELECT id, title, price FROM books WHERE title = %s;"
+    sql = SELECT_BOOKS_BY_TITLE_SQL
+    params = (title,)
     
     try:
-        with conn.cursor() as cur:
-            cur.execute(sql, (title,))
-            results = cur.fetchall()
+        if use_cache:
+            results = BOOK_CACHE.get_or_load(sql, params, lambda: _fetch_books(sql, params), tables=("books",))
+        else:
+            results = _fetch_books(sql, params)
+        if print_results:
             print(f"=> [문제 3-3] 제목이 '{title}'인 도서 {len(results)}권을 조회했습니다.")
             print_books_results(results)
     except psycopg2.Error as e:
         print(f"제목으로 도서 조회 오류: {e}", file=sys.stderr)
-    finally:
-        conn.close()
     return results
 
+def search_books(keyword: str, page_size: int = 20, page_token: Optional[str] = None,
+                 print_results: bool = True) -> Tuple[List[Tuple], Optional[str]]:
+    """
+    제목에 keyword가 포함된 도서를 관련도순으로 한 페이지 조회하고 (행 목록, 다음 페이지 토큰)을 반환합니다.
+    '알고리즘'처럼 제목 일부만 입력해도 찾으며, bigram GIN 인덱스를 사용하므로 전체 스캔하지 않습니다.
+    행은 (id, title, price, 점수)이며, 다음 페이지는 반환된 토큰을 page_token으로 넘겨 조회합니다.
+    """
+    from postgres_search import DEFAULT_MAX_CANDIDATES, search
+    try:
+        with get_connection(readonly=True) as conn, conn.cursor() as cur:
+            results, next_token = search(cur, keyword, "books", "title", ("id", "title", "price"),
+                                         page_size=page_size, page_token=page_token)
+    except (psycopg2.Error, ValueError) as e:
+        print(f"제목 검색 오류: {e}", file=sys.stderr)
+        return [], None
+    if print_results:
+        print(f"=> [검색] 제목에 '{keyword}'이(가) 포함된 도서 {len(results)}권을 조회했습니다.")
+        print_books_results(row[:3] for row in results)
+        if results.truncated:
+            print(f"   (일치하는 도서가 많아 앞의 {DEFAULT_MAX_CANDIDATES}권과 '{keyword}'(으)로 시작하는 제목만 순위를 매겼습니다.)")
+    return results, next_token
+
 # ----------------------------------------------------------------------
-# 문제 4: 데이터 갱신 (UPDATE)
+# 문제 3 (페이지): 키셋 페이지네이션 조회
 # ----------------------------------------------------------------------
 
-def update_second_book_price(new_price: int = 27000) -> None:
+# 페이지 정렬 방식: 이름 -> (정렬 키, 내림차순 여부). 마지막 키 id로 순서를 유일하게 만듭니다.
+BOOK_PAGE_ORDERS = {
+    "price": (("price", "id"), True),   # 가격 내림차순 (get_all_books와 같은 순서)
+    "title": (("title", "id"), False),  # 제목 오름차순
+}
+
+def get_books_page(page_size: int = 100, page_token: Optional[str] = None,
+                   order: str = "price") -> Tuple[List[Tuple], Optional[str]]:
     """
-    저장된 순서에서 두 번째 도서의 가격을 갱신합니다.
-    UUID를 먼저 가져온 후 해당 ID로 업데이트를 수행합니다.
+    도서 한 페이지를 조회하고 (행 목록, 다음 페이지 토큰)을 반환합니다.
+    다음 페이지는 반환된 토큰을 page_token으로 넘겨 조회하며, 마지막 페이지이면 토큰은 None입니다.
+    OFFSET을 쓰지 않으므로 깊은 페이지도 첫 페이지와 같은 비용으로 조회됩니다.
     """
-    conn = get_connection()
-    if conn is None:
-        return
+    from postgres_pagination import fetch_page
+    keys, descending = BOOK_PAGE_ORDERS[order]
+    try:
+        with get_connection() as conn, conn.cursor() as cur:
+            return fetch_page(cur, "books", ("id", "title", "price"), keys,
+                              page_size=page_size, page_token=page_token, descending=descending)
+    except (psycopg2.Error, ValueError) as e:
+        print(f"페이지 조회 오류: {e}", file=sys.stderr)
+        return [], None
 
-    # 1. 두 번째 도서의 ID를 가져옵니다. (ORDER BY는 명시되지 않았으므로 임의의 순서로 가져옴)
-    # 안전성을 위해 title로 ORDER BY를 사용하겠습니다.
-    select_id_sql = "SELECT id FROM books ORDER BY title ASC LIMIT 1 OFFSET 1;"
-    
+# ----------------------------------------------------------------------
+# 문제 3 (스트리밍): 서버 측 커서 조회
+# ----------------------------------------------------------------------
+# 아래 iter_* 함수는 결과를 리스트로 모으지 않고 한 행씩 반환하는 제너레이터입니다.
+# 순회가 끝나거나 중단될 때까지 풀의 연결 하나를 점유하며,
+# 중간에 결과가 끊기지 않도록 오류는 출력하지 않고 호출자에게 그대로 전달합니다.
+# itersize(서버에서 한 번에 가져올 행 수)를 생략하면 postgres_stream.DEFAULT_ITERSIZE를 사용합니다.
+
+def _stream_books(sql: str, params: Tuple = (), itersize: Optional[int] = None) -> Iterator[Tuple]:
+    from postgres_stream import DEFAULT_ITERSIZE, stream_query
+    with get_connection() as conn:
+        yield from stream_query(conn, sql, params, itersize=itersize or DEFAULT_ITERSIZE)
+
+def iter_all_books(itersize: Optional[int] = None) -> Iterator[Tuple]:
+    """전체 도서를 가격 내림차순으로 한 행씩 반환합니다."""
+    return _stream_books(SELECT_ALL_BOOKS_SQL, itersize=itersize)
+
+def iter_expensive_books(min_price: int = 25000, itersize: Optional[int] = None) -> Iterator[Tuple]:
+    """가격이 min_price 이상인 도서를 가격 내림차순으로 한 행씩 반환합니다."""
+    return _stream_books(SELECT_EXPENSIVE_BOOKS_SQL, (min_price,), itersize)
+
+def iter_books_by_title(title: str, itersize: Optional[int] = None) -> Iterator[Tuple]:
+    """title이 일치하는 도서를 한 행씩 반환합니다."""
+    return _stream_books(SELECT_BOOKS_BY_TITLE_SQL, (title,), itersize)
+
+def export_books(out_dir: str = "exports", fmt: str = "csv", workers: int = 4) -> Optional[dict]:
+    """
+    books 테이블 전체를 범위별로 나누어 여러 프로세스에서 병렬로 COPY하여 CSV/Parquet 파일로 내보냅니다.
+    모든 조각은 같은 스냅숏을 읽으며, 진행 상황은 표준 에러로 출력됩니다. 실패하면 None을 반환합니다.
+    """
+    from postgres_export import export_table
     try:
-        with conn.cursor() as cur:
-            # ID 조회
-            cur.execute(select_id_sql)
-            book_id_result = cur.fetchone()
+        manifest = export_table("books", out_dir, fmt, workers, host=DB_HOST, port=DB_PORT,
+                                dbname=DB_NAME, user=DB_USER, password=DB_PASSWORD)
+        print(f"=> [내보내기] {manifest['rows']}권을 {len(manifest['parts'])}개 {fmt} 파일로 내보냈습니다.")
+        return manifest
+    except (psycopg2.Error, OSError, ValueError, RuntimeError) as e:
+        print(f"내보내기 오류: {e}", file=sys.stderr)
+        return None
+
+# ----------------------------------------------------------------------
+# 문제 3 (분석): 컬럼 단위 조회와 벡터 집계
+# ----------------------------------------------------------------------
+
+def get_books_columns(min_price: Optional[int] = None,
+                      columns: Iterable[str] = ("id", "title", "price")) -> Optional["Columns"]:
+    """
+    도서를 COPY로 받아 컬럼 단위(columns 배열, 기본 id/title/price)로 반환합니다. 실패하면 None을 반환합니다.
+    행 튜플을 만들지 않으므로 대량 조회 후 가격 집계/필터링에 적합합니다.
+    집계에 필요한 컬럼만 고르면(예: ("price",)) 문자열 컬럼을 해석하지 않아 훨씬 빠릅니다.
+    """
+    from postgres_columnar import fetch_columns
+    columns = list(columns)
+    unknown = [c for c in columns if c not in ("id", "title", "price")]
+    if not columns or unknown:
+        print(f"컬럼 조회 오류: 지원하지 않는 컬럼입니다: {unknown or columns}", file=sys.stderr)
+        return None
+    sql = f"SELECT {', '.join(columns)} FROM books"
+    params: Tuple = ()
+    if min_price is not None:
+        sql += " WHERE price >= %s"
+        params = (min_price,)
+    try:
+        with get_connection() as conn, conn.cursor() as cur:
+            return fetch_columns(cur, sql, params)
+    except (psycopg2.Error, ValueError) as e:
+        print(f"컬럼 조회 오류: {e}", file=sys.stderr)
+        return None
+
+def get_price_stats(min_price: int = 25000, bins: int = 10, print_results: bool = True) -> Optional[dict]:
+    """
+    전체 도서 가격 분포와 min_price 이상 도서의 가격 통계를 한 번의 조회로 계산합니다.
+    반환값: {"all": 전체 통계, "expensive": min_price 이상 통계, "histogram": (구간별 개수, 구간 경계)}
+    """
+    from postgres_columnar import aggregate, histogram, threshold_mask
+    books = get_books_columns(columns=("price",))  # id/title은 집계에 쓰지 않으므로 받지 않습니다.
+    if books is None:
+        return None
+    prices = books.dropna("price")["price"]
+    mask = threshold_mask(prices, minimum=min_price)
+    stats = {
+        "all": aggregate(prices),
+        "expensive": aggregate(prices, mask),
+        "histogram": histogram(prices, bins=bins),
+    }
+    if print_results:
+        expensive = stats["expensive"]
+        print(f"=> [분석] 전체 {stats['all']['count']}권 중 {min_price}원 이상 {expensive['count']}권 "
+              f"(평균 {expensive['mean'] or 0:,.0f}원, 중앙값 {expensive['p50'] or 0:,.0f}원)")
+        counts, edges = stats["histogram"]
+        for count, low, high in zip(counts, edges, edges[1:]):
+            print(f"  {low:>10,.0f} ~ {high:>10,.0f}원: {count}")
+    return stats
+
+# ----------------------------------------------------------------------
+# 문제 4: 데이터 갱신 (UPDATE)
+# ----------------------------------------------------------------------
+
+def update_second_book_price(new_price: int = 27000) -> Optional[Tuple]:
+    """
+    저장된 순서에서 두 번째 도서의 가격을 갱신하고, 갱신된 행 (id, title, price)을 반환합니다.
+    대상 선택과 갱신을 한 문장(CTE + RETURNING)으로 처리하므로 서버 왕복은 한 번입니다.
+    """
+    from postgres_modify import update_nth
+    try:
+        with get_connection() as conn, conn.cursor() as cur:
+            # 두 번째 도서를 골라 잠그고 바로 가격을 갱신합니다. (ORDER BY는 명시되지 않았으므로
+            # 안전성을 위해 (title, id) 순서를 사용하며, books_title_id_idx 인덱스로 앞의 2개 항목만 읽습니다.)
+            updated = update_nth(cur, "books", ("title", "id"), 1, {"price": new_price},
+                                 returning=("id", "title", "price"))
+            conn.commit()
+            _books_changed(conn)
             
-            if book_id_result:
-                target_id = book_id_result[0]
-                
-                # 2. 해당 ID를 사용하여 가격 갱신 (매개변수화된 쿼리 사용)
-                update_sql = "UPDATE books SET price = %s WHERE id = %s;"
-                cur.execute(update_sql, (new_price, target_id))
-                
-                conn.commit()
-                if cur.rowcount > 0:
-                    print(f"=> [문제 4] 두 번째 도서 (ID: {str(target_id)[:8]}...) 가격이 {new_price:,}으로 수정되었습니다.")
-                else:
-                    print("=> [문제 4] 업데이트 대상 도서를 찾지 못했습니다.", file=sys.stderr)
+            if updated:
+                print(f"=> [문제 4] 두 번째 도서 (ID: {str(updated[0])[:8]}...) 가격이 {new_price:,}으로 수정되었습니다.")
             else:
                 print("=> [문제 4] 업데이트할 두 번째 도서를 찾지 못했습니다.", file=sys.stderr)
+            return updated
                 
     except psycopg2.Error as e:
         print(f"데이터 갱신 오류: {e}", file=sys.stderr)
-        conn.rollback()
-    finally:
-        conn.close()
+        return None
+
+def update_book_prices(id_price_pairs: List[Tuple[Any, int]]) -> List[Tuple]:
+    """
+    여러 도서의 가격을 (id, 새 가격) 목록으로 한 번에 갱신합니다.
+    UPDATE ... FROM (VALUES ...) 한 문장으로 처리하며, 갱신된 행 목록을 반환합니다.
+    """
+    from postgres_modify import update_many
+    try:
+        with get_connection() as conn, conn.cursor() as cur:
+            updated = update_many(cur, "books", "id", ("price",), id_price_pairs,
+                                  returning=("id", "title", "price"))
+            conn.commit()
+            _books_changed(conn)
+            print(f"=> [일괄 갱신] {len(updated)}개 도서의 가격이 수정되었습니다.")
+            return updated
+    except psycopg2.Error as e:
+        print(f"일괄 갱신 오류: {e}", file=sys.stderr)
+        return []
+
+# ----------------------------------------------------------------------
+# 문제 2/4 (쓰기 지연): 작은 삽입/갱신 모아 보내기
+# ----------------------------------------------------------------------
+# 요청 처리 스레드마다 한두 권씩 insert_books()를 호출하면 호출마다 트랜잭션과 커밋이 생깁니다.
+# 아래 함수는 쓰기를 공용 버퍼에 넣고 Future를 바로 반환하며, 버퍼는 WRITE_BUFFER_MAX_BATCH개가 모이거나
+# WRITE_BUFFER_MAX_DELAY초가 지나면 한 트랜잭션으로 반영합니다. 프로세스 종료 시 남은 쓰기는 자동으로 반영됩니다.
+
+WRITE_BUFFER_MAX_BATCH = 500    # 한 트랜잭션에 모을 최대 쓰기 수
+WRITE_BUFFER_MAX_DELAY = 0.05   # 첫 쓰기 후 반영까지 최대 대기 시간(초)
+
+_write_buffer: Optional["WriteBehindBuffer"] = None
+_write_buffer_lock = threading.Lock()
+
+def get_write_buffer() -> "WriteBehindBuffer":
+    """books 쓰기 지연 버퍼를 반환합니다. 처음 호출할 때 백그라운드 스레드와 함께 생성됩니다."""
+    from postgres_writebehind import WriteBehindBuffer
+
+    global _write_buffer
+    with _write_buffer_lock:
+        if _write_buffer is None:
+            _write_buffer = WriteBehindBuffer(
+                get_connection, "books", ("title", "price"), ("price",), key="id", returning=("id",),
+                max_batch=WRITE_BUFFER_MAX_BATCH, max_delay=WRITE_BUFFER_MAX_DELAY,
+                on_flush=_books_changed,
+            )
+            atexit.register(_write_buffer.close)
+        return _write_buffer
+
+def insert_book_buffered(title: str, price: int) -> "Future":
+    """도서 한 권을 삽입 예약합니다. 반환된 Future의 result()는 생성된 id입니다."""
+    from concurrent.futures import Future
+
+    future = Future()
+    inner = get_write_buffer().insert((title, price))
+
+    def done(f: Future) -> None:
+        if f.exception() is not None:
+            future.set_exception(f.exception())
+        else:
+            future.set_result(f.result()[0])
+
+    inner.add_done_callback(done)
+    return future
+
+def update_book_price_buffered(book_id: Any, new_price: int) -> "Future":
+    """도서 가격 갱신을 예약합니다. Future의 result()는 (id, price) 또는 도서가 없으면 None입니다."""
+    return get_write_buffer().update(book_id, (new_price,))
+
+def flush_book_writes(timeout: Optional[float] = None) -> bool:
+    """예약된 도서 쓰기가 모두 커밋될 때까지 기다립니다. timeout 안에 끝나면 True를 반환합니다."""
+    if _write_buffer is None:
+        return True
+    return _write_buffer.flush(timeout)
 
 # ----------------------------------------------------------------------
 # 문제 5: 데이터 삭제 (DELETE)
 # ----------------------------------------------------------------------
 
-def delete_third_book() -> None:
+def delete_third_book() -> Optional[Tuple]:
     """
-    저장된 순서에서 세 번째 도서 데이터를 삭제합니다.
-    UUID를 먼저 가져온 후 해당 ID로 삭제를 수행합니다.
+    저장된 순서에서 세 번째 도서 데이터를 삭제하고, 삭제된 행 (id, title, price)을 반환합니다.
+    대상 선택과 삭제를 한 문장(CTE + RETURNING)으로 처리하므로 서버 왕복은 한 번입니다.
     """
-    conn = get_connection()
-    if conn is None:
-        return
-
-    # 1. 세 번째 도서의 ID를 가져옵니다. (ORDER BY는 명시되지 않았으므로 임의의 순서로 가져옴)
-    # 안전성을 위해 title로 ORDER BY를 사용하겠습니다.
-    select_id_sql = "SELECT id FROM books ORDER BY title ASC LIMIT 1 OFFSET 2;"
-    
+    from postgres_modify import delete_nth
     try:
-        with conn.cursor() as cur:
-            # ID 조회
-            cur.execute(select_id_sql)
-            book_id_result = cur.fetchone()
+        with get_connection() as conn, conn.cursor() as cur:
+            # 세 번째 도서를 골라 잠그고 바로 삭제합니다. ((title, id) 순서, books_title_id_idx 사용)
+            deleted = delete_nth(cur, "books", ("title", "id"), 2, returning=("id", "title", "price"))
+            conn.commit()
+            _books_changed(conn)
             
-            if book_id_result:
-                target_id = book_id_result[0]
-                
-                # 2. 해당 ID를 사용하여 삭제 (매개변수화된 쿼리 사용)
-                delete_sql = "DELETE FROM books WHERE id = %s;"
-                cur.execute(delete_sql, (target_id,))
-                
-                conn.commit()
-                if cur.rowcount > 0:
-                    print(f"=> [문제 5] 세 번째 도서 (ID: {str(target_id)[:8]}...) 가 삭제되었습니다.")
-                else:
-                    print("=> [문제 5] 삭제 대상 도서를 찾지 못했습니다.", file=sys.stderr)
+            if deleted:
+                print(f"=> [문제 5] 세 번째 도서 (ID: {str(deleted[0])[:8]}...) 가 삭제되었습니다.")
             else:
                 print("=> [문제 5] 삭제할 세 번째 도서를 찾지 못했습니다.", file=sys.stderr)
+            return deleted
                 
     except psycopg2.Error as e:
         print(f"데이터 삭제 오류: {e}", file=sys.stderr)
-        conn.rollback()
-    finally:
-        conn.close()
+        return None
+
+# ----------------------------------------------------------------------
+# 변경 스트림 (CDC): books 변경만 받아 처리하기
+# ----------------------------------------------------------------------
+# 캐시/검색 인덱스가 get_all_books()로 전체를 주기적으로 다시 읽는 대신, 논리 복제 슬롯에서
+# 커밋된 INSERT/UPDATE/DELETE만 배치로 받습니다. 서버에 wal_level = logical 설정이 필요합니다.
+# 처리한 위치는 슬롯에 저장되므로 소비자를 다시 시작해도 이어서 받습니다. (postgres_cdc 참고)
+# 소비자를 더 이상 쓰지 않으면 python codes/postgres_cdc.py drop 으로 슬롯을 지워야 WAL이 쌓이지 않습니다.
+
+BOOKS_CDC_SLOT = "books_cdc"          # 소비자별로 다른 슬롯 이름을 사용
+BOOKS_CDC_PUBLICATION = "books_cdc"
+BOOKS_CDC_BATCH_SIZE = 500
+BOOKS_CDC_BATCH_TIMEOUT = 1.0
+
+def books_change_stream(slot: str = BOOKS_CDC_SLOT, auto_ack: bool = True) -> "ChangeStream":
+    """books 테이블의 변경 스트림을 만듭니다. (슬롯/publication이 없으면 처음 열 때 생성)"""
+    from postgres_cdc import ChangeStream
+    return ChangeStream(slot, BOOKS_CDC_PUBLICATION, ("books",), batch_size=BOOKS_CDC_BATCH_SIZE,
+                        batch_timeout=BOOKS_CDC_BATCH_TIMEOUT, auto_ack=auto_ack,
+                        host=DB_HOST, port=DB_PORT, dbname=DB_NAME, user=DB_USER, password=DB_PASSWORD)
+
+def _format_change(event: "ChangeEvent") -> str:
+    if event.op == "truncate":
+        return f"{event.table} 전체"
+    row = event.new or event.old or {}
+    book_id = str(row.get("id", ""))[:8]
+    if event.op == "delete":
+        return f"(ID: {book_id}...)"
+    return f"(ID: {book_id}...) {row.get('title')} {row.get('price', 0):,}원"
+
+def follow_books_changes(handler: Optional[Callable[[List["ChangeEvent"]], Any]] = None,
+                         idle_timeout: Optional[float] = None, slot: str = BOOKS_CDC_SLOT) -> int:
+    """
+    books 변경을 배치로 받아 handler(batch)를 호출하고, 변경이 있으면 BOOK_CACHE를 무효화합니다.
+    handler가 없으면 변경 내용을 출력합니다. handler가 끝난 배치만 확인되므로, 도중에 실패하면
+    다음 실행에서 같은 배치를 다시 받습니다. idle_timeout초 동안 변경이 없으면 처리한 이벤트 수를 반환합니다.
+    """
+    processed = 0
+    try:
+        with books_change_stream(slot) as stream:
+            for batch in stream.batches(idle_timeout=idle_timeout):
+                if handler is not None:
+                    handler(batch)
+                else:
+                    for event in batch:
+                        print(f"=> [변경] {event.op} {_format_change(event)}")
+                BOOK_CACHE.invalidate("books")
+                processed += len(batch)
+    except psycopg2.Error as e:
+        print(f"변경 스트림 오류: {e}", file=sys.stderr)
+    except KeyboardInterrupt:
+        pass
+    return processed
+
+# ----------------------------------------------------------------------
+# 비동기(asyncio) CRUD
+# ----------------------------------------------------------------------
+# 위 동기 함수와 같은 이름에 _async가 붙은 코루틴입니다. 반환 형태도 동일합니다.
+# 이벤트 루프를 막지 않으므로 비동기 웹 서버에서 스레드 없이 바로 await 할 수 있으며,
+# 여러 조회를 asyncio.gather로 풀의 서로 다른 연결에서 동시에 실행할 수 있습니다.
+
+_async_pools: Dict[Any, "AsyncConnectionPool"] = {}  # 이벤트 루프 -> 그 루프의 비동기 연결 풀
+
+async def get_async_pool() -> "AsyncConnectionPool":
+    """
+    현재 이벤트 루프용 비동기 연결 풀을 반환합니다. (없으면 새로 생성)
+    asyncio.run()을 여러 번 호출하는 등 이미 끝난 이벤트 루프의 풀은 이때 연결을 닫고 버립니다.
+    """
+    import asyncio
+    from postgres_async import AsyncConnectionPool
+
+    loop = asyncio.get_running_loop()
+    pool = _async_pools.get(loop)
+    if pool is not None:
+        return pool
+    for old_loop in [old for old in _async_pools if old.is_closed()]:
+        _async_pools.pop(old_loop).close_nowait()
+    created = await AsyncConnectionPool(
+        minconn=POOL_MIN_SIZE, maxconn=POOL_MAX_SIZE, timeout=POOL_TIMEOUT, max_lifetime=POOL_MAX_LIFETIME,
+        metrics=QUERY_METRICS, host=DB_HOST, port=DB_PORT, dbname=DB_NAME, user=DB_USER, password=DB_PASSWORD
+    ).open()
+    pool = _async_pools.setdefault(loop, created)
+    if pool is not created:  # 다른 태스크가 먼저 만든 풀을 사용
+        await created.close()
+    return pool
+
+async def _books_changed_async(conn: "AsyncConnection") -> None:
+    """비동기 쓰기 후 캐시를 무효화합니다. (동기 _books_changed와 같은 동작)"""
+    BOOK_CACHE.invalidate("books")
+    if CACHE_NOTIFY_ENABLED:
+        await conn.run("SELECT pg_notify(%s, %s)", (CACHE_NOTIFY_CHANNEL, "books"))
+
+async def create_books_table_async() -> None:
+    """create_books_table()의 비동기 버전입니다."""
+    try:
+        pool = await get_async_pool()
+        async with pool.connection() as conn, conn.transaction():
+            for statement in create_books_statements():
+                await conn.run(statement)
+        print("=> [문제 1] books 테이블이 생성되었습니다.")
+    except psycopg2.Error as e:
+        print(f"테이블 생성 오류: {e}", file=sys.stderr)
+
+async def insert_books_async(books_data: List[List[Any]]) -> None:
+    """insert_books()의 비동기 버전입니다. 여러 행을 VALUES 목록 한 문장으로 삽입합니다."""
+    try:
+        pool = await get_async_pool()
+        async with pool.connection() as conn:
+            count = await conn.insert_values("INSERT INTO books (title, price) VALUES ", books_data)
+            await _books_changed_async(conn)
+            print(f"=> [문제 2] {count}개 도서가 삽입되었습니다.")
+    except psycopg2.Error as e:
+        print(f"데이터 삽입 오류: {e}", file=sys.stderr)
+
+async def _fetch_books_async(sql: str, params: Optional[Tuple] = None) -> List[Tuple]:
+    pool = await get_async_pool()
+    async with pool.connection() as conn:
+        return await conn.fetchall(sql, params)
+
+async def get_all_books_async(print_results: bool = True) -> List[Tuple]:
+    """get_all_books()의 비동기 버전입니다."""
+    results = []
+    try:
+        results = await _fetch_books_async(SELECT_ALL_BOOKS_SQL)
+        if print_results:
+            print(f"=> [문제 3-1] 전체 도서 {len(results)}권을 조회했습니다.")
+            print_books_results(results)
+    except psycopg2.Error as e:
+        print(f"전체 조회 오류: {e}", file=sys.stderr)
+    return results
+
+async def get_expensive_books_async(print_results: bool = True, min_price: int = 25000) -> List[Tuple]:
+    """get_expensive_books()의 비동기 버전입니다. (캐시는 사용하지 않습니다)"""
+    results = []
+    try:
+        results = await _fetch_books_async(SELECT_EXPENSIVE_BOOKS_SQL, (min_price,))
+        if print_results:
+            print(f"=> [문제 3-2] 가격이 {min_price}원 이상인 도서 {len(results)}권을 조회했습니다.")
+            print_books_results(results)
+    except psycopg2.Error as e:
+        print(f"고가 도서 조회 오류: {e}", file=sys.stderr)
+    return results
+
+async def get_book_by_title_async(title: str, print_results: bool = True) -> List[Tuple]:
+    """get_book_by_title()의 비동기 버전입니다. (캐시는 사용하지 않습니다)"""
+    results = []
+    try:
+        results = await _fetch_books_async(SELECT_BOOKS_BY_TITLE_SQL, (title,))
+        if print_results:
+            print(f"=> [문제 3-3] 제목이 '{title}'인 도서 {len(results)}권을 조회했습니다.")
+            print_books_results(results)
+    except psycopg2.Error as e:
+        print(f"제목으로 도서 조회 오류: {e}", file=sys.stderr)
+    return results
+
+async def get_books_by_titles_async(titles: List[str]) -> List[List[Tuple]]:
+    """여러 제목을 풀의 서로 다른 연결에서 동시에 조회하고, 입력 순서대로 결과 목록을 반환합니다."""
+    try:
+        pool = await get_async_pool()
+        from postgres_async import gather_fetchall
+        return await gather_fetchall(pool, [(SELECT_BOOKS_BY_TITLE_SQL, (t,)) for t in titles])
+    except psycopg2.Error as e:
+        print(f"제목으로 도서 조회 오류: {e}", file=sys.stderr)
+        return [[] for _ in titles]
+
+async def update_second_book_price_async(new_price: int = 27000) -> Optional[Tuple]:
+    """update_second_book_price()의 비동기 버전입니다. 갱신된 행 (id, title, price)을 반환합니다."""
+    from postgres_modify import update_nth_query
+    query, params = update_nth_query("books", ("title", "id"), 1, {"price": new_price},
+                                     returning=("id", "title", "price"))
+    try:
+        pool = await get_async_pool()
+        async with pool.connection() as conn:
+            updated = await conn.fetchone(query, params)
+            await _books_changed_async(conn)
+        if updated:
+            print(f"=> [문제 4] 두 번째 도서 (ID: {str(updated[0])[:8]}...) 가격이 {new_price:,}으로 수정되었습니다.")
+        else:
+            print("=> [문제 4] 업데이트할 두 번째 도서를 찾지 못했습니다.", file=sys.stderr)
+        return updated
+    except psycopg2.Error as e:
+        print(f"데이터 갱신 오류: {e}", file=sys.stderr)
+        return None
+
+async def delete_third_book_async() -> Optional[Tuple]:
+    """delete_third_book()의 비동기 버전입니다. 삭제된 행 (id, title, price)을 반환합니다."""
+    from postgres_modify import delete_nth_query
+    query, params = delete_nth_query("books", ("title", "id"), 2, returning=("id", "title", "price"))
+    try:
+        pool = await get_async_pool()
+        async with pool.connection() as conn:
+            deleted = await conn.fetchone(query, params)
+            await _books_changed_async(conn)
+        if deleted:
+            print(f"=> [문제 5] 세 번째 도서 (ID: {str(deleted[0])[:8]}...) 가 삭제되었습니다.")
+        else:
+            print("=> [문제 5] 삭제할 세 번째 도서를 찾지 못했습니다.", file=sys.stderr)
+        return deleted
+    except psycopg2.Error as e:
+        print(f"데이터 삭제 오류: {e}", file=sys.stderr)
+        return None
 
 # ----------------------------------------------------------------------
 # 메인 실행 엔트리 포인트 (Execution Entry Point)
 # ----------------------------------------------------------------------
 
-def main():
+def run_demo() -> None:
     """모든 함수를 순서대로 호출하여 기능을 테스트합니다."""
     
     print("=============================================")
@@ -297,17 +859,14 @@ def main():
     
     # 테이블이 이미 존재할 경우, 테스트를 위해 기존 데이터를 정리합니다.
     # 이 부분은 명시된 요구사항은 아니지만, 반복 테스트의 일관성을 위해 추가합니다.
-    conn = get_connection()
-    if conn:
-        try:
-            with conn.cursor() as cur:
-                cur.execute("TRUNCATE books RESTART IDENTITY;")
-                conn.commit()
-                print("=> [준비] 기존 데이터베이스 'books' 테이블의 내용을 모두 비웠습니다.")
-        except psycopg2.Error as e:
-            print(f"[정리 오류] {e}", file=sys.stderr)
-        finally:
-            conn.close()
+    try:
+        with get_connection() as conn, conn.cursor() as cur:
+            cur.execute("TRUNCATE books RESTART IDENTITY;")
+            conn.commit()
+            _books_changed(conn)
+            print("=> [준비] 기존 데이터베이스 'books' 테이블의 내용을 모두 비웠습니다.")
+    except psycopg2.Error as e:
+        print(f"[정리 오류] {e}", file=sys.stderr)
             
     print("\n--- [초기 삽입] ---")
     # [2] 대량 데이터 삽입
@@ -338,5 +897,83 @@ def main():
     print("   PostgreSQL Books CRUD 기능 테스트 완료")
     print("=============================================")
 
+def run_command(argv: Optional[List[str]] = None) -> int:
+    """
+    하위 명령 하나를 이 프로세스에서 실행하고 종료 코드를 반환합니다. (데몬이 요청마다 호출)
+    하위 명령이 없으면 전체 데모(run_demo)를 실행합니다.
+    """
+    parser = build_parser("10_DMLs_codes.py", "books 테이블 CRUD 명령")
+    args = parser.parse_args(argv)
+    if args.command in (None, "demo"):
+        run_demo()
+    elif args.command == "init-schema":
+        create_books_table(force=args.force)
+    elif args.command == "insert":
+        if args.file:
+            load_books(args.file)
+        elif args.rows:
+            try:
+                insert_books(parse_insert_rows(args.rows))
+            except ValueError as e:
+                parser.error(str(e))
+        else:
+            parser.error("insert에는 TITLE PRICE 쌍이나 --file이 필요합니다.")
+    elif args.command == "merge":
+        merge_books(args.file, method=args.method)
+    elif args.command == "query":
+        if args.kind in ("title", "search") and not args.text:
+            parser.error(f"query {args.kind}에는 검색할 제목이 필요합니다.")
+        if args.kind == "all":
+            get_all_books()
+        elif args.kind == "expensive":
+            get_expensive_books(min_price=args.min_price)
+        elif args.kind == "title":
+            get_book_by_title(args.text)
+        else:
+            search_books(args.text, page_size=args.limit)
+    elif args.command == "update":
+        if args.id:
+            update_book_prices([(args.id, args.price)])
+        else:
+            update_second_book_price(args.price)
+    elif args.command == "delete":
+        delete_third_book()
+    else:
+        parser.error(f"데몬 안에서는 실행할 수 없는 명령입니다: {args.command}")
+    return 0
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    명령줄 진입점입니다. --socket(또는 $BOOKS_CLI_SOCKET)의 데몬이 실행 중이면 명령을 데몬에 전달하고,
+    없으면 이 프로세스에서 직접 실행합니다.
+      python 10_DMLs_codes.py                        # 전체 데모 (기존 동작)
+      python 10_DMLs_codes.py init-schema            # 스키마 버전이 같으면 DDL 생략
+      python 10_DMLs_codes.py insert "새 책" 19000
+      python 10_DMLs_codes.py query expensive --min-price 20000
+      python 10_DMLs_codes.py serve --socket /tmp/books.sock
+    """
+    argv = sys.argv[1:] if argv is None else list(argv)
+    args = build_parser("10_DMLs_codes.py", "books 테이블 CRUD 명령").parse_args(argv)
+    if args.command == "serve":
+        socket_path = args.serve_socket or args.socket
+        if not socket_path:
+            print("serve에는 --socket 경로가 필요합니다.", file=sys.stderr)
+            return 2
+        try:
+            serve(socket_path, run_command)
+        except (RuntimeError, OSError) as e:
+            print(f"데몬 시작 오류: {e}", file=sys.stderr)
+            return 1
+        return 0
+    if args.command == "stop":
+        if args.socket and stop(args.socket):
+            return 0
+        print(f"실행 중인 데몬이 없습니다: {args.socket}", file=sys.stderr)
+        return 1
+    status = forward(args.socket, argv)
+    if status is not None:
+        return status
+    return run_command(argv)
+
 if __name__ == '__main__':
-    main()
\ No newline at end of file
+    sys.exit(main())
\ No newline at end of file
@@ -0,0 +1,30 @@
+-- 시간 범위 파티션 로그 테이블: 보존 기간 정리를 DELETE 대신 파티션 DROP으로 처리합니다.
+-- 파티션 생성/보존 작업은 codes/postgres_partition.py (create / maintain)로 자동화합니다.
+CREATE TABLE scraping_html_results (
+    result_id INT NOT NULL,
+    page_title VARCHAR(500),
+    page_url VARCHAR(500),
+    html_length INT,
+    status_code INT,
+    scraped_at TIMESTAMP NOT NULL DEFAULT now(),
+    PRIMARY KEY (result_id, scraped_at)  -- 기본 키에는 파티션 컬럼이 포함되어야 합니다.
+) PARTITION BY RANGE (scraped_at);
+
+CREATE INDEX scraping_html_results_status_code_idx ON scraping_html_results (status_code);
+
+CREATE TABLE scraping_html_results_p202610 PARTITION OF scraping_html_results
+    FOR VALUES FROM ('2026-10-01') TO ('2026-11-01');
+CREATE TABLE scraping_html_results_p202611 PARTITION OF scraping_html_results
+    FOR VALUES FROM ('2026-11-01') TO ('2026-12-01');
+
+INSERT INTO scraping_html_results (result_id, page_title, page_url, html_length, status_code, scraped_at) VALUES
+(1, '홈페이지', 'https://site.com', 15700, 200, '2026-10-19 10:00:00'),
+(2, '404 페이지', 'https://site.com/notfound', 0, 404, '2026-11-02 09:00:00');
+
+-- 시간 조건이 있으면 해당 파티션만 읽습니다. (EXPLAIN에 scraping_html_results_p202611만 나타남)
+EXPLAIN SELECT * FROM scraping_html_results
+WHERE scraped_at >= '2026-11-01' AND scraped_at < '2026-12-01' AND status_code = 404;
+
+-- 보존 기간이 지난 달은 행 단위 DELETE 없이 통째로 제거합니다.
+ALTER TABLE scraping_html_results DETACH PARTITION scraping_html_results_p202610;
+DROP TABLE scraping_html_results_p202610;
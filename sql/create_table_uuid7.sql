@@ -0,0 +1,27 @@
+-- 시간 순서 UUID (UUIDv7): 확장 없이 PostgreSQL 13+ 기본 함수만 사용합니다.
+-- 무작위 v4와 달리 새 키가 항상 인덱스 오른쪽 끝에 쌓여 인덱스 팽창과 페이지 분할이 줄어듭니다.
+CREATE OR REPLACE FUNCTION uuid_generate_v7() RETURNS uuid AS $$
+    -- gen_random_uuid()(v4)의 앞 6바이트를 밀리초 시각으로 덮어쓰고 버전 비트를 0111로 바꿉니다.
+    SELECT encode(
+        set_bit(
+            set_bit(
+                overlay(uuid_send(gen_random_uuid())
+                        placing substring(int8send(floor(extract(epoch FROM clock_timestamp()) * 1000)::bigint) FROM 3)
+                        FROM 1 FOR 6),
+                52, 1),
+            53, 1),
+        'hex')::uuid
+$$ LANGUAGE sql VOLATILE PARALLEL SAFE;
+
+CREATE TABLE users_uuid7_name (
+  id_name UUID PRIMARY KEY DEFAULT uuid_generate_v7(),
+  name VARCHAR(100)
+);
+
+INSERT INTO users_uuid7_name (name) VALUES ('Alice');
+
+SELECT * FROM users_uuid7_name;
+
+-- 기존 v4 테이블 전환: 기본값만 바꾸고 이미 저장된 키는 유지합니다.
+-- ALTER TABLE users_uuid_name ALTER COLUMN id_name SET DEFAULT uuid_generate_v7();
+-- REINDEX TABLE users_uuid_name;  -- (선택) 팽창한 인덱스 재생성